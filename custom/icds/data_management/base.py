@@ -1,7 +1,12 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from django.db import connections
+
 from dimagi.utils.chunked import chunked
 
 from corehq.form_processor.backends.sql.dbaccessors import CaseReindexAccessor
 from corehq.form_processor.interfaces.dbaccessors import CaseAccessors
+from corehq.sql_db.util import get_db_aliases_for_partitioned_query
 from corehq.util.doc_processor.interface import BulkDocProcessor
 from corehq.util.doc_processor.sql import SqlDocumentProvider
 from custom.icds.data_management.progress_logger import (
@@ -9,6 +14,9 @@ from custom.icds.data_management.progress_logger import (
     SQLBasedProgressLogger,
 )
 
+# maximum number of shard dbs iterated at the same time
+MAX_DB_WORKERS = 8
+
 
 class DataManagement(object):
     slug = ""
@@ -33,25 +41,47 @@ class SQLBasedDataManagement(DataManagement):
         self.start_date = start_date
         self.end_date = end_date
 
-    def case_accessor(self):
+    def case_accessor(self, db_alias=None):
         return CaseReindexAccessor(
             domain=self.domain,
             case_type=self.case_type,
-            limit_db_aliases=self.db_aliases,
+            limit_db_aliases=[db_alias] if db_alias else self.db_aliases,
             start_date=self.start_date,
             end_date=self.end_date
         )
 
     def run(self, iteration_key):
         """
-        iterate sql records and update them as and when needed
+        iterate sql records and update them as and when needed,
+        with a worker per shard db iterating the records of its db.
+        Each db is iterated under its own iteration key so that running again
+        with the same iteration key resumes each db from where it stopped.
+        Each db also gets its own progress logger since the loggers are not thread safe
         """
-        record_provider = SqlDocumentProvider(iteration_key, self.case_accessor())
-        logger = SQLBasedProgressLogger(iteration_key)
-        processor = BulkDocProcessor(record_provider, self.doc_processor(self.domain),
-                                     progress_logger=logger)
-        processed, skipped = processor.run()
-        return processed, skipped, logger.logs
+        db_aliases = self.db_aliases or get_db_aliases_for_partitioned_query()
+        with ThreadPoolExecutor(max_workers=min(len(db_aliases), MAX_DB_WORKERS)) as executor:
+            results = list(executor.map(
+                lambda db_alias: self._run_for_db(f"{iteration_key}-{db_alias}", db_alias),
+                db_aliases
+            ))
+        processed = sum(db_processed for db_processed, db_skipped, db_logs in results)
+        skipped = sum(db_skipped for db_processed, db_skipped, db_logs in results)
+        logs = {}
+        for db_processed, db_skipped, db_logs in results:
+            logs.update(db_logs)
+        return processed, skipped, logs
+
+    def _run_for_db(self, db_iteration_key, db_alias):
+        try:
+            record_provider = SqlDocumentProvider(db_iteration_key, self.case_accessor(db_alias))
+            logger = SQLBasedProgressLogger(db_iteration_key)
+            processor = BulkDocProcessor(record_provider, self.doc_processor(self.domain),
+                                         progress_logger=logger)
+            processed, skipped = processor.run()
+            return processed, skipped, logger.logs
+        finally:
+            # the worker thread opens its own connections
+            connections.close_all()
 
 
 class ESBasedDataManagement(DataManagement):
@@ -60,9 +90,11 @@ class ESBasedDataManagement(DataManagement):
 
     def run(self, iteration_key):
         progress_logger = ESBasedProgressLogger(iteration_key)
-        case_ids = self._get_case_ids()
         doc_processor = self.doc_processor(self.domain)
-        for chunk in chunked(case_ids, 100):
-            case_accessor = CaseAccessors(self.domain)
+        case_accessor = CaseAccessors(self.domain)
+        processed = 0
+        # case ids are iterated as they are fetched instead of being loaded all at once
+        for chunk in chunked(self._get_case_ids(), 100):
             doc_processor.process_bulk_docs(case_accessor.get_cases(list(chunk)), progress_logger)
-        return len(case_ids), 0, progress_logger.logs
+            processed += len(chunk)
+        return processed, 0, progress_logger.logs
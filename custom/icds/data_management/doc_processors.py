@@ -1,3 +1,4 @@
+from collections import defaultdict
 from datetime import date
 from xml.etree import cElementTree as ElementTree
 
@@ -8,9 +9,9 @@ from corehq.apps.hqcase.utils import (
     submit_case_blocks,
 )
 from corehq.apps.users.util import SYSTEM_USER_ID
-from corehq.form_processor.backends.sql.dbaccessors import CaseAccessorSQL
-from corehq.form_processor.exceptions import CaseNotFound
 from corehq.form_processor.interfaces.dbaccessors import CaseAccessors
+from corehq.form_processor.models import CommCareCaseIndexSQL
+from corehq.sql_db.util import split_list_by_db_partition
 from corehq.util.doc_processor.interface import BaseDocProcessor
 from custom.icds.utils.location import find_test_awc_location_ids
 
@@ -43,6 +44,24 @@ class DataManagementDocProcessor(BaseDocProcessor):
             case_blocks.append(case_block)
         return case_blocks
 
+    def get_referenced_case_ids(self, case_ids, identifier):
+        """
+        resolve the indices of all the cases at once, with a query per shard db
+        :return: case id mapped to the ids of the cases referenced by its indices with the identifier
+        """
+        referenced_case_ids = defaultdict(list)
+        for db_name, db_case_ids in split_list_by_db_partition(case_ids):
+            for case_id, referenced_id in CommCareCaseIndexSQL.objects.using(db_name).filter(
+                domain=self.domain, case_id__in=db_case_ids, identifier=identifier
+            ).values_list('case_id', 'referenced_id'):
+                referenced_case_ids[case_id].append(referenced_id)
+        return referenced_case_ids
+
+    def get_cases_by_id(self, case_ids):
+        if not case_ids:
+            return {}
+        return {case.case_id: case for case in CaseAccessors(self.domain).get_cases(list(case_ids))}
+
     def handle_skip(self, doc):
         print('Unable to process case {}'.format(doc['_id']))
         return True
@@ -54,23 +73,20 @@ class PopulateMissingMotherNameDocProcessor(DataManagementDocProcessor):
         date_today = date.today()
         self.cut_off_dob = str(date_today.replace(year=date_today.year - CUT_OFF_AGE_IN_YEARS))
         self.test_location_ids = find_test_awc_location_ids(self.domain)
-        self.case_accessor = CaseAccessors(self.domain)
 
     def process_bulk_docs(self, docs, progress_logger):
         updates = {}
         cases_updated = {}
+        mother_case_ids = self.get_referenced_case_ids([doc['_id'] for doc in docs], MOTHER_INDEX_IDENTIFIER)
+        mother_cases = self.get_cases_by_id({
+            referenced_ids[0] for referenced_ids in mother_case_ids.values() if len(referenced_ids) == 1
+        })
         for doc in docs:
             case_id = doc['_id']
-            mother_case_ids = [i.referenced_id for i in CaseAccessorSQL.get_indices(self.domain, case_id)
-                               if i.identifier == MOTHER_INDEX_IDENTIFIER]
-            if len(mother_case_ids) == 1:
-                try:
-                    mother_case = self.case_accessor.get_case(mother_case_ids[0])
-                except CaseNotFound:
-                    pass
-                else:
-                    updates[case_id] = {MOTHER_NAME_PROPERTY: mother_case.name}
-                    cases_updated[case_id] = doc
+            referenced_ids = mother_case_ids.get(case_id, [])
+            if len(referenced_ids) == 1 and referenced_ids[0] in mother_cases:
+                updates[case_id] = {MOTHER_NAME_PROPERTY: mother_cases[referenced_ids[0]].name}
+                cases_updated[case_id] = doc
         if updates:
             for case_id, case_doc in cases_updated.items():
                 progress_logger.document_processed(case_doc, updates[case_id])
@@ -19,4 +19,4 @@ class ResetMissingCaseName(ESBasedDataManagement):
             .case_type(self.case_type)
             .is_closed(False)
             .term('name.exact', '')
-        ).get_ids()
+        ).scroll_ids()
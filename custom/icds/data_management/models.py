@@ -67,6 +67,8 @@ class DataManagementRequest(models.Model):
 
     def _perform_task(self):
         task_to_run = DATA_MANAGEMENT_TASKS[self.slug](self.domain, self.db_alias, self.start_date, self.end_date)
+        # the same for every execution of the request, for a request executed again
+        # to resume from the progress checkpointed by the previous execution
         iteration_key = "%s-%s-%s-%s-%s" % (self.slug, self.start_date, self.end_date, self.initiated_by,
-                                            self.started_on)
+                                            self.created_at)
         return task_to_run.run(iteration_key)
@@ -127,6 +127,69 @@ ICDS_LOCATION_REASSIGNMENT_AGG = StaticToggle(
     namespaces=[NAMESPACE_DOMAIN],
 )
 
+ICDS_INCREMENTAL_AGGREGATION = StaticToggle(
+    'icds_incremental_aggregation',
+    'ICDS: Skip per state aggregation steps whose UCR data has not changed since the last aggregation',
+    TAG_CUSTOM,
+    namespaces=[NAMESPACE_DOMAIN],
+)
+
+ICDS_PARALLEL_MONTH_AGGREGATION = StaticToggle(
+    'icds_parallel_month_aggregation',
+    'ICDS: Aggregate the months of the daily aggregation at the same time instead of one after the other',
+    TAG_CUSTOM,
+    namespaces=[NAMESPACE_DOMAIN],
+)
+
+ICDS_AGGREGATION_PROFILING = StaticToggle(
+    'icds_aggregation_profiling',
+    'ICDS: Record the duration and rows affected of every statement run by the aggregation helpers',
+    TAG_CUSTOM,
+    namespaces=[NAMESPACE_DOMAIN],
+)
+
+ICDS_AGGREGATION_EXPLAIN = StaticToggle(
+    'icds_aggregation_explain',
+    'ICDS: Also record EXPLAIN (ANALYZE, BUFFERS) output of the aggregation statements when profiling',
+    TAG_CUSTOM,
+    namespaces=[NAMESPACE_DOMAIN],
+)
+
+ICDS_BATCHED_STATE_AGGREGATION = StaticToggle(
+    'icds_batched_state_aggregation',
+    'ICDS: Aggregate the form tables of a state in a single task and transaction',
+    TAG_CUSTOM,
+    namespaces=[NAMESPACE_DOMAIN],
+)
+
+ICDS_MATERIALIZED_DASHBOARD_RESULTS = StaticToggle(
+    'icds_materialized_dashboard_results',
+    'ICDS: Precompute the dashboard indicator maps and charts after aggregation and serve them from the database',
+    TAG_CUSTOM,
+    namespaces=[NAMESPACE_DOMAIN],
+)
+
+ICDS_DASHBOARD_CACHE_WARMUP = StaticToggle(
+    'icds_dashboard_cache_warmup',
+    'ICDS: Record the most requested dashboard data and load it in the cache after aggregation',
+    TAG_CUSTOM,
+    namespaces=[NAMESPACE_DOMAIN],
+)
+
+ICDS_STREAMING_EXPORTS = StaticToggle(
+    'icds_streaming_exports',
+    'ICDS: Write the dashboard CSV/XLSX exports row by row instead of building them in memory',
+    TAG_CUSTOM,
+    namespaces=[NAMESPACE_DOMAIN],
+)
+
+ICDS_BULK_HOUSEHOLD_REASSIGNMENT = StaticToggle(
+    'icds_bulk_household_reassignment',
+    'ICDS: Reassign households in parallel batches, resuming from the last batch processed after failures',
+    TAG_CUSTOM,
+    namespaces=[NAMESPACE_DOMAIN],
+)
+
 ENABLE_ICDS_DASHBOARD_RELEASE_NOTES_UPDATE = StaticToggle(
     'enable_icds_dashboard_release_notes_update',
     'Enable updating ICDS dashboard release notes for specific users',
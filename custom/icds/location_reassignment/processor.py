@@ -1,4 +1,12 @@
-from collections import defaultdict
+import hashlib
+import json
+import logging
+from collections import defaultdict, namedtuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+
+from django.core.cache import cache
+from django.db import connections
 
 from memoized import memoized
 
@@ -6,6 +14,16 @@ from corehq.apps.locations.models import LocationType, SQLLocation
 from custom.icds.location_reassignment.models import Transition
 from custom.icds.location_reassignment.utils import get_supervisor_id
 
+logger = logging.getLogger(__name__)
+
+# number of households reassigned with a single form submission in bulk reassignments
+HOUSEHOLD_BATCH_SIZE = 50
+# number of batches of households submitted at the same time
+REASSIGNMENT_WORKERS = 4
+
+HouseholdBatch = namedtuple('HouseholdBatch', ['batch_id', 'old_owner_id', 'new_owner_id', 'supervisor_id',
+                                               'household_case_ids'])
+
 
 class Processor(object):
     def __init__(self, domain, transitions):
@@ -39,6 +57,14 @@ class HouseholdReassignmentProcessor():
 
     def process(self):
         from custom.icds.location_reassignment.utils import reassign_household
+        for household_id, (old_owner_id, new_owner_id) in self._get_owner_ids().items():
+            supervisor_id = self._supervisor_id(old_owner_id)
+            reassign_household(self.domain, household_id, old_owner_id, new_owner_id, supervisor_id)
+
+    def _get_owner_ids(self):
+        """
+        :return: household case id mapped to its old and new owner id
+        """
         old_site_codes = set()
         new_site_codes = set()
         for household_id, details in self.reassignments.items():
@@ -50,17 +76,112 @@ class HouseholdReassignmentProcessor():
         new_locations_by_site_code = {
             loc.site_code: loc
             for loc in SQLLocation.active_objects.filter(domain=self.domain, site_code__in=new_site_codes)}
-        for household_id, details in self.reassignments.items():
-            old_owner_id = old_locations_by_site_code[details['old_site_code']].location_id
-            new_owner_id = new_locations_by_site_code[details['new_site_code']].location_id
-            supervisor_id = self._supervisor_id(old_owner_id)
-            reassign_household(self.domain, household_id, old_owner_id, new_owner_id, supervisor_id)
+        return {
+            household_id: (
+                old_locations_by_site_code[details['old_site_code']].location_id,
+                new_locations_by_site_code[details['new_site_code']].location_id,
+            )
+            for household_id, details in self.reassignments.items()
+        }
 
     @memoized
     def _supervisor_id(self, location_id):
         return get_supervisor_id(self.domain, location_id)
 
 
+class BulkHouseholdReassignmentProcessor(HouseholdReassignmentProcessor):
+    """
+    Reassigns households grouped by their old and new AWC, submitting the case blocks
+    of a batch of households and their member cases with a single form,
+    with batches submitted in parallel.
+    Batches submitted successfully are checkpointed so that processing the same
+    reassignments again after a failure resumes with the batches left.
+    """
+    def __init__(self, domain, reassignments, batch_size=HOUSEHOLD_BATCH_SIZE, workers=REASSIGNMENT_WORKERS):
+        super().__init__(domain, reassignments)
+        self.batch_size = batch_size
+        self.workers = workers
+        self.checkpoint = ReassignmentCheckpoint(domain, reassignments)
+
+    def process(self):
+        batches = self.get_batches()
+        pending_batches = self.checkpoint.get_pending_batches(batches)
+        total = len(batches)
+        completed = total - len(pending_batches)
+        if completed:
+            logger.info(f"[Location Reassignment] Resuming {self.domain} household reassignment "
+                        f"with {completed}/{total} batches already processed")
+        deprecation_time = datetime.utcnow()
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futures = [
+                executor.submit(self._process_batch, batch, deprecation_time)
+                for batch in pending_batches
+            ]
+            try:
+                for future in as_completed(futures):
+                    future.result()
+                    completed += 1
+                    logger.info(f"[Location Reassignment] Processed {completed}/{total} batches "
+                                f"of households for {self.domain}")
+            except Exception:
+                for future in futures:
+                    future.cancel()
+                raise
+        self.checkpoint.clear(batches)
+
+    def get_batches(self):
+        households_by_owner_ids = defaultdict(list)
+        for household_id, owner_ids in self._get_owner_ids().items():
+            households_by_owner_ids[owner_ids].append(household_id)
+        batches = []
+        for (old_owner_id, new_owner_id), household_ids in sorted(households_by_owner_ids.items()):
+            household_ids = sorted(household_ids)
+            supervisor_id = self._supervisor_id(old_owner_id)
+            for index in range(0, len(household_ids), self.batch_size):
+                batches.append(HouseholdBatch(
+                    f"{old_owner_id}-{new_owner_id}-{index}", old_owner_id, new_owner_id, supervisor_id,
+                    household_ids[index:index + self.batch_size]
+                ))
+        return batches
+
+    def _process_batch(self, batch, deprecation_time):
+        from custom.icds.location_reassignment.utils import reassign_households
+        try:
+            reassign_households(self.domain, batch.household_case_ids, batch.old_owner_id, batch.new_owner_id,
+                                batch.supervisor_id, deprecation_time)
+            self.checkpoint.mark_processed(batch)
+        finally:
+            # each worker thread opens its own connections
+            connections.close_all()
+
+
+class ReassignmentCheckpoint(object):
+    """
+    Keeps track of the batches of a reassignment processed successfully,
+    for the same reassignments uploaded again to skip them
+    """
+    timeout = 7 * 24 * 60 * 60
+
+    def __init__(self, domain, reassignments):
+        reassignments_hash = hashlib.md5(
+            json.dumps(reassignments, sort_keys=True).encode('utf-8')
+        ).hexdigest()
+        self.key_prefix = f'location-reassignment-checkpoint/{domain}/{reassignments_hash}'
+
+    def _get_key(self, batch):
+        return f'{self.key_prefix}/{batch.batch_id}'
+
+    def get_pending_batches(self, batches):
+        processed_keys = cache.get_many([self._get_key(batch) for batch in batches])
+        return [batch for batch in batches if self._get_key(batch) not in processed_keys]
+
+    def mark_processed(self, batch):
+        cache.set(self._get_key(batch), True, self.timeout)
+
+    def clear(self, batches):
+        cache.delete_many([self._get_key(batch) for batch in batches])
+
+
 class OtherCasesReassignmentProcessor():
     def __init__(self, domain, reassignments):
         self.domain = domain
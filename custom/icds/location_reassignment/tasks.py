@@ -9,9 +9,11 @@ from corehq.apps.userreports.data_source_providers import (
 from corehq.apps.userreports.specs import EvaluationContext
 from corehq.apps.userreports.util import get_indicator_adapter
 from corehq.form_processor.backends.sql.dbaccessors import CaseAccessorSQL
+from custom.icds.icds_toggles import ICDS_BULK_HOUSEHOLD_REASSIGNMENT
 from custom.icds.location_reassignment.download import Households, OtherCases
 from custom.icds.location_reassignment.models import Transition
 from custom.icds.location_reassignment.processor import (
+    BulkHouseholdReassignmentProcessor,
     HouseholdReassignmentProcessor,
     OtherCasesReassignmentProcessor,
     Processor,
@@ -24,6 +26,7 @@ from custom.icds.location_reassignment.utils import (
     reassign_cases,
     reassign_household,
 )
+from custom.icds_reports.ucr.expressions import prefetch_case_forms
 
 
 @task
@@ -124,8 +127,12 @@ def email_other_cases_details(domain, transitions, uploaded_filename, user_email
 
 @task
 def process_households_reassignment(domain, reassignments, uploaded_filename, user_email):
+    if ICDS_BULK_HOUSEHOLD_REASSIGNMENT.enabled(domain):
+        processor_class = BulkHouseholdReassignmentProcessor
+    else:
+        processor_class = HouseholdReassignmentProcessor
     try:
-        HouseholdReassignmentProcessor(domain, reassignments).process()
+        processor_class(domain, reassignments).process()
     except Exception as e:
         notify_failure(
             e,
@@ -179,12 +186,13 @@ def process_ucr_changes(domain, case_ids):
         for config in all_configs
     ]
 
-    for doc in docs:
-        eval_context = EvaluationContext(doc)
-        for adapter in adapters:
-            if adapter.config.filter(doc, eval_context):
-                rows_to_save = adapter.get_all_values(doc, eval_context)
-                if rows_to_save:
-                    adapter.save_rows(rows_to_save, use_shard_col=False)
-                else:
-                    adapter.delete(doc, use_shard_col=False)
+    with prefetch_case_forms(domain, docs):
+        for doc in docs:
+            eval_context = EvaluationContext(doc)
+            for adapter in adapters:
+                if adapter.config.filter(doc, eval_context):
+                    rows_to_save = adapter.get_all_values(doc, eval_context)
+                    if rows_to_save:
+                        adapter.save_rows(rows_to_save, use_shard_col=False)
+                    else:
+                        adapter.delete(doc, use_shard_col=False)
@@ -7,6 +7,7 @@ from mock import call, patch
 
 from custom.icds.location_reassignment.const import MOVE_OPERATION
 from custom.icds.location_reassignment.processor import (
+    BulkHouseholdReassignmentProcessor,
     HouseholdReassignmentProcessor,
     Processor,
 )
@@ -106,3 +107,58 @@ class TestHouseholdReassignmentProcessor(UnitTestTestCase):
             call(self.domain, 'household_case_id1', '199', '299', 'a_supervisor_id'),
             call(self.domain, 'household_case_id2', '399', '499', 'a_supervisor_id')
         ])
+
+
+@patch('custom.icds.location_reassignment.processor.connections')
+@patch('custom.icds.location_reassignment.processor.get_supervisor_id', return_value='a_supervisor_id')
+@patch('custom.icds.location_reassignment.processor.SQLLocation.active_objects.filter')
+@patch('custom.icds.location_reassignment.processor.SQLLocation.objects.filter')
+class TestBulkHouseholdReassignmentProcessor(UnitTestTestCase):
+    domain = "test"
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.old_locations = [Location(location_id='199', site_code='1'),
+                             Location(location_id='399', site_code='3')]
+        cls.new_locations = [Location(location_id='299', site_code='2'),
+                             Location(location_id='499', site_code='4')]
+        cls.reassignments = {
+            'household_case_id1': {'old_site_code': '1', 'new_site_code': '2'},
+            'household_case_id2': {'old_site_code': '3', 'new_site_code': '4'},
+            'household_case_id3': {'old_site_code': '1', 'new_site_code': '2'},
+            'household_case_id4': {'old_site_code': '1', 'new_site_code': '2'},
+        }
+
+    def _get_processor(self, old_locations_fetch_mock, new_locations_fetch_mock):
+        old_locations_fetch_mock.return_value = self.old_locations
+        new_locations_fetch_mock.return_value = self.new_locations
+        return BulkHouseholdReassignmentProcessor(self.domain, self.reassignments, batch_size=2, workers=1)
+
+    def test_batches(self, old_locations_fetch_mock, new_locations_fetch_mock, *mocks):
+        processor = self._get_processor(old_locations_fetch_mock, new_locations_fetch_mock)
+        batches = processor.get_batches()
+        self.assertEqual(
+            [(batch.old_owner_id, batch.new_owner_id, batch.household_case_ids) for batch in batches],
+            [
+                ('199', '299', ['household_case_id1', 'household_case_id3']),
+                ('199', '299', ['household_case_id4']),
+                ('399', '499', ['household_case_id2']),
+            ]
+        )
+
+    @patch('custom.icds.location_reassignment.utils.reassign_households')
+    def test_resume_after_failure(self, reassign_households_mock, old_locations_fetch_mock,
+                                  new_locations_fetch_mock, *mocks):
+        processor = self._get_processor(old_locations_fetch_mock, new_locations_fetch_mock)
+        reassign_households_mock.side_effect = [None, None, Exception]
+        with self.assertRaises(Exception):
+            processor.process()
+
+        reassign_households_mock.reset_mock(side_effect=True)
+        processor = self._get_processor(old_locations_fetch_mock, new_locations_fetch_mock)
+        processor.process()
+        reassign_households_mock.assert_called_once()
+        self.assertEqual(reassign_households_mock.call_args[0][1], ['household_case_id2'])
+        self.assertEqual(processor.checkpoint.get_pending_batches(processor.get_batches()),
+                         processor.get_batches())
@@ -97,6 +97,34 @@ def reassign_household(domain, household_case_id, old_owner_id, new_owner_id, su
     else:
         case_ids = get_household_child_case_ids_by_owner(domain, household_case_id, old_owner_id)
     case_ids.append(household_case_id)
+    case_blocks = get_household_case_blocks(case_ids, old_owner_id, new_owner_id, supervisor_id,
+                                             deprecation_time)
+    if case_blocks:
+        submit_case_blocks(case_blocks, domain, user_id=SYSTEM_USER_ID)
+    process_ucr_changes.delay(domain, case_ids)
+
+
+def reassign_households(domain, household_case_ids, old_owner_id, new_owner_id, supervisor_id,
+                        deprecation_time=None):
+    """
+    reassign a batch of households of an owner and their member cases
+    to the new owner with a single form submission
+    """
+    from custom.icds.location_reassignment.tasks import process_ucr_changes
+    if deprecation_time is None:
+        deprecation_time = datetime.utcnow()
+    case_ids = []
+    for household_case_id in household_case_ids:
+        case_ids.extend(get_household_child_case_ids_by_owner(domain, household_case_id, old_owner_id))
+        case_ids.append(household_case_id)
+    case_blocks = get_household_case_blocks(case_ids, old_owner_id, new_owner_id, supervisor_id,
+                                             deprecation_time)
+    if case_blocks:
+        submit_case_blocks(case_blocks, domain, user_id=SYSTEM_USER_ID)
+    process_ucr_changes.delay(domain, case_ids)
+
+
+def get_household_case_blocks(case_ids, old_owner_id, new_owner_id, supervisor_id, deprecation_time):
     case_blocks = []
     for case_id in case_ids:
         updates = {
@@ -111,9 +139,7 @@ def reassign_household(domain, household_case_id, old_owner_id, new_owner_id, su
                                user_id=SYSTEM_USER_ID)
         case_block = ElementTree.tostring(case_block.as_xml()).decode('utf-8')
         case_blocks.append(case_block)
-    if case_blocks:
-        submit_case_blocks(case_blocks, domain, user_id=SYSTEM_USER_ID)
-    process_ucr_changes.delay(domain, case_ids)
+    return case_blocks
 
 
 def reassign_cases(domain, case_ids, new_owner_id):
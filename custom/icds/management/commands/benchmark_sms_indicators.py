@@ -0,0 +1,69 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from corehq.apps.locations.dbaccessors import get_users_by_location_id
+from corehq.apps.locations.models import SQLLocation
+from custom.icds.const import AWC_LOCATION_TYPE_CODE, SUPERVISOR_LOCATION_TYPE_CODE
+from custom.icds.messaging.custom_content import (
+    count_queries,
+    run_indicator_for_user,
+    run_indicator_for_users,
+)
+from custom.icds.messaging.indicators import (
+    AWWSubmissionPerformanceIndicator,
+    AWWVHNDSurveyIndicator,
+    LSSubmissionPerformanceIndicator,
+    LSVHNDSurveyIndicator,
+)
+
+INDICATORS = {
+    indicator_class.slug: (indicator_class, location_type_code)
+    for indicator_class, location_type_code in [
+        (AWWSubmissionPerformanceIndicator, AWC_LOCATION_TYPE_CODE),
+        (AWWVHNDSurveyIndicator, AWC_LOCATION_TYPE_CODE),
+        (LSSubmissionPerformanceIndicator, SUPERVISOR_LOCATION_TYPE_CODE),
+        (LSVHNDSurveyIndicator, SUPERVISOR_LOCATION_TYPE_CODE),
+    ]
+}
+
+
+class Command(BaseCommand):
+    help = """
+    Compares running an SMS indicator user by user with running it for all the users
+    under a location from a single snapshot, and reports the number of queries of each run.
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument('domain')
+        parser.add_argument('location_id')
+        parser.add_argument('indicator', choices=sorted(INDICATORS))
+
+    def handle(self, domain, location_id, indicator, **options):
+        indicator_class, location_type_code = INDICATORS[indicator]
+        location_ids = SQLLocation.objects.get(
+            domain=domain, location_id=location_id
+        ).get_descendants(include_self=True).filter(
+            location_type__code=location_type_code
+        ).values_list('location_id', flat=True)
+        users = [
+            user
+            for location_id in location_ids
+            for user in get_users_by_location_id(domain, location_id)
+        ]
+        self.stdout.write(f'{len(users)} users')
+
+        start = time.time()
+        with count_queries({}) as counter:
+            by_user = {
+                user.get_id: run_indicator_for_user(user, indicator_class, language_code='en')
+                for user in users
+            }
+        self.stdout.write(f'user by user: {counter["queries"]} queries, {time.time() - start:.1f}s')
+
+        start = time.time()
+        batched, queries = run_indicator_for_users(users, indicator_class, language_code='en')
+        self.stdout.write(f'batched: {queries} queries, {time.time() - start:.1f}s')
+
+        if by_user != batched:
+            raise AssertionError('The batched run does not return the same messages')
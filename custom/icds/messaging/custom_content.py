@@ -1,5 +1,7 @@
+from contextlib import ExitStack, contextmanager
 from decimal import Decimal, InvalidOperation
 
+from django.db import connections
 from django.template import TemplateDoesNotExist
 from django.template.loader import render_to_string
 
@@ -9,6 +11,7 @@ from corehq.apps.users.models import CommCareUser
 from corehq.form_processor.backends.sql.dbaccessors import CaseAccessorSQL
 from corehq.form_processor.models import XFormInstanceSQL
 from corehq.sql_db.util import get_db_aliases_for_partitioned_query
+from corehq.util.metrics import metrics_counter
 from custom.icds.case_relationships import (
     child_person_case_from_child_health_case,
     mother_person_case_from_ccs_record_case,
@@ -29,11 +32,13 @@ from custom.icds.messaging.indicators import (
     AWWIndicator,
     AWWSubmissionPerformanceIndicator,
     AWWVHNDSurveyIndicator,
+    IndicatorSnapshot,
     LSAggregatePerformanceIndicator,
     LSAggregatePerformanceIndicatorV2,
     LSIndicator,
     LSSubmissionPerformanceIndicator,
     LSVHNDSurveyIndicator,
+    get_scheduled_run_snapshot,
 )
 from custom.icds.messaging.utils import (
     get_app_version_used_by_user,
@@ -237,28 +242,102 @@ def cf_visits_complete(recipient, case_schedule_instance):
     return [render_content_for_user(recipient, 'cf_visits_complete.txt', context)]
 
 
-def validate_user_location_and_indicator(user, indicator_class):
+def validate_user_location_and_indicator(user, indicator_class, location_type_code=None):
+    if location_type_code is None:
+        location_type_code = user.location.location_type.code
     if issubclass(indicator_class, AWWIndicator):
-        if user.location.location_type.code != AWC_LOCATION_TYPE_CODE:
+        if location_type_code != AWC_LOCATION_TYPE_CODE:
             raise TypeError("Expected AWWIndicator to be called for an AWW, got %s instead" % user.get_id)
     elif issubclass(indicator_class, LSIndicator):
-        if user.location.location_type.code != SUPERVISOR_LOCATION_TYPE_CODE:
+        if location_type_code != SUPERVISOR_LOCATION_TYPE_CODE:
             raise TypeError("Expected LSIndicator to be called for an LS, got %s instead" % user.get_id)
     else:
         raise TypeError("Expected AWWIndicator or LSIndicator")
 
 
-def run_indicator_for_user(user, indicator_class, language_code=None):
+def run_indicator_for_user(user, indicator_class, language_code=None, snapshot=None):
+    if snapshot is not None:
+        return _run_indicator_from_snapshot(user, indicator_class, snapshot, language_code) or []
     validate_user_location_and_indicator(user, indicator_class)
     indicator = indicator_class(user.domain, user)
     return indicator.get_messages(language_code=language_code)
 
 
+def _run_indicator_from_snapshot(user, indicator_class, snapshot, language_code=None):
+    """
+    Runs an indicator for a user from an IndicatorSnapshot.
+    Returns None when the location of the user is not found or does not match the
+    indicator, after reporting the user, so that the other users are not affected.
+    """
+    snapshot.add_users([user])
+    if snapshot.has_location(user.location_id):
+        try:
+            validate_user_location_and_indicator(
+                user, indicator_class, snapshot.get_location_type_code(user.location_id)
+            )
+        except TypeError:
+            pass
+        else:
+            indicator = indicator_class(user.domain, user, snapshot=snapshot)
+            return indicator.get_messages(language_code=language_code)
+
+    notify_exception(
+        None,
+        message="Skipped user for ICDS indicator",
+        details={'user_id': user.get_id, 'location_id': user.location_id, 'indicator': indicator_class.slug},
+    )
+    return None
+
+
+@contextmanager
+def count_queries(counter):
+    """counts the queries run on all the databases, in counter['queries']"""
+    def _count(execute, sql, params, many, context):
+        counter['queries'] += 1
+        return execute(sql, params, many, context)
+
+    counter['queries'] = 0
+    with ExitStack() as stack:
+        for alias in connections:
+            stack.enter_context(connections[alias].execute_wrapper(_count))
+        yield counter
+
+
+def run_indicator_for_users(users, indicator_class, language_code=None):
+    """
+    Runs an indicator for a batch of users of a scheduled run, from a single
+    IndicatorSnapshot loaded for all of them.
+    Users whose location is not found or does not match the indicator are reported and skipped
+    so that they do not prevent the messages of the other users.
+    :return: {user id: messages}, and the number of database queries run
+    """
+    users = [user for user in users if user.location_id]
+    if not users:
+        return {}, 0
+
+    messages = {}
+    with count_queries({}) as counter:
+        snapshot = IndicatorSnapshot(users[0].domain, users)
+        for user in users:
+            user_messages = _run_indicator_from_snapshot(user, indicator_class, snapshot, language_code)
+            if user_messages is not None:
+                messages[user.get_id] = user_messages
+    metrics_counter('commcare.icds.sms_indicators.queries', counter['queries'],
+                    tags={'indicator': indicator_class.slug})
+    return messages, counter['queries']
+
+
 def run_indicator_for_usercase(usercase, indicator_class, user=None):
     if not user:
         user = get_user_from_usercase(usercase)
-    if user and user.location:
-        return run_indicator_for_user(user, indicator_class, language_code=usercase.get_language_code())
+    if user and user.location_id:
+        # the indicators of the scheduled messages share the data loaded for the run
+        return run_indicator_for_user(
+            user,
+            indicator_class,
+            language_code=usercase.get_language_code(),
+            snapshot=get_scheduled_run_snapshot(user.domain),
+        )
 
     return []
 
@@ -1,4 +1,5 @@
 import math
+from collections import defaultdict
 from datetime import date, datetime, timedelta
 
 from django.conf import settings
@@ -6,9 +7,9 @@ from django.db import connections
 from django.db.models import Max
 from django.template import TemplateDoesNotExist
 from django.template.loader import get_template, render_to_string
+from django.utils.functional import cached_property
 
 import pytz
-from lxml import etree
 from memoized import memoized
 
 from casexml.apps.phone.models import OTARestoreCommCareUser
@@ -21,6 +22,8 @@ from corehq.apps.app_manager.fixtures.mobile_ucr import (
     ReportFixturesProviderV1,
     ReportFixturesProviderV2,
 )
+from corehq.apps.locations.dbaccessors import get_users_by_location_id
+from corehq.apps.locations.models import SQLLocation
 from corehq.apps.userreports.models import StaticDataSourceConfiguration
 from corehq.apps.userreports.util import get_table_name
 from corehq.sql_db.connections import connection_manager
@@ -84,8 +87,7 @@ def get_report_configs(domain, ls_app_version):
     }
 
 
-@quickcache(['domain', 'report_id', 'ota_user.user_id', 'ls_app_version'], timeout=12 * 60 * 60)
-def _get_cached_report_fixture_for_user(domain, report_id, ota_user, ls_app_version):
+def _get_report_fixture_for_user(domain, report_id, ota_user, ls_app_version):
     """
     :param domain: the domain
     :param report_id: the index to the result from get_report_configs()
@@ -95,27 +97,10 @@ def _get_cached_report_fixture_for_user(domain, report_id, ota_user, ls_app_vers
     [xml] = ReportFixturesProviderV1().report_config_to_fixture(
         get_report_configs(domain, ls_app_version)[report_id], ota_user
     )
-    return etree.tostring(xml)
+    return xml
 
 
-def get_report_fixture_for_user(domain, report_id, ota_user, ls_app_version):
-    """
-    The Element objects used by the lxml library don't cache properly.
-    So instead we cache the XML string and convert back here.
-    """
-    return etree.fromstring(_get_cached_report_fixture_for_user(domain, report_id, ota_user, ls_app_version))
-
-
-def get_v2_report_fixture_for_user(domain, report_slug, ota_user, ls_app_version):
-    """
-    The Element objects used by the lxml library don't cache properly.
-    So instead we cache the XML string and convert back here.
-    """
-    return etree.fromstring(_get_cached_v2_report_fixture_for_user(domain, report_slug, ota_user, ls_app_version))
-
-
-@quickcache(['domain', 'report_slug', 'ota_user.user_id', 'ls_app_version'], timeout=12 * 60 * 60)
-def _get_cached_v2_report_fixture_for_user(domain, report_slug, ota_user, ls_app_version):
+def _get_v2_report_fixture_for_user(domain, report_slug, ota_user, ls_app_version):
     """
     :param domain: the domain
     :param report_slug: the slug/alias of the report
@@ -123,10 +108,55 @@ def _get_cached_v2_report_fixture_for_user(domain, report_slug, ota_user, ls_app
     :param ls_app_version: the version of app user is on
     """
     report_config = _get_v2_report_configs(domain, ls_app_version)[report_slug]
-    xml = ReportFixturesProviderV2().report_config_to_fixture(
+    return ReportFixturesProviderV2().report_config_to_fixture(
         report_config, ota_user
     )[1]
-    return etree.tostring(xml)
+
+
+class ReportValues(object):
+    """
+    The values of the rows of a mobile report fixture, which is all the SMS indicators
+    read from the fixture. Only they are cached, not the fixture XML, so that the indicators
+    of the AWWs of a supervisor read the values without parsing the fixture again.
+    """
+
+    def __init__(self, rows, total_row=None):
+        # rows that are not total rows, as {column id: value}
+        self.rows = rows
+        self.total_row = total_row
+
+    @classmethod
+    def from_v1_fixture(cls, fixture):
+        rows = []
+        total_row = None
+        for row in fixture.findall('./rows/row'):
+            values = {column.get('id'): column.text for column in row.findall('./column')}
+            if row.get('is_total_row') == 'True':
+                total_row = total_row or values
+            else:
+                rows.append(values)
+        return cls(rows, total_row)
+
+    @classmethod
+    def from_v2_fixture(cls, fixture):
+        return cls([
+            {column.tag: column.text for column in row}
+            for row in fixture.findall('./rows/row[@is_total_row="False"]')
+        ])
+
+
+@quickcache(['domain', 'report_id', 'ota_user.user_id', 'ls_app_version'], timeout=12 * 60 * 60,
+            skip_arg=lambda *args: settings.UNIT_TESTING)
+def get_report_values_for_user(domain, report_id, ota_user, ls_app_version):
+    return ReportValues.from_v1_fixture(_get_report_fixture_for_user(domain, report_id, ota_user, ls_app_version))
+
+
+@quickcache(['domain', 'report_slug', 'ota_user.user_id', 'ls_app_version'], timeout=12 * 60 * 60,
+            skip_arg=lambda *args: settings.UNIT_TESTING)
+def get_v2_report_values_for_user(domain, report_slug, ota_user, ls_app_version):
+    return ReportValues.from_v2_fixture(
+        _get_v2_report_fixture_for_user(domain, report_slug, ota_user, ls_app_version)
+    )
 
 
 @quickcache(['domain', 'ls_app_version'], timeout=4 * 60 * 60, memoize_timeout=4 * 60 * 60)
@@ -147,6 +177,124 @@ class IndicatorError(Exception):
     pass
 
 
+class IndicatorSnapshot(object):
+    """
+    The data the AWW and LS indicators are computed from, loaded for all the users
+    of a scheduled run at once with a few set based queries, instead of by each
+    indicator for its own user.
+
+    Users can also be added one at a time, as the scheduled messages are sent,
+    in which case only the data of their locations that is not loaded yet is queried.
+    """
+
+    def __init__(self, domain, users=()):
+        self.domain = domain
+        self.location_ids = set()
+        self._locations = {}
+        self._child_awc_locations = {}
+        self._last_submission_dates = {}
+        self._loaded_location_ids = defaultdict(set)
+        self._supervisor_indicators = {}
+        self.add_users(users)
+
+    def add_users(self, users):
+        self.location_ids.update(user.location_id for user in users if user.location_id)
+
+    def _get_location_ids_to_load(self, data_name):
+        location_ids = self.location_ids - self._loaded_location_ids[data_name]
+        self._loaded_location_ids[data_name].update(location_ids)
+        return location_ids
+
+    @property
+    def locations(self):
+        """location id mapped to the name, parent location id and location type of the locations of the users"""
+        location_ids = self._get_location_ids_to_load('locations')
+        if location_ids:
+            self._locations.update({
+                location['location_id']: location
+                for location in SQLLocation.objects.filter(
+                    domain=self.domain, location_id__in=location_ids
+                ).values('location_id', 'name', 'parent__location_id', 'location_type__code')
+            })
+        return self._locations
+
+    @property
+    def child_awc_locations(self):
+        """location id of the LS mapped to {AWC location id: AWC name} for the AWCs under it"""
+        location_ids = self._get_location_ids_to_load('child_awc_locations')
+        if location_ids:
+            self._child_awc_locations.update({location_id: {} for location_id in location_ids})
+            for parent_id, location_id, name in SQLLocation.objects.filter(
+                domain=self.domain, parent__location_id__in=location_ids, is_archived=False
+            ).values_list('parent__location_id', 'location_id', 'name'):
+                self._child_awc_locations[parent_id][location_id] = name
+        return self._child_awc_locations
+
+    @property
+    def last_submission_dates(self):
+        location_ids = self._get_location_ids_to_load('last_submission_dates')
+        if location_ids:
+            child_awc_locations = self.child_awc_locations
+            awc_ids = set(location_ids)
+            for location_id in location_ids:
+                awc_ids.update(child_awc_locations[location_id])
+            self._last_submission_dates.update(_get_last_submission_dates(awc_ids))
+        return self._last_submission_dates
+
+    @cached_property
+    def awcs_in_vhnd_timeframe(self):
+        return get_awws_in_vhnd_timeframe(self.domain)
+
+    def has_location(self, location_id):
+        return location_id in self.locations
+
+    def get_location_name(self, location_id):
+        return self.locations[location_id]['name']
+
+    def get_location_type_code(self, location_id):
+        return self.locations[location_id]['location_type__code']
+
+    def get_awc_locations(self, location_id):
+        return self.child_awc_locations[location_id]
+
+    @memoized
+    def _get_supervisor(self, supervisor_location_id):
+        return get_users_by_location_id(self.domain, supervisor_location_id).first()
+
+    def get_supervisor_indicator(self, indicator_class, supervisor):
+        """the LS indicator of a supervisor, shared by the indicators of all the AWWs under it"""
+        key = (indicator_class, supervisor.get_id)
+        if key not in self._supervisor_indicators:
+            self._supervisor_indicators[key] = indicator_class(self.domain, supervisor, snapshot=self)
+        return self._supervisor_indicators[key]
+
+    def get_supervisor(self, aww):
+        # the supervisor is looked up once per LS location for all the AWWs under it
+        supervisor_location_id = self.locations[aww.location_id]['parent__location_id']
+        if supervisor_location_id is None:
+            return None
+        return self._get_supervisor(supervisor_location_id)
+
+
+# The snapshots shared by the indicators of the scheduled messages sent by this process
+_scheduled_run_snapshots = {}
+SCHEDULED_RUN_SNAPSHOT_MAX_LOCATIONS = 10000
+
+
+def get_scheduled_run_snapshot(domain):
+    """
+    Returns the IndicatorSnapshot shared by the indicators of the scheduled messages
+    sent by this process today. A new snapshot is started every day, and once the
+    current one holds the data of SCHEDULED_RUN_SNAPSHOT_MAX_LOCATIONS locations.
+    """
+    key = (domain, datetime.now(tz=pytz.timezone('Asia/Kolkata')).date())
+    snapshot = _scheduled_run_snapshots.get(key)
+    if snapshot is None or len(snapshot.location_ids) >= SCHEDULED_RUN_SNAPSHOT_MAX_LOCATIONS:
+        _scheduled_run_snapshots.clear()
+        snapshot = _scheduled_run_snapshots[key] = IndicatorSnapshot(domain)
+    return snapshot
+
+
 class SMSIndicator(object):
     # The name of the template to be used when rendering the message(s) to be sent
     # This should not be the full path, just the name of the file, since the path
@@ -164,9 +312,14 @@ class SMSIndicator(object):
     # This is used to identify the indicator in the SMS data
     slug = None
 
-    def __init__(self, domain, user):
+    # The IndicatorSnapshot the indicator is computed from, when it is run
+    # for a batch of users
+    snapshot = None
+
+    def __init__(self, domain, user, snapshot=None):
         self.domain = domain
         self.user = user
+        self.snapshot = snapshot
 
     @property
     @memoized
@@ -205,8 +358,21 @@ class AWWIndicator(SMSIndicator):
     @property
     @memoized
     def supervisor(self):
+        if self.snapshot:
+            return self.snapshot.get_supervisor(self.user)
         return get_supervisor_for_aww(self.user)
 
+    def get_supervisor_indicator(self, indicator_class):
+        if self.snapshot:
+            return self.snapshot.get_supervisor_indicator(indicator_class, self.supervisor)
+        return indicator_class(self.domain, self.supervisor)
+
+    @property
+    def awc_name(self):
+        if self.snapshot:
+            return self.snapshot.get_location_name(self.user.location_id)
+        return self.user.sql_location.name
+
 
 class LSIndicator(SMSIndicator):
     @property
@@ -217,6 +383,8 @@ class LSIndicator(SMSIndicator):
     @property
     @memoized
     def awc_locations(self):
+        if self.snapshot:
+            return self.snapshot.get_awc_locations(self.user.location_id)
         return {l.location_id: l.name for l in self.child_locations}
 
 
@@ -229,16 +397,13 @@ class AWWAggregatePerformanceIndicator(BaseAWWAggregatePerformanceIndicator):
     template = 'aww_aggregate_performance.txt'
     slug = 'aww_2'
 
-    def get_value_from_fixture(self, fixture, attribute):
-        xpath = './rows/row[@is_total_row="False"]'
-        rows = fixture.findall(xpath)
-        location_name = self.user.sql_location.name
-        for row in rows:
-            owner_id = row.find('./column[@id="owner_id"]')
-            if owner_id.text == location_name:
+    def get_value_from_fixture(self, report_values, attribute):
+        location_name = self.awc_name
+        for row in report_values.rows:
+            if row.get('owner_id') == location_name:
                 try:
-                    return row.find('./column[@id="{}"]'.format(attribute)).text
-                except:
+                    return row[attribute]
+                except KeyError:
                     raise IndicatorError(
                         "Attribute {} not found in restore for AWC {}".format(attribute, location_name)
                     )
@@ -249,7 +414,7 @@ class AWWAggregatePerformanceIndicator(BaseAWWAggregatePerformanceIndicator):
         if self.supervisor is None:
             return []
 
-        agg_perf = LSAggregatePerformanceIndicator(self.domain, self.supervisor)
+        agg_perf = self.get_supervisor_indicator(LSAggregatePerformanceIndicator)
 
         visits = self.get_value_from_fixture(agg_perf.visits_fixture, 'count')
         on_time_visits = self.get_value_from_fixture(agg_perf.visits_fixture, 'visit_on_time')
@@ -274,40 +439,29 @@ class AWWAggregatePerformanceIndicatorV2(BaseAWWAggregatePerformanceIndicator):
     template = 'aww_aggregate_performance_v2.txt'
     slug = 'aww_v2'
 
-    def get_value_from_fixture(self, fixture, attribute):
-        xpath = './rows/row[@is_total_row="False"]'
-        rows = fixture.findall(xpath)
-        location_name = self.user.sql_location.name
+    def get_value_from_fixture(self, report_values, attribute):
+        location_name = self.awc_name
         last_month_string = _get_last_month_string()
-        for row in rows:
-            owner_id = row.find('owner_id')
-            month = row.find('month')
-            if owner_id.text == location_name and month is not None and month.text == last_month_string:
+        for row in report_values.rows:
+            if row.get('owner_id') == location_name and row.get('month') == last_month_string:
                 try:
-                    return row.find(attribute).text
-                except:
+                    return row[attribute]
+                except KeyError:
                     raise IndicatorError(
                         f"Attribute {attribute} not found in restore for AWC {location_name}"
                     )
         return 0
 
-    def get_rows_count_from_fixture(self, fixture):
-        count = 0
-        xpath = './rows/row[@is_total_row="False"]'
-        rows = fixture.findall(xpath)
-        location_name = self.user.sql_location.name
-        for row in rows:
-            owner_id = row.find("awc_id")
-            if owner_id.text == location_name:
-                count += 1
-        return count
+    def get_rows_count_from_fixture(self, report_values):
+        location_name = self.awc_name
+        return sum(1 for row in report_values.rows if row.get('awc_id') == location_name)
 
     def get_messages(self, language_code=None):
         get_template(self._template_path(language_code))  # fail early if template missing
         if self.supervisor is None:
             return []
 
-        ls_agg_perf_indicator = LSAggregatePerformanceIndicatorV2(self.domain, self.supervisor)
+        ls_agg_perf_indicator = self.get_supervisor_indicator(LSAggregatePerformanceIndicatorV2)
         data = _get_data_for_v2_performance_indicator(self, ls_agg_perf_indicator)
         return [self.render_template(data, language_code=language_code)]
 
@@ -343,13 +497,16 @@ class AWWSubmissionPerformanceIndicator(AWWIndicator):
     last_submission_date = None
     slug = 'aww_1'
 
-    def __init__(self, domain, user):
-        super(AWWSubmissionPerformanceIndicator, self).__init__(domain, user)
+    def __init__(self, domain, user, snapshot=None):
+        super(AWWSubmissionPerformanceIndicator, self).__init__(domain, user, snapshot)
 
-        result = AggregateInactiveAWW.objects.filter(
-            awc_id=user.location_id).values('last_submission').first()
-        if result:
-            self.last_submission_date = result['last_submission']
+        if self.snapshot:
+            self.last_submission_date = self.snapshot.last_submission_dates.get(user.location_id)
+        else:
+            result = AggregateInactiveAWW.objects.filter(
+                awc_id=user.location_id).values('last_submission').first()
+            if result:
+                self.last_submission_date = result['last_submission']
 
     def get_messages(self, language_code=None):
         if not is_aggregate_inactive_aww_data_fresh(send_email=True):
@@ -369,7 +526,7 @@ class AWWSubmissionPerformanceIndicator(AWWIndicator):
             context = {
                 'more_than_one_week': more_than_one_week,
                 'more_than_one_month': more_than_one_month,
-                'awc': self.user.sql_location.name,
+                'awc': self.awc_name,
             }
             return [self.render_template(context, language_code=language_code)]
 
@@ -380,10 +537,13 @@ class AWWVHNDSurveyIndicator(AWWIndicator):
     template = 'aww_vhnd_survey.txt'
     slug = 'phase2_aww_1'
 
-    def __init__(self, domain, user):
-        super(AWWVHNDSurveyIndicator, self).__init__(domain, user)
+    def __init__(self, domain, user, snapshot=None):
+        super(AWWVHNDSurveyIndicator, self).__init__(domain, user, snapshot)
 
-        self.should_send_sms = bool(get_awcs_with_old_vhnd_date(domain, [self.user.location_id]))
+        if self.snapshot:
+            self.should_send_sms = self.user.location_id not in self.snapshot.awcs_in_vhnd_timeframe
+        else:
+            self.should_send_sms = bool(get_awcs_with_old_vhnd_date(domain, [self.user.location_id]))
 
     def get_messages(self, language_code=None):
         if self.should_send_sms:
@@ -404,10 +564,13 @@ class LSSubmissionPerformanceIndicator(LSIndicator):
     template = 'ls_no_submissions.txt'
     slug = 'ls_6'
 
-    def __init__(self, domain, user):
-        super(LSSubmissionPerformanceIndicator, self).__init__(domain, user)
+    def __init__(self, domain, user, snapshot=None):
+        super(LSSubmissionPerformanceIndicator, self).__init__(domain, user, snapshot)
 
-        self.last_submission_dates = _get_last_submission_dates(awc_ids=set(self.awc_locations))
+        if self.snapshot:
+            self.last_submission_dates = self.snapshot.last_submission_dates
+        else:
+            self.last_submission_dates = _get_last_submission_dates(awc_ids=set(self.awc_locations))
 
     def get_messages(self, language_code=None):
         messages = []
@@ -441,13 +604,16 @@ class LSVHNDSurveyIndicator(LSIndicator):
     template = 'ls_vhnd_survey.txt'
     slug = 'ls_2'
 
-    def __init__(self, domain, user):
-        super(LSVHNDSurveyIndicator, self).__init__(domain, user)
+    def __init__(self, domain, user, snapshot=None):
+        super(LSVHNDSurveyIndicator, self).__init__(domain, user, snapshot)
 
-        self.awc_ids_not_in_timeframe = get_awcs_with_old_vhnd_date(
-            domain,
-            set(self.awc_locations)
-        )
+        if self.snapshot:
+            self.awc_ids_not_in_timeframe = set(self.awc_locations) - self.snapshot.awcs_in_vhnd_timeframe
+        else:
+            self.awc_ids_not_in_timeframe = get_awcs_with_old_vhnd_date(
+                domain,
+                set(self.awc_locations)
+            )
 
     def get_messages(self, language_code=None):
         messages = []
@@ -466,7 +632,7 @@ def get_awcs_with_old_vhnd_date(domain, awc_location_ids):
 
 @icds_quickcache(
     ['domain'], timeout=12 * 60 * 60, memoize_timeout=12 * 60 * 60, session_function=None,
-    skip_arg=lambda *args: settings.UNIT_TESTING)
+    skip_arg=lambda *args: settings.UNIT_TESTING, vary_on_data_generation=False)
 def get_awws_in_vhnd_timeframe(domain):
     # This function is called concurrently by many tasks.
     # The CriticalSection ensures that the expensive operation is not triggered
@@ -478,7 +644,7 @@ def get_awws_in_vhnd_timeframe(domain):
 
 @icds_quickcache(
     ['domain'], timeout=60 * 60, memoize_timeout=60 * 60, session_function=None,
-    skip_arg=lambda *args: settings.UNIT_TESTING)
+    skip_arg=lambda *args: settings.UNIT_TESTING, vary_on_data_generation=False)
 def compute_awws_in_vhnd_timeframe(domain):
     """
     This computes awws with vhsnd_date_past_month less than 37 days.
@@ -517,12 +683,12 @@ class LSAggregatePerformanceIndicator(BaseLSAggregatePerformanceIndicator):
     template = 'ls_aggregate_performance.txt'
     slug = 'ls_1'
 
-    def __init__(self, domain, user):
-        super().__init__(domain, user)
+    def __init__(self, domain, user, snapshot=None):
+        super().__init__(domain, user, snapshot)
         self.app_version = get_app_version_used_by_user(SUPERVISOR_APP_ID, user)
 
     def get_report_fixture(self, report_id):
-        return get_report_fixture_for_user(self.domain, report_id, self.restore_user, self.app_version)
+        return get_report_values_for_user(self.domain, report_id, self.restore_user, self.app_version)
 
     @property
     @memoized
@@ -544,13 +710,12 @@ class LSAggregatePerformanceIndicator(BaseLSAggregatePerformanceIndicator):
     def days_open_fixture(self):
         return self.get_report_fixture(DAYS_AWC_OPEN_REPORT_ID)
 
-    def get_value_from_fixture(self, fixture, attribute):
-        xpath = './rows/row[@is_total_row="True"]/column[@id="{}"]'.format(attribute)
+    def get_value_from_fixture(self, report_values, attribute):
         try:
-            return fixture.findall(xpath)[0].text
-        except:
+            return report_values.total_row[attribute]
+        except (KeyError, TypeError):
             raise IndicatorError("{} not found in fixture {} for user {}".format(
-                attribute, fixture, self.user.get_id
+                attribute, report_values, self.user.get_id
             ))
 
     def get_messages(self, language_code=None):
@@ -584,33 +749,30 @@ class LSAggregatePerformanceIndicatorV2(BaseLSAggregatePerformanceIndicator):
     template = 'ls_aggregate_performance_v2.txt'
     slug = 'ls_v2'
 
-    def __init__(self, domain, user):
-        super().__init__(domain, user)
+    def __init__(self, domain, user, snapshot=None):
+        super().__init__(domain, user, snapshot)
         self.app_version = get_app_version_used_by_user(SUPERVISOR_APP_ID, user)
 
     @memoized
     def get_report_fixture(self, report_id):
-        return get_v2_report_fixture_for_user(self.domain, report_id, self.restore_user, self.app_version)
+        return get_v2_report_values_for_user(self.domain, report_id, self.restore_user, self.app_version)
 
-    def get_value_from_fixture(self, fixture, attribute):
-        xpath = './rows/row[@is_total_row="False"]'
-        rows = fixture.findall(xpath)
+    def get_value_from_fixture(self, report_values, attribute):
         last_month_string = _get_last_month_string()
         total = 0
-        for row in rows:
-            month = row.find('month')
-            if month is not None and month.text == last_month_string:
+        for row in report_values.rows:
+            if row.get('month') == last_month_string:
                 try:
-                    total += int(row.find(attribute).text)
-                except:
-                    raise IndicatorError(f"{attribute} not found in fixture {fixture} for user {self.user.get_id}")
+                    total += int(row[attribute])
+                except (KeyError, TypeError, ValueError):
+                    raise IndicatorError(
+                        f"{attribute} not found in fixture {report_values} for user {self.user.get_id}"
+                    )
         return total
 
     @staticmethod
-    def get_rows_count_from_fixture(fixture):
-        xpath = './rows/row[@is_total_row="False"]'
-        rows = fixture.findall(xpath)
-        return len(rows)
+    def get_rows_count_from_fixture(report_values):
+        return len(report_values.rows)
 
     def get_messages(self, language_code=None):
         get_template(self._template_path(language_code))  # fail early if template missing
@@ -5,7 +5,7 @@ import mock
 from corehq.apps.domain.shortcuts import create_domain
 from corehq.apps.locations.tests.util import make_loc, setup_location_types
 from corehq.apps.users.models import CommCareUser
-from custom.icds.messaging.custom_content import run_indicator_for_user
+from custom.icds.messaging.custom_content import run_indicator_for_user, run_indicator_for_users
 from custom.icds.messaging.indicators import AWWSubmissionPerformanceIndicator
 from custom.icds_reports.models.aggregate import AggregateInactiveAWW
 
@@ -92,3 +92,15 @@ class TestAWWSubmissionPerformanceIndicator(TestCase):
         )
         self.assertEqual(len(messages), 1)
         self.assertIn('one month', messages[0])
+
+    def test_run_for_users(self, patch):
+        self.agg_inactive_aww.last_submission = self.now - timedelta(days=8)
+        self.agg_inactive_aww.save()
+        users = [self.user, self.user_sans_aggregation]
+        messages, _ = run_indicator_for_users(users, AWWSubmissionPerformanceIndicator, language_code='en')
+        self.assertEqual(messages, {
+            user.get_id: run_indicator_for_user(user, AWWSubmissionPerformanceIndicator, language_code='en')
+            for user in users
+        })
+        self.assertIn('one week', messages[self.user.get_id][0])
+        self.assertIn('one month', messages[self.user_sans_aggregation.get_id][0])
@@ -28,6 +28,7 @@ from custom.icds.messaging.custom_content import (
     run_indicator_for_usercase,
     static_negative_growth_indicator,
 )
+from custom.icds.messaging.indicators import IndicatorSnapshot
 from custom.icds.tests.base import BaseICDSTest
 
 TEST_GROWTH_FORM_XML = """<?xml version="1.0" ?>
@@ -114,6 +115,15 @@ class CustomContentTest(BaseICDSTest):
                 self.assertTrue(isinstance(call_args[0], CommCareUser))
                 self.assertEqual(call_args[0].get_id, self.user1.get_id)
                 self.assertEqual(call_args[1], object)
+                self.assertIsInstance(patched.call_args[1]['snapshot'], IndicatorSnapshot)
+
+    def test_usercases_share_the_run_snapshot(self):
+        with create_user_case(self.user1) as case1, create_user_case(self.user3) as case2:
+            with patch('custom.icds.messaging.custom_content.run_indicator_for_user') as patched:
+                run_indicator_for_usercase(case1, object)
+                run_indicator_for_usercase(case2, object)
+                first_snapshot, second_snapshot = [call[1]['snapshot'] for call in patched.call_args_list]
+                self.assertIs(first_snapshot, second_snapshot)
 
     def test_static_negative_growth_indicator(self):
         schedule_instance = CaseTimedScheduleInstance(
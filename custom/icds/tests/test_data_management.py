@@ -0,0 +1,171 @@
+from datetime import date, datetime
+
+from django.test import SimpleTestCase
+
+import mock
+
+from custom.icds.data_management.base import SQLBasedDataManagement
+from custom.icds.data_management.doc_processors import (
+    MOTHER_NAME_PROPERTY,
+    PopulateMissingMotherNameDocProcessor,
+)
+from custom.icds.data_management.models import DataManagementRequest
+
+
+class DummyDataManagement(SQLBasedDataManagement):
+    slug = 'dummy'
+    case_type = 'person'
+    doc_processor = mock.Mock()
+
+
+@mock.patch('custom.icds.data_management.base.connections', mock.MagicMock())
+@mock.patch('custom.icds.data_management.base.SQLBasedProgressLogger',
+            side_effect=lambda iteration_key: mock.Mock(logs={f'success-{iteration_key}.log': iteration_key}))
+@mock.patch('custom.icds.data_management.base.CaseReindexAccessor')
+@mock.patch('custom.icds.data_management.base.SqlDocumentProvider',
+            side_effect=lambda iteration_key, case_accessor: iteration_key)
+@mock.patch('custom.icds.data_management.base.get_db_aliases_for_partitioned_query',
+            return_value=['p1', 'p2', 'p3'])
+class TestSQLBasedDataManagement(SimpleTestCase):
+    counts = {
+        'key-p1': (10, 1),
+        'key-p2': (20, 2),
+        'key-p3': (30, 3),
+    }
+
+    def _run(self, db_alias=None):
+        def _bulk_doc_processor(record_provider, doc_processor, progress_logger):
+            # each db is processed with its own progress logger
+            self.assertEqual(progress_logger.logs, {f'success-{record_provider}.log': record_provider})
+            return mock.Mock(run=mock.Mock(return_value=self.counts[record_provider]))
+
+        with mock.patch('custom.icds.data_management.base.BulkDocProcessor', side_effect=_bulk_doc_processor):
+            return DummyDataManagement('icds-cas', db_alias).run('key')
+
+    def test_run_per_db(self, get_db_aliases, document_provider, case_accessor, progress_logger):
+        processed, skipped, logs = self._run()
+
+        self.assertEqual((processed, skipped), (60, 6))
+        self.assertEqual(logs, {
+            'success-key-p1.log': 'key-p1',
+            'success-key-p2.log': 'key-p2',
+            'success-key-p3.log': 'key-p3',
+        })
+        self.assertEqual(
+            sorted(call[0][0] for call in document_provider.call_args_list),
+            ['key-p1', 'key-p2', 'key-p3']
+        )
+        self.assertEqual(
+            sorted(call[1]['limit_db_aliases'] for call in case_accessor.call_args_list),
+            [['p1'], ['p2'], ['p3']]
+        )
+
+    def test_run_for_db_alias(self, get_db_aliases, document_provider, case_accessor, progress_logger):
+        processed, skipped, logs = self._run(db_alias='p2')
+
+        self.assertEqual((processed, skipped), (20, 2))
+        self.assertEqual(logs, {'success-key-p2.log': 'key-p2'})
+        progress_logger.assert_called_once_with('key-p2')
+        get_db_aliases.assert_not_called()
+        document_provider.assert_called_once_with('key-p2', case_accessor.return_value)
+        self.assertEqual(case_accessor.call_args[1]['limit_db_aliases'], ['p2'])
+
+
+class TestDataManagementRequest(SimpleTestCase):
+
+    def test_iteration_key_is_the_same_for_every_execution(self):
+        task = mock.Mock()
+        task.return_value.run.return_value = (0, 0, {})
+        request = DataManagementRequest(
+            slug='dummy', domain='icds-cas', db_alias=None, initiated_by='user',
+            start_date=date(2020, 1, 1), end_date=date(2020, 2, 1), created_at=datetime(2020, 3, 1, 10, 30),
+        )
+        with mock.patch.dict('custom.icds.data_management.models.DATA_MANAGEMENT_TASKS', {'dummy': task}):
+            request._perform_task()
+            request._perform_task()
+
+        self.assertEqual(
+            [call[0][0] for call in task.return_value.run.call_args_list],
+            ['dummy-2020-01-01-2020-02-01-user-2020-03-01 10:30:00'] * 2
+        )
+
+
+class TestPopulateMissingMotherNameDocProcessor(SimpleTestCase):
+    # case id mapped to the shard db of the case and the mother cases referenced by its indices
+    case_indices = {
+        'child1': ('p1', ['mother1']),
+        'twins-child': ('p1', ['mother2', 'mother3']),
+        'orphan-child': ('p2', ['missing-mother']),
+        'child2': ('p2', ['mother4']),
+        'child-without-mother': ('p2', []),
+    }
+    mother_names = {'mother1': 'Mother 1', 'mother2': 'Mother 2', 'mother3': 'Mother 3', 'mother4': 'Mother 4'}
+
+    def _split_list_by_db_partition(self, case_ids):
+        case_ids_by_db = {}
+        for case_id in case_ids:
+            case_ids_by_db.setdefault(self.case_indices[case_id][0], []).append(case_id)
+        return sorted(case_ids_by_db.items())
+
+    def _using(self, db_name):
+        def _filter(domain, case_id__in, identifier):
+            return mock.Mock(values_list=mock.Mock(return_value=[
+                (case_id, referenced_id)
+                for case_id in case_id__in
+                if self.case_indices[case_id][0] == db_name
+                for referenced_id in self.case_indices[case_id][1]
+            ]))
+        return mock.Mock(filter=mock.Mock(side_effect=_filter))
+
+    def _get_cases(self, case_ids):
+        cases = []
+        for case_id in case_ids:
+            if case_id in self.mother_names:
+                case = mock.Mock(case_id=case_id)
+                case.name = self.mother_names[case_id]
+                cases.append(case)
+        return cases
+
+    def setUp(self):
+        def _patch(target, **kwargs):
+            patcher = mock.patch('custom.icds.data_management.doc_processors.' + target, **kwargs)
+            self.addCleanup(patcher.stop)
+            return patcher.start()
+
+        _patch('find_test_awc_location_ids', return_value=[])
+        _patch('split_list_by_db_partition', side_effect=self._split_list_by_db_partition)
+        self.using = _patch('CommCareCaseIndexSQL.objects.using', side_effect=self._using)
+        self.get_cases = _patch('CaseAccessors').return_value.get_cases
+        self.get_cases.side_effect = self._get_cases
+        self.submit_case_blocks = _patch('submit_case_blocks')
+        self.doc_processor = PopulateMissingMotherNameDocProcessor('icds-cas')
+
+    def test_get_referenced_case_ids_across_shards(self):
+        referenced_case_ids = self.doc_processor.get_referenced_case_ids(list(self.case_indices), 'mother')
+
+        self.assertEqual(dict(referenced_case_ids), {
+            'child1': ['mother1'],
+            'twins-child': ['mother2', 'mother3'],
+            'orphan-child': ['missing-mother'],
+            'child2': ['mother4'],
+        })
+        # one query per shard db
+        self.assertEqual(sorted(call[0][0] for call in self.using.call_args_list), ['p1', 'p2'])
+
+    def test_process_bulk_docs(self):
+        docs = [{'_id': case_id} for case_id in self.case_indices]
+        progress_logger = mock.Mock()
+
+        self.assertTrue(self.doc_processor.process_bulk_docs(docs, progress_logger))
+
+        # cases with several mother indices, or whose mother case does not exist, are not updated
+        self.assertEqual(
+            sorted((call[0][0]['_id'], call[0][1]) for call in progress_logger.document_processed.call_args_list),
+            [('child1', {MOTHER_NAME_PROPERTY: 'Mother 1'}), ('child2', {MOTHER_NAME_PROPERTY: 'Mother 4'})]
+        )
+        self.assertEqual(
+            sorted(self.get_cases.call_args[0][0]),
+            ['missing-mother', 'mother1', 'mother4']
+        )
+        self.submit_case_blocks.assert_called_once()
+        self.assertEqual(len(self.submit_case_blocks.call_args[0][0]), 2)
@@ -3,7 +3,7 @@ import uuid
 from pathlib import Path
 
 from django.template.exceptions import TemplateDoesNotExist
-from django.test import TestCase
+from django.test import SimpleTestCase, TestCase
 
 from casexml.apps.phone.tests.utils import create_restore_user
 
@@ -26,7 +26,8 @@ from custom.icds.messaging.indicators import (
     IndicatorError,
     LSAggregatePerformanceIndicator,
     LSAggregatePerformanceIndicatorV2,
-    _get_cached_report_fixture_for_user,
+    ReportValues,
+    _get_report_fixture_for_user,
 )
 from lxml import etree
 from mock import Mock, patch
@@ -75,6 +76,9 @@ class BaseAggregatePerformanceTestCase(TestCase, TestXmlMixin):
         user.set_location(location)
         return user
 
+    def get_report_values(self, name):
+        return ReportValues.from_v1_fixture(etree.fromstring(self.get_xml(name)))
+
 
 class TestLSAggregatePerformanceIndicator(BaseAggregatePerformanceTestCase):
 
@@ -83,10 +87,10 @@ class TestLSAggregatePerformanceIndicator(BaseAggregatePerformanceTestCase):
     @patch.object(LSAggregatePerformanceIndicator, 'weighed_fixture', new_callable=PropertyMock)
     @patch.object(LSAggregatePerformanceIndicator, 'days_open_fixture', new_callable=PropertyMock)
     def test_report_parsing(self, days_open, weighed, thr, visits):
-        days_open.return_value = etree.fromstring(self.get_xml('days_open_fixture'))
-        weighed.return_value = etree.fromstring(self.get_xml('weighed_fixture'))
-        thr.return_value = etree.fromstring(self.get_xml('thr_fixture'))
-        visits.return_value = etree.fromstring(self.get_xml('visit_fixture'))
+        days_open.return_value = self.get_report_values('days_open_fixture')
+        weighed.return_value = self.get_report_values('weighed_fixture')
+        thr.return_value = self.get_report_values('thr_fixture')
+        visits.return_value = self.get_report_values('visit_fixture')
         [message] = run_indicator_for_user(self.ls, LSAggregatePerformanceIndicator, language_code='en')
         self.assertIn('Number of visits / Number of desired visits: 45 / 195', message)
         self.assertIn('Number of visits on time / Number of visits: 16 / 45', message)
@@ -102,10 +106,10 @@ class TestAWWAggregatePerformanceIndicator(BaseAggregatePerformanceTestCase):
     @patch.object(LSAggregatePerformanceIndicator, 'weighed_fixture', new_callable=PropertyMock)
     @patch.object(LSAggregatePerformanceIndicator, 'days_open_fixture', new_callable=PropertyMock)
     def test_report_parsing(self, days_open, weighed, thr, visits):
-        days_open.return_value = etree.fromstring(self.get_xml('days_open_fixture'))
-        weighed.return_value = etree.fromstring(self.get_xml('weighed_fixture'))
-        thr.return_value = etree.fromstring(self.get_xml('thr_fixture'))
-        visits.return_value = etree.fromstring(self.get_xml('visit_fixture'))
+        days_open.return_value = self.get_report_values('days_open_fixture')
+        weighed.return_value = self.get_report_values('weighed_fixture')
+        thr.return_value = self.get_report_values('thr_fixture')
+        visits.return_value = self.get_report_values('visit_fixture')
         [message] = run_indicator_for_user(self.aww, AWWAggregatePerformanceIndicator, language_code='en')
         self.assertIn('Number of visits / Number of desired visits: 6 / 65', message)
         self.assertIn('Number of visits on time / Number of visits: 2 / 6', message)
@@ -120,10 +124,10 @@ class TestAWWAggregatePerformanceIndicator(BaseAggregatePerformanceTestCase):
     def test_user_not_in_fixtures(self, days_open, weighed, thr, visits):
         aww3 = self._make_user('aww3', self.locs['AWC3'])
         self.addCleanup(aww3.delete, deleted_by=None)
-        days_open.return_value = etree.fromstring(self.get_xml('days_open_fixture'))
-        weighed.return_value = etree.fromstring(self.get_xml('weighed_fixture'))
-        thr.return_value = etree.fromstring(self.get_xml('thr_fixture'))
-        visits.return_value = etree.fromstring(self.get_xml('visit_fixture'))
+        days_open.return_value = self.get_report_values('days_open_fixture')
+        weighed.return_value = self.get_report_values('weighed_fixture')
+        thr.return_value = self.get_report_values('thr_fixture')
+        visits.return_value = self.get_report_values('visit_fixture')
         [message] = run_indicator_for_user(aww3, AWWAggregatePerformanceIndicator, language_code='en')
         self.assertIn('Number of visits / Number of desired visits: 0 / 65', message)
         self.assertIn('Number of visits on time / Number of visits: 0 / 0', message)
@@ -136,28 +140,49 @@ class TestAWWAggregatePerformanceIndicator(BaseAggregatePerformanceTestCase):
     @patch.object(LSAggregatePerformanceIndicator, 'weighed_fixture', new_callable=PropertyMock)
     @patch.object(LSAggregatePerformanceIndicator, 'days_open_fixture', new_callable=PropertyMock)
     def test_attribute_not_in_fixtures(self, days_open, weighed, thr, visits):
-        days_open.return_value = etree.fromstring(self.get_xml('bad_days_open_fixture'))
-        weighed.return_value = etree.fromstring(self.get_xml('weighed_fixture'))
-        thr.return_value = etree.fromstring(self.get_xml('thr_fixture'))
-        visits.return_value = etree.fromstring(self.get_xml('visit_fixture'))
+        days_open.return_value = self.get_report_values('bad_days_open_fixture')
+        weighed.return_value = self.get_report_values('weighed_fixture')
+        thr.return_value = self.get_report_values('thr_fixture')
+        visits.return_value = self.get_report_values('visit_fixture')
         with self.assertRaises(IndicatorError) as e:
             run_indicator_for_user(self.aww, AWWAggregatePerformanceIndicator, language_code='en')
         self.assertIn('Attribute awc_opened_count not found in restore for AWC AWC1', str(e.exception))
 
 
+class TestReportValues(SimpleTestCase, TestXmlMixin):
+    root = Path(__file__).parent
+    file_path = ('data', 'fixtures',)
+
+    def test_from_v1_fixture(self):
+        report_values = ReportValues.from_v1_fixture(etree.fromstring(self.get_xml('visit_fixture')))
+        self.assertEqual(report_values.rows, [
+            {'count': '6', 'owner_id': 'AWC1', 'visit_on_time': '2'},
+            {'count': '39', 'owner_id': 'AWC2', 'visit_on_time': '14'},
+        ])
+        self.assertEqual(report_values.total_row, {'count': '45', 'owner_id': 'Total', 'visit_on_time': '16'})
+
+    def test_from_v2_fixture(self):
+        report_values = ReportValues.from_v2_fixture(etree.fromstring(self.get_xml('ucr_v2_mpr_5_ccs_record')))
+        self.assertEqual(report_values.rows[1], {
+            'count_bp': '0', 'count_ebf': '1', 'count_pnc': '0', 'month': '2020-07',
+            'open_in_month': '3', 'owner_id': 'AWC1', 'thr_rations_gte_21': '0',
+        })
+        self.assertIsNone(report_values.total_row)
+
+
 class TestAggregatePerformanceV2TestCase(BaseAggregatePerformanceTestCase):
     def test_missing_translation_file(self):
         with self.assertRaises(TemplateDoesNotExist):
             run_indicator_for_user(self.ls, LSAggregatePerformanceIndicatorV2, language_code=None)
 
     def _get_v2_report_fixture(self, domain, report_slug, *args, **kwargs):
-        return self.get_xml(report_slug)
+        return etree.fromstring(self.get_xml(report_slug))
 
 
 class TestLSAggregatePerformanceIndicatorV2(TestAggregatePerformanceV2TestCase):
 
     @patch('custom.icds.messaging.indicators._get_last_month_string')
-    @patch('custom.icds.messaging.indicators._get_cached_v2_report_fixture_for_user')
+    @patch('custom.icds.messaging.indicators._get_v2_report_fixture_for_user')
     def test_get_messages(self, get_report_fixture_patch, last_month_string_patch):
         last_month_string_patch.return_value = "2020-07"
         get_report_fixture_patch.side_effect = self._get_v2_report_fixture
@@ -180,7 +205,7 @@ class TestLSAggregatePerformanceIndicatorV2(TestAggregatePerformanceV2TestCase):
 class TestAWWAggregatePerformanceIndicatorV2(TestAggregatePerformanceV2TestCase):
 
     @patch('custom.icds.messaging.indicators._get_last_month_string')
-    @patch('custom.icds.messaging.indicators._get_cached_v2_report_fixture_for_user')
+    @patch('custom.icds.messaging.indicators._get_v2_report_fixture_for_user')
     def test_get_messages(self, get_report_fixture_patch, last_month_string_patch):
         last_month_string_patch.return_value = "2020-07"
         get_report_fixture_patch.side_effect = self._get_v2_report_fixture
@@ -234,5 +259,7 @@ class TestGetReportFixture(TestCase):
             get_data_mock.return_value = [{'owner': 'bob', 'count': 3, 'is_starred': True}]
 
             with mock_datasource_config():
-                fixture = _get_cached_report_fixture_for_user(self.domain, 'test_id', self.user, None).decode('utf8')
+                fixture = etree.tostring(
+                    _get_report_fixture_for_user(self.domain, 'test_id', self.user, None)
+                ).decode('utf8')
                 self.assertIn(self.report_config1.get_id, fixture)
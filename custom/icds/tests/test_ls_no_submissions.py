@@ -1,6 +1,6 @@
 from datetime import datetime, timedelta
 from django.test import TestCase
-from mock import patch
+from mock import Mock, patch
 import pytz
 
 from corehq.apps.domain.shortcuts import create_domain
@@ -11,7 +11,7 @@ from corehq.apps.locations.tests.util import (
     setup_locations_with_structure,
 )
 from corehq.apps.users.models import CommCareUser
-from custom.icds.messaging.custom_content import run_indicator_for_user
+from custom.icds.messaging.custom_content import run_indicator_for_user, run_indicator_for_users
 from custom.icds.messaging.indicators import LSSubmissionPerformanceIndicator
 
 
@@ -38,6 +38,7 @@ class TestLSSubmissionPerformanceIndicator(TestCase):
         cls.loc_types = setup_location_types_with_structure(cls.domain, location_type_structure)
         cls.locs = setup_locations_with_structure(cls.domain, location_structure)
         cls.ls = cls._make_user('ls', cls.locs['LSL'])
+        cls.aww = cls._make_user('aww', cls.locs['AWC1'])
         cls.awc1 = cls.locs['AWC1']
         cls.awc2 = cls.locs['AWC2']
 
@@ -117,3 +118,37 @@ class TestLSSubmissionPerformanceIndicator(TestCase):
         self.assertTrue('one week' in message)
         self.assertTrue('AWC1' in message)
         self.assertTrue('AWC2' in message)
+
+    def test_run_for_users(self, last_sub_time):
+        last_sub_time.return_value = {
+            self.awc1.location_id: self.today - timedelta(days=8),
+        }
+        messages, _ = run_indicator_for_users([self.ls], LSSubmissionPerformanceIndicator, language_code='en')
+        self.assertEqual(messages, {
+            self.ls.get_id: run_indicator_for_user(self.ls, LSSubmissionPerformanceIndicator, language_code='en')
+        })
+        week_message, month_message = messages[self.ls.get_id]
+        self.assertIn('AWC1', week_message)
+        self.assertIn('AWC2', month_message)
+
+    @patch('custom.icds.messaging.custom_content.notify_exception')
+    def test_run_for_users_skips_invalid_users(self, notify_exception, last_sub_time):
+        last_sub_time.return_value = {
+            self.awc1.location_id: self.today - timedelta(days=8),
+        }
+        messages, _ = run_indicator_for_users(
+            [self.aww, self.ls], LSSubmissionPerformanceIndicator, language_code='en'
+        )
+        self.assertEqual(list(messages), [self.ls.get_id])
+        self.assertEqual(len(messages[self.ls.get_id]), 2)
+        notify_exception.assert_called_once()
+
+    @patch('custom.icds.messaging.custom_content.notify_exception')
+    def test_run_for_users_skips_unknown_locations(self, notify_exception, last_sub_time):
+        last_sub_time.return_value = {}
+        unknown_user = Mock(domain=self.domain, location_id='unknown-location', get_id='unknown-user')
+        messages, _ = run_indicator_for_users(
+            [unknown_user, self.ls], LSSubmissionPerformanceIndicator, language_code='en'
+        )
+        self.assertEqual(list(messages), [self.ls.get_id])
+        notify_exception.assert_called_once()
@@ -6,5 +6,6 @@ class ICDSReportsAppConfig(AppConfig):
 
     def ready(self):
         import custom.icds_reports.reports.reports  # noqa
+        import custom.icds_reports.utils.location_access  # noqa
 
 default_app_config = 'custom.icds_reports.ICDSReportsAppConfig'
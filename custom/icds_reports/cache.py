@@ -1,11 +1,29 @@
+import inspect
+import re
+import time
 from collections import namedtuple
+from datetime import date
+
+from dateutil.relativedelta import relativedelta
+from django.core.cache import cache as django_cache
 
 from quickcache import get_quickcache
 from quickcache.django_quickcache import tiered_django_cache
 from quickcache.quickcache import ConfigMixin
 
+from corehq.const import ONE_DAY
 from corehq.util.quickcache import quickcache_soft_assert, get_session_key
 
+# results keyed on the data generation are invalidated by the aggregation, so they
+# can be kept for longer than their timeout
+DATA_GENERATION_TIMEOUT = ONE_DAY
+
+# charts show the three months before the selected one, so the aggregation of a month
+# changes the data of the following three months too
+DATA_GENERATION_MONTHS = 3
+
+ALL = 'all'
+
 
 def get_default_prefix():
     return 'c'
@@ -15,6 +33,87 @@ def get_locmem_prefix():
     return get_session_key() + get_default_prefix()
 
 
+def _data_generation_key(month, state_id):
+    return f'icds-data-generation/{month}/{state_id}'
+
+
+def _get_month(value, year=None):
+    if isinstance(value, (tuple, list)) and len(value) >= 2:
+        return f'{value[0]:04d}-{value[1]:02d}'
+    if isinstance(value, date):
+        return value.strftime('%Y-%m')
+    if isinstance(value, str) and re.match(r'^\d{4}-\d{2}', value):
+        return value[:7]
+    if isinstance(value, int) and isinstance(year, int):
+        return f'{year:04d}-{value:02d}'
+    return None
+
+
+def get_data_partition(callargs):
+    """Returns the (month, state_id) of the data a cached function reads, looking at its
+    arguments and the dicts passed to it (config, filters...).
+    Either one is 'all' when it can not be found.
+    """
+    month = state_id = None
+    for values in [callargs] + [value for value in callargs.values() if isinstance(value, dict)]:
+        if month is None and values.get('month') is not None:
+            month = _get_month(values['month'], values.get('year'))
+        if state_id is None and values.get('state_id'):
+            state_id = values['state_id']
+    return month or ALL, state_id or ALL
+
+
+def get_data_generation(month, state_id):
+    return django_cache.get(_data_generation_key(month, state_id))
+
+
+def bump_data_generation(months, state_ids):
+    """Invalidates the cached results of the months and states.
+
+    Called when the aggregation of the months has finished for the states. Besides the
+    aggregated (month, state), the results of the following months, of the whole
+    country and of unknown months are invalidated as they include the aggregated data.
+
+    :param months: list of first days of the month
+    """
+    generation = int(time.time() * 1000)
+    keys = set()
+    for month in months:
+        affected_months = [
+            (month + relativedelta(months=offset)).strftime('%Y-%m')
+            for offset in range(DATA_GENERATION_MONTHS + 1)
+        ] + [ALL]
+        for affected_month in affected_months:
+            for state_id in list(state_ids) + [ALL]:
+                keys.add(_data_generation_key(affected_month, state_id))
+    django_cache.set_many({key: generation for key in keys}, timeout=None)
+
+
+def _vary_on_data_generation(fn, vary_on):
+    """Returns a `vary_on` function for quickcache that adds the data generation
+    of the month and state of the call to the values of the `vary_on` arguments
+    """
+    arg_names = inspect.getfullargspec(fn).args
+    vary_on = [part.split('.') for part in vary_on]
+    for part in vary_on:
+        if part[0] not in arg_names:
+            raise ValueError(
+                f'We cannot vary on "{part[0]}" because the function {fn.__name__} has no such argument'
+            )
+
+    def get_vary_on_values(*args, **kwargs):
+        callargs = inspect.getcallargs(fn, *args, **kwargs)
+        values = []
+        for arg_name, *attrs in vary_on:
+            value = callargs[arg_name]
+            for attr in attrs:
+                value = getattr(value, attr)
+            values.append(value)
+        values.append(get_data_generation(*get_data_partition(callargs)))
+        return values
+    return get_vary_on_values
+
+
 # Custom cache that varies the key depending on if request is sent to CitusDB or not
 class ICDSQuickCache(namedtuple('ICDSQuickCache', [
     'vary_on',
@@ -22,20 +121,34 @@ class ICDSQuickCache(namedtuple('ICDSQuickCache', [
     'timeout',
     'memoize_timeout',
     'session_function',
+    'vary_on_data_generation',
 ]), ConfigMixin):
 
     def call(self):
+        timeout = self.timeout
+        if self.vary_on_data_generation:
+            timeout = max(timeout, DATA_GENERATION_TIMEOUT)
         cache = tiered_django_cache([
             ('locmem', self.memoize_timeout, self.session_function),
-            ('default', self.timeout, get_default_prefix)
+            ('default', timeout, get_default_prefix)
         ])
 
-        return get_quickcache(
-            cache=cache,
-            vary_on=self.vary_on,
-            skip_arg=self.skip_arg,
-            assert_function=quickcache_soft_assert,
-        ).call()
+        if not self.vary_on_data_generation:
+            return get_quickcache(
+                cache=cache,
+                vary_on=self.vary_on,
+                skip_arg=self.skip_arg,
+                assert_function=quickcache_soft_assert,
+            ).call()
+
+        def decorator(fn):
+            return get_quickcache(
+                cache=cache,
+                vary_on=_vary_on_data_generation(fn, self.vary_on),
+                skip_arg=self.skip_arg,
+                assert_function=quickcache_soft_assert,
+            ).call()(fn)
+        return decorator
 
 
 icds_quickcache = ICDSQuickCache(
@@ -43,5 +156,6 @@ icds_quickcache = ICDSQuickCache(
     skip_arg=None,
     timeout=5 * 60,
     memoize_timeout=10,
-    session_function=get_locmem_prefix
+    session_function=get_locmem_prefix,
+    vary_on_data_generation=True,
 )
@@ -2,9 +2,12 @@ import calendar
 import csv
 import datetime
 import io
+import tempfile
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from copy import copy
 
+from django.db import connections
 from django.utils.dateparse import parse_date
 
 import openpyxl
@@ -40,13 +43,44 @@ from custom.icds_reports.data_pull.queries import (
 )
 
 
+# number of queries of a data pull run at the same time, each one over its own connection
+DEFAULT_QUERY_CONCURRENCY = 4
+
+
+def run_queries(query_objs, db_alias, concurrency=1):
+    """
+    run queries of a data pull, in parallel when concurrency is more than one.
+    Django connections are per thread so each query runs its setup, COPY and clean up
+    over a single connection of its own, which is closed once the query is done.
+    :return: result file name mapped to the temporary file with the query result
+    """
+    if concurrency <= 1 or len(query_objs) <= 1:
+        return {query_obj.result_file_name: query_obj.run(db_alias) for query_obj in query_objs}
+
+    def _run(query_obj):
+        try:
+            return query_obj.run(db_alias)
+        finally:
+            connections[db_alias].close()
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        result_files = executor.map(_run, query_objs)
+        return {
+            query_obj.result_file_name: result_file
+            for query_obj, result_file in zip(query_objs, result_files)
+        }
+
+
 class BaseDataPull:
     slug = ""
     name = ""
     queries = None  # list of query classes
+    query_concurrency = DEFAULT_QUERY_CONCURRENCY
 
     def __init__(self, db_alias, *args, **kwargs):
         self.db_alias = db_alias
+        if kwargs.get('query_concurrency'):
+            self.query_concurrency = kwargs['query_concurrency']
 
     def get_queries(self):
         raise NotImplementedError
@@ -61,7 +95,7 @@ class BaseDataPull:
     def post_run(self, data_files):
         """
         any tasks to be done post data pull
-        :param data_files: file name mapped to string buffer for file content
+        :param data_files: file name mapped to file with the file content
         :return processed data_files
         """
         return data_files
@@ -74,6 +108,7 @@ class DirectDataPull(BaseDataPull):
         self.query_file_path = kwargs.pop('query_file_path')
         self.name = self.query_file_path.rsplit('/')[-1].rsplit('.')[0]
         self.kwargs = kwargs
+        self.kwargs.pop('query_concurrency', None)
 
     def get_queries(self):
         query_obj = DirectQuery(self.name, self.query_file_path, **self.kwargs)
@@ -95,19 +130,17 @@ class MonthBasedDataPull(BaseDataPull):
 
     def get_queries(self):
         queries = []
-        for query_class in self.queries:
-            query_obj = query_class(self.month)
+        for query_obj in self._get_query_objs():
             if query_obj.setup_sql:
                 queries.append(query_obj.setup_sql)
             queries.append(query_obj.sql_query)
         return queries
 
+    def _get_query_objs(self):
+        return [query_class(self.month) for query_class in self.queries]
+
     def _get_data_files(self):
-        result = {}
-        for query_class in self.queries:
-            query_obj = query_class(self.month)
-            result[query_obj.result_file_name] = query_obj.run(self.db_alias)
-        return result
+        return run_queries(self._get_query_objs(), self.db_alias, self.query_concurrency)
 
 
 class LocationAndMonthBasedDataPull(MonthBasedDataPull):
@@ -118,14 +151,10 @@ class LocationAndMonthBasedDataPull(MonthBasedDataPull):
             raise UnboundDataPullException("Location not defined")
 
     def get_queries(self):
-        return [query_class(self.location_id, self.month).sql_query for query_class in self.queries]
+        return [query_obj.sql_query for query_obj in self._get_query_objs()]
 
-    def _get_data_files(self):
-        result = {}
-        for query_class in self.queries:
-            query_obj = query_class(self.location_id, self.month)
-            result[query_obj.result_file_name] = query_obj.run(self.db_alias)
-        return result
+    def _get_query_objs(self):
+        return [query_class(self.location_id, self.month) for query_class in self.queries]
 
 
 class AndhraPradeshMonthly(LocationAndMonthBasedDataPull):
@@ -169,6 +198,10 @@ class MonthlyPerformance(MonthBasedDataPull):
         }
 
     def _consolidate_data(self, data_files):
+        """
+        join the results of the queries on state name, reading the result files row by row.
+        Each query returns a row per state so only the joined rows are kept in memory.
+        """
         result = defaultdict(dict)
         test_state_names = self._get_test_state_names()
         state_name_column = 'state_name'
@@ -176,21 +209,20 @@ class MonthlyPerformance(MonthBasedDataPull):
             filestream.seek(0)
             reader = csv.DictReader(filestream)
             for row in reader:
-                state_name = row[state_name_column]
+                state_name = row.pop(state_name_column)
                 if state_name in test_state_names:
                     continue
-                for column_name, value in row.items():
-                    if column_name != state_name_column:
-                        result[state_name][column_name] = value
+                result[state_name].update(row)
+            filestream.close()
         return result
 
     @staticmethod
     def _get_test_state_names():
-        return map(lambda loc: loc.name, find_test_state_locations())
+        return {loc.name for loc in find_test_state_locations()}
 
     @staticmethod
     def _dump_consolidated_data(result):
-        result_file = io.StringIO()
+        result_file = tempfile.TemporaryFile(mode='w+', encoding='utf-8', newline='')
         headers = ['State']
         for state_name, col_values in result.items():
             for col_name in col_values:
@@ -230,6 +262,7 @@ class VHSNDMonthlyReport(MonthBasedDataPull):
                     result[state_name][data_key].append(vhsnd_date)
                 else:
                     result[state_name][data_key] = [vhsnd_date]
+            filestream.close()
 
         return self._format_consolidated_data(result)
 
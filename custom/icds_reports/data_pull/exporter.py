@@ -8,8 +8,12 @@ from custom.icds_reports.const import CUSTOM_DATA_PULLS
 from custom.icds_reports.data_pull.data_pulls import DirectDataPull
 
 
+# size of the chunks the result files are copied to the zip file in
+COPY_CHUNK_SIZE = 1024 * 1024
+
+
 class DataExporter(object):
-    def __init__(self, slug_or_file, db_alias, month, location_id):
+    def __init__(self, slug_or_file, db_alias, month, location_id, query_concurrency=None):
         """
         run data export by either passing slug to a custom data pull
         or file name/path to a sql file which will be read as a single query
@@ -24,17 +28,32 @@ class DataExporter(object):
         self.data_pull_obj = data_pull_class(
             db_alias,
             query_file_path=self.slug_or_file,
-            month=self.month, location_id=self.location_id
+            month=self.month, location_id=self.location_id,
+            query_concurrency=query_concurrency
         )
 
     @prevent_parallel_execution(DATA_PULL_CACHE_KEY)
     def export(self):
         zip_file_name = "%s-DataPull.zip" % self.data_pull_obj.name
-        with zipfile.ZipFile(zip_file_name, mode='w') as z:
-            for filename, string_buffer in self.data_pull_obj.run().items():
-                z.writestr(filename, string_buffer.getvalue())
+        with zipfile.ZipFile(zip_file_name, mode='w', compression=zipfile.ZIP_DEFLATED) as z:
+            for filename, filestream in self.data_pull_obj.run().items():
+                self._write_to_zip(z, filename, filestream)
         return zip_file_name
 
+    @staticmethod
+    def _write_to_zip(z, filename, filestream):
+        # copy the file in chunks instead of reading all of it in memory
+        filestream.seek(0)
+        with z.open(filename, mode='w') as zipped_file:
+            while True:
+                chunk = filestream.read(COPY_CHUNK_SIZE)
+                if not chunk:
+                    break
+                if isinstance(chunk, str):
+                    chunk = chunk.encode('utf-8')
+                zipped_file.write(chunk)
+        filestream.close()
+
     @cached_property
     def queries(self):
         return self.data_pull_obj.get_queries()
@@ -1,4 +1,4 @@
-from io import StringIO
+import tempfile
 
 from django.db import connections
 from django.utils.dateparse import parse_date
@@ -13,23 +13,28 @@ class BaseQuery:
     temp_table_name = ""
 
     def run(self, db_alias):
+        """
+        :return: temporary file with the result of the query as CSV
+        """
         # dropping any prev temp table from earlier queries
         if self.temp_table_name:
             self._remove_temp_table(db_alias)
         if self.setup_sql_file_path:
             self._setup(db_alias)
-        string_buffer = StringIO()
+        # the result is copied to disk instead of memory as data pulls can be large
+        result_file = tempfile.TemporaryFile(mode='w+', encoding='utf-8', newline='')
         db_conn = connections[db_alias]
         cursor = db_conn.cursor()
         query = self.sql_query
         query = query.replace('\n', ' ')
         cursor.copy_expert(
             "COPY ({query}) TO STDOUT DELIMITER ',' CSV HEADER;".format(query=query),
-            string_buffer)
+            result_file)
         # dropping any temp table if created
         if self.temp_table_name:
             self._remove_temp_table(db_alias)
-        return string_buffer
+        result_file.seek(0)
+        return result_file
 
     def _setup(self, db_alias):
         db_conn = connections[db_alias]
@@ -0,0 +1,58 @@
+import time
+
+from django.core.management import BaseCommand
+from django.db import connections
+from django.test.utils import CaptureQueriesContext
+
+from corehq.apps.locations.models import SQLLocation
+from corehq.apps.locations.permissions import user_can_access_location_id
+from corehq.apps.users.models import CouchUser
+from custom.icds_reports.utils.location_access import LocationAccess
+
+
+class Command(BaseCommand):
+    help = """
+    Compares the access resolution of the location drill down endpoints (LocationView,
+    LocationAncestorsView) location by location with the batched LocationAccess,
+    drilling down the location tree from a location down to the AWCs.
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument('domain')
+        parser.add_argument('username')
+        parser.add_argument('location_id')
+
+    def handle(self, domain, username, location_id, **options):
+        user = CouchUser.get_by_username(username)
+        location = SQLLocation.objects.get(domain=domain, location_id=location_id)
+        while location is not None:
+            children = list(location.child_locations().values_list('location_id', flat=True))
+            if not children:
+                break
+            self.stdout.write(f'{location.location_type.code} {location.name}: {len(children)} children')
+
+            def _legacy():
+                SQLLocation.objects.get_queryset_ancestors(
+                    user.get_sql_locations(domain), include_self=True
+                ).distinct().count()
+                return {child for child in children if user_can_access_location_id(domain, user, child)}
+
+            def _batched():
+                return LocationAccess(domain, user).get_accessible_location_ids(children)
+
+            results = [
+                self._run(label, func)
+                for label, func in [('location by location', _legacy), ('batched', _batched),
+                                    ('batched, cached', _batched)]
+            ]
+            if len({frozenset(result) for result in results}) != 1:
+                raise AssertionError('The batched access resolution does not return the same locations')
+            location = location.child_locations().first()
+
+    def _run(self, label, func):
+        with CaptureQueriesContext(connections['default']) as queries:
+            start = time.time()
+            result = func()
+            duration = time.time() - start
+        self.stdout.write(f'    {label}: {len(queries)} queries, {duration * 1000:.1f}ms')
+        return result
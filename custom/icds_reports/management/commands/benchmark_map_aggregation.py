@@ -0,0 +1,123 @@
+import random
+import timeit
+from collections import defaultdict
+
+from django.core.management import BaseCommand
+
+from custom.icds_reports.utils import generate_data_for_map
+from custom.icds_reports.utils.map_aggregation import MapColumns, aggregate_by_map_location
+
+
+def _legacy_generate_data_for_map(data, loc_level, num_prop, denom_prop, fill_key_lower, fill_key_bigger,
+                                  all_property=None, location_launched_status=None):
+    # row by row implementation that was used before the map aggregation engine
+    data_for_map = defaultdict(lambda: {
+        num_prop: 0,
+        denom_prop: 0,
+        'original_name': []
+    })
+    if all_property:
+        data_for_map = defaultdict(lambda: {
+            num_prop: 0,
+            denom_prop: 0,
+            'original_name': [],
+            all_property: 0
+        })
+
+    valid_total = 0
+    in_month_total = 0
+    total = 0
+    values_to_calculate_average = {'numerator': 0, 'denominator': 0}
+
+    for row in data:
+        if location_launched_status is not None:
+            launched_status = location_launched_status.get(row['%s_name' % loc_level])
+            if launched_status is None or launched_status <= 0:
+                continue
+        valid = row[denom_prop] or 0
+        name = row['%s_name' % loc_level]
+        on_map_name = row['%s_map_location_name' % loc_level] or name
+        in_month = row[num_prop] or 0
+
+        values_to_calculate_average['numerator'] += in_month if in_month else 0
+        values_to_calculate_average['denominator'] += row[denom_prop] if row[denom_prop] else 0
+
+        valid_total += valid
+        in_month_total += in_month
+        if all_property:
+            all_data = row[all_property] or 0
+            data_for_map[on_map_name][all_property] += all_data
+            total += all_data
+        data_for_map[on_map_name][num_prop] += in_month
+        data_for_map[on_map_name][denom_prop] += valid
+        data_for_map[on_map_name]['original_name'].append(name)
+
+    for data_for_location in data_for_map.values():
+        value = data_for_location[num_prop] * 100 / (data_for_location[denom_prop] or 1)
+        fill_format = '%s%%-%s%%'
+        if value < fill_key_lower:
+            data_for_location.update({'fillKey': (fill_format % (0, fill_key_lower))})
+        elif fill_key_lower <= value < fill_key_bigger:
+            data_for_location.update({'fillKey': (fill_format % (fill_key_lower, fill_key_bigger))})
+        elif value >= fill_key_bigger:
+            data_for_location.update({'fillKey': (fill_format % (fill_key_bigger, 100))})
+
+    average = (
+        (values_to_calculate_average['numerator'] * 100) /
+        float(values_to_calculate_average['denominator'] or 1)
+    )
+    return data_for_map, valid_total, in_month_total, average, total
+
+
+class Command(BaseCommand):
+    help = "Compares the row by row map aggregation with the map aggregation engine on synthetic data"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--locations', type=int, default=50000)
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, locations, repeat, **options):
+        random.seed(42)
+        rows = []
+        for index in range(locations):
+            denominator = random.randint(0, 60)
+            rows.append({
+                'awc_name': f'AWC {index}',
+                # a few locations are shown as a single one on the map
+                'awc_map_location_name': f'Map {index // 2}' if index % 10 == 0 else None,
+                'children': random.randint(0, denominator),
+                'all': denominator,
+            })
+        launched_status = {row['awc_name']: random.randint(0, 3) for row in rows}
+        # rows as fetched by the engine from a queryset, where the database drops the locations
+        # that are not launched
+        tuples = [
+            (row['awc_name'], row['awc_map_location_name'], row['children'], row['all'])
+            for row in rows if launched_status[row['awc_name']] > 0
+        ]
+
+        def _aggregate_tuples():
+            names, map_names, children, all_children = zip(*tuples)
+            return aggregate_by_map_location(
+                MapColumns(names, map_names, {'children': children, 'all': all_children})
+            )
+
+        legacy = _legacy_generate_data_for_map(rows, 'awc', 'children', 'all', 20, 60,
+                                               location_launched_status=launched_status)
+        engine = generate_data_for_map(rows, 'awc', 'children', 'all', 20, 60,
+                                       location_launched_status=launched_status)
+        if dict(legacy[0]) != engine[0] or legacy[1:] != engine[1:]:
+            raise AssertionError('The map aggregation engine does not return the same data')
+
+        timings = [
+            ('row by row', lambda: _legacy_generate_data_for_map(
+                rows, 'awc', 'children', 'all', 20, 60, location_launched_status=launched_status
+            )),
+            ('engine, dict rows', lambda: generate_data_for_map(
+                rows, 'awc', 'children', 'all', 20, 60, location_launched_status=launched_status
+            )),
+            ('engine, values_list rows', _aggregate_tuples),
+        ]
+        for label, func in timings:
+            duration = min(timeit.repeat(func, number=1, repeat=repeat))
+            print(f'{label}: {duration * 1000:.1f}ms for {locations} locations')
@@ -0,0 +1,75 @@
+import time
+from datetime import date
+
+from django.core.management import BaseCommand
+
+from dateutil.relativedelta import relativedelta
+
+from corehq.util.dates import get_first_last_days
+from custom.icds_reports.reports.reports import ASR_DATA_PROVIDERS, MPR_DATA_PROVIDERS
+from custom.icds_reports.utils import ICDSMixin
+from dimagi.utils.dates import DateSpan
+
+DATA_PROVIDERS = {
+    'mpr': MPR_DATA_PROVIDERS,
+    'asr': ASR_DATA_PROVIDERS,
+}
+
+
+class Command(BaseCommand):
+    help = """
+    Compares rendering the sections of an MPR or ASR with each section querying its
+    UCR reports with rendering them with the UCR report rows shared between the sections.
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument('domain')
+        parser.add_argument('location_id')
+        parser.add_argument('report', choices=sorted(DATA_PROVIDERS))
+        parser.add_argument('--month', type=int, default=date.today().month)
+        parser.add_argument('--year', type=int, default=date.today().year)
+        parser.add_argument('--conditional-agg', action='store_true')
+
+    def handle(self, domain, location_id, report, month, year, **options):
+        provider_classes = [
+            provider_cls for provider_cls in DATA_PROVIDERS[report]
+            if issubclass(provider_cls, ICDSMixin)
+        ]
+        # same dates as IcdsBaseReport.report_config
+        start_date, _ = get_first_last_days(year, month)
+        datespan = DateSpan(
+            (start_date - relativedelta(months=1)).replace(day=21),
+            start_date.replace(day=20)
+        )
+
+        def _get_config():
+            return dict(
+                location_id=location_id,
+                domain=domain,
+                month=month,
+                year=year,
+                start_date=datespan.startdate,
+                end_date=datespan.enddate,
+                date_span=datespan,
+                report_data_cache={},
+            )
+
+        def _render(configs):
+            caches = {id(config['report_data_cache']): config['report_data_cache'] for config in configs}
+            start = time.time()
+            rows = [
+                provider_cls(config, allow_conditional_agg=options['conditional_agg']).rows
+                for provider_cls, config in zip(provider_classes, configs)
+            ]
+            duration = time.time() - start
+            return rows, sum(len(cache) for cache in caches.values()), duration
+
+        section_rows, section_queries, section_duration = _render([_get_config() for _ in provider_classes])
+        self.stdout.write(f'section by section: {section_queries} UCR report queries, {section_duration:.1f}s')
+
+        shared_config = _get_config()
+        shared_rows, shared_queries, shared_duration = _render([shared_config] * len(provider_classes))
+        self.stdout.write(f'shared: {shared_queries} UCR report queries, {shared_duration:.1f}s')
+
+        if section_rows != shared_rows:
+            raise AssertionError('The sections do not render the same rows with the shared report data')
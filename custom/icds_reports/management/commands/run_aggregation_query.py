@@ -33,6 +33,7 @@ from custom.icds_reports.tasks import (
     _ccs_record_monthly_table,
     _child_health_monthly_aggregation,
     _daily_attendance_table,
+    _drop_prev_ucr_tables,
     _update_months_table,
     ag_pre_queries,
     agg_child_health_temp,
@@ -40,6 +41,7 @@ from custom.icds_reports.tasks import (
     awc_infra_pre_queries,
     availing_pre_queries,
     bp_pre_queries,
+    bump_aggregated_data_generation,
     ccs_cf_pre_queries,
     ccs_pnc_pre_queries,
     cf_pre_queries,
@@ -90,6 +92,7 @@ ALL_STATES_TASKS = {
 
 NORMAL_TASKS = {
     'setup_aggregation': (None, setup_aggregation, None),
+    'drop_prev_ucr_tables': (None, _drop_prev_ucr_tables, None),
     'agg_ls_table': (None, _agg_ls_table, None),
     'update_months_table': (None, _update_months_table, None),
     'daily_attendance': (None, _daily_attendance_table, None),
@@ -103,7 +106,9 @@ NORMAL_TASKS = {
     'update_service_delivery_report': (None, update_service_delivery_report, None),
     'update_bihar_api_table': (None, update_bihar_api_table, None),
     'update_child_vaccine_table': (None, update_child_vaccine_table, None),
-    'aggregate_inactive_aww_agg': (None, _aggregate_inactive_aww_agg, None)
+    'aggregate_inactive_aww_agg': (None, _aggregate_inactive_aww_agg, None),
+    # run by the DAG once the tables read by the dashboard are aggregated
+    'bump_dashboard_data_generation': (None, bump_aggregated_data_generation, None),
 }
 
 
@@ -16,6 +16,8 @@ class Command(BaseCommand):
         parser.add_argument('db_alias', choices=settings.DATABASES)
         parser.add_argument('--month', help="format YYYY-MM-DD")
         parser.add_argument('--location_id')
+        parser.add_argument('--query_concurrency', type=int,
+                            help="number of queries of the data pull run at the same time")
         parser.add_argument('-s', '--skip_confirmation', action='store_true')
         parser.add_argument('-l', '--log_progress', action='store_true')
 
@@ -27,7 +29,8 @@ class Command(BaseCommand):
         location_id = options.get('location_id')
         skip_confirmation = options.get('skip_confirmation')
         log_progress = options.get('log_progress')
-        exporter = DataExporter(name, db_alias, month, location_id)
+        query_concurrency = options.get('query_concurrency')
+        exporter = DataExporter(name, db_alias, month, location_id, query_concurrency=query_concurrency)
         if log_progress:
             self._log(exporter.queries)
         if skip_confirmation or self._get_confirmation():
@@ -7,9 +7,14 @@ from custom.icds_reports.tasks import update_aggregate_locations_tables
 class Command(BaseCommand):
     def add_arguments(self, parser):
         parser.add_argument('agg_uuid')
+        parser.add_argument(
+            '--full-rebuild',
+            action='store_true',
+            help='Rebuild the location tables from all the locations instead of only the modified ones',
+        )
 
     def handle(self, agg_uuid, **options):
         agg_record = AggregationRecord.objects.get(agg_uuid=agg_uuid)
         if not agg_record.run_aggregation_queries:
             return
-        update_aggregate_locations_tables()
+        update_aggregate_locations_tables(full_rebuild=options['full_rebuild'])
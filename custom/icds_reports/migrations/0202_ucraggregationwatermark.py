@@ -0,0 +1,28 @@
+# Generated by Django 2.2.13 on 2020-08-24 10:12
+
+import django.contrib.postgres.fields.jsonb
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('icds_reports', '0201_auto_20200817_1631'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UcrAggregationWatermark',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('func_name', models.TextField()),
+                ('state_id', models.CharField(max_length=40)),
+                ('month', models.DateField()),
+                ('ucr_watermarks', django.contrib.postgres.fields.jsonb.JSONField(default=dict, help_text='Max inserted_at and row count for the state in each input UCR')),
+                ('aggregated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'unique_together': {('func_name', 'state_id', 'month')},
+            },
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 2.2.13 on 2020-08-25 09:41
+
+import django.contrib.postgres.fields.jsonb
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('icds_reports', '0202_ucraggregationwatermark'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AggregationQueryProfile',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('helper_key', models.TextField()),
+                ('state_id', models.CharField(max_length=40, null=True)),
+                ('month', models.DateField(null=True)),
+                ('query_index', models.PositiveIntegerField(help_text='Order of the statement within the helper run')),
+                ('query', models.TextField()),
+                ('duration', models.FloatField(help_text='Wall time of the statement in seconds')),
+                ('rows_affected', models.IntegerField(null=True)),
+                ('explain_plan', django.contrib.postgres.fields.jsonb.JSONField(help_text='EXPLAIN (ANALYZE, BUFFERS) output of the statement', null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+            ],
+            options={
+                'index_together': {('helper_key', 'month')},
+            },
+        ),
+    ]
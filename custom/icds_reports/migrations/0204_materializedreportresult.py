@@ -0,0 +1,24 @@
+# Generated by Django 2.2.13 on 2020-08-27 07:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('icds_reports', '0203_aggregationqueryprofile'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MaterializedReportResult',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('result_key', models.CharField(help_text='Hash of the function and its arguments', max_length=64, unique=True)),
+                ('function_name', models.TextField()),
+                ('month', models.DateField(db_index=True)),
+                ('payload', models.TextField()),
+                ('computed_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,31 @@
+from django.db import migrations
+
+# the index of AggAwcDistributedHelper.indexes for the level 5 tables already aggregated
+CREATE_GOVERNANCE_INDEXES = r"""
+DO $$
+DECLARE
+    agg_tablename text;
+BEGIN
+    FOR agg_tablename IN
+        SELECT tablename FROM pg_tables
+        WHERE schemaname = 'public' AND tablename ~ '^agg_awc_\d{4}-\d{2}-\d{2}_5$'
+    LOOP
+        EXECUTE format(
+            'CREATE INDEX IF NOT EXISTS %I ON %I (state_id, awc_id) '
+            'INCLUDE (district_id, block_id, supervisor_id, num_launched_awcs, valid_visits, expected_visits)',
+            agg_tablename || '_governance_idx', agg_tablename
+        );
+    END LOOP;
+END $$;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('icds_reports', '0204_materializedreportresult'),
+    ]
+
+    operations = [
+        migrations.RunSQL(CREATE_GOVERNANCE_INDEXES, migrations.RunSQL.noop),
+    ]
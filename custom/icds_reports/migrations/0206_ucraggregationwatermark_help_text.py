@@ -0,0 +1,19 @@
+# Generated by Django 2.2.13 on 2020-09-07 11:20
+
+import django.contrib.postgres.fields.jsonb
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('icds_reports', '0205_agg_awc_governance_index'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='ucraggregationwatermark',
+            name='ucr_watermarks',
+            field=django.contrib.postgres.fields.jsonb.JSONField(default=dict, help_text='Max inserted_at of the state and the months read in each input UCR'),
+        ),
+    ]
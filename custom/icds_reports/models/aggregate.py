@@ -65,6 +65,7 @@ from custom.icds_reports.utils.aggregation_helpers.distributed import (
     AvailingServiceFormsAggregationDistributedHelper,
     ChildVaccineHelper
 )
+from custom.icds_reports.utils.aggregation_profiling import profile_helper
 
 def get_cursor(model):
     db = router.db_for_write(model)
@@ -88,8 +89,10 @@ class AggregateMixin(object):
 
     @classmethod
     def aggregate(cls, *args, **kwargs):
+        helper = cls._agg_helper_cls(*args, **kwargs)
         with get_cursor(cls) as cursor, maybe_atomic(cls, cls._agg_atomic):
-            cls._agg_helper_cls(*args, **kwargs).aggregate(cursor)
+            with profile_helper(cursor, helper) as profiled_cursor:
+                helper.aggregate(profiled_cursor)
 
 
 class CcsRecordMonthly(models.Model, AggregateMixin):
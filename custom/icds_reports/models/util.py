@@ -93,6 +93,70 @@ class AggregationRecord(models.Model):
         return False
 
 
+class AggregationQueryProfile(models.Model):
+    """Timing of a single statement executed by an aggregation helper.
+
+    Only recorded when the ICDS_AGGREGATION_PROFILING toggle is enabled.
+    """
+    helper_key = models.TextField()
+    state_id = models.CharField(max_length=40, null=True)
+    month = models.DateField(null=True)
+    query_index = models.PositiveIntegerField(help_text="Order of the statement within the helper run")
+    query = models.TextField()
+    duration = models.FloatField(help_text="Wall time of the statement in seconds")
+    rows_affected = models.IntegerField(null=True)
+    explain_plan = JSONField(null=True, help_text="EXPLAIN (ANALYZE, BUFFERS) output of the statement")
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        app_label = 'icds_reports'
+        index_together = ('helper_key', 'month')
+
+
+class MaterializedReportResult(models.Model):
+    """Precomputed result of a dashboard indicator function decorated with
+    `materialized_result`, stored as JSON text to keep the key order of the payload.
+    """
+    result_key = models.CharField(max_length=64, unique=True, help_text="Hash of the function and its arguments")
+    function_name = models.TextField()
+    month = models.DateField(db_index=True)
+    payload = models.TextField()
+    computed_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        app_label = 'icds_reports'
+
+
+class UcrAggregationWatermark(models.Model):
+    """The state of the UCR inputs included in the last aggregation of a
+    per state aggregation step for a month.
+
+    Used to skip re-aggregating (step, state, month) combinations whose
+    UCR inputs have not changed since the last run.
+    """
+    func_name = models.TextField()
+    state_id = models.CharField(max_length=40)
+    month = models.DateField()
+    ucr_watermarks = JSONField(
+        default=dict,
+        help_text="Max inserted_at of the state and the months read in each input UCR"
+    )
+    aggregated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        app_label = 'icds_reports'
+        unique_together = ('func_name', 'state_id', 'month')
+
+    @classmethod
+    def record(cls, func_name, state_id, month, ucr_watermarks):
+        cls.objects.update_or_create(
+            func_name=func_name,
+            state_id=state_id,
+            month=month,
+            defaults={'ucr_watermarks': ucr_watermarks}
+        )
+
+
 UCR_MAPPING = {
     "XFormInstance": {
         "static-usage_forms": [
@@ -82,7 +82,9 @@ class IcdsBaseReport(CustomProjectReport, ProjectReportParametersMixin, MonthYea
             year=self.year,
             start_date=new_start_date,
             end_date=new_end_date,
-            date_span=self.datespan
+            date_span=self.datespan,
+            # shared by the data providers, see ICDSMixin._custom_data
+            report_data_cache={},
         )
         return config
 
@@ -13,9 +13,13 @@ from custom.icds_reports.messages import percent_aadhaar_seeded_beneficiaries_he
 from custom.icds_reports.models import AggAwcMonthly
 from custom.icds_reports.utils import apply_exclude, generate_data_for_map, indian_formatted_number,\
     person_has_aadhaar_column, person_is_beneficiary_column
+from custom.icds_reports.utils.cache_warmup import set_config_month, warm_up_candidate
+from custom.icds_reports.utils.materialized_results import CHART, MAP, SECTOR, materialized_result
 
 
+@warm_up_candidate(set_config_month)
 @icds_quickcache(['domain', 'config', 'loc_level', 'show_test', 'beta'], timeout=30 * 60)
+@materialized_result(MAP)
 def get_adhaar_data_map(domain, config, loc_level, show_test=False, beta=False):
 
     def get_data_for(filters):
@@ -76,6 +80,7 @@ def get_adhaar_data_map(domain, config, loc_level, show_test=False, beta=False):
 
 
 @icds_quickcache(['domain', 'config', 'loc_level', 'location_id', 'show_test', 'beta'], timeout=30 * 60)
+@materialized_result(SECTOR)
 def get_adhaar_sector_data(domain, config, loc_level, location_id, show_test=False, beta=False):
     group_by = ['%s_name' % loc_level]
 
@@ -139,6 +144,7 @@ def get_adhaar_sector_data(domain, config, loc_level, location_id, show_test=Fal
 
 
 @icds_quickcache(['domain', 'config', 'loc_level', 'show_test', 'beta'], timeout=30 * 60)
+@materialized_result(CHART)
 def get_adhaar_data_chart(domain, config, loc_level, show_test=False, beta=False):
     month = datetime(*config['month'])
     three_before = datetime(*config['month']) - relativedelta(months=3)
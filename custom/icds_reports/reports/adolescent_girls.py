@@ -12,9 +12,14 @@ from custom.icds_reports.messages import percent_adolescent_girls_enrolled_help_
     percent_adolescent_girls_enrolled_help_text_v2
 from custom.icds_reports.models import AggAwcMonthly
 from custom.icds_reports.utils import apply_exclude, indian_formatted_number
+from custom.icds_reports.utils.cache_warmup import set_config_month, warm_up_candidate
+from custom.icds_reports.utils.map_aggregation import aggregate_by_map_location, get_map_columns
+from custom.icds_reports.utils.materialized_results import CHART, MAP, SECTOR, materialized_result
 
 
+@warm_up_candidate(set_config_month)
 @icds_quickcache(['domain', 'config', 'loc_level', 'show_test', 'beta'], timeout=30 * 60)
+@materialized_result(MAP)
 def get_adolescent_girls_data_map(domain, config, loc_level, show_test=False, beta=False):
 
     valid_col_name = 'cases_person_adolescent_girls_11_14_out_of_school'
@@ -38,29 +43,14 @@ def get_adolescent_girls_data_map(domain, config, loc_level, show_test=False, be
             queryset = apply_exclude(domain, queryset)
         return queryset
 
-    data_for_map = defaultdict(lambda: {
-        'valid': 0,
-        'all': 0,
-        'original_name': [],
-        'fillKey': 'Out of school Adolescent Girls'
-    })
-    average = []
-    total_valid = 0
-    total = 0
-    for row in get_data_for(config):
-        valid = row['valid'] or 0
-        all_adolescent = row['all'] or 0
-        name = row['%s_name' % loc_level]
-        on_map_name = row['%s_map_location_name' % loc_level] or name
-
-        average.append(valid)
-
-        total_valid += valid
-        total += all_adolescent
-
-        data_for_map[on_map_name]['valid'] += valid
-        data_for_map[on_map_name]['all'] += all_adolescent
-        data_for_map[on_map_name]['original_name'].append(name)
+    columns = ['valid', 'all']
+    data_for_map, totals = aggregate_by_map_location(
+        get_map_columns(get_data_for(config), loc_level, columns)
+    )
+    for data_for_location in data_for_map.values():
+        data_for_location['fillKey'] = 'Out of school Adolescent Girls'
+    total_valid = totals['valid']
+    total = totals['all']
 
     fills = OrderedDict()
     fills.update({'Out of school Adolescent Girls': MapColors.BLUE})
@@ -95,6 +85,7 @@ def get_adolescent_girls_data_map(domain, config, loc_level, show_test=False, be
 
 
 @icds_quickcache(['domain', 'config', 'loc_level', 'location_id', 'show_test', 'beta'], timeout=30 * 60)
+@materialized_result(SECTOR)
 def get_adolescent_girls_sector_data(domain, config, loc_level, location_id, show_test=False, beta=False):
 
     valid_col_name = 'cases_person_adolescent_girls_11_14_out_of_school'
@@ -160,6 +151,7 @@ def get_adolescent_girls_sector_data(domain, config, loc_level, location_id, sho
 
 
 @icds_quickcache(['domain', 'config', 'loc_level', 'show_test', 'beta'], timeout=30 * 60)
+@materialized_result(CHART)
 def get_adolescent_girls_data_chart(domain, config, loc_level, show_test=False, beta=False):
 
     valid_col_name = 'cases_person_adolescent_girls_11_14_out_of_school'
@@ -10,9 +10,13 @@ from custom.icds_reports.const import LocationTypes, ChartColors, MapColors
 from custom.icds_reports.messages import awcs_reported_weighing_scale_mother_and_child_help_text
 from custom.icds_reports.models import AggAwcMonthly
 from custom.icds_reports.utils import apply_exclude, generate_data_for_map, indian_formatted_number
+from custom.icds_reports.utils.cache_warmup import set_config_month, warm_up_candidate
+from custom.icds_reports.utils.materialized_results import CHART, MAP, SECTOR, materialized_result
 
 
+@warm_up_candidate(set_config_month)
 @icds_quickcache(['domain', 'config', 'loc_level', 'show_test', 'beta'], timeout=30 * 60)
+@materialized_result(MAP)
 def get_adult_weight_scale_data_map(domain, config, loc_level, show_test=False, beta=False):
 
     def get_data_for(filters):
@@ -74,6 +78,7 @@ def get_adult_weight_scale_data_map(domain, config, loc_level, show_test=False,
 
 
 @icds_quickcache(['domain', 'config', 'loc_level', 'show_test'], timeout=30 * 60)
+@materialized_result(CHART)
 def get_adult_weight_scale_data_chart(domain, config, loc_level, show_test=False):
     month = datetime(*config['month'])
     three_before = datetime(*config['month']) - relativedelta(months=3)
@@ -156,6 +161,7 @@ def get_adult_weight_scale_data_chart(domain, config, loc_level, show_test=False
 
 
 @icds_quickcache(['domain', 'config', 'loc_level', 'location_id', 'show_test'], timeout=30 * 60)
+@materialized_result(SECTOR)
 def get_adult_weight_scale_sector_data(domain, config, loc_level, location_id, show_test=False):
     group_by = ['%s_name' % loc_level]
 
@@ -10,9 +10,13 @@ from custom.icds_reports.cache import icds_quickcache
 from custom.icds_reports.const import LocationTypes, ChartColors, MapColors
 from custom.icds_reports.models import AggAwcDailyView
 from custom.icds_reports.utils import apply_exclude, generate_data_for_map, indian_formatted_number
+from custom.icds_reports.utils.cache_warmup import set_config_month, warm_up_candidate
+from custom.icds_reports.utils.materialized_results import CHART, MAP, SECTOR, materialized_result
 
 
+@warm_up_candidate(set_config_month)
 @icds_quickcache(['domain', 'config', 'loc_level', 'show_test', 'beta'], timeout=30 * 60)
+@materialized_result(MAP)
 def get_awc_daily_status_data_map(domain, config, loc_level, show_test=False, beta=False):
     date = datetime(*config['month'])
     del config['month']
@@ -85,6 +89,7 @@ def get_awc_daily_status_data_map(domain, config, loc_level, show_test=False, be
 
 
 @icds_quickcache(['domain', 'config', 'loc_level', 'show_test'], timeout=30 * 60)
+@materialized_result(CHART)
 def get_awc_daily_status_data_chart(domain, config, loc_level, show_test=False):
     month = datetime(*config['month'])
     last = datetime(*config['month']) - relativedelta(days=30)
@@ -184,6 +189,7 @@ def get_awc_daily_status_data_chart(domain, config, loc_level, show_test=False):
 
 
 @icds_quickcache(['domain', 'config', 'loc_level', 'location_id', 'show_test'], timeout=30 * 60)
+@materialized_result(SECTOR)
 def get_awc_daily_status_sector_data(domain, config, loc_level, location_id, show_test=False):
     group_by = ['%s_name' % loc_level]
 
@@ -11,9 +11,14 @@ from custom.icds_reports.const import LocationTypes, ChartColors, MapColors
 from custom.icds_reports.messages import awcs_launched_help_text
 from custom.icds_reports.models import AggAwcMonthly
 from custom.icds_reports.utils import apply_exclude, indian_formatted_number, get_child_locations
+from custom.icds_reports.utils.cache_warmup import set_config_month, warm_up_candidate
+from custom.icds_reports.utils.map_aggregation import aggregate_by_map_location, get_map_columns
+from custom.icds_reports.utils.materialized_results import CHART, MAP, SECTOR, materialized_result
 
 
+@warm_up_candidate(set_config_month)
 @icds_quickcache(['domain', 'config', 'loc_level', 'show_test'], timeout=30 * 60)
+@materialized_result(MAP)
 def get_awcs_covered_data_map(domain, config, loc_level, show_test=False):
     level = config['aggregation_level']
 
@@ -35,48 +40,15 @@ def get_awcs_covered_data_map(domain, config, loc_level, show_test=False):
             queryset = apply_exclude(domain, queryset)
         return queryset
 
-    data_for_map = defaultdict(lambda: {
-        'awcs': [],
-        'sectors': [],
-        'blocks': [],
-        'districts': [],
-        'states': [],
-        'original_name': []
-    })
-
-    for row in get_data_for(config):
-        name = row['%s_name' % loc_level]
-        on_map_name = row['%s_map_location_name' % loc_level] or name
-        awcs = row['awcs'] or 0
-        sectors = row['sectors'] or 0
-        blocks = row['blocks'] or 0
-        districts = row['districts'] or 0
-        states = row['states'] or 0
-
-        data_for_map[on_map_name]['awcs'].append(awcs)
-        data_for_map[on_map_name]['sectors'].append(sectors)
-        data_for_map[on_map_name]['blocks'].append(blocks)
-        data_for_map[on_map_name]['districts'].append(districts)
-        data_for_map[on_map_name]['states'].append(states)
-        data_for_map[on_map_name]['original_name'].append(name)
-
+    # the number of launched locations above the aggregation level is the same for all the rows
+    launched_levels = {'states': 1, 'districts': 2, 'blocks': 3, 'sectors': 4, 'awcs': 5}
+    columns = ['awcs', 'sectors', 'blocks', 'districts', 'states']
+    data_for_map = aggregate_by_map_location(
+        get_map_columns(get_data_for(config), loc_level, columns),
+        max_columns=[column for column, column_level in launched_levels.items() if level > column_level]
+    )[0]
     for data_for_location in data_for_map.values():
-        data_for_location['awcs'] = (
-            sum(data_for_location['awcs']) if level <= 5 else max(data_for_location['awcs'])
-        )
-        data_for_location['sectors'] = (
-            sum(data_for_location['sectors']) if level <= 4 else max(data_for_location['sectors'])
-        )
-        data_for_location['blocks'] = (
-            sum(data_for_location['blocks']) if level <= 3 else max(data_for_location['blocks'])
-        )
-        data_for_location['districts'] = (
-            sum(data_for_location['districts']) if level <= 2 else max(data_for_location['districts'])
-        )
-        data_for_location['states'] = (
-            sum(data_for_location['states']) if level <= 1 else max(data_for_location['states'])
-        )
-        data_for_location.update({'fillKey': 'Launched' if data_for_location['awcs'] > 0 else 'Not launched'})
+        data_for_location['fillKey'] = 'Launched' if data_for_location['awcs'] > 0 else 'Not launched'
 
     if level == 1:
         prop = 'states'
@@ -128,6 +100,7 @@ def get_awcs_covered_data_map(domain, config, loc_level, show_test=False):
 
 
 @icds_quickcache(['domain', 'config', 'loc_level', 'location_id', 'show_test'], timeout=30 * 60)
+@materialized_result(SECTOR)
 def get_awcs_covered_sector_data(domain, config, loc_level, location_id, show_test=False):
     group_by = ['%s_name' % loc_level]
 
@@ -231,6 +204,7 @@ def get_awcs_covered_sector_data(domain, config, loc_level, location_id, show_te
 
 
 @icds_quickcache(['domain', 'config', 'loc_level', 'show_test'], timeout=30 * 60)
+@materialized_result(CHART)
 def get_awcs_covered_data_chart(domain, config, loc_level, show_test=False):
     month = datetime(*config['month'])
     three_before = datetime(*config['month']) - relativedelta(months=3)
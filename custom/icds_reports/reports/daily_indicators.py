@@ -14,7 +14,7 @@ def _get_data_for_daily_indicators(filters):
     return queryset
 
 
-@icds_quickcache([], timeout=30 * 60)
+@icds_quickcache([], timeout=30 * 60, vary_on_data_generation=False)
 def get_daily_indicators():
 
     today_date = date.today()
@@ -11,9 +11,14 @@ from custom.icds_reports.messages import percent_pregnant_women_enrolled_help_te
 from custom.icds_reports.models import AggCcsRecordMonthly
 from custom.icds_reports.utils import apply_exclude, indian_formatted_number
 from custom.icds_reports.utils import get_location_launched_status
+from custom.icds_reports.utils.cache_warmup import set_config_month, warm_up_candidate
+from custom.icds_reports.utils.map_aggregation import aggregate_by_map_location, get_map_columns
+from custom.icds_reports.utils.materialized_results import CHART, MAP, SECTOR, materialized_result
 
 
+@warm_up_candidate(set_config_month)
 @icds_quickcache(['domain', 'config', 'loc_level', 'show_test', 'icds_features_flag'], timeout=30 * 60)
+@materialized_result(MAP)
 def get_enrolled_women_data_map(domain, config, loc_level, show_test=False, icds_features_flag=False):
     config['month'] = datetime(*config['month'])
 
@@ -30,38 +35,19 @@ def get_enrolled_women_data_map(domain, config, loc_level, show_test=False, icds
             queryset = apply_exclude(domain, queryset)
         return queryset
 
-    data_for_map = defaultdict(lambda: {
-        'valid': 0,
-        'all': 0,
-        'original_name': [],
-        'fillKey': 'Women'
-    })
-    average = []
-    total_valid = 0
-    total = 0
-
     if icds_features_flag:
         location_launched_status = get_location_launched_status(config, loc_level)
     else:
         location_launched_status = None
-    for row in get_data_for(config):
-        if location_launched_status:
-            launched_status = location_launched_status.get(row['%s_name' % loc_level])
-            if launched_status is None or launched_status <= 0:
-                continue
-        valid = row['valid'] or 0
-        all_pregnant = row['all'] or 0
-        name = row['%s_name' % loc_level]
-        on_map_name = row['%s_map_location_name' % loc_level] or name
-
-        average.append(valid)
-
-        total_valid += valid
-        total += all_pregnant
 
-        data_for_map[on_map_name]['valid'] += valid
-        data_for_map[on_map_name]['all'] += all_pregnant
-        data_for_map[on_map_name]['original_name'].append(name)
+    columns = ['valid', 'all']
+    data_for_map, totals = aggregate_by_map_location(
+        get_map_columns(get_data_for(config), loc_level, columns, location_launched_status or None)
+    )
+    for data_for_location in data_for_map.values():
+        data_for_location['fillKey'] = 'Women'
+    total_valid = totals['valid']
+    total = totals['all']
 
     fills = OrderedDict()
     fills.update({'Women': MapColors.BLUE})
@@ -101,6 +87,7 @@ def get_enrolled_women_data_map(domain, config, loc_level, show_test=False, icds
 
 @icds_quickcache(['domain', 'config', 'loc_level', 'location_id', 'show_test', 'icds_features_flag'],
                  timeout=30 * 60)
+@materialized_result(SECTOR)
 def get_enrolled_women_sector_data(domain, config, loc_level, location_id,
                                    show_test=False, icds_features_flag=False):
     group_by = ['%s_name' % loc_level]
@@ -169,6 +156,7 @@ def get_enrolled_women_sector_data(domain, config, loc_level, location_id,
 
 
 @icds_quickcache(['domain', 'config', 'loc_level', 'show_test', 'icds_features_flag'], timeout=30 * 60)
+@materialized_result(CHART)
 def get_enrolled_women_data_chart(domain, config, loc_level, show_test=False, icds_features_flag=False):
     month = datetime(*config['month'])
     three_before = datetime(*config['month']) - relativedelta(months=3)
@@ -12,6 +12,7 @@ from custom.icds_reports.sqldata.agg_child_health_monthly import AggChildHealthM
 from custom.icds_reports.sqldata.national_aggregation import NationalAggregationDataSource
 from custom.icds_reports.utils import person_is_beneficiary_column, default_age_interval
 from custom.icds_reports.cache import icds_quickcache
+from custom.icds_reports.utils.cache_warmup import set_fact_sheet_month, warm_up_candidate
 
 
 FACT_SHEET_DATASOURCES_NAMES = {
@@ -21,6 +22,7 @@ FACT_SHEET_DATASOURCES_NAMES = {
 }
 
 
+@warm_up_candidate(set_fact_sheet_month)
 @icds_quickcache(['domain', 'previous_month', 'data_source_name', 'loc_level', 'show_test', 'beta'],
                  timeout=30 * 60)
 def get_data_for_national_aggregatation(domain, previous_month, data_source_name, loc_level, show_test, beta):
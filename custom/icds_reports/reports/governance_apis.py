@@ -1,28 +1,59 @@
+import json
 from datetime import date
 
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db.models import F, Case, When, TextField, Value
 
 from custom.icds_reports.cache import icds_quickcache
+from custom.icds_reports.const import AggregationLevels, CAS_API_PAGE_SIZE
 from custom.icds_reports.models.aggregate import AggGovernanceDashboard
-from custom.icds_reports.const import AggregationLevels
 from custom.icds_reports.models import AggAwcMonthly, AwcLocation
 
 
-@icds_quickcache(['length', 'year', 'month', 'order', 'query_filters'], timeout=30 * 60)
-def get_home_visit_data(length, year, month, order, query_filters):
-    data = AggAwcMonthly.objects.filter(
+# the totals are the same for all the pages of a month and state, and partners
+# walking all the AWCs page by page should be able to do so within 2 hours
+@icds_quickcache(
+    ['model_classname', 'year', 'month', 'query_filters'], timeout=60 * 60 * 2, vary_on_data_generation=False
+)
+def get_total_count(model_classname, year, month, query_filters):
+    classes = {
+        AggAwcMonthly.__name__: AggAwcMonthly,
+        AggGovernanceDashboard.__name__: AggGovernanceDashboard,
+    }
+    return classes[model_classname].objects.filter(
+        month=date(year, month, 1),
+        **query_filters
+    ).count()
+
+
+def get_total_count_for_query(data, year, month, query_filters):
+    """Returns the number of rows of the month of a query, whatever the `awc_id__gt` cursor"""
+    total_filters = {key: value for key, value in query_filters.items() if key != 'awc_id__gt'}
+    return get_total_count(data.model.__name__, year, month, total_filters)
+
+
+def iter_ndjson(data):
+    """Yields the rows of a query as newline delimited JSON, fetching them in chunks"""
+    for row in data.iterator(chunk_size=CAS_API_PAGE_SIZE):
+        yield json.dumps(row, cls=DjangoJSONEncoder) + '\n'
+
+
+def get_home_visit_query(year, month, order, query_filters):
+    return AggAwcMonthly.objects.filter(
         month=date(year, month, 1),
         **query_filters
     ).order_by(*order).annotate(awc_code=F('awc_site_code')).values(
         'awc_id', 'awc_code', 'valid_visits', 'expected_visits'
     )
-    paginated_data = list(data[:length])
-
-    return paginated_data, data.count()
 
 
 @icds_quickcache(['length', 'year', 'month', 'order', 'query_filters'], timeout=30 * 60)
-def get_vhnd_data(length, year, month, order, query_filters):
+def get_home_visit_data(length, year, month, order, query_filters):
+    data = get_home_visit_query(year, month, order, query_filters)
+    return list(data[:length]), data.count()
+
+
+def get_vhnd_query(year, month, order, query_filters):
 
     def yes_no_or_null(col_name):
         when_true = {col_name: 1, 'then': Value('yes')}
@@ -34,7 +65,7 @@ def get_vhnd_data(length, year, month, order, query_filters):
             output_field=TextField()
         )
 
-    data = AggGovernanceDashboard.objects.filter(
+    return AggGovernanceDashboard.objects.filter(
         month=date(year, month, 1),
         **query_filters
     ).order_by(*order).values(
@@ -53,14 +84,15 @@ def get_vhnd_data(length, year, month, order, query_filters):
         ),
     )
 
-    paginated_data = list(data[:length])
 
-    return paginated_data, data.count()
+@icds_quickcache(['length', 'year', 'month', 'order', 'query_filters'], timeout=30 * 60)
+def get_vhnd_data(length, year, month, order, query_filters):
+    data = get_vhnd_query(year, month, order, query_filters)
+    return list(data[:length]), data.count()
 
 
-@icds_quickcache(['length', 'year', 'month', 'order', 'query_filters'], timeout=30 * 60)
-def get_beneficiary_data(length, year, month, order, query_filters):
-    data = AggGovernanceDashboard.objects.filter(
+def get_beneficiary_query(year, month, order, query_filters):
+    return AggGovernanceDashboard.objects.filter(
         month=date(year, month, 1),
         **query_filters
     ).order_by(*order).values(
@@ -92,10 +124,12 @@ def get_beneficiary_data(length, year, month, order, query_filters):
         'total_3_6_male_reg_in_month'
     )
 
-    # To apply pagination on database query with data size length
-    paginated_data = list(data[:length])
 
-    return paginated_data, data.count()
+@icds_quickcache(['length', 'year', 'month', 'order', 'query_filters'], timeout=30 * 60)
+def get_beneficiary_data(length, year, month, order, query_filters):
+    data = get_beneficiary_query(year, month, order, query_filters)
+    # To apply pagination on database query with data size length
+    return list(data[:length]), data.count()
 
 
 @icds_quickcache([], timeout=30 * 60)
@@ -104,9 +138,8 @@ def get_state_names():
                                            ).values('state_site_code', 'state_name'))
 
 
-@icds_quickcache(['length', 'year', 'month', 'order', 'query_filters'], timeout=30 * 60)
-def get_cbe_data(length, year, month, order, query_filters):
-    data = AggGovernanceDashboard.objects.filter(
+def get_cbe_query(year, month, order, query_filters):
+    return AggGovernanceDashboard.objects.filter(
         month=date(year, month, 1),
         **query_filters
     ).order_by(*order).annotate(
@@ -135,7 +168,9 @@ def get_cbe_data(length, year, month, order, query_filters):
         'num_other_beneficiaries_2',
     )
 
-    # To apply pagination on database query with data size length
-    paginated_data = list(data[:length])
 
-    return paginated_data, data.count()
+@icds_quickcache(['length', 'year', 'month', 'order', 'query_filters'], timeout=30 * 60)
+def get_cbe_data(length, year, month, order, query_filters):
+    data = get_cbe_query(year, month, order, query_filters)
+    # To apply pagination on database query with data size length
+    return list(data[:length]), data.count()
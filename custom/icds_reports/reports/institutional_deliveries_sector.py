@@ -12,10 +12,13 @@ from custom.icds_reports.models import AggCcsRecordMonthly, CcsRecordMonthlyView
 from custom.icds_reports.utils import apply_exclude, generate_data_for_map, indian_formatted_number, \
     get_filters_from_config_for_chart_view
 from custom.icds_reports.utils import get_location_launched_status
+from custom.icds_reports.utils.cache_warmup import set_config_month, warm_up_candidate
+from custom.icds_reports.utils.materialized_results import CHART, MAP, SECTOR, materialized_result
 
 
 @icds_quickcache(['domain', 'config', 'loc_level', 'location_id', 'show_test', 'icds_features_flag'],
                  timeout=30 * 60)
+@materialized_result(SECTOR)
 def get_institutional_deliveries_sector_data(domain, config, loc_level, location_id,
                                              show_test=False, icds_features_flag=False):
     group_by = ['%s_name' % loc_level]
@@ -85,7 +88,9 @@ def get_institutional_deliveries_sector_data(domain, config, loc_level, location
     }
 
 
+@warm_up_candidate(set_config_month)
 @icds_quickcache(['domain', 'config', 'loc_level', 'show_test', 'icds_features_flag'], timeout=30 * 60)
+@materialized_result(MAP)
 def get_institutional_deliveries_data_map(domain, config, loc_level, show_test=False, icds_features_flag=False):
     config['month'] = datetime(*config['month'])
     def get_data_for(filters):
@@ -157,6 +162,7 @@ def get_institutional_deliveries_data_map(domain, config, loc_level, show_test=F
 
 
 @icds_quickcache(['domain', 'config', 'loc_level', 'show_test', 'icds_features_flag'], timeout=30 * 60)
+@materialized_result(CHART)
 def get_institutional_deliveries_data_chart(domain, config, loc_level, show_test=False, icds_features_flag=False):
     month = datetime(*config['month'])
     three_before = datetime(*config['month']) - relativedelta(months=3)
@@ -14,9 +14,14 @@ from custom.icds_reports.utils import apply_exclude, chosen_filters_to_labels, i
     wasting_moderate_column, wasting_severe_column, wasting_normal_column, \
     default_age_interval, wfh_recorded_in_month_column, get_filters_from_config_for_chart_view
 from custom.icds_reports.utils import get_location_launched_status
+from custom.icds_reports.utils.cache_warmup import set_config_month, warm_up_candidate
+from custom.icds_reports.utils.map_aggregation import aggregate_by_map_location, get_map_columns
+from custom.icds_reports.utils.materialized_results import CHART, MAP, SECTOR, materialized_result
 
 
+@warm_up_candidate(set_config_month)
 @icds_quickcache(['domain', 'config', 'loc_level', 'show_test', 'icds_feature_flag'], timeout=30 * 60)
+@materialized_result(MAP)
 def get_prevalence_of_severe_data_map(domain, config, loc_level, show_test=False, icds_feature_flag=False):
     config['month'] = datetime(*config['month'])
 
@@ -40,60 +45,21 @@ def get_prevalence_of_severe_data_map(domain, config, loc_level, show_test=False
             queryset = queryset.filter(age_tranche__lt=72)
         return queryset
 
-    data_for_map = defaultdict(lambda: {
-        'moderate': 0,
-        'severe': 0,
-        'normal': 0,
-        'total_weighed': 0,
-        'total_measured': 0,
-        'total_height_eligible': 0,
-        'original_name': []
-    })
-
-    severe_for_all_locations = 0
-    moderate_for_all_locations = 0
-    normal_for_all_locations = 0
-    weighed_for_all_locations = 0
-    measured_for_all_locations = 0
-    height_eligible_for_all_locations = 0
-
-    values_to_calculate_average = {'numerator': 0, 'denominator': 0}
     if icds_feature_flag:
         location_launched_status = get_location_launched_status(config, loc_level)
     else:
         location_launched_status = None
-    for row in get_data_for(config):
-        if location_launched_status:
-            launched_status = location_launched_status.get(row['%s_name' % loc_level])
-            if launched_status is None or launched_status <= 0:
-                continue
-        total_weighed = row['total_weighed'] or 0
-        total_height_eligible = row['total_height_eligible'] or 0
-        name = row['%s_name' % loc_level]
-        on_map_name = row['%s_map_location_name' % loc_level] or name
-        severe = row['severe'] or 0
-        moderate = row['moderate'] or 0
-        normal = row['normal'] or 0
-        total_measured = row['total_measured'] or 0
 
-        values_to_calculate_average['numerator'] += moderate if moderate else 0
-        values_to_calculate_average['numerator'] += severe if severe else 0
-        values_to_calculate_average['denominator'] += total_measured if total_measured else 0
-
-        severe_for_all_locations += severe
-        moderate_for_all_locations += moderate
-        normal_for_all_locations += normal
-        weighed_for_all_locations += total_weighed
-        measured_for_all_locations += total_measured
-        height_eligible_for_all_locations += total_height_eligible
-
-        data_for_map[on_map_name]['severe'] += severe
-        data_for_map[on_map_name]['moderate'] += moderate
-        data_for_map[on_map_name]['normal'] += normal
-        data_for_map[on_map_name]['total_weighed'] += total_weighed
-        data_for_map[on_map_name]['total_measured'] += total_measured
-        data_for_map[on_map_name]['total_height_eligible'] += total_height_eligible
-        data_for_map[on_map_name]['original_name'].append(name)
+    columns = ['moderate', 'severe', 'normal', 'total_weighed', 'total_measured', 'total_height_eligible']
+    data_for_map, totals = aggregate_by_map_location(
+        get_map_columns(get_data_for(config), loc_level, columns, location_launched_status or None)
+    )
+    severe_for_all_locations = totals['severe']
+    moderate_for_all_locations = totals['moderate']
+    normal_for_all_locations = totals['normal']
+    weighed_for_all_locations = totals['total_weighed']
+    measured_for_all_locations = totals['total_measured']
+    height_eligible_for_all_locations = totals['total_height_eligible']
 
     for data_for_location in data_for_map.values():
         numerator = data_for_location['moderate'] + data_for_location['severe']
@@ -119,8 +85,8 @@ def get_prevalence_of_severe_data_map(domain, config, loc_level, show_test=False
     )
 
     average = (
-        (values_to_calculate_average['numerator'] * 100) /
-        float(values_to_calculate_average['denominator'] or 1)
+        ((moderate_for_all_locations + severe_for_all_locations) * 100) /
+        float(measured_for_all_locations or 1)
     )
 
     return {
@@ -166,6 +132,7 @@ def get_prevalence_of_severe_data_map(domain, config, loc_level, show_test=False
 
 
 @icds_quickcache(['domain', 'config', 'loc_level', 'show_test', 'icds_feature_flag'], timeout=30 * 60)
+@materialized_result(CHART)
 def get_prevalence_of_severe_data_chart(domain, config, loc_level, show_test=False, icds_feature_flag=False):
     month = datetime(*config['month'])
     three_before = datetime(*config['month']) - relativedelta(months=3)
@@ -310,6 +277,7 @@ def get_prevalence_of_severe_data_chart(domain, config, loc_level, show_test=Fal
 
 
 @icds_quickcache(['domain', 'config', 'loc_level', 'location_id', 'show_test', 'icds_feature_flag'], timeout=30 * 60)
+@materialized_result(SECTOR)
 def get_prevalence_of_severe_sector_data(domain, config, loc_level, location_id, show_test=False,
                                          icds_feature_flag=False):
     group_by = ['%s_name' % loc_level]
@@ -13,9 +13,14 @@ from custom.icds_reports.utils import apply_exclude, chosen_filters_to_labels, i
     stunting_moderate_column, stunting_severe_column, stunting_normal_column, \
     default_age_interval, hfa_recorded_in_month_column, get_filters_from_config_for_chart_view
 from custom.icds_reports.utils import get_location_launched_status
+from custom.icds_reports.utils.cache_warmup import set_config_month, warm_up_candidate
+from custom.icds_reports.utils.map_aggregation import aggregate_by_map_location, get_map_columns
+from custom.icds_reports.utils.materialized_results import CHART, MAP, SECTOR, materialized_result
 
 
+@warm_up_candidate(set_config_month)
 @icds_quickcache(['domain', 'config', 'loc_level', 'show_test', 'icds_feature_flag'], timeout=30 * 60)
+@materialized_result(MAP)
 def get_prevalence_of_stunting_data_map(domain, config, loc_level, show_test=False, icds_feature_flag=False):
     config['month'] = datetime(*config['month'])
 
@@ -37,57 +42,20 @@ def get_prevalence_of_stunting_data_map(domain, config, loc_level, show_test=Fal
             queryset = queryset.filter(age_tranche__lt=72)
         return queryset
 
-    data_for_map = defaultdict(lambda: {
-        'moderate': 0,
-        'severe': 0,
-        'normal': 0,
-        'total': 0,
-        'total_measured': 0,
-        'original_name': []
-    })
-
-    moderate_total = 0
-    severe_total = 0
-    normal_total = 0
-    all_total = 0
-    measured_total = 0
-
-    values_to_calculate_average = {'numerator': 0, 'denominator': 0}
-
     if icds_feature_flag:
         location_launched_status = get_location_launched_status(config, loc_level)
     else:
         location_launched_status = None
 
-    for row in get_data_for(config):
-        if location_launched_status:
-            launched_status = location_launched_status.get(row['%s_name' % loc_level])
-            if launched_status is None or launched_status <= 0:
-                continue
-        total = row['total'] or 0
-        name = row['%s_name' % loc_level]
-        on_map_name = row['%s_map_location_name' % loc_level] or name
-        severe = row['severe'] or 0
-        moderate = row['moderate'] or 0
-        normal = row['normal'] or 0
-        total_measured = row['total_measured'] or 0
-
-        values_to_calculate_average['numerator'] += moderate if moderate else 0
-        values_to_calculate_average['numerator'] += severe if severe else 0
-        values_to_calculate_average['denominator'] += total_measured if total_measured else 0
-
-        severe_total += severe
-        moderate_total += moderate
-        normal_total += normal
-        all_total += total
-        measured_total += total_measured
-
-        data_for_map[on_map_name]['severe'] += severe
-        data_for_map[on_map_name]['moderate'] += moderate
-        data_for_map[on_map_name]['normal'] += normal
-        data_for_map[on_map_name]['total'] += total
-        data_for_map[on_map_name]['total_measured'] += total_measured
-        data_for_map[on_map_name]['original_name'].append(name)
+    columns = ['moderate', 'severe', 'normal', 'total', 'total_measured']
+    data_for_map, totals = aggregate_by_map_location(
+        get_map_columns(get_data_for(config), loc_level, columns, location_launched_status or None)
+    )
+    moderate_total = totals['moderate']
+    severe_total = totals['severe']
+    normal_total = totals['normal']
+    all_total = totals['total']
+    measured_total = totals['total_measured']
 
     for data_for_location in data_for_map.values():
         numerator = data_for_location['moderate'] + data_for_location['severe']
@@ -112,8 +80,8 @@ def get_prevalence_of_stunting_data_map(domain, config, loc_level, show_test=Fal
         default_interval=default_age_interval(icds_feature_flag)
     )
     average = (
-        (values_to_calculate_average['numerator'] * 100) /
-        float(values_to_calculate_average['denominator'] or 1)
+        ((moderate_total + severe_total) * 100) /
+        float(measured_total or 1)
     )
 
     return {
@@ -165,6 +133,7 @@ def get_prevalence_of_stunting_data_map(domain, config, loc_level, show_test=Fal
 
 
 @icds_quickcache(['domain', 'config', 'loc_level', 'show_test', 'icds_feature_flag'], timeout=30 * 60)
+@materialized_result(CHART)
 def get_prevalence_of_stunting_data_chart(domain, config, loc_level, show_test=False, icds_feature_flag=False):
     month = datetime(*config['month'])
     three_before = datetime(*config['month']) - relativedelta(months=3)
@@ -304,6 +273,7 @@ def get_prevalence_of_stunting_data_chart(domain, config, loc_level, show_test=F
 
 
 @icds_quickcache(['domain', 'config', 'loc_level', 'location_id', 'show_test', 'icds_feature_flag'], timeout=30 * 60)
+@materialized_result(SECTOR)
 def get_prevalence_of_stunting_sector_data(domain, config, loc_level, location_id, show_test=False,
                                            icds_feature_flag=False):
     group_by = ['%s_name' % loc_level]
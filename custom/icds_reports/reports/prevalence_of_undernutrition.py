@@ -12,9 +12,14 @@ from custom.icds_reports.models import AggChildHealthMonthly, ChildHealthMonthly
 from custom.icds_reports.utils import apply_exclude, chosen_filters_to_labels, indian_formatted_number, \
     format_decimal, get_filters_from_config_for_chart_view
 from custom.icds_reports.utils import get_location_launched_status
+from custom.icds_reports.utils.cache_warmup import set_config_month, warm_up_candidate
+from custom.icds_reports.utils.map_aggregation import aggregate_by_map_location, get_map_columns
+from custom.icds_reports.utils.materialized_results import CHART, MAP, SECTOR, materialized_result
 
 
+@warm_up_candidate(set_config_month)
 @icds_quickcache(['domain', 'config', 'loc_level', 'show_test', 'icds_features_flag'], timeout=30 * 60)
+@materialized_result(MAP)
 def get_prevalence_of_undernutrition_data_map(domain, config, loc_level,
                                               show_test=False, icds_features_flag=False):
     config['month'] = datetime(*config['month'])
@@ -35,56 +40,20 @@ def get_prevalence_of_undernutrition_data_map(domain, config, loc_level,
             queryset = queryset.filter(age_tranche__lt=72)
         return queryset
 
-    data_for_map = defaultdict(lambda: {
-        'moderately_underweight': 0,
-        'severely_underweight': 0,
-        'normal': 0,
-        'weighed': 0,
-        'total': 0,
-        'original_name': []
-    })
-
-    moderately_underweight_total = 0
-    severely_underweight_total = 0
-    normal_total = 0
-    all_total = 0
-    weighed_total = 0
-
-    values_to_calculate_average = {'numerator': 0, 'denominator': 0}
     if icds_features_flag:
         location_launched_status = get_location_launched_status(config, loc_level)
     else:
         location_launched_status = None
 
-    for row in get_data_for(config):
-        if location_launched_status:
-            launched_status = location_launched_status.get(row['%s_name' % loc_level])
-            if launched_status is None or launched_status <= 0:
-                continue
-        weighed = row['weighed'] or 0
-        total = row['total'] or 0
-        name = row['%s_name' % loc_level]
-        on_map_name = row['%s_map_location_name' % loc_level] or name
-        severely_underweight = row['severely_underweight'] or 0
-        moderately_underweight = row['moderately_underweight'] or 0
-        normal = row['normal'] or 0
-
-        values_to_calculate_average['numerator'] += moderately_underweight if moderately_underweight else 0
-        values_to_calculate_average['numerator'] += severely_underweight if severely_underweight else 0
-        values_to_calculate_average['denominator'] += weighed if weighed else 0
-
-        moderately_underweight_total += moderately_underweight
-        severely_underweight_total += severely_underweight
-        normal_total += normal
-        all_total += total
-        weighed_total += weighed
-
-        data_for_map[on_map_name]['severely_underweight'] += severely_underweight
-        data_for_map[on_map_name]['moderately_underweight'] += moderately_underweight
-        data_for_map[on_map_name]['normal'] += normal
-        data_for_map[on_map_name]['total'] += total
-        data_for_map[on_map_name]['weighed'] += weighed
-        data_for_map[on_map_name]['original_name'].append(name)
+    columns = ['moderately_underweight', 'severely_underweight', 'normal', 'weighed', 'total']
+    data_for_map, totals = aggregate_by_map_location(
+        get_map_columns(get_data_for(config), loc_level, columns, location_launched_status or None)
+    )
+    moderately_underweight_total = totals['moderately_underweight']
+    severely_underweight_total = totals['severely_underweight']
+    normal_total = totals['normal']
+    all_total = totals['total']
+    weighed_total = totals['weighed']
 
     for data_for_location in data_for_map.values():
         numerator = data_for_location['moderately_underweight'] + data_for_location['severely_underweight']
@@ -105,8 +74,8 @@ def get_prevalence_of_undernutrition_data_map(domain, config, loc_level,
     fills.update({'defaultFill': MapColors.GREY})
 
     average = (
-        (values_to_calculate_average['numerator'] * 100) /
-        float(values_to_calculate_average['denominator'] or 1)
+        ((moderately_underweight_total + severely_underweight_total) * 100) /
+        float(weighed_total or 1)
     )
 
     gender_label, age_label, chosen_filters = chosen_filters_to_labels(config, default_interval='0 - 5 years')
@@ -149,6 +118,7 @@ def get_prevalence_of_undernutrition_data_map(domain, config, loc_level,
 
 
 @icds_quickcache(['domain', 'config', 'loc_level', 'show_test', 'icds_features_flag'], timeout=30 * 60)
+@materialized_result(CHART)
 def get_prevalence_of_undernutrition_data_chart(domain, config, loc_level,
                                                 show_test=False, icds_features_flag=False):
     month = datetime(*config['month'])
@@ -292,6 +262,7 @@ def get_prevalence_of_undernutrition_data_chart(domain, config, loc_level,
 
 @icds_quickcache(['domain', 'config', 'loc_level', 'location_id', 'show_test', 'icds_features_flag'],
                  timeout=30 * 60)
+@materialized_result(SECTOR)
 def get_prevalence_of_undernutrition_sector_data(domain, config, loc_level, location_id,
                                                  show_test=False, icds_features_flag=False):
     group_by = ['%s_name' % loc_level]
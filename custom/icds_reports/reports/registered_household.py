@@ -10,9 +10,14 @@ from custom.icds_reports.cache import icds_quickcache
 from custom.icds_reports.const import LocationTypes, ChartColors, MapColors
 from custom.icds_reports.models import AggAwcMonthly
 from custom.icds_reports.utils import apply_exclude, indian_formatted_number
+from custom.icds_reports.utils.cache_warmup import set_config_month, warm_up_candidate
+from custom.icds_reports.utils.map_aggregation import aggregate_by_map_location, get_map_columns
+from custom.icds_reports.utils.materialized_results import CHART, MAP, SECTOR, materialized_result
 
 
+@warm_up_candidate(set_config_month)
 @icds_quickcache(['domain', 'config', 'loc_level', 'show_test', 'beta'], timeout=30 * 60)
+@materialized_result(MAP)
 def get_registered_household_data_map(domain, config, loc_level, show_test=False, beta=False):
 
     def get_data_for(filters):
@@ -29,21 +34,14 @@ def get_registered_household_data_map(domain, config, loc_level, show_test=False
 
         return queryset
 
-    data_for_map = defaultdict(lambda: {
-        'household': 0,
-        'original_name': [],
-        'fillKey': 'Household'
-    })
-    average = []
-
-    for row in get_data_for(config):
-        household = row['household'] or 0
-        name = row['%s_name' % loc_level]
-        on_map_name = row['%s_map_location_name' % loc_level] or name
-
-        average.append(household)
-        data_for_map[on_map_name]['household'] += household
-        data_for_map[on_map_name]['original_name'].append(name)
+    columns = ['household']
+    data_for_map, totals = aggregate_by_map_location(
+        get_map_columns(get_data_for(config), loc_level, columns)
+    )
+    number_of_locations = 0
+    for data_for_location in data_for_map.values():
+        data_for_location['fillKey'] = 'Household'
+        number_of_locations += len(data_for_location['original_name'])
 
     fills = OrderedDict()
     fills.update({'Household': MapColors.BLUE})
@@ -56,15 +54,16 @@ def get_registered_household_data_map(domain, config, loc_level, show_test=False
         "label": "",
         "fills": fills,
         "rightLegend": {
-            "average": sum(average) / float(len(average) or 1),
+            "average": totals['household'] / float(number_of_locations or 1),
             "average_format": 'number',
-            "info": _("Total number of households registered: %s" % indian_formatted_number(sum(average)))
+            "info": _("Total number of households registered: %s" % indian_formatted_number(totals['household']))
         },
         "data": dict(data_for_map),
     }
 
 
 @icds_quickcache(['domain', 'config', 'loc_level', 'location_id', 'show_test'], timeout=30 * 60)
+@materialized_result(SECTOR)
 def get_registered_household_sector_data(domain, config, loc_level, location_id, show_test=False):
     group_by = ['%s_name' % loc_level]
 
@@ -121,6 +120,7 @@ def get_registered_household_sector_data(domain, config, loc_level, location_id,
 
 
 @icds_quickcache(['domain', 'config', 'loc_level', 'show_test'], timeout=30 * 60)
+@materialized_result(CHART)
 def get_registered_household_data_chart(domain, config, loc_level, show_test=False):
     month = datetime(*config['month'])
     three_before = datetime(*config['month']) - relativedelta(months=3)
@@ -13,6 +13,34 @@ from custom.icds_reports.mpr_sqldata import MPRIdentification, MPRSectors, MPRPo
 from custom.icds_reports.mpr_sqldata import MPROperationalization
 from custom.icds_reports.reports import IcdsBaseReport
 
+MPR_DATA_PROVIDERS = [
+    MPRIdentification,
+    MPROperationalization,
+    MPRSectors,
+    MPRPopulation,
+    MPRBirthsAndDeaths,
+    MPRAWCDetails,
+    MPRSupplementaryNutrition,
+    MPRUsingSalt,
+    MPRProgrammeCoverage,
+    MPRPreschoolEducation,
+    MPRGrowthMonitoring,
+    MPRImmunizationCoverage,
+    MPRVhnd,
+    MPRReferralServices,
+    MPRMonitoring
+]
+
+ASR_DATA_PROVIDERS = [
+    ASRIdentification,
+    ASROperationalization,
+    ASRPopulation,
+    Annual,
+    DisabledChildren,
+    Infrastructure,
+    Equipment
+]
+
 
 @location_safe
 class MPRReport(IcdsBaseReport):
@@ -25,23 +53,7 @@ class MPRReport(IcdsBaseReport):
 
     @property
     def data_provider_classes(self):
-        return [
-            MPRIdentification,
-            MPROperationalization,
-            MPRSectors,
-            MPRPopulation,
-            MPRBirthsAndDeaths,
-            MPRAWCDetails,
-            MPRSupplementaryNutrition,
-            MPRUsingSalt,
-            MPRProgrammeCoverage,
-            MPRPreschoolEducation,
-            MPRGrowthMonitoring,
-            MPRImmunizationCoverage,
-            MPRVhnd,
-            MPRReferralServices,
-            MPRMonitoring
-        ]
+        return MPR_DATA_PROVIDERS
 
 
 @location_safe
@@ -55,16 +67,7 @@ class ASRReport(IcdsBaseReport):
 
     @property
     def data_provider_classes(self):
-        cls_list = [
-            ASRIdentification,
-            ASROperationalization,
-            ASRPopulation,
-            Annual,
-            DisabledChildren,
-            Infrastructure,
-            Equipment
-        ]
-        return cls_list
+        return ASR_DATA_PROVIDERS
 
 
 @location_safe
@@ -40,6 +40,7 @@ class DemographicsChildHealth(ExportableMixin, IcdsSqlData):
         group_by = ['aggregation_level']
         for column in group_by_columns:
             group_by.append(column.slug)
+        group_by.append(self.location_id_column)
         return group_by
 
     @property
@@ -49,6 +50,7 @@ class DemographicsChildHealth(ExportableMixin, IcdsSqlData):
         for column in order_by_columns:
             order_by.append(OrderBy(column.slug))
         order_by.append(OrderBy('aggregation_level'))
+        order_by.append(OrderBy(self.location_id_column))
         return order_by
 
     @property
@@ -113,6 +115,7 @@ class DemographicsAWCMonthly(ExportableMixin, IcdsSqlData):
         group_by = ['aggregation_level']
         for column in group_by_columns:
             group_by.append(column.slug)
+        group_by.append(self.location_id_column)
         return group_by
 
     @property
@@ -122,6 +125,7 @@ class DemographicsAWCMonthly(ExportableMixin, IcdsSqlData):
         for column in order_by_columns:
             order_by.append(OrderBy(column.slug))
         order_by.append(OrderBy('aggregation_level'))
+        order_by.append(OrderBy(self.location_id_column))
         return order_by
 
     @property
@@ -270,6 +274,14 @@ class DemographicsExport(ExportableMixin):
     def get_data(self):
         awc_monthly = DemographicsAWCMonthly(
             self.config, self.loc_level, show_test=self.show_test, beta=self.beta).get_data()
+        return list(self._join_child_health(awc_monthly))
+
+    def iter_data(self):
+        awc_monthly = DemographicsAWCMonthly(
+            self.config, self.loc_level, show_test=self.show_test, beta=self.beta).iter_data()
+        return self._join_child_health(awc_monthly)
+
+    def _join_child_health(self, awc_monthly):
         child_health = DemographicsChildHealth(
             self.config, self.loc_level, show_test=self.show_test, beta=self.beta).get_data()
         connect_column = 'state_name'
@@ -282,13 +294,15 @@ class DemographicsExport(ExportableMixin):
         elif self.loc_level == 5:
             connect_column = 'awc_name'
 
-        for awc_row in awc_monthly:
-            for child_row in child_health:
-                if awc_row[connect_column] == child_row[connect_column]:
-                    awc_row.update(child_row)
-                    break
+        child_health_by_location = {}
+        for child_row in child_health:
+            child_health_by_location.setdefault(child_row[connect_column], child_row)
 
-        return awc_monthly
+        for awc_row in awc_monthly:
+            child_row = child_health_by_location.get(awc_row[connect_column])
+            if child_row is not None:
+                awc_row.update(child_row)
+            yield awc_row
 
     @property
     def columns(self):
@@ -1,12 +1,15 @@
 import csv
+import functools
+import hashlib
 import io
 import json
 import logging
 import os
 import re
 import tempfile
+import time
 import zipfile
-from collections import namedtuple
+from collections import defaultdict, namedtuple
 from datetime import date, datetime, timedelta
 from io import BytesIO, open
 
@@ -30,7 +33,7 @@ from dimagi.utils.logging import notify_exception
 from pillowtop.feed.interface import ChangeMeta
 
 from corehq.apps.change_feed import data_sources, topics
-from corehq.apps.change_feed.producer import producer
+from corehq.apps.change_feed.producer import ChangeProducer, producer
 from corehq.apps.reports.analytics.esaccessors import (
     get_case_ids_missing_from_elasticsearch,
     get_form_ids_missing_from_elasticsearch)
@@ -50,7 +53,7 @@ from custom.icds_reports.utils.connections import get_icds_ucr_citus_db_alias
 from corehq.util.celery_utils import periodic_task_on_envs
 from corehq.util.decorators import serial_task
 from corehq.util.log import send_HTML_email
-from corehq.util.metrics import metrics_counter
+from corehq.util.metrics import metrics_counter, metrics_gauge
 from corehq.util.soft_assert import soft_assert
 from corehq.util.view_utils import reverse
 from custom.icds_reports.const import (
@@ -116,7 +119,7 @@ from custom.icds_reports.models.aggregate import (
 
 )
 from custom.icds_reports.models.helper import IcdsFile
-from custom.icds_reports.models.util import UcrReconciliationStatus
+from custom.icds_reports.models.util import UCR_MAPPING, UcrAggregationWatermark, UcrReconciliationStatus
 from custom.icds_reports.reports.disha import DishaDump, build_dumps_for_month
 from custom.icds_reports.reports.incentive import IncentiveReport
 from custom.icds_reports.reports.issnip_monthly_register import (
@@ -146,12 +149,17 @@ from custom.icds_reports.utils import (
     create_child_report_excel_file,
     create_excel_file,
     create_excel_file_in_openpyxl,
+    create_streaming_excel_file,
     create_lady_supervisor_excel_file,
     create_pdf_file,
+    create_pdf_zip_file,
     create_thr_report_excel_file,
+    get_location_filter,
     get_performance_report_blob_key,
+    iter_pdfs,
+    render_pdf_page,
+    store_cas_data_export_partitions,
     track_time,
-    zip_folder,
     get_dashboard_usage_excel_file,
     create_service_delivery_report,
     create_child_growth_tracker_report,
@@ -159,6 +167,15 @@ from custom.icds_reports.utils import (
     create_aww_activity_report
 )
 from custom.icds_core.view_utils import icds_pre_release_features
+from custom.icds.icds_toggles import (
+    ICDS_AGGREGATION_PROFILING,
+    ICDS_BATCHED_STATE_AGGREGATION,
+    ICDS_DASHBOARD_CACHE_WARMUP,
+    ICDS_INCREMENTAL_AGGREGATION,
+    ICDS_MATERIALIZED_DASHBOARD_RESULTS,
+    ICDS_PARALLEL_MONTH_AGGREGATION,
+    ICDS_STREAMING_EXPORTS,
+)
 from custom.icds_reports.utils.aggregation_helpers.distributed import (
     ChildHealthMonthlyAggregationDistributedHelper,
     AggAwcDistributedHelper,
@@ -166,6 +183,30 @@ from custom.icds_reports.utils.aggregation_helpers.distributed import (
     GrowthMonitoringFormsAggregationDistributedHelper,
     DailyFeedingFormsChildHealthAggregationDistributedHelper,
 )
+from custom.icds_reports.utils.aggregation_dag import (
+    ALL_STATES,
+    SINGLE_STATE,
+    AggregationDAG,
+    AggregationDAGRun,
+    AggregationStep,
+    SkippedPartitionResult,
+    format_critical_path,
+)
+from custom.icds_reports.utils.aggregation_batch import aggregate_state_helpers
+from custom.icds_reports.utils.aggregation_helpers import transform_day_to_month
+from custom.icds_reports.utils.aggregation_profiling import (
+    get_helper_durations,
+    get_slowest_queries,
+    profile_aggregation,
+)
+from custom.icds_reports.utils.aggregation_watermarks import (
+    IncrementalAggregationPlan,
+    get_ucr_watermarks,
+)
+from custom.icds_reports.cache import bump_data_generation
+from custom.icds_reports.utils.cache_warmup import warm_up_cache
+from custom.icds_reports.utils.materialized_results import precompute_results
+from custom.icds_reports.utils.streaming_export import STREAMING_EXPORT_FORMATS
 from custom.icds_reports.utils.aggregation_helpers.distributed.location_reassignment import (
     TempPrevUCRTables,
     TempPrevIntermediateTables,
@@ -184,6 +225,25 @@ UCRAggregationTask = namedtuple("UCRAggregationTask", ['type', 'date'])
 DASHBOARD_TEAM_EMAILS = ['{}@{}'.format('dashboard-aggregation-script', 'dimagi.com')]
 _dashboard_team_soft_assert = soft_assert(to=DASHBOARD_TEAM_EMAILS, send_to_ops=False)
 
+UCR_RECONCILIATION_CHUNK_SIZE = 10000
+UCR_REPUBLISH_BATCH_SIZE = 1000
+# case UCRs that store the modified_on of the case
+UCR_TABLES_WITH_CASE_MODIFIED_ON = {
+    'static-ccs_record_cases',
+    'static-child_health_cases',
+    'static-hardware_cases',
+    'static-person_cases_v3',
+    'static-tech_issue_cases',
+}
+
+STREAMING_EXPORTS = (
+    CHILDREN_EXPORT,
+    PREGNANT_WOMEN_EXPORT,
+    DEMOGRAPHICS_EXPORT,
+    SYSTEM_USAGE_EXPORT,
+    AWC_INFRASTRUCTURE_EXPORT,
+)
+
 
 UCR_TABLE_NAME_MAPPING = [
     {'type': "awc_location", 'name': 'static-awc_location'},
@@ -213,9 +273,156 @@ SQL_FUNCTION_PATHS = [
     ('migrations', 'sql_templates', 'database_functions', 'create_new_agg_table_for_month.sql'),
 ]
 
+CHILD_HEALTH_FORM_STEPS = (
+    '_aggregate_gm_forms',
+    '_aggregate_df_forms',
+    '_aggregate_cf_forms',
+    '_aggregate_child_health_thr_forms',
+    '_aggregate_child_health_pnc_forms',
+    '_agg_migration_table',
+    '_agg_availing_services_table',
+)
+
+CCS_RECORD_FORM_STEPS = (
+    '_aggregate_ccs_cf_forms',
+    '_aggregate_ccs_record_thr_forms',
+    '_aggregate_ccs_record_pnc_forms',
+    '_aggregate_delivery_forms',
+    '_aggregate_bp_forms',
+    '_agg_migration_table',
+    '_agg_availing_services_table',
+)
+
+LS_FORM_STEPS = (
+    '_agg_ls_awc_mgt_form',
+    '_agg_ls_vhnd_form',
+    '_agg_beneficiary_form',
+)
+
+# the aggregate tables of these steps are used through the location reassignment
+# tables built by _setup_monthly_tables for the next month
+PREV_TABLE_FORM_STEPS = (
+    '_aggregate_gm_forms',
+    '_aggregate_cf_forms',
+    '_aggregate_ccs_cf_forms',
+    '_aggregate_child_health_pnc_forms',
+    '_aggregate_ccs_record_pnc_forms',
+    '_aggregate_bp_forms',
+    '_aggregate_awc_infra_forms',
+    '_agg_adolescent_girls_registration_table',
+    '_agg_migration_table',
+    '_agg_availing_services_table',
+)
+
+# these steps only keep the data of the latest month, so the next month can only
+# start once the monthly tables have read it
+SINGLE_MONTH_FORM_STEPS = (
+    '_aggregate_child_health_thr_forms',
+    '_aggregate_ccs_record_thr_forms',
+    '_aggregate_delivery_forms',
+    '_agg_thr_table',
+)
+
+MONTHLY_TABLE_STEPS = (
+    '_child_health_monthly_table',
+    '_ccs_record_monthly_table',
+    '_agg_awc_table',
+)
+
+# the form steps run by _aggregate_state_forms in a single task per state. The
+# daily feeding, THR and delivery forms are left out as they have to wait for
+# other steps.
+STATE_FORM_BATCH_STEP = '_aggregate_state_forms'
+STATE_FORM_BATCH = {
+    '_aggregate_gm_forms': AggregateGrowthMonitoringForms,
+    '_aggregate_cf_forms': AggregateComplementaryFeedingForms,
+    '_aggregate_ccs_cf_forms': AggregateCcsRecordComplementaryFeedingForms,
+    '_aggregate_child_health_pnc_forms': AggregateChildHealthPostnatalCareForms,
+    '_aggregate_ccs_record_pnc_forms': AggregateCcsRecordPostnatalCareForms,
+    '_aggregate_bp_forms': AggregateBirthPreparednesForms,
+    '_aggregate_awc_infra_forms': AggregateAwcInfrastructureForms,
+    '_agg_adolescent_girls_registration_table': AggregateAdolescentGirlsRegistrationForms,
+    '_agg_migration_table': AggregateMigrationForms,
+    '_agg_availing_services_table': AggregateAvailingServiceForms,
+    '_agg_ls_awc_mgt_form': AggregateLsAWCVisitForm,
+    '_agg_ls_vhnd_form': AggregateLsVhndForm,
+    '_agg_beneficiary_form': AggregateBeneficiaryForm,
+}
+
+
+def _monthly_aggregation_dag(batch_state_forms=False):
+    def steps(names):
+        if not batch_state_forms:
+            return tuple(names)
+        return tuple(dict.fromkeys(
+            STATE_FORM_BATCH_STEP if name in STATE_FORM_BATCH else name
+            for name in names
+        ))
+
+    form_steps = [
+        AggregationStep(
+            name,
+            by_state=SINGLE_STATE,
+            depends_on=['_setup_monthly_tables'],
+            previous_month_depends_on=MONTHLY_TABLE_STEPS if name in SINGLE_MONTH_FORM_STEPS else (),
+        )
+        for name in dict.fromkeys(CHILD_HEALTH_FORM_STEPS + CCS_RECORD_FORM_STEPS + LS_FORM_STEPS + (
+            '_aggregate_awc_infra_forms',
+            '_agg_thr_table',
+            '_agg_adolescent_girls_registration_table',
+        ))
+        if name != '_aggregate_df_forms' and not (batch_state_forms and name in STATE_FORM_BATCH)
+    ]
+    if batch_state_forms:
+        form_steps.append(AggregationStep(
+            STATE_FORM_BATCH_STEP,
+            by_state=SINGLE_STATE,
+            depends_on=['_setup_monthly_tables'],
+        ))
+
+    return AggregationDAG(form_steps + [
+        AggregationStep(
+            '_setup_monthly_tables',
+            previous_month_depends_on=steps(PREV_TABLE_FORM_STEPS + ('_create_df_indices',))
+        ),
+        # daily feeding forms are joined with the daily_attendance table
+        AggregationStep('_aggregate_df_forms', by_state=SINGLE_STATE, depends_on=['_daily_attendance_table']),
+        AggregationStep('_daily_attendance_table', depends_on=['_setup_monthly_tables']),
+        AggregationStep('_update_months_table'),
+        AggregationStep('_aggregate_inactive_aww_agg'),
+        AggregationStep('_create_df_indices', depends_on=['_aggregate_df_forms']),
+        AggregationStep(
+            '_child_health_monthly_table',
+            by_state=ALL_STATES,
+            depends_on=steps(CHILD_HEALTH_FORM_STEPS + ('_create_df_indices',))
+        ),
+        AggregationStep('_agg_child_health_table', depends_on=['_child_health_monthly_table']),
+        AggregationStep('_ccs_record_monthly_table', depends_on=steps(CCS_RECORD_FORM_STEPS)),
+        AggregationStep('_agg_ccs_record_table', depends_on=['_ccs_record_monthly_table']),
+        AggregationStep(
+            'update_service_delivery_report',
+            depends_on=['_child_health_monthly_table', '_ccs_record_monthly_table']
+        ),
+        AggregationStep('_agg_awc_table', depends_on=steps([
+            '_daily_attendance_table',
+            '_update_months_table',
+            '_agg_child_health_table',
+            '_agg_ccs_record_table',
+            '_aggregate_awc_infra_forms',
+            '_agg_thr_table',
+            '_agg_adolescent_girls_registration_table',
+        ])),
+        AggregationStep('_agg_ls_table', depends_on=steps(LS_FORM_STEPS)),
+        AggregationStep('_drop_prev_ucr_tables', depends_on=MONTHLY_TABLE_STEPS),
+    ])
+
+
+MONTHLY_AGGREGATION_DAG = _monthly_aggregation_dag()
+BATCHED_MONTHLY_AGGREGATION_DAG = _monthly_aggregation_dag(batch_state_forms=True)
+
 
 @serial_task('{date}', timeout=36 * 60 * 60, queue='icds_aggregation_queue')
-def move_ucr_data_into_aggregation_tables(date=None, intervals=2):
+def move_ucr_data_into_aggregation_tables(date=None, intervals=2, parallel_months=None, max_running_steps=None):
     start_time = datetime.now(pytz.utc)
     date = date or start_time.date()
     monthly_dates = _get_monthly_dates(date, intervals)
@@ -237,150 +444,108 @@ def move_ucr_data_into_aggregation_tables(date=None, intervals=2):
                      .filter(domain=DASHBOARD_DOMAIN, location_type__name='state')
                      .values_list('location_id', flat=True))
 
-        for monthly_date in monthly_dates:
-            TempPrevUCRTables().make_all_tables(monthly_date)
-            TempPrevIntermediateTables().make_all_tables(monthly_date)
-            TempInfraTables().make_all_tables(monthly_date)
-            calculation_date = monthly_date.strftime('%Y-%m-%d')
-            res_daily = icds_aggregation_task.delay(date=calculation_date, func_name='_daily_attendance_table')
-            res_daily.get(disable_sync_subtasks=False)
-
-            drop_gm_indices(monthly_date)
-            drop_df_indices(monthly_date)
-            stage_1_tasks = [
-                icds_state_aggregation_task.si(state_id=state_id, date=monthly_date, func_name='_aggregate_gm_forms')
-                for state_id in state_ids
-            ]
-            stage_1_tasks.extend([
-                icds_state_aggregation_task.si(
-                    state_id=state_id, date=monthly_date, func_name='_aggregate_df_forms')
-                for state_id in state_ids
-            ])
-            stage_1_tasks.extend([
-                icds_state_aggregation_task.si(state_id=state_id, date=monthly_date, func_name='_aggregate_cf_forms')
-                for state_id in state_ids
-            ])
-            stage_1_tasks.extend([
-                icds_state_aggregation_task.si(state_id=state_id, date=monthly_date, func_name='_aggregate_ccs_cf_forms')
-                for state_id in state_ids
-            ])
-            stage_1_tasks.extend([
-                icds_state_aggregation_task.si(state_id=state_id, date=monthly_date, func_name='_aggregate_child_health_thr_forms')
-                for state_id in state_ids
-            ])
-            stage_1_tasks.extend([
-                icds_state_aggregation_task.si(state_id=state_id, date=monthly_date, func_name='_aggregate_ccs_record_thr_forms')
-                for state_id in state_ids
-            ])
-            stage_1_tasks.extend([
-                icds_state_aggregation_task.si(
-                    state_id=state_id, date=monthly_date, func_name='_aggregate_child_health_pnc_forms'
-                ) for state_id in state_ids
-            ])
-            stage_1_tasks.extend([
-                icds_state_aggregation_task.si(
-                    state_id=state_id, date=monthly_date, func_name='_aggregate_ccs_record_pnc_forms'
-                ) for state_id in state_ids
-            ])
-            stage_1_tasks.extend([
-                icds_state_aggregation_task.si(
-                    state_id=state_id, date=monthly_date, func_name='_aggregate_delivery_forms'
-                ) for state_id in state_ids
-            ])
-            stage_1_tasks.extend([
-                icds_state_aggregation_task.si(
-                    state_id=state_id, date=monthly_date, func_name='_aggregate_bp_forms'
-                ) for state_id in state_ids
-            ])
-            stage_1_tasks.extend([
-                icds_state_aggregation_task.si(state_id=state_id, date=monthly_date, func_name='_aggregate_awc_infra_forms')
-                for state_id in state_ids
-            ])
-            stage_1_tasks.extend([
-                icds_state_aggregation_task.si(state_id=state_id, date=calculation_date, func_name='_agg_thr_table')
-                for state_id in state_ids
-            ])
-
-            stage_1_tasks.extend([
-                icds_state_aggregation_task.si(state_id=state_id, date=monthly_date,
-                                               func_name='_agg_adolescent_girls_registration_table')
-                for state_id in state_ids
-            ])
-
-            stage_1_tasks.extend([
-                icds_state_aggregation_task.si(state_id=state_id, date=monthly_date,
-                                               func_name='_agg_migration_table')
-                for state_id in state_ids
-            ])
-
-            stage_1_tasks.extend([
-                icds_state_aggregation_task.si(state_id=state_id, date=monthly_date,
-                                               func_name='_agg_availing_services_table')
-                for state_id in state_ids
-            ])
-
-            stage_1_tasks.append(icds_aggregation_task.si(date=calculation_date, func_name='_update_months_table'))
-
-            # https://github.com/celery/celery/issues/4274
-            stage_1_task_results = [stage_1_task.delay() for stage_1_task in stage_1_tasks]
-            for stage_1_task_result in stage_1_task_results:
-                stage_1_task_result.get(disable_sync_subtasks=False)
-
-            create_df_indices(monthly_date)
-            res_child = chain(
-                icds_state_aggregation_task.si(
-                    state_id=state_ids, date=calculation_date, func_name='_child_health_monthly_table'
-                ),
-                icds_aggregation_task.si(date=calculation_date, func_name='_agg_child_health_table')
-            ).apply_async()
-            res_ccs = chain(
-                icds_aggregation_task.si(date=calculation_date, func_name='_ccs_record_monthly_table'),
-                icds_aggregation_task.si(date=calculation_date, func_name='_agg_ccs_record_table'),
-            ).apply_async()
-
-            res_ccs.get(disable_sync_subtasks=False)
-            res_child.get(disable_sync_subtasks=False)
-
-            res_ls_tasks = list()
-            res_ls_tasks.extend([icds_state_aggregation_task.si(state_id=state_id, date=calculation_date,
-                                                                func_name='_agg_ls_awc_mgt_form')
-                                 for state_id in state_ids
-                                 ])
-            res_ls_tasks.extend([icds_state_aggregation_task.si(state_id=state_id, date=calculation_date,
-                                                                func_name='_agg_ls_vhnd_form')
-                                 for state_id in state_ids
-                                 ])
-            res_ls_tasks.extend([icds_state_aggregation_task.si(state_id=state_id, date=calculation_date,
-                                                                func_name='_agg_beneficiary_form')
-                                 for state_id in state_ids
-                                 ])
-
-            res_ls_tasks.append(icds_aggregation_task.si(date=calculation_date, func_name='_agg_ls_table'))
-
-            res_sdr = chain(icds_aggregation_task.si(date=calculation_date, func_name='update_service_delivery_report'),
-                            ).apply_async()
-
-            res_sdr.get(disable_sync_subtasks=False)
-
-            res_inactive_aww = chain(icds_aggregation_task.si(date=calculation_date, func_name='_aggregate_inactive_aww_agg'),).apply_async()
-
-            res_inactive_aww.get(disable_sync_subtasks=False)
-
-            res_awc = chain(icds_aggregation_task.si(date=calculation_date, func_name='_agg_awc_table'),
-                            *res_ls_tasks
-                            ).apply_async()
-
-            res_awc.get(disable_sync_subtasks=False)
+        incremental = ICDS_INCREMENTAL_AGGREGATION.enabled(DASHBOARD_DOMAIN)
+        ucr_watermarks = get_ucr_watermarks(monthly_dates) if incremental else None
+        incremental_plans = {
+            monthly_date: IncrementalAggregationPlan(monthly_date, ucr_watermarks)
+            for monthly_date in monthly_dates
+        } if incremental else {}
+
+        if parallel_months is None:
+            parallel_months = ICDS_PARALLEL_MONTH_AGGREGATION.enabled(DASHBOARD_DOMAIN)
+        if ICDS_BATCHED_STATE_AGGREGATION.enabled(DASHBOARD_DOMAIN):
+            monthly_dag = BATCHED_MONTHLY_AGGREGATION_DAG
+        else:
+            monthly_dag = MONTHLY_AGGREGATION_DAG
+        dag_run = AggregationDAGRun(
+            monthly_dag.for_months(monthly_dates, pipelined=parallel_months),
+            state_ids,
+            functools.partial(
+                _submit_aggregation_step,
+                state_ids=state_ids,
+                incremental_plans=incremental_plans
+            ),
+            max_running=max_running_steps
+        )
+        critical_path = dag_run.run()
+        aggregated_months = ', '.join(monthly_date.strftime('%Y-%m-%d') for monthly_date in monthly_dates)
+        celery_task_logger.info("Aggregation critical path for {}: {}".format(
+            aggregated_months, format_critical_path(critical_path)
+        ))
+        critical_paths = {aggregated_months: critical_path}
+        skipped_steps = {
+            monthly_date.strftime('%Y-%m-%d'): dict(incremental_plan.skipped)
+            for monthly_date, incremental_plan in incremental_plans.items()
+        }
 
+        for monthly_date in monthly_dates:
             first_of_month_string = monthly_date.strftime('%Y-%m-01')
             for state_id in state_ids:
                 create_mbt_for_month.delay(state_id, first_of_month_string)
         chain(
             icds_aggregation_task.si(date=date.strftime('%Y-%m-%d'), func_name='aggregate_awc_daily'),
-            email_dashboad_team.si(aggregation_date=date.strftime('%Y-%m-%d'), aggregation_start_time=start_time)
+            email_dashboad_team.si(
+                aggregation_date=date.strftime('%Y-%m-%d'),
+                aggregation_start_time=start_time,
+                critical_paths=critical_paths,
+                skipped_steps=skipped_steps
+            ),
+            precompute_dashboard_results.si(
+                months=[monthly_date.strftime('%Y-%m-01') for monthly_date in monthly_dates]
+            ),
+            # bumped once the materialized results are rewritten, or the results of the
+            # previous aggregation would be cached under the new generation
+            bump_dashboard_data_generation.si(
+                months=[monthly_date.strftime('%Y-%m-01') for monthly_date in monthly_dates],
+                state_ids=state_ids
+            ),
+            warm_up_dashboard_cache.si(
+                months=[monthly_date.strftime('%Y-%m-01') for monthly_date in monthly_dates]
+            )
         ).delay()
 
 
+def _submit_aggregation_step(step, state_id, state_ids, incremental_plans):
+    monthly_date = step.month
+    calculation_date = monthly_date.strftime('%Y-%m-%d')
+    if step.func_name == STATE_FORM_BATCH_STEP:
+        return _submit_state_form_batch(state_id, monthly_date, incremental_plans.get(monthly_date))
+    elif step.by_state == SINGLE_STATE:
+        ucr_watermarks = None
+        incremental_plan = incremental_plans.get(monthly_date)
+        if incremental_plan:
+            if incremental_plan.should_skip(step.func_name, state_id):
+                return SkippedPartitionResult()
+            ucr_watermarks = incremental_plan.watermarks_for(step.func_name, state_id)
+        return icds_state_aggregation_task.delay(
+            state_id=state_id, date=monthly_date, func_name=step.func_name, ucr_watermarks=ucr_watermarks
+        )
+    elif step.by_state == ALL_STATES:
+        return icds_state_aggregation_task.delay(
+            state_id=state_ids, date=calculation_date, func_name=step.func_name
+        )
+    return icds_aggregation_task.delay(date=calculation_date, func_name=step.func_name)
+
+
+def _submit_state_form_batch(state_id, monthly_date, incremental_plan=None):
+    func_names = list(STATE_FORM_BATCH)
+    ucr_watermarks = None
+    if incremental_plan:
+        func_names = [
+            func_name for func_name in func_names
+            if not incremental_plan.should_skip(func_name, state_id)
+        ]
+        if not func_names:
+            return SkippedPartitionResult()
+        ucr_watermarks = {
+            func_name: incremental_plan.watermarks_for(func_name, state_id)
+            for func_name in func_names
+        }
+    return icds_state_form_batch_task.delay(
+        state_id=state_id, date=monthly_date, func_names=func_names, ucr_watermarks=ucr_watermarks
+    )
+
+
 def _get_monthly_dates(start_date, total_intervals):
     """
     Gets a list of dates for the aggregation. Which all take the form of the last of the month.
@@ -418,11 +583,11 @@ def _create_aggregate_functions(cursor):
         raise
 
 
-def update_aggregate_locations_tables():
+def update_aggregate_locations_tables(full_rebuild=False):
     try:
         celery_task_logger.info("Starting icds reports update_location_tables")
         with transaction.atomic(using=router.db_for_write(AwcLocation)):
-            AwcLocation.aggregate()
+            AwcLocation.aggregate(full_rebuild=full_rebuild)
         celery_task_logger.info("Ended icds reports update_location_tables_sql")
     except IntegrityError:
         # This has occurred when there's a location upload, but not all locations were updated.
@@ -450,7 +615,10 @@ def icds_aggregation_task(self, date, func_name):
         '_agg_awc_table': _agg_awc_table,
         'aggregate_awc_daily': aggregate_awc_daily,
         'update_service_delivery_report': update_service_delivery_report,
-        '_aggregate_inactive_aww_agg': _aggregate_inactive_aww_agg
+        '_aggregate_inactive_aww_agg': _aggregate_inactive_aww_agg,
+        '_create_df_indices': _create_df_indices,
+        '_setup_monthly_tables': _setup_monthly_tables,
+        '_drop_prev_ucr_tables': _drop_prev_ucr_tables,
     }[func_name]
 
     db_alias = get_icds_ucr_citus_db_alias()
@@ -477,7 +645,7 @@ def icds_aggregation_task(self, date, func_name):
 
 
 @task(serializer='pickle', queue='icds_aggregation_queue', bind=True, default_retry_delay=15 * 60, acks_late=True)
-def icds_state_aggregation_task(self, state_id, date, func_name):
+def icds_state_aggregation_task(self, state_id, date, func_name, ucr_watermarks=None):
     func = {
         '_aggregate_gm_forms': _aggregate_gm_forms,
         '_aggregate_cf_forms': _aggregate_cf_forms,
@@ -521,9 +689,64 @@ def icds_state_aggregation_task(self, state_id, date, func_name):
         )
         self.retry(exc=exc)
 
+    if ucr_watermarks is not None:
+        UcrAggregationWatermark.record(
+            func_name, state_id, transform_day_to_month(force_to_date(date)), ucr_watermarks
+        )
+
     celery_task_logger.info("Ended icds reports {} {} {}".format(state_id, date, func.__name__))
 
 
+@task(serializer='pickle', queue='icds_aggregation_queue', bind=True, default_retry_delay=15 * 60, acks_late=True)
+def icds_state_form_batch_task(self, state_id, date, func_names, ucr_watermarks=None):
+    """Runs several form aggregation helpers for a state on one connection and in one
+    transaction. Only the helpers that failed are retried.
+    """
+    db_alias = get_icds_ucr_citus_db_alias()
+    if not db_alias:
+        return
+
+    celery_task_logger.info("Starting icds reports {} {} {}".format(state_id, date, ', '.join(func_names)))
+    failures = _aggregate_state_forms(state_id, date, func_names)
+
+    for func_name, exc in failures.items():
+        notify_exception(
+            None, message="Error occurred during ICDS aggregation",
+            details={'func': func_name, 'date': date, 'state_id': state_id, 'error': exc}
+        )
+        _dashboard_team_soft_assert(
+            False,
+            "{} aggregation failed on {} for {} on {}. This task will be retried in 15 minutes".format(
+                func_name, settings.SERVER_ENVIRONMENT, state_id, date
+            )
+        )
+
+    if ucr_watermarks is not None:
+        month = transform_day_to_month(force_to_date(date))
+        for func_name in func_names:
+            if func_name not in failures:
+                UcrAggregationWatermark.record(func_name, state_id, month, ucr_watermarks[func_name])
+
+    if failures:
+        self.retry(exc=list(failures.values())[0], kwargs={
+            'state_id': state_id,
+            'date': date,
+            'func_names': list(failures),
+            'ucr_watermarks': ucr_watermarks,
+        })
+
+    celery_task_logger.info("Ended icds reports {} {} {}".format(state_id, date, ', '.join(func_names)))
+
+
+@track_time
+def _aggregate_state_forms(state_id, day, func_names):
+    return aggregate_state_helpers(
+        [(func_name, STATE_FORM_BATCH[func_name]) for func_name in func_names],
+        state_id,
+        force_to_date(day)
+    )
+
+
 @track_time
 def _aggregate_cf_forms(state_id, day):
     AggregateComplementaryFeedingForms.aggregate(state_id, day)
@@ -670,7 +893,13 @@ def update_child_health_monthly_table(day, state_ids):
 @task(serializer='pickle', queue='icds_aggregation_queue', default_retry_delay=15 * 60, acks_late=True)
 @track_time
 def _child_health_helper(queries):
-    with get_cursor(ChildHealthMonthly) as cursor:
+    _, first_params = queries[0]
+    with get_cursor(ChildHealthMonthly) as cursor, profile_aggregation(
+        cursor,
+        ChildHealthMonthlyAggregationDistributedHelper.helper_key,
+        first_params['start_date'],
+        first_params['state_id']
+    ) as cursor:
         for query, params in queries:
             celery_task_logger.info("Running child_health_helper with %s", params)
             cursor.execute(query, params)
@@ -779,7 +1008,7 @@ def _agg_availing_services_table(state_id, day):
 
 
 @task(serializer='pickle', queue='icds_aggregation_queue')
-def email_dashboad_team(aggregation_date, aggregation_start_time):
+def email_dashboad_team(aggregation_date, aggregation_start_time, critical_paths=None, skipped_steps=None):
     aggregation_start_time = aggregation_start_time.astimezone(INDIA_TIMEZONE)
     aggregation_finish_time = datetime.now(INDIA_TIMEZONE)
 
@@ -788,6 +1017,21 @@ def email_dashboad_team(aggregation_date, aggregation_start_time):
         citus = 'Citus '
         timings = "Aggregation Started At : {} IST, Completed At : {} IST".format(aggregation_start_time,
                                                                                   aggregation_finish_time)
+        for month, critical_path in (critical_paths or {}).items():
+            timings += "\nCritical path for {} : {}".format(month, format_critical_path(critical_path))
+        for month, skipped in (skipped_steps or {}).items():
+            for func_name, skipped_state_ids in skipped.items():
+                timings += "\nSkipped unchanged {} for {} : {} states".format(
+                    func_name, month, len(skipped_state_ids)
+                )
+        if ICDS_AGGREGATION_PROFILING.enabled(DASHBOARD_DOMAIN):
+            for helper in get_helper_durations(aggregation_start_time):
+                timings += "\nTotal query time of {} : {:.0f}s".format(
+                    helper['helper_key'], helper['total_duration']
+                )
+            for query in get_slowest_queries(aggregation_start_time):
+                timings += "\nSlow query {query_index} of {helper_key} for {month} and state {state_id} : " \
+                           "{duration:.0f}s, {rows_affected} rows".format(**query)
         _dashboard_team_soft_assert(False, "{}Aggregation completed on {}".format(citus,
                                                                                   settings.SERVER_ENVIRONMENT),
                                     timings)
@@ -795,6 +1039,75 @@ def email_dashboad_team(aggregation_date, aggregation_start_time):
     icds_data_validation.delay(aggregation_date)
 
 
+@task(serializer='pickle', queue='icds_aggregation_queue', acks_late=True)
+def bump_dashboard_data_generation(months, state_ids):
+    """Invalidates the cached dashboard results of the aggregated months and states"""
+    bump_data_generation([force_to_date(month) for month in months], state_ids)
+
+
+def _bump_data_generation_for_all_states(months):
+    state_ids = list(SQLLocation.objects
+                     .filter(domain=DASHBOARD_DOMAIN, location_type__name='state')
+                     .values_list('location_id', flat=True))
+    bump_data_generation(months, state_ids)
+
+
+def bump_aggregated_data_generation(agg_date):
+    """Invalidates the cached dashboard results of the month aggregated by airflow"""
+    _bump_data_generation_for_all_states([transform_day_to_month(force_to_date(agg_date))])
+
+
+@task(serializer='pickle', queue='icds_aggregation_queue', acks_late=True)
+def precompute_dashboard_results(months):
+    """Stores the map, sector and chart results of the dashboard indicators for the
+    national, state and district levels so that the views do not have to query the
+    aggregate tables for the default filters.
+    """
+    if not ICDS_MATERIALIZED_DASHBOARD_RESULTS.enabled(DASHBOARD_DOMAIN):
+        return
+
+    # importing the views registers every function decorated with materialized_result
+    import custom.icds_reports.views  # noqa: F401
+
+    location_ids = (SQLLocation.objects
+                    .filter(domain=DASHBOARD_DOMAIN, location_type__name__in=['state', 'district'])
+                    .values_list('location_id', flat=True))
+    locations = [(None, {})] + [
+        (location_id, get_location_filter(location_id, DASHBOARD_DOMAIN))
+        for location_id in location_ids
+    ]
+    for month in months:
+        start = time.time()
+        stored, failed = precompute_results(DASHBOARD_DOMAIN, force_to_date(month), locations)
+        celery_task_logger.info("Precomputed {} dashboard results for {} in {:.0f}s, {} failed".format(
+            stored, month, time.time() - start, failed
+        ))
+
+
+@task(serializer='pickle', queue='icds_aggregation_queue', acks_late=True)
+def warm_up_dashboard_cache(months, limit=500, concurrency=10):
+    """Loads the most requested dashboard data of the months in the cache so that the
+    first users after the aggregation do not wait for the queries.
+    """
+    if not ICDS_DASHBOARD_CACHE_WARMUP.enabled(DASHBOARD_DOMAIN):
+        return
+
+    # importing the views registers every function decorated with warm_up_candidate
+    import custom.icds_reports.views  # noqa: F401
+
+    report = warm_up_cache([force_to_date(month) for month in months], limit, concurrency)
+    celery_task_logger.info(
+        "Warmed up {calls} dashboard cache entries in {duration:.0f}s, {failed} failed, "
+        "covering {coverage:.0%} of the recorded requests".format(**report)
+    )
+    for duration, hot_call in report['slowest']:
+        celery_task_logger.info("Slow cache warm up ({:.0f}s): {}".format(duration, hot_call))
+    metrics_gauge('commcare.icds.dashboard_cache_warmup.coverage', report['coverage'],
+                  documentation="Share of the recorded dashboard requests loaded in the cache after aggregation")
+    metrics_gauge('commcare.icds.dashboard_cache_warmup.duration', report['duration'],
+                  documentation="Time taken to load the most requested dashboard data in the cache")
+
+
 @periodic_task_on_envs(
     settings.ICDS_ENVS,
     queue='background_queue',
@@ -870,14 +1183,26 @@ def _find_stagnant_cases(adapter, latest_datetime):
 @task(serializer='pickle', queue='icds_dashboard_reports_queue')
 def prepare_excel_reports(config, aggregation_level, include_test, beta, location, domain,
                           file_format, indicator):
+    # the rows of these exports are written to the file while they are read from the database
+    streaming = (
+        indicator in STREAMING_EXPORTS
+        and file_format in STREAMING_EXPORT_FORMATS
+        and ICDS_STREAMING_EXPORTS.enabled(domain)
+    )
+
     if indicator == CHILDREN_EXPORT:
         data_type = 'Children'
-        excel_data = ChildrenExport(
+        export = ChildrenExport(
             config=config,
             loc_level=aggregation_level,
             show_test=include_test,
             beta=beta
-        ).get_excel_data(location)
+        )
+        # the formatted xlsx export needs all the rows to lay out the merged headers
+        if streaming and file_format != 'xlsx':
+            excel_data = export.get_streaming_excel_data(location)
+        else:
+            excel_data = export.get_excel_data(location)
 
         if file_format == 'xlsx':
             cache_key = create_child_report_excel_file(
@@ -887,33 +1212,43 @@ def prepare_excel_reports(config, aggregation_level, include_test, beta, locatio
                 aggregation_level,
                 beta=beta
             )
+        elif streaming:
+            cache_key = create_streaming_excel_file(excel_data, data_type, file_format)
         else:
             cache_key = create_excel_file(excel_data, data_type, file_format)
 
     elif indicator == PREGNANT_WOMEN_EXPORT:
         data_type = 'Pregnant_Women'
-        excel_data = PregnantWomenExport(
+        export = PregnantWomenExport(
             config=config,
             loc_level=aggregation_level,
             show_test=include_test,
             beta=beta
-        ).get_excel_data(location)
+        )
+        excel_data = (
+            export.get_streaming_excel_data(location) if streaming else export.get_excel_data(location)
+        )
     elif indicator == DEMOGRAPHICS_EXPORT:
         data_type = 'Demographics'
-        excel_data = DemographicsExport(
+        export = DemographicsExport(
             config=config,
             loc_level=aggregation_level,
             show_test=include_test,
             beta=beta
-        ).get_excel_data(location)
+        )
+        excel_data = (
+            export.get_streaming_excel_data(location) if streaming else export.get_excel_data(location)
+        )
     elif indicator == SYSTEM_USAGE_EXPORT:
         data_type = 'System_Usage'
-        excel_data = SystemUsageExport(
+        export = SystemUsageExport(
             config=config,
             loc_level=aggregation_level,
             show_test=include_test,
             beta=beta
-        ).get_excel_data(
+        )
+        get_excel_data = export.get_streaming_excel_data if streaming else export.get_excel_data
+        excel_data = get_excel_data(
             location,
             system_usage_num_launched_awcs_formatting_at_awc_level=aggregation_level > 4 and beta,
             system_usage_num_of_days_awc_was_open_formatting=aggregation_level <= 4 and beta,
@@ -921,12 +1256,15 @@ def prepare_excel_reports(config, aggregation_level, include_test, beta, locatio
         )
     elif indicator == AWC_INFRASTRUCTURE_EXPORT:
         data_type = 'AWC_Infrastructure'
-        excel_data = AWCInfrastructureExport(
+        export = AWCInfrastructureExport(
             config=config,
             loc_level=aggregation_level,
             show_test=include_test,
             beta=beta,
-        ).get_excel_data(location)
+        )
+        excel_data = (
+            export.get_streaming_excel_data(location) if streaming else export.get_excel_data(location)
+        )
     elif indicator == GROWTH_MONITORING_LIST_EXPORT:
         # this report doesn't use this configuration
         config.pop('aggregation_level', None)
@@ -1105,7 +1443,9 @@ def prepare_excel_reports(config, aggregation_level, include_test, beta, locatio
     if indicator not in (AWW_INCENTIVE_REPORT, LS_REPORT_EXPORT, THR_REPORT_EXPORT, CHILDREN_EXPORT,
                          DASHBOARD_USAGE_EXPORT, SERVICE_DELIVERY_REPORT, CHILD_GROWTH_TRACKER_REPORT,
                          AWW_ACTIVITY_REPORT, POSHAN_PROGRESS_REPORT):
-        if file_format == 'xlsx' and beta:
+        if streaming:
+            cache_key = create_streaming_excel_file(excel_data, data_type, file_format)
+        elif file_format == 'xlsx' and beta:
             cache_key = create_excel_file_in_openpyxl(excel_data, data_type)
         else:
             cache_key = create_excel_file(excel_data, data_type, file_format)
@@ -1124,16 +1464,14 @@ def prepare_excel_reports(config, aggregation_level, include_test, beta, locatio
     }
 
 
-@task(serializer='pickle', queue='icds_dashboard_reports_queue')
-def prepare_issnip_monthly_register_reports(domain, awcs, pdf_format, month, year, couch_user):
+@task(serializer='pickle', queue='icds_dashboard_reports_queue', bind=True)
+def prepare_issnip_monthly_register_reports(self, domain, awcs, pdf_format, month, year, couch_user):
     selected_date = date(year, month, 1)
     report_context = {
         'reports': [],
         'user_have_access_to_features': icds_pre_release_features(couch_user),
     }
 
-    pdf_files = {}
-
     report_data = ISSNIPMonthlyReport(config={
         'awc_id': awcs,
         'month': selected_date,
@@ -1144,13 +1482,19 @@ def prepare_issnip_monthly_register_reports(domain, awcs, pdf_format, month, yea
         report_context['reports'] = report_data
         cache_key = create_pdf_file(report_context)
     else:
+        pdf_pages = []
         for data in report_data:
             report_context['reports'] = [data]
-            pdf_hash = create_pdf_file(report_context)
-            pdf_files.update({
-                pdf_hash: data['awc_name']
-            })
-        cache_key = zip_folder(pdf_files)
+            pdf_pages.append(render_pdf_page(report_context))
+        file_names = [
+            'ICDS_CAS_monthly_register_{}.pdf'.format(data['awc_name'])
+            for data in report_data
+        ]
+
+        def _update_progress(done):
+            self.update_state(state='PROGRESS', meta={'done': done, 'total': len(pdf_pages)})
+
+        cache_key = create_pdf_zip_file(zip(file_names, iter_pdfs(pdf_pages)), _update_progress)
 
     params = {
         'domain': domain,
@@ -1723,6 +2067,7 @@ def create_mbt_for_month(state_id, month):
             )
             icds_file.store_file_in_blobdb(f, expired=THREE_MONTHS)
             icds_file.save()
+            store_cas_data_export_partitions(f, helper.base_tablename, state_id, month, expired=THREE_MONTHS)
 
 
 def _dictfetchall(cursor):
@@ -1741,7 +2086,10 @@ def setup_aggregation(agg_date):
     if db_alias:
         with connections[db_alias].cursor() as cursor:
             _create_aggregate_functions(cursor)
-            TempPrevUCRTables().make_all_tables(force_to_date(agg_date))
+            prev_ucr_tables = TempPrevUCRTables()
+            # the airflow aggregation does not drop the tables of the month once it is aggregated
+            prev_ucr_tables.drop_old_tables(force_to_date(agg_date))
+            prev_ucr_tables.make_all_tables(force_to_date(agg_date))
 
 
 def _child_health_monthly_aggregation(day, state_ids):
@@ -1820,39 +2168,47 @@ def reconcile_data_not_in_ucr(reconciliation_status_pk):
     status_record = UcrReconciliationStatus.objects.get(pk=reconciliation_status_pk)
     num_docs_retried = 0
     num_docs_unporcessed = 0
+    num_docs_partially_processed = 0
+    # the changes are acknowledged once all of them are published
+    ucr_producer = ChangeProducer(auto_flush=False)
 
-    data_not_in_ucr = list(get_data_not_in_ucr(status_record))
-    doc_ids_not_in_ucr = {data[0] for data in data_not_in_ucr}
-    known_bad_doc_ids = set(
-        InvalidUCRData.objects.filter(doc_id__in=doc_ids_not_in_ucr).values_list('doc_id', flat=True))
+    # the docs missing from the UCR are handled a batch at a time
+    # so that a large backlog of errors is not kept in memory
+    try:
+        for data_not_in_ucr in chunked(get_data_not_in_ucr(status_record), UCR_REPUBLISH_BATCH_SIZE):
+            doc_ids_not_in_ucr = {data[0] for data in data_not_in_ucr}
+            known_bad_doc_ids = set(
+                InvalidUCRData.objects.filter(doc_id__in=doc_ids_not_in_ucr).values_list('doc_id', flat=True))
 
-    if status_record.is_form_ucr:
-        doc_ids_not_in_es = get_form_ids_missing_from_elasticsearch(doc_ids_not_in_ucr)
-    else:
-        doc_ids_not_in_es = get_case_ids_missing_from_elasticsearch(doc_ids_not_in_ucr)
-
-    # republish_kafka_changes
-    # running the data accessor again to avoid storing all doc ids in memory
-    # since run time is relatively short and does not scale with number of errors
-    # but the number of doc ids will increase with the number of errors
-    for doc_id, doc_subtype, sql_modified_on, inserted_at in data_not_in_ucr:
-        if doc_id in known_bad_doc_ids:
-            # These docs are invalid
-            continue
-        num_docs_retried += 1
-        found_in_es = doc_id not in doc_ids_not_in_es
-        if not inserted_at or sql_modified_on > inserted_at:
-            num_docs_unporcessed += 1
-            log = {
-                "doc_id": doc_id,
-                "modified_on": sql_modified_on.isoformat(),
-                "inserted_at": inserted_at.isoformat() if inserted_at else None,
-                "in_es": found_in_es,
-                "subtype": doc_subtype,
-            }
-            celery_task_logger.info("|" + json.dumps(log))
-
-        send_change_for_ucr_reprocessing(doc_id, doc_subtype, status_record.is_form_ucr)
+            if status_record.is_form_ucr:
+                doc_ids_not_in_es = get_form_ids_missing_from_elasticsearch(doc_ids_not_in_ucr)
+            else:
+                doc_ids_not_in_es = get_case_ids_missing_from_elasticsearch(doc_ids_not_in_ucr)
+            num_docs_partially_processed += len(doc_ids_not_in_ucr - set(doc_ids_not_in_es))
+
+            docs_to_republish = []
+            for doc_id, doc_subtype, sql_modified_on, inserted_at in data_not_in_ucr:
+                if doc_id in known_bad_doc_ids:
+                    # These docs are invalid
+                    continue
+                found_in_es = doc_id not in doc_ids_not_in_es
+                if not inserted_at or sql_modified_on > inserted_at:
+                    num_docs_unporcessed += 1
+                    log = {
+                        "doc_id": doc_id,
+                        "modified_on": sql_modified_on.isoformat(),
+                        "inserted_at": inserted_at.isoformat() if inserted_at else None,
+                        "in_es": found_in_es,
+                        "subtype": doc_subtype,
+                    }
+                    celery_task_logger.info("|" + json.dumps(log))
+                docs_to_republish.append((doc_id, doc_subtype))
+
+            send_changes_for_ucr_reprocessing(ucr_producer, docs_to_republish, status_record.is_form_ucr)
+            num_docs_retried += len(docs_to_republish)
+    finally:
+        ucr_producer.flush()
+        ucr_producer.producer.close()
 
     metrics_counter(
         "commcare.icds.ucr_reconciliation.published_change_count",
@@ -1868,7 +2224,7 @@ def reconcile_data_not_in_ucr(reconciliation_status_pk):
     )
     metrics_counter(
         "commcare.icds.ucr_reconciliation.partially_processed_count",
-        len(set(doc_ids_not_in_ucr) - set(doc_ids_not_in_es)),
+        num_docs_partially_processed,
         tags={'config_id': status_record.table_id, 'doc_type': status_record.doc_type},
         documentation="Number of docs that exists in Elasticsearch but are not found in UCR"
     )
@@ -1881,22 +2237,42 @@ def reconcile_data_not_in_ucr(reconciliation_status_pk):
     return num_docs_retried
 
 
+def _get_change_meta_for_ucr_reprocessing(doc_id, doc_subtype, is_form):
+    return ChangeMeta(
+        document_id=doc_id,
+        data_source_type=data_sources.SOURCE_SQL,
+        data_source_name=data_sources.FORM_SQL if is_form else data_sources.CASE_SQL,
+        document_type='XFormInstance' if is_form else 'CommCareCase',
+        document_subtype=doc_subtype,
+        domain=DASHBOARD_DOMAIN,
+        is_deletion=False,
+    )
+
+
 def send_change_for_ucr_reprocessing(doc_id, doc_subtype, is_form):
     producer.send_change(
         topics.FORM_SQL if is_form else topics.CASE_SQL,
-        ChangeMeta(
-            document_id=doc_id,
-            data_source_type=data_sources.SOURCE_SQL,
-            data_source_name=data_sources.FORM_SQL if is_form else data_sources.CASE_SQL,
-            document_type='XFormInstance' if is_form else 'CommCareCase',
-            document_subtype=doc_subtype,
-            domain=DASHBOARD_DOMAIN,
-            is_deletion=False,
-        )
+        _get_change_meta_for_ucr_reprocessing(doc_id, doc_subtype, is_form)
     )
 
 
+def send_changes_for_ucr_reprocessing(change_producer, docs, is_form):
+    """Publishes the changes of [(doc_id, doc_subtype)] with a producer that does not
+    wait for each of them to be acknowledged. The caller flushes the producer.
+    """
+    topic = topics.FORM_SQL if is_form else topics.CASE_SQL
+    for doc_id, doc_subtype in docs:
+        change_producer.send_change(topic, _get_change_meta_for_ucr_reprocessing(doc_id, doc_subtype, is_form))
+
+
 def get_data_not_in_ucr(status_record):
+    """Yields (doc_id, doc_subtype, sql_modified_on, inserted_at) of the docs of the
+    day that are missing from the UCR or were not updated in it since they were modified.
+
+    The primary rows are compared with the UCR a chunk at a time. Both sides count the
+    docs of each hashed doc id bucket of the chunk and sum a hash of their doc id and
+    modified_on, and the UCR rows are only fetched for the buckets that do not match.
+    """
     domain = DASHBOARD_DOMAIN
     if status_record.is_form_ucr:
         matching_records_for_db = _get_primary_data_for_forms(
@@ -1906,18 +2282,91 @@ def get_data_not_in_ucr(status_record):
         matching_records_for_db = _get_primary_data_for_cases(
             status_record.db_alias, domain, status_record.day, status_record.doc_type_filter
         )
-    chunk_size = 1000
-    for chunk in chunked(matching_records_for_db, chunk_size):
-        doc_ids = [val[0] for val in chunk]
-        doc_id_and_inserted_in_ucr = _get_docs_in_ucr(domain, status_record.table_id, doc_ids)
-        for doc_id, doc_subtype, sql_modified_on in chunk:
-            if doc_id in doc_id_and_inserted_in_ucr:
-                # This is to handle the cases which are outdated. This condition also handles the time drift of 2 sec
-                # between main db and ucr db. i.e  doc will even be included when inserted_at-sql_modified_on < 2 sec
-                if sql_modified_on - doc_id_and_inserted_in_ucr[doc_id] > timedelta(seconds=-2):
-                    yield (doc_id, doc_subtype, sql_modified_on, doc_id_and_inserted_in_ucr[doc_id])
-            else:
-                yield (doc_id, doc_subtype, sql_modified_on, None)
+    for chunk in chunked(matching_records_for_db.iterator(), UCR_RECONCILIATION_CHUNK_SIZE):
+        yield from _get_chunk_data_not_in_ucr(domain, status_record.table_id, chunk)
+
+
+def _get_chunk_data_not_in_ucr(domain, table_id, chunk):
+    if table_id in UCR_TABLES_WITH_CASE_MODIFIED_ON:
+        modified_on_column = 'modified_on'
+    elif table_id in UCR_MAPPING[UcrReconciliationStatus.XFormInstance]:
+        # forms are not modified after they are received
+        modified_on_column = None
+    else:
+        # without the modified_on of the case the UCR can only be checked doc by doc
+        yield from _get_records_not_in_ucr(domain, table_id, chunk)
+        return
+
+    records_by_bucket = defaultdict(list)
+    for record in chunk:
+        records_by_bucket[get_doc_id_bucket(record[0])].append(record)
+    ucr_aggregates = _get_bucket_aggregates_in_ucr(
+        domain, table_id, [record[0] for record in chunk], modified_on_column
+    )
+    mismatching_records = [
+        record
+        for bucket, records in records_by_bucket.items()
+        if ucr_aggregates.get(bucket) != _get_bucket_aggregate(records, modified_on_column)
+        for record in records
+    ]
+    if mismatching_records:
+        yield from _get_records_not_in_ucr(domain, table_id, mismatching_records)
+
+
+def _get_records_not_in_ucr(domain, table_id, records):
+    doc_id_and_inserted_in_ucr = _get_docs_in_ucr(domain, table_id, [record[0] for record in records])
+    for doc_id, doc_subtype, sql_modified_on, *_ in records:
+        if doc_id in doc_id_and_inserted_in_ucr:
+            # This is to handle the cases which are outdated. This condition also handles the time drift of 2 sec
+            # between main db and ucr db. i.e  doc will even be included when inserted_at-sql_modified_on < 2 sec
+            if sql_modified_on - doc_id_and_inserted_in_ucr[doc_id] > timedelta(seconds=-2):
+                yield (doc_id, doc_subtype, sql_modified_on, doc_id_and_inserted_in_ucr[doc_id])
+        else:
+            yield (doc_id, doc_subtype, sql_modified_on, None)
+
+
+def get_doc_id_bucket(doc_id):
+    # same as get_byte(decode(md5(doc_id), 'hex'), 0) in postgres
+    return hashlib.md5(doc_id.encode('utf-8')).digest()[0]
+
+
+def _get_doc_hash(doc_id, modified_on):
+    # same as ('x' || substr(md5(doc_id || '|' || modified_on), 1, 15))::bit(60)::bigint in postgres
+    key = doc_id if modified_on is None else '{}|{}'.format(doc_id, modified_on)
+    return int(hashlib.md5(key.encode('utf-8')).hexdigest()[:15], 16)
+
+
+def _get_bucket_aggregate(records, modified_on_column):
+    """Returns the doc count and hash sum of the primary `records` of a bucket"""
+    if modified_on_column:
+        hashes = [
+            _get_doc_hash(record[0], record[3].strftime('%Y%m%d%H%M%S%f') if record[3] else '')
+            for record in records
+        ]
+    else:
+        hashes = [_get_doc_hash(record[0], None) for record in records]
+    return len(records), sum(hashes)
+
+
+def _get_bucket_aggregates_in_ucr(domain, table_id, doc_ids, modified_on_column):
+    """Returns the doc count and hash sum of the docs of `doc_ids` in the UCR by doc id bucket"""
+    table_name = get_table_name(domain, table_id)
+    if modified_on_column:
+        hash_key = f"""doc_id || '|' || COALESCE(to_char("{modified_on_column}", 'YYYYMMDDHH24MISSUS'), '')"""
+    else:
+        hash_key = 'doc_id'
+    with connections[get_icds_ucr_citus_db_alias()].cursor() as cursor:
+        query = f'''
+            SELECT
+                get_byte(decode(md5(doc_id), 'hex'), 0),
+                COUNT(DISTINCT doc_id),
+                SUM(DISTINCT ('x' || substr(md5({hash_key}), 1, 15))::bit(60)::bigint)
+            FROM "{table_name}"
+            WHERE doc_id = ANY(%(doc_ids)s)
+            GROUP BY 1;
+        '''
+        cursor.execute(query, {'doc_ids': doc_ids})
+        return {bucket: (count, hash_sum) for bucket, count, hash_sum in cursor.fetchall()}
 
 
 def _get_docs_in_ucr(domain, table_id, doc_ids):
@@ -1952,7 +2401,7 @@ def _get_primary_data_for_cases(db, domain, day, case_type):
         server_modified_on__lte=end_date,
         type=case_type
     )
-    return matching_cases.values_list('case_id', 'type', 'server_modified_on')
+    return matching_cases.values_list('case_id', 'type', 'server_modified_on', 'modified_on')
 
 
 @periodic_task_on_envs(
@@ -1967,13 +2416,16 @@ def update_dashboard_activity_report(target_date=None):
     db_alias = router.db_for_write(DashboardUserActivityReport)
     with transaction.atomic(using=db_alias):
         DashboardUserActivityReport().aggregate(target_date)
+    _bump_data_generation_for_all_states([transform_day_to_month(force_to_date(target_date))])
 
 
 def drop_gm_indices(agg_date):
     helper = GrowthMonitoringFormsAggregationDistributedHelper(None, agg_date)
-    with get_cursor(AggregateGrowthMonitoringForms) as cursor:
-        for query, params in helper.delete_queries():
-            cursor.execute(query, params)
+    # with incremental aggregation each state deletes its own data when it is re-aggregated
+    if not ICDS_INCREMENTAL_AGGREGATION.enabled(DASHBOARD_DOMAIN):
+        with get_cursor(AggregateGrowthMonitoringForms) as cursor:
+            for query, params in helper.delete_queries():
+                cursor.execute(query, params)
     helper.create_temporary_prev_table('static-child_health_cases')
 
 
@@ -1984,7 +2436,28 @@ def create_df_indices(agg_date):
             cursor.execute(query)
 
 
+def _create_df_indices(day):
+    create_df_indices(force_to_date(day))
+
+
+def _setup_monthly_tables(day):
+    monthly_date = force_to_date(day)
+    TempPrevUCRTables().make_all_tables(monthly_date)
+    TempPrevIntermediateTables().make_all_tables(monthly_date)
+    TempInfraTables().make_all_tables(monthly_date)
+    drop_gm_indices(monthly_date)
+    drop_df_indices(monthly_date)
+
+
+def _drop_prev_ucr_tables(day):
+    TempPrevUCRTables().drop_all_tables(force_to_date(day))
+
+
 def drop_df_indices(agg_date):
+    # with incremental aggregation each state deletes its own data when it is re-aggregated
+    if ICDS_INCREMENTAL_AGGREGATION.enabled(DASHBOARD_DOMAIN):
+        return
+
     helper = DailyFeedingFormsChildHealthAggregationDistributedHelper(None, agg_date)
     with get_cursor(AggregateChildHealthDailyFeedingForms) as cursor:
         for query, params in helper.delete_queries():
@@ -2049,6 +2522,7 @@ def _agg_governance_dashboard(current_month):
         db_alias = router.db_for_write(AggGovernanceDashboard)
         with transaction.atomic(using=db_alias):
             AggGovernanceDashboard().aggregate(month)
+    _bump_data_generation_for_all_states([previous_month, current_month])
 
 
 def update_service_delivery_report(target_date):
@@ -2064,6 +2538,7 @@ def update_bihar_api_table(target_date):
 @task(queue='icds_aggregation_queue', serializer='pickle')
 def _agg_bihar_api_demographics(target_date):
     BiharAPIDemographics.aggregate(target_date)
+    _bump_data_generation_for_all_states([transform_day_to_month(force_to_date(target_date))])
 
 
 def update_child_vaccine_table(target_date):
@@ -1,6 +1,6 @@
 import os
 import re
-from datetime import date, datetime, time
+from datetime import date, datetime, time, timedelta
 from decimal import Decimal
 
 from django.test.testcases import TestCase, override_settings
@@ -14,17 +14,23 @@ from corehq.sql_db.connections import (
     ICDS_UCR_CITUS_ENGINE_ID,
     connection_manager,
 )
+from corehq.util.test_utils import flag_enabled
 from custom.icds_reports.models.aggregate import (
+    AggregateGrowthMonitoringForms,
     AggregateInactiveAWW,
     AwcLocation,
     get_cursor,
     maybe_atomic
 )
+from custom.icds_reports.tasks import _aggregate_gm_forms
 from custom.icds_reports.tests.agg_tests import OUTPUT_PATH, CSVTestCase
 from custom.icds_reports.utils.aggregation_helpers.distributed import (
     InactiveAwwsAggregationDistributedHelper,
     LocationAggregationDistributedHelper,
 )
+from custom.icds_reports.utils.aggregation_helpers.distributed.awc_location import (
+    _get_all_locations_for_domain,
+)
 
 
 @override_settings(SERVER_ENVIRONMENT='icds')
@@ -405,6 +411,25 @@ class DailyAttendanceAggregationTest(AggregationScriptTestBase):
 
 
 @override_settings(SERVER_ENVIRONMENT='icds')
+class GrowthMonitoringFormsAggregationTest(TestCase):
+
+    def _get_state_rows(self):
+        return list(AggregateGrowthMonitoringForms.objects.filter(
+            state_id='st1', month=date(2017, 3, 1)
+        ).order_by('case_id').values_list('case_id', 'latest_time_end_processed'))
+
+    @flag_enabled('ICDS_INCREMENTAL_AGGREGATION')
+    def test_reaggregate_state(self):
+        # the month is not deleted up front when only the changed states are re-aggregated
+        rows = self._get_state_rows()
+        self.assertNotEqual(rows, [])
+
+        _aggregate_gm_forms('st1', datetime(2017, 3, 31))
+        _aggregate_gm_forms('st1', datetime(2017, 3, 31))
+
+        self.assertEqual(self._get_state_rows(), rows)
+
+
 class InactiveAWWsTest(TestCase):
 
     @classmethod
@@ -543,6 +568,78 @@ class LocationAggregationTest(TestCase):
                 if 'allow this' not in str(e):
                     raise
 
+    def test_number_rows_csv_modified_since(self):
+        csv = self.helper.generate_csv(modified_since=datetime.utcnow() + timedelta(days=1))
+        self.assertEqual(len(csv.readlines()), 1)
+
+    def test_agg_modified_locations(self):
+        with maybe_atomic(AwcLocation):
+            try:
+                with maybe_atomic(AwcLocation):
+                    with get_cursor(AwcLocation) as cursor:
+                        cursor.execute("DELETE FROM awc_location")
+                        cursor.execute("DELETE FROM awc_location_local")
+                        self.helper.rebuild(cursor, list(_get_all_locations_for_domain(self.domain_name)))
+
+                        SQLLocation.objects.filter(domain=self.domain_name, name='Supervisor2').update(
+                            name='Supervisor3', last_modified=datetime.utcnow() + timedelta(days=1)
+                        )
+                        self.assertTrue(self.helper.aggregate_modified_locations(
+                            cursor,
+                            list(_get_all_locations_for_domain(self.domain_name)),
+                            datetime.utcnow() + timedelta(hours=2),
+                        ))
+
+                    self.assertEqual(AwcLocation.objects.count(), 8)
+                    self.assertEqual(
+                        list(AwcLocation.objects.filter(supervisor_name='Supervisor3').values_list(
+                            'aggregation_level', 'awc_name', 'supervisor_is_test'
+                        ).order_by('-aggregation_level')),
+                        [(5, 'Awc3', 1), (4, None, 1)]
+                    )
+                    self.assertEqual(AwcLocation.objects.filter(supervisor_name='Supervisor2').count(), 0)
+                    raise Exception("Don't allow this to be commited")
+            except Exception as e:
+                if 'allow this' not in str(e):
+                    raise
+
+    def test_agg_modified_locations_deleted_awc(self):
+        with maybe_atomic(AwcLocation):
+            try:
+                with maybe_atomic(AwcLocation):
+                    with get_cursor(AwcLocation) as cursor:
+                        cursor.execute("DELETE FROM awc_location")
+                        cursor.execute("DELETE FROM awc_location_local")
+                        self.helper.rebuild(cursor, list(_get_all_locations_for_domain(self.domain_name)))
+
+                        # the number of AWCs does not change
+                        SQLLocation.objects.get(domain=self.domain_name, name='Awc2').delete()
+                        SQLLocation.objects.create(
+                            domain=self.domain_name,
+                            name='Awc4',
+                            site_code='awc4',
+                            location_type=LocationType.objects.get(domain=self.domain_name, code='awc'),
+                            parent=SQLLocation.objects.get(domain=self.domain_name, name='Supervisor1'),
+                        )
+                        domain_locations = list(_get_all_locations_for_domain(self.domain_name))
+                        self.assertFalse(self.helper.aggregate_modified_locations(
+                            cursor, domain_locations, datetime.utcnow() - timedelta(hours=2)
+                        ))
+                        self.assertEqual(AwcLocation.objects.filter(awc_name='Awc2').count(), 1)
+
+                        self.helper.rebuild(cursor, domain_locations)
+
+                    self.assertEqual(
+                        list(AwcLocation.objects.filter(aggregation_level=5).values_list(
+                            'awc_name', flat=True
+                        ).order_by('awc_name')),
+                        ['Awc1', 'Awc3', 'Awc4']
+                    )
+                    raise Exception("Don't allow this to be commited")
+            except Exception as e:
+                if 'allow this' not in str(e):
+                    raise
+
     @property
     def _expected_end_state(self):
         return [
@@ -1,11 +1,12 @@
 import datetime
+import json
 
 from django.test import TestCase
 
 
 from custom.icds_reports.const import CAS_API_PAGE_SIZE
 from custom.icds_reports.reports.governance_apis import get_home_visit_data, get_state_names, get_vhnd_data,\
-    get_beneficiary_data, get_cbe_data
+    get_beneficiary_data, get_cbe_data, get_home_visit_query, get_total_count_for_query, iter_ndjson
 
 from custom.icds_reports.tasks import _agg_governance_dashboard
 from datetime import date
@@ -58,6 +59,34 @@ class GovernanceApiTest(TestCase):
         }
         self.assertEqual(data[0], expected_first_row)
 
+    def test_data_fetching_total_record_count_with_start_for_home_visit_api(self):
+        """
+        test to check the total of the month of the home visit api is the same for every page
+        """
+        limit = CAS_API_PAGE_SIZE
+        query_filters = {'aggregation_level': 5, 'awc_id__gt': 'a1'}
+        order = ['awc_id']
+        data, count = get_home_visit_data(limit,
+                                          2017, 5, order, query_filters)
+        total_count = get_total_count_for_query(
+            get_home_visit_query(2017, 5, order, query_filters), 2017, 5, query_filters
+        )
+        self.assertEqual(count, 54)
+        self.assertEqual(total_count, 55)
+        self.assertEqual(len(data), 54)
+
+    def test_data_streaming_for_home_visit_api(self):
+        """
+        test to check all the records of the month are streamed as newline delimited json
+        """
+        query_filters = {'aggregation_level': 5, 'awc_id__gt': 'a1'}
+        order = ['awc_id']
+        lines = list(iter_ndjson(get_home_visit_query(2017, 5, order, query_filters)))
+        self.assertEqual(len(lines), 54)
+        self.assertEqual(json.loads(lines[0]), {
+            'awc_id': 'a10', 'awc_code': 'a10', 'valid_visits': 0, 'expected_visits': 2
+        })
+
     def test_data_fetching_total_record_count_for_no_records_for_home_visit_api(self):
         """
         test to check the no records are returned from the home visit api
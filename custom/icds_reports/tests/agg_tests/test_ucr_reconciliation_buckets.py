@@ -0,0 +1,81 @@
+from datetime import datetime, timedelta
+
+from django.db import connections
+from django.test import TestCase
+
+import mock
+
+from corehq.apps.userreports.util import get_table_name
+from custom.icds_reports.const import DASHBOARD_DOMAIN
+from custom.icds_reports.tasks import _get_chunk_data_not_in_ucr, _get_docs_in_ucr, get_doc_id_bucket
+from custom.icds_reports.utils.connections import get_icds_ucr_citus_db_alias
+
+
+class TestChunkDataNotInUcr(TestCase):
+
+    def _get_ucr_rows(self, table_id, columns):
+        with connections[get_icds_ucr_citus_db_alias()].cursor() as cursor:
+            cursor.execute(
+                f'SELECT {", ".join(columns)} FROM "{get_table_name(DASHBOARD_DOMAIN, table_id)}" '
+                f'ORDER BY doc_id LIMIT 300'
+            )
+            return cursor.fetchall()
+
+    def _get_data_not_in_ucr(self, table_id, chunk):
+        with mock.patch('custom.icds_reports.tasks._get_docs_in_ucr', wraps=_get_docs_in_ucr) as get_docs_in_ucr:
+            data = list(_get_chunk_data_not_in_ucr(DASHBOARD_DOMAIN, table_id, chunk))
+        return data, get_docs_in_ucr
+
+    def _get_case_chunk(self):
+        return [
+            (doc_id, 'child_health', inserted_at - timedelta(hours=1), modified_on)
+            for doc_id, inserted_at, modified_on in self._get_ucr_rows(
+                'static-child_health_cases', ['doc_id', 'inserted_at', 'modified_on']
+            )
+        ]
+
+    def test_cases_up_to_date(self):
+        data, get_docs_in_ucr = self._get_data_not_in_ucr('static-child_health_cases', self._get_case_chunk())
+        self.assertEqual(data, [])
+        get_docs_in_ucr.assert_not_called()
+
+    def test_cases_missing_and_outdated(self):
+        chunk = self._get_case_chunk()
+        outdated_id, _, inserted_at, modified_on = chunk[0]
+        chunk[0] = (outdated_id, 'child_health', inserted_at + timedelta(days=1), modified_on + timedelta(days=1))
+        chunk.append(('missing-case', 'child_health', datetime(2017, 6, 1), datetime(2017, 6, 1)))
+
+        data, get_docs_in_ucr = self._get_data_not_in_ucr('static-child_health_cases', chunk)
+        self.assertEqual(sorted(data), [
+            ('missing-case', 'child_health', datetime(2017, 6, 1), None),
+            (outdated_id, 'child_health', inserted_at + timedelta(days=1), inserted_at + timedelta(hours=1)),
+        ])
+        # only the docs of the mismatching buckets are looked up
+        self.assertEqual(
+            {get_doc_id_bucket(doc_id) for doc_id in get_docs_in_ucr.call_args[0][2]},
+            {get_doc_id_bucket('missing-case'), get_doc_id_bucket(outdated_id)}
+        )
+
+    def test_forms_missing(self):
+        chunk = [
+            (doc_id, 'usage', inserted_at - timedelta(hours=1))
+            for doc_id, inserted_at in self._get_ucr_rows('static-usage_forms', ['doc_id', 'inserted_at'])
+        ]
+        chunk.append(('missing-form', 'usage', datetime(2017, 6, 1)))
+
+        data, get_docs_in_ucr = self._get_data_not_in_ucr('static-usage_forms', chunk)
+        self.assertEqual(data, [('missing-form', 'usage', datetime(2017, 6, 1), None)])
+        self.assertEqual(
+            {get_doc_id_bucket(doc_id) for doc_id in get_docs_in_ucr.call_args[0][2]},
+            {get_doc_id_bucket('missing-form')}
+        )
+
+    def test_cases_without_modified_on_are_checked_doc_by_doc(self):
+        chunk = [
+            (doc_id, 'household', inserted_at - timedelta(hours=1))
+            for doc_id, inserted_at in self._get_ucr_rows('static-household_cases', ['doc_id', 'inserted_at'])
+        ]
+
+        data, get_docs_in_ucr = self._get_data_not_in_ucr('static-household_cases', chunk)
+        self.assertEqual(data, [])
+        self.assertEqual(len(get_docs_in_ucr.call_args[0][2]), len(chunk))
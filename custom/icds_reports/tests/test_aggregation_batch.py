@@ -0,0 +1,87 @@
+from contextlib import contextmanager
+from unittest import mock
+
+from django.db import DatabaseError
+from django.test import SimpleTestCase
+
+from custom.icds_reports.utils import aggregation_batch
+from custom.icds_reports.utils.aggregation_batch import aggregate_state_helpers
+
+
+class FakeCursor(object):
+
+    def __init__(self):
+        self.executed = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+    def mogrify(self, sql, params=None):
+        return (sql % params if params else sql).encode('utf-8')
+
+    def execute(self, sql, params=None):
+        if 'broken' in sql:
+            raise DatabaseError('relation "broken" does not exist')
+        self.executed.append(sql)
+
+
+def _model(helper_key, table):
+    class Helper(object):
+        def __init__(self, state_id, month):
+            self.helper_key = helper_key
+            self.state_id = state_id
+            self.month = month
+
+        def aggregate(self, cursor):
+            cursor.execute(f'DELETE FROM "{table}" WHERE state_id = %(state)s', {'state': f"'{self.state_id}'"})
+            cursor.execute(f'INSERT INTO "{table}" (SELECT 1)')
+
+    return mock.Mock(_agg_helper_cls=Helper, __name__=helper_key)
+
+
+@contextmanager
+def _noop(*args, **kwargs):
+    yield
+
+
+@contextmanager
+def _unprofiled(cursor, *args):
+    yield cursor
+
+
+class TestAggregateStateHelpers(SimpleTestCase):
+
+    def setUp(self):
+        self.cursor = FakeCursor()
+        for patcher in [
+            mock.patch.object(aggregation_batch, 'router', mock.Mock(db_for_write=lambda model: 'citus')),
+            mock.patch.object(aggregation_batch, 'connections', {'citus': mock.Mock(cursor=lambda: self.cursor)}),
+            mock.patch.object(aggregation_batch.transaction, 'atomic', _noop),
+            mock.patch.object(aggregation_batch, 'profile_aggregation', _unprofiled),
+        ]:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_one_batch_per_helper(self):
+        failures = aggregate_state_helpers([
+            ('_aggregate_gm_forms', _model('gm', 'agg_gm')),
+            ('_aggregate_cf_forms', _model('cf', 'agg_cf')),
+        ], 'st1', None)
+
+        self.assertEqual(failures, {})
+        self.assertEqual(self.cursor.executed, [
+            'DELETE FROM "agg_gm" WHERE state_id = \'st1\';\nINSERT INTO "agg_gm" (SELECT 1)',
+            'DELETE FROM "agg_cf" WHERE state_id = \'st1\';\nINSERT INTO "agg_cf" (SELECT 1)',
+        ])
+
+    def test_failures_reported_per_helper(self):
+        failures = aggregate_state_helpers([
+            ('_aggregate_gm_forms', _model('gm', 'broken')),
+            ('_aggregate_cf_forms', _model('cf', 'agg_cf')),
+        ], 'st1', None)
+
+        self.assertEqual(list(failures), ['_aggregate_gm_forms'])
+        self.assertEqual(len(self.cursor.executed), 1)
@@ -0,0 +1,159 @@
+from datetime import date
+
+from django.test import SimpleTestCase
+
+from custom.icds_reports.utils.aggregation_dag import (
+    ALL_STATES,
+    SINGLE_STATE,
+    AggregationDAG,
+    AggregationDAGError,
+    AggregationDAGRun,
+    AggregationStep,
+)
+
+
+class FakeResult(object):
+    def __init__(self, polls_until_ready):
+        self.polls_until_ready = polls_until_ready
+
+    def ready(self):
+        self.polls_until_ready -= 1
+        return self.polls_until_ready < 0
+
+    def get(self, disable_sync_subtasks=True):
+        return None
+
+
+class FakeClock(object):
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self):
+        self.now += 1
+        return self.now
+
+
+class TestAggregationDAG(SimpleTestCase):
+
+    def setUp(self):
+        self.dag = AggregationDAG([
+            AggregationStep('forms', by_state=SINGLE_STATE),
+            AggregationStep('state_rollup', by_state=SINGLE_STATE, depends_on=['forms']),
+            AggregationStep('monthly', by_state=ALL_STATES, depends_on=['forms']),
+            AggregationStep('agg', depends_on=['monthly', 'state_rollup']),
+        ])
+
+    def test_unknown_dependency(self):
+        with self.assertRaises(AggregationDAGError):
+            AggregationDAG([AggregationStep('agg', depends_on=['missing'])])
+
+    def test_cycle(self):
+        with self.assertRaises(AggregationDAGError):
+            AggregationDAG([
+                AggregationStep('a', depends_on=['b']),
+                AggregationStep('b', depends_on=['a']),
+            ])
+
+    def test_partitions(self):
+        self.assertEqual(self.dag.partitions(['st1', 'st2']), [
+            ('forms', 'st1'),
+            ('forms', 'st2'),
+            ('state_rollup', 'st1'),
+            ('state_rollup', 'st2'),
+            ('monthly', None),
+            ('agg', None),
+        ])
+
+    def test_upstream_partitions(self):
+        state_ids = ['st1', 'st2']
+        self.assertEqual(
+            self.dag.upstream_partitions(('state_rollup', 'st2'), state_ids),
+            [('forms', 'st2')]
+        )
+        self.assertEqual(
+            self.dag.upstream_partitions(('monthly', None), state_ids),
+            [('forms', 'st1'), ('forms', 'st2')]
+        )
+        self.assertEqual(
+            self.dag.upstream_partitions(('agg', None), state_ids),
+            [('monthly', None), ('state_rollup', 'st1'), ('state_rollup', 'st2')]
+        )
+
+    def test_state_does_not_wait_for_other_states(self):
+        submitted = []
+
+        def submit(step, state_id):
+            submitted.append((step.name, state_id))
+            # forms for st2 and the monthly table are slow
+            slow = {('forms', 'st2'): 5, ('monthly', None): 3}
+            return FakeResult(slow.get((step.name, state_id), 0))
+
+        run = AggregationDAGRun(self.dag, ['st1', 'st2'], submit, poll_interval=0, clock=FakeClock())
+        critical_path = run.run()
+
+        self.assertLess(submitted.index(('state_rollup', 'st1')), submitted.index(('state_rollup', 'st2')))
+        self.assertEqual(submitted[-1], ('agg', None))
+        self.assertEqual(
+            [(name, state_id) for name, state_id, _ in critical_path],
+            [('forms', 'st2'), ('monthly', None), ('agg', None)]
+        )
+
+    def test_max_running(self):
+        running = []
+        max_seen = []
+
+        class TrackedResult(FakeResult):
+            def get(self, disable_sync_subtasks=True):
+                running.remove(self)
+
+        def submit(step, state_id):
+            result = TrackedResult(1)
+            running.append(result)
+            max_seen.append(len(running))
+            return result
+
+        AggregationDAGRun(
+            self.dag, ['st1', 'st2', 'st3'], submit, poll_interval=0, clock=FakeClock(), max_running=2
+        ).run()
+        self.assertEqual(max(max_seen), 2)
+
+
+class TestMultiMonthAggregationDAG(SimpleTestCase):
+
+    def setUp(self):
+        self.dag = AggregationDAG([
+            AggregationStep('setup', previous_month_depends_on=['forms']),
+            AggregationStep('forms', by_state=SINGLE_STATE, depends_on=['setup']),
+            AggregationStep('monthly', depends_on=['forms']),
+        ])
+        self.months = [date(2020, 5, 31), date(2020, 6, 15)]
+
+    def test_pipelined(self):
+        dag = self.dag.for_months(self.months)
+        state_ids = ['st1', 'st2']
+        self.assertEqual(dag.steps['forms@2020-06'].func_name, 'forms')
+        self.assertEqual(dag.steps['forms@2020-06'].month, date(2020, 6, 15))
+        self.assertEqual(
+            dag.upstream_partitions(('setup@2020-06', None), state_ids),
+            [('setup@2020-05', None), ('forms@2020-05', 'st1'), ('forms@2020-05', 'st2')]
+        )
+        self.assertEqual(
+            dag.upstream_partitions(('forms@2020-06', 'st1'), state_ids),
+            [('setup@2020-06', None), ('forms@2020-05', 'st1')]
+        )
+        # the next month does not wait for the monthly table
+        self.assertNotIn(
+            ('monthly@2020-05', None),
+            dag.upstream_partitions(('forms@2020-06', 'st1'), state_ids)
+        )
+
+    def test_sequential(self):
+        dag = self.dag.for_months(self.months, pipelined=False)
+        self.assertEqual(
+            dag.upstream_partitions(('setup@2020-06', None), ['st1']),
+            [('setup@2020-05', None), ('forms@2020-05', 'st1'), ('monthly@2020-05', None)]
+        )
+        self.assertEqual(
+            dag.upstream_partitions(('forms@2020-06', 'st1'), ['st1']),
+            [('setup@2020-06', None)]
+        )
@@ -0,0 +1,55 @@
+from django.test import SimpleTestCase
+
+from custom.icds_reports.utils.aggregation_profiling import ProfilingCursor
+
+EXPLAIN_OUTPUT = [{
+    'Plan': {
+        'Node Type': 'ModifyTable',
+        'Actual Rows': 0,
+        'Plans': [{'Node Type': 'Seq Scan', 'Actual Rows': 42}],
+    },
+}]
+
+
+class FakeCursor(object):
+    rowcount = -1
+
+    def __init__(self):
+        self.executed = []
+
+    def execute(self, sql, params=None):
+        self.executed.append(sql)
+        self.rowcount = 7 if sql.startswith('DELETE') else -1
+
+    def fetchone(self):
+        return [EXPLAIN_OUTPUT]
+
+
+class TestProfilingCursor(SimpleTestCase):
+
+    def test_records_statements(self):
+        cursor = ProfilingCursor(FakeCursor())
+        cursor.execute('DELETE FROM "agg_awc" WHERE month=%(month)s', {'month': '2020-06-01'})
+        cursor.execute('CREATE INDEX "idx" ON "agg_awc" (state_id)')
+
+        self.assertEqual(
+            [(profile['query'][:6], profile['rows_affected']) for profile in cursor.profiles],
+            [('DELETE', 7), ('CREATE', None)]
+        )
+        self.assertIsNone(cursor.profiles[0]['explain_plan'])
+
+    def test_explain(self):
+        fake_cursor = FakeCursor()
+        cursor = ProfilingCursor(fake_cursor, explain=True)
+        cursor.execute('INSERT INTO "agg_awc" (SELECT * FROM "tmp_agg_awc")')
+        cursor.execute('SELECT create_new_aggregate_table_for_month(%s)', ['agg_awc'])
+        cursor.execute('DELETE FROM "a"; DELETE FROM "b"')
+
+        self.assertEqual(fake_cursor.executed, [
+            'EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) INSERT INTO "agg_awc" (SELECT * FROM "tmp_agg_awc")',
+            'SELECT create_new_aggregate_table_for_month(%s)',
+            'DELETE FROM "a"; DELETE FROM "b"',
+        ])
+        self.assertEqual(cursor.profiles[0]['rows_affected'], 42)
+        self.assertEqual(cursor.profiles[0]['explain_plan'], EXPLAIN_OUTPUT)
+        self.assertIsNone(cursor.profiles[1]['explain_plan'])
@@ -0,0 +1,84 @@
+from datetime import date, datetime
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from custom.icds_reports.models.util import UcrAggregationWatermark
+from custom.icds_reports.utils.aggregation_watermarks import IncrementalAggregationPlan
+
+UCR_WATERMARKS = {
+    'static-dashboard_growth_monitoring_forms': {
+        ('st1', date(2020, 5, 1)): '2020-06-10T10:00:00',
+        ('st1', date(2020, 6, 1)): '2020-06-09T10:00:00',
+    },
+    'static-infrastructure_form_v2': {
+        ('st1', date(2019, 11, 1)): '2020-06-10T10:00:00',
+        ('st1', date(2020, 3, 1)): '2020-04-01T10:00:00',
+        ('st1', date(2020, 6, 1)): '2020-06-01T10:00:00',
+    },
+    'static-awc_location': {('st1', None): '2020-01-01T00:00:00'},
+    'static-child_health_cases': {('st1', None): '2020-06-09T00:00:00'},
+}
+
+
+def _watermark(month, aggregated_at, ucr_watermarks=None):
+    return UcrAggregationWatermark(
+        func_name='_aggregate_gm_forms',
+        state_id='st1',
+        month=month,
+        aggregated_at=aggregated_at,
+        ucr_watermarks=ucr_watermarks or {},
+    )
+
+
+class TestIncrementalAggregationPlan(SimpleTestCase):
+
+    def setUp(self):
+        self.plan = IncrementalAggregationPlan(date(2020, 6, 15), UCR_WATERMARKS)
+
+    def _should_skip(self, watermarks, func_name='_aggregate_gm_forms', state_id='st1'):
+        with mock.patch.object(UcrAggregationWatermark.objects, 'filter', return_value=watermarks):
+            return self.plan.should_skip(func_name, state_id)
+
+    def _unchanged_watermarks(self):
+        return self.plan.watermarks_for('_aggregate_gm_forms', 'st1')
+
+    def test_skip_unchanged(self):
+        self.assertTrue(self._should_skip([
+            _watermark(date(2020, 5, 1), datetime(2020, 6, 10, 1)),
+            _watermark(date(2020, 6, 1), datetime(2020, 6, 10, 2), self._unchanged_watermarks()),
+        ]))
+        self.assertEqual(self.plan.skipped, {'_aggregate_gm_forms': ['st1']})
+
+    def test_run_when_ucr_changed(self):
+        watermarks = self._unchanged_watermarks()
+        watermarks['static-dashboard_growth_monitoring_forms'] = '2020-06-08T10:00:00'
+        self.assertFalse(self._should_skip([
+            _watermark(date(2020, 5, 1), datetime(2020, 6, 10, 1)),
+            _watermark(date(2020, 6, 1), datetime(2020, 6, 10, 2), watermarks),
+        ]))
+
+    def test_run_when_previous_month_reaggregated(self):
+        self.assertFalse(self._should_skip([
+            _watermark(date(2020, 5, 1), datetime(2020, 6, 11, 1)),
+            _watermark(date(2020, 6, 1), datetime(2020, 6, 10, 2), self._unchanged_watermarks()),
+        ]))
+
+    def test_run_without_previous_aggregation(self):
+        self.assertFalse(self._should_skip([]))
+
+    def test_run_steps_that_are_not_incremental(self):
+        self.assertFalse(self._should_skip([], '_agg_awc_table', None))
+        self.assertIsNone(self.plan.watermarks_for('_agg_awc_table', None))
+
+    def test_watermarks_of_the_months_read(self):
+        self.assertEqual(self._unchanged_watermarks(), {
+            'static-dashboard_growth_monitoring_forms': '2020-06-09T10:00:00',
+            'static-awc_location': '2020-01-01T00:00:00',
+            'static-child_health_cases': '2020-06-09T00:00:00',
+        })
+        self.assertEqual(
+            self.plan.watermarks_for('_aggregate_awc_infra_forms', 'st1')['static-infrastructure_form_v2'],
+            '2020-06-01T10:00:00'
+        )
+        self.assertIsNone(self.plan.watermarks_for('_aggregate_gm_forms', 'st2')['static-child_health_cases'])
@@ -0,0 +1,72 @@
+import inspect
+import json
+from datetime import date
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from custom.icds_reports.utils import cache_warmup
+from custom.icds_reports.utils.cache_warmup import (
+    get_hot_call,
+    get_replay_call,
+    set_program_summary_month,
+    warm_up_cache,
+    warm_up_candidate,
+)
+
+
+@warm_up_candidate(set_program_summary_month)
+def get_summary(step, domain, config, now, include_test, pre_release_features):
+    return config['month']
+
+
+NAME = f'{__name__}.get_summary'
+
+
+class TestCacheWarmup(SimpleTestCase):
+
+    def _hot_call(self, month):
+        config = {
+            'month': month,
+            'prev_month': (2020, month[1] - 1, 1),
+            'aggregation_level': 2,
+            'state_id': 'st1',
+        }
+        return get_hot_call(
+            NAME, inspect.signature(get_summary), ('maternal_child', 'icds-cas', config, (2020, 7, 3), False, False), {}
+        )
+
+    def test_calls_recorded_independently_of_the_month(self):
+        self.assertEqual(self._hot_call((2020, 5, 1)), self._hot_call((2020, 6, 1)))
+        self.assertEqual(json.loads(self._hot_call((2020, 6, 1)))['arguments']['config'], {
+            'month': None,
+            'prev_month': None,
+            'aggregation_level': 2,
+            'state_id': 'st1',
+        })
+
+    def test_replayed_for_the_month(self):
+        func, arguments = get_replay_call(self._hot_call((2020, 5, 1)), date(2020, 7, 1))
+        self.assertEqual(arguments['config']['month'], (2020, 7, 1))
+        self.assertEqual(arguments['config']['prev_month'], (2020, 6, 1))
+        self.assertEqual(arguments['now'], tuple(date.today().timetuple())[:3])
+        self.assertEqual(arguments['step'], 'maternal_child')
+
+    def test_coverage(self):
+        hot_calls = [(self._hot_call((2020, 5, 1)), 30), (json.dumps({'function': 'gone'}), 10)]
+        with mock.patch.object(cache_warmup, 'get_hot_calls', return_value=(hot_calls, 50)):
+            report = warm_up_cache([date(2020, 6, 1), date(2020, 7, 1)])
+        self.assertEqual(report['calls'], 2)
+        self.assertEqual(report['failed'], 2)
+        self.assertEqual(report['coverage'], 0.6)
+
+    @mock.patch.object(cache_warmup, 'ICDS_DASHBOARD_CACHE_WARMUP', mock.Mock(enabled=mock.Mock(return_value=True)))
+    def test_calls_sampled(self):
+        config = {'month': (2020, 5, 1), 'prev_month': (2020, 4, 1), 'aggregation_level': 2, 'state_id': 'st1'}
+        with mock.patch.object(cache_warmup, 'record_hot_call') as record_hot_call, \
+                mock.patch.object(cache_warmup.random, 'randrange', side_effect=[3, 0, 7]):
+            for _ in range(3):
+                self.assertEqual(
+                    get_summary('maternal_child', 'icds-cas', config, (2020, 7, 3), False, False), (2020, 5, 1)
+                )
+        record_hot_call.assert_called_once()
@@ -0,0 +1,72 @@
+from datetime import date, datetime
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from custom.icds_reports import cache
+from custom.icds_reports.cache import (
+    _vary_on_data_generation,
+    bump_data_generation,
+    get_data_generation,
+    get_data_partition,
+)
+from custom.icds_reports.tasks import bump_aggregated_data_generation
+from custom.icds_reports.tests.utils import FakeCache
+
+
+def get_map(domain, config, loc_level, show_test=False):
+    return {}
+
+
+class TestDataGeneration(SimpleTestCase):
+
+    def setUp(self):
+        patcher = mock.patch.object(cache, 'django_cache', FakeCache())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_data_partition(self):
+        self.assertEqual(
+            get_data_partition({'config': {'month': (2020, 6, 1), 'state_id': 'st1'}, 'domain': 'icds-cas'}),
+            ('2020-06', 'st1')
+        )
+        self.assertEqual(
+            get_data_partition({'filters': {'month': datetime(2020, 6, 1), 'aggregation_level': 1}}),
+            ('2020-06', 'all')
+        )
+        self.assertEqual(
+            get_data_partition({'year': 2020, 'month': 6, 'query_filters': {'state_id': 'st1'}}),
+            ('2020-06', 'st1')
+        )
+        self.assertEqual(get_data_partition({'domain': 'icds-cas'}), ('all', 'all'))
+
+    def test_bump(self):
+        bump_data_generation([date(2020, 6, 1)], ['st1'])
+        for month, state_id in [('2020-06', 'st1'), ('2020-09', 'st1'), ('2020-06', 'all'), ('all', 'all')]:
+            self.assertIsNotNone(get_data_generation(month, state_id))
+        self.assertIsNone(get_data_generation('2020-05', 'st1'))
+        self.assertIsNone(get_data_generation('2020-10', 'st1'))
+        self.assertIsNone(get_data_generation('2020-06', 'st2'))
+
+    @mock.patch('custom.icds_reports.tasks.SQLLocation')
+    def test_bump_aggregated_month(self, sql_location):
+        sql_location.objects.filter.return_value.values_list.return_value = ['st1', 'st2']
+        bump_aggregated_data_generation(date(2020, 6, 15))
+        for month, state_id in [('2020-06', 'st1'), ('2020-06', 'st2'), ('2020-07', 'st2'), ('all', 'all')]:
+            self.assertIsNotNone(get_data_generation(month, state_id))
+        self.assertIsNone(get_data_generation('2020-05', 'st1'))
+
+    def test_cache_key_changes_with_generation(self):
+        vary_on = _vary_on_data_generation(get_map, ['domain', 'config', 'loc_level'])
+        config = {'month': (2020, 6, 1), 'state_id': 'st1'}
+
+        before = vary_on('icds-cas', config, 'district')
+        bump_data_generation([date(2020, 5, 1)], ['st2'])
+        self.assertEqual(vary_on('icds-cas', config, loc_level='district'), before)
+        bump_data_generation([date(2020, 5, 1)], ['st1'])
+        self.assertNotEqual(vary_on('icds-cas', config, 'district'), before)
+        self.assertEqual(vary_on('icds-cas', config, 'district')[:3], ['icds-cas', config, 'district'])
+
+    def test_unknown_vary_on(self):
+        with self.assertRaises(ValueError):
+            _vary_on_data_generation(get_map, ['location_id'])
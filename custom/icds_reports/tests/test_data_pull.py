@@ -0,0 +1,70 @@
+import csv
+import io
+import zipfile
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from custom.icds_reports.data_pull.data_pulls import MonthlyPerformance, run_queries
+from custom.icds_reports.data_pull.exporter import DataExporter
+
+
+class FakeQuery(object):
+    def __init__(self, name, content):
+        self.result_file_name = f'{name}.csv'
+        self.content = content
+
+    def run(self, db_alias):
+        return io.StringIO(self.content)
+
+
+def _read_csv(filestream):
+    filestream.seek(0)
+    return list(csv.reader(filestream))
+
+
+@mock.patch('custom.icds_reports.data_pull.data_pulls.connections', mock.MagicMock())
+class TestRunQueries(SimpleTestCase):
+
+    def test_run_queries(self):
+        queries = [FakeQuery(f'query_{index}', f'state_name,count\r\nS{index},{index}\r\n') for index in range(6)]
+        for concurrency in [1, 3]:
+            data_files = run_queries(queries, 'default', concurrency)
+            self.assertEqual(list(data_files), [f'query_{index}.csv' for index in range(6)])
+            self.assertEqual(_read_csv(data_files['query_4.csv']), [['state_name', 'count'], ['S4', '4']])
+
+    def test_run_queries_error(self):
+        query = FakeQuery('failing', '')
+        query.run = mock.Mock(side_effect=ValueError)
+        with self.assertRaises(ValueError):
+            run_queries([FakeQuery('query', ''), query], 'default', 2)
+
+
+class TestMonthlyPerformance(SimpleTestCase):
+
+    @mock.patch.object(MonthlyPerformance, '_get_test_state_names', return_value={'Test State', 'Test State 2'})
+    def test_post_run(self, _):
+        data_pull = MonthlyPerformance('default', month='2020-04-01')
+        result = data_pull.post_run({
+            'launched.csv': io.StringIO(
+                'state_name,awcs_launched\r\nS1,10\r\nTest State,1\r\nTest State 2,3\r\nS2,20\r\n'
+            ),
+            'children.csv': io.StringIO('state_name,children\r\nS2,200\r\nS1,100\r\n'),
+        })
+        self.assertEqual(_read_csv(result['Consolidated_monthly_report.csv']), [
+            ['State', 'awcs_launched', 'children'],
+            ['S1', '10', '100'],
+            ['S2', '20', '200'],
+        ])
+
+
+class TestDataExporter(SimpleTestCase):
+
+    def test_write_to_zip(self):
+        zip_file = io.BytesIO()
+        with zipfile.ZipFile(zip_file, mode='w', compression=zipfile.ZIP_DEFLATED) as z:
+            DataExporter._write_to_zip(z, 'text.csv', io.StringIO('state_name\r\nनागालैंड\r\n'))
+            DataExporter._write_to_zip(z, 'binary.xlsx', io.BytesIO(b'\x00\x01'))
+        with zipfile.ZipFile(zip_file) as z:
+            self.assertEqual(z.read('text.csv').decode('utf-8'), 'state_name\r\nनागालैंड\r\n')
+            self.assertEqual(z.read('binary.xlsx'), b'\x00\x01')
@@ -0,0 +1,72 @@
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from custom.icds_reports.tests.utils import FakeCache
+from custom.icds_reports.utils import location_access
+from custom.icds_reports.utils.location_access import LocationAccess, bump_location_tree_version
+
+
+class FakeUser(object):
+    _id = 'user1'
+
+    def __init__(self, access_all_locations=False, location_ids=('block1',)):
+        self.access_all_locations = access_all_locations
+        self.location_ids = list(location_ids)
+
+    def has_permission(self, domain, permission):
+        return self.access_all_locations
+
+    def get_location_ids(self, domain):
+        return self.location_ids
+
+    def get_sql_locations(self, domain):
+        return self.location_ids
+
+
+class TestLocationAccess(SimpleTestCase):
+
+    def setUp(self):
+        patches = [
+            mock.patch.object(location_access, 'cache', FakeCache()),
+            mock.patch.object(location_access.SQLLocation, 'objects'),
+        ]
+        for patcher in patches:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.objects = location_access.SQLLocation.objects
+        self.objects.get_queryset_ancestors.return_value.distinct.return_value.values_list.return_value = [
+            'state1', 'district1', 'block1'
+        ]
+        self.accessible = self.objects.accessible_to_user.return_value.filter
+        self.accessible.return_value.values_list.return_value = ['block1', 'sector1']
+
+    def test_accessible_locations_resolved_once(self):
+        user = FakeUser()
+        access = LocationAccess('icds-cas', user)
+        self.assertEqual(access.ancestor_ids, {'state1', 'district1', 'block1'})
+        self.assertEqual(
+            access.get_accessible_location_ids(['block1', 'sector1', 'block2']),
+            {'block1', 'sector1'}
+        )
+        self.assertEqual(self.accessible.call_count, 1)
+
+        access = LocationAccess('icds-cas', user)
+        self.assertTrue(access.can_access('sector1'))
+        self.assertFalse(access.can_access('block2'))
+        self.assertEqual(self.accessible.call_count, 1)
+        self.assertEqual(self.objects.get_queryset_ancestors.call_count, 1)
+
+    def test_location_tree_change(self):
+        user = FakeUser()
+        LocationAccess('icds-cas', user).can_access('sector1')
+        bump_location_tree_version(None, mock.Mock(domain='icds-cas'))
+        LocationAccess('icds-cas', user).can_access('sector1')
+        self.assertEqual(self.accessible.call_count, 2)
+        self.assertEqual(self.objects.get_queryset_ancestors.call_count, 2)
+
+    def test_access_all_locations(self):
+        access = LocationAccess('icds-cas', FakeUser(access_all_locations=True, location_ids=[]))
+        self.assertEqual(access.get_accessible_location_ids(['state2', 'block2']), {'state2', 'block2'})
+        self.assertTrue(access.can_access(None))
+        self.accessible.assert_not_called()
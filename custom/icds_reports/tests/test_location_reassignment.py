@@ -0,0 +1,38 @@
+from datetime import date
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from custom.icds_reports.utils.aggregation_helpers.distributed.location_reassignment import (
+    TempPrevUCRTables,
+)
+
+
+@mock.patch(
+    'custom.icds_reports.utils.aggregation_helpers.distributed.location_reassignment.get_icds_ucr_citus_db_alias',
+    mock.Mock(return_value='icds-ucr-citus')
+)
+class TestTempPrevUCRTables(SimpleTestCase):
+
+    def test_drop_old_tables(self):
+        cursor = mock.MagicMock()
+        cursor.fetchall.return_value = [
+            ('static-child_health_cases_prev_202004',),
+            ('static-child_health_cases_prev_local_202004',),
+            ('static-person_cases_v3_prev_202005',),
+            ('static-person_cases_v3_prev_202006',),
+            ('static-child_health_cases_prev',),
+            ('static-child_health_cases_prev_local',),
+        ]
+        connections = {'icds-ucr-citus': mock.MagicMock()}
+        connections['icds-ucr-citus'].cursor.return_value.__enter__.return_value = cursor
+        with mock.patch(
+            'custom.icds_reports.utils.aggregation_helpers.distributed.location_reassignment.connections',
+            connections
+        ):
+            TempPrevUCRTables().drop_old_tables(date(2020, 6, 15))
+
+        self.assertEqual([call[0][0] for call in cursor.execute.call_args_list[1:]], [
+            'DROP TABLE IF EXISTS "static-child_health_cases_prev_202004"',
+            'DROP TABLE IF EXISTS "static-child_health_cases_prev_local_202004"',
+        ])
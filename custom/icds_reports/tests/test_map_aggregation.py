@@ -0,0 +1,45 @@
+from django.test import SimpleTestCase
+
+from custom.icds_reports.utils.map_aggregation import aggregate_by_map_location, get_fill_key, get_map_columns
+
+ROWS = [
+    {'district_name': 'D1', 'district_map_location_name': 'M1', 'valid': 4, 'all': 10},
+    {'district_name': 'D2', 'district_map_location_name': 'M1', 'valid': 1, 'all': None},
+    {'district_name': 'D3', 'district_map_location_name': None, 'valid': None, 'all': 5},
+    {'district_name': 'D4', 'district_map_location_name': 'M4', 'valid': 2, 'all': 2},
+]
+
+
+class TestMapAggregation(SimpleTestCase):
+
+    def test_aggregate_by_map_location(self):
+        data_for_map, totals = aggregate_by_map_location(get_map_columns(ROWS, 'district', ['valid', 'all']))
+        self.assertEqual(data_for_map, {
+            'M1': {'valid': 5, 'all': 10, 'original_name': ['D1', 'D2']},
+            'D3': {'valid': 0, 'all': 5, 'original_name': ['D3']},
+            'M4': {'valid': 2, 'all': 2, 'original_name': ['D4']},
+        })
+        self.assertEqual(list(data_for_map), ['M1', 'D3', 'M4'])
+        self.assertEqual(totals, {'valid': 7, 'all': 17})
+
+    def test_launched_locations(self):
+        map_columns = get_map_columns(ROWS, 'district', ['valid'], {'D1': 3, 'D2': 0, 'D4': None})
+        data_for_map, totals = aggregate_by_map_location(map_columns)
+        self.assertEqual(data_for_map, {'M1': {'valid': 4, 'original_name': ['D1']}})
+        self.assertEqual(totals, {'valid': 4})
+
+        self.assertEqual(aggregate_by_map_location(get_map_columns(ROWS, 'district', ['valid'], {})), ({}, {'valid': 0}))
+
+    def test_max_columns(self):
+        data_for_map, totals = aggregate_by_map_location(
+            get_map_columns(ROWS, 'district', ['valid', 'all']),
+            max_columns=['valid']
+        )
+        self.assertEqual(data_for_map['M1']['valid'], 4)
+        self.assertEqual(totals['valid'], 6)
+
+    def test_fill_key(self):
+        self.assertEqual(
+            [get_fill_key(value, 20, 60) for value in [0, 19.9, 20, 59.9, 60, 100]],
+            ['0%-20%', '0%-20%', '20%-60%', '20%-60%', '60%-100%', '60%-100%']
+        )
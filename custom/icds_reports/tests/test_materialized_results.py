@@ -0,0 +1,81 @@
+import inspect
+import json
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from custom.icds_reports.const import LocationTypes
+from custom.icds_reports.models.util import MaterializedReportResult
+from custom.icds_reports.utils import materialized_results
+from custom.icds_reports.utils.materialized_results import (
+    MAP,
+    SECTOR,
+    get_precompute_calls,
+    get_result_key,
+    materialized_result,
+)
+
+
+@materialized_result(MAP)
+def get_indicator_data_map(domain, config, loc_level, show_test=False, icds_features_flag=False):
+    return {'data': {'st1': config['month'][0]}}
+
+
+@materialized_result(SECTOR)
+def get_indicator_sector_data(domain, config, loc_level, location_id, show_test=False):
+    return {'chart_data': []}
+
+
+MAP_NAME = f'{__name__}.get_indicator_data_map'
+SECTOR_NAME = f'{__name__}.get_indicator_sector_data'
+
+
+class TestMaterializedResults(SimpleTestCase):
+
+    def setUp(self):
+        patcher = mock.patch.object(materialized_results, 'ICDS_MATERIALIZED_DASHBOARD_RESULTS')
+        patcher.start().enabled.return_value = True
+        self.addCleanup(patcher.stop)
+
+    def _key(self, *args, **kwargs):
+        return get_result_key(MAP_NAME, inspect.signature(get_indicator_data_map), args, kwargs)
+
+    def test_key_ignores_how_arguments_are_passed(self):
+        config = {'month': (2020, 6, 1), 'aggregation_level': 1}
+        self.assertEqual(
+            self._key('icds-cas', config, 'state', False, False),
+            self._key('icds-cas', dict(config), 'state'),
+        )
+        self.assertNotEqual(
+            self._key('icds-cas', config, 'state'),
+            self._key('icds-cas', config, 'state', icds_features_flag=True),
+        )
+
+    def test_served_from_store(self):
+        stored = json.dumps({'data': {'st1': 'stored'}})
+        with mock.patch.object(MaterializedReportResult.objects, 'filter') as filter_:
+            filter_.return_value.values_list.return_value.first.return_value = stored
+            result = get_indicator_data_map('icds-cas', {'month': (2020, 6, 1)}, 'state')
+        self.assertEqual(result, {'data': {'st1': 'stored'}})
+
+    def test_falls_back_to_live_query(self):
+        with mock.patch.object(MaterializedReportResult.objects, 'filter') as filter_:
+            filter_.return_value.values_list.return_value.first.return_value = None
+            result = get_indicator_data_map('icds-cas', {'month': (2020, 6, 1)}, 'state')
+        self.assertEqual(result, {'data': {'st1': 2020}})
+
+    def test_precompute_calls(self):
+        config = {'month': (2020, 6, 1), 'aggregation_level': 2, 'state_id': 'st1'}
+        self.assertEqual(
+            [kwargs for _, kwargs in get_precompute_calls(
+                MAP_NAME, MAP, 'icds-cas', 'st1', config, LocationTypes.STATE
+            )],
+            [{'show_test': False, 'icds_features_flag': False}, {'show_test': False, 'icds_features_flag': True}]
+        )
+        # sector data is only shown from the block level down
+        self.assertEqual(list(get_precompute_calls(
+            SECTOR_NAME, SECTOR, 'icds-cas', 'st1', config, LocationTypes.STATE
+        )), [])
+        self.assertEqual(list(get_precompute_calls(
+            SECTOR_NAME, SECTOR, 'icds-cas', 'b1', config, LocationTypes.BLOCK
+        )), [(['icds-cas', config, LocationTypes.BLOCK, 'b1'], {'show_test': False})])
@@ -0,0 +1,94 @@
+import csv
+import io
+import zipfile
+from datetime import date
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from openpyxl import load_workbook
+
+from custom.icds_reports.utils import mixins
+from custom.icds_reports.utils.mixins import ExportableMixin
+from custom.icds_reports.utils.streaming_export import write_export_tables
+
+
+def _get_tables(generated_rows):
+    def _rows():
+        yield ['State', 'Count']
+        for index in range(3):
+            generated_rows.append(index)
+            yield [f'State {index}', index or None]
+
+    return [
+        ['Children', _rows()],
+        ['Export Info', [['Generated at', date(2020, 6, 1)]]],
+    ]
+
+
+class TestStreamingExport(SimpleTestCase):
+
+    def test_csv(self):
+        generated_rows = []
+        export_file = io.BytesIO()
+        write_export_tables(_get_tables(generated_rows), export_file, 'csv')
+        self.assertEqual(generated_rows, [0, 1, 2])
+
+        with zipfile.ZipFile(export_file) as archive:
+            self.assertEqual(archive.namelist(), ['Children.csv', 'Export Info.csv'])
+            with archive.open('Children.csv') as table_file:
+                rows = list(csv.reader(io.TextIOWrapper(table_file, encoding='utf-8')))
+        self.assertEqual(rows, [['State', 'Count'], ['State 0', ''], ['State 1', '1'], ['State 2', '2']])
+
+    def test_xlsx(self):
+        export_file = io.BytesIO()
+        write_export_tables(_get_tables([]), export_file, 'xlsx')
+
+        workbook = load_workbook(export_file)
+        self.assertEqual(workbook.sheetnames, ['Children', 'Export Info'])
+        self.assertEqual(
+            [list(row) for row in workbook['Children'].iter_rows(values_only=True)],
+            [['State', 'Count'], ['State 0', None], ['State 1', 1], ['State 2', 2]]
+        )
+
+    def test_unsupported_format(self):
+        with self.assertRaises(ValueError):
+            write_export_tables(_get_tables([]), io.BytesIO(), 'html')
+
+
+class PagedExport(ExportableMixin):
+    title = 'Paged'
+    columns = [{'header': 'AWC', 'slug': 'awc_name'}]
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.config = {}
+        self.pages = []
+
+    def get_data(self, start=None, limit=None):
+        self.pages.append(start)
+        return self.rows[start:start + limit]
+
+
+@mock.patch.object(mixins, 'EXPORT_PAGE_SIZE', 2)
+class TestExportPages(SimpleTestCase):
+
+    def test_rows_read_by_page(self):
+        export = PagedExport([{'awc_name': f'AWC {index}'} for index in range(5)])
+        [[title, rows], _] = export.get_streaming_excel_data(None)
+        self.assertEqual(export.pages, [])
+        self.assertEqual(list(rows), [['AWC'], ['AWC 0'], ['AWC 1'], ['AWC 2'], ['AWC 3'], ['AWC 4']])
+        self.assertEqual(export.pages, [0, 2, 4])
+
+    def test_full_last_page(self):
+        export = PagedExport([{'awc_name': f'AWC {index}'} for index in range(4)])
+        self.assertEqual(len(list(export.iter_data())), 4)
+        self.assertEqual(export.pages, [0, 2, 4])
+
+    def test_pages_ordered_by_location_id(self):
+        export = PagedExport([])
+        export.get_columns_by_loc_level = [mock.Mock(slug='state_name'), mock.Mock(slug='awc_name')]
+        for loc_level, location_id_column in [(1, 'state_id'), (4, 'supervisor_id'), (5, 'awc_id')]:
+            export.loc_level = loc_level
+            self.assertEqual(export.order_by[-1].name, location_id_column)
+            self.assertEqual(export.group_by[-1], location_id_column)
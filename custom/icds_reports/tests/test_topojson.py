@@ -0,0 +1,35 @@
+import json
+
+from django.test import SimpleTestCase
+
+from custom.icds_reports.utils.topojson_util.topojson_util import (
+    get_block_topojson_for_state,
+    get_compiled_block_topojson_for_state,
+    get_district_topojson_data,
+)
+
+
+class TestCompiledTopojson(SimpleTestCase):
+
+    def test_same_content_as_parsed_topojson(self):
+        state = sorted(get_district_topojson_data())[0]
+        topojson = get_compiled_block_topojson_for_state(state)
+        self.assertEqual(json.loads(topojson.content), {'topojson': get_block_topojson_for_state(state)})
+        self.assertIs(get_compiled_block_topojson_for_state(state), topojson)
+
+    def test_unknown_state(self):
+        topojson = get_compiled_block_topojson_for_state('Unknown state')
+        self.assertEqual(json.loads(topojson.content), {'topojson': None})
+
+    def test_unknown_states_share_cached_content(self):
+        self.assertIs(
+            get_compiled_block_topojson_for_state('Unknown state'),
+            get_compiled_block_topojson_for_state('Other unknown state'),
+        )
+
+    def test_etag_changes_with_content(self):
+        states = sorted(get_district_topojson_data())[:2]
+        self.assertNotEqual(
+            get_compiled_block_topojson_for_state(states[0]).etag,
+            get_compiled_block_topojson_for_state(states[1]).etag,
+        )
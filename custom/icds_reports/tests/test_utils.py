@@ -1,6 +1,26 @@
+import csv
+import io
+import tempfile
+import zipfile
+from unittest import mock
+
 from django.test import SimpleTestCase
 
-from custom.icds_reports.utils import generate_data_for_map
+from custom.icds_reports import utils
+from custom.icds_reports.utils import (
+    aggregate_report_data,
+    generate_data_for_map,
+    split_csv_by_column,
+    store_cas_data_export_partitions,
+)
+
+MBT_CSV = (
+    'case_id,district_name,block_name\r\n'
+    'c1,D1,B1\r\n'
+    'c2,D2,B1\r\n'
+    'c3,D1,B2\r\n'
+    'c4,D1,B1\r\n'
+)
 
 
 class TestUtils(SimpleTestCase):
@@ -56,3 +76,115 @@ class TestUtils(SimpleTestCase):
             60
         )
         self.assertEqual(average, 0.0)
+
+
+class TestAggregateReportData(SimpleTestCase):
+
+    def test_aggregate_report_data(self):
+        report_data = [
+            {'awc_id': 'a1', 'owner_id': 'o1', 'pse_days': 20, 'gender': 'F', 'open_count': 3},
+            {'awc_id': 'a2', 'owner_id': 'o2', 'pse_days': 10, 'gender': 'M', 'open_count': None},
+            {'awc_id': 'a2', 'owner_id': 'o3', 'pse_days': 0, 'gender': 'F', 'open_count': 5},
+        ]
+        columns = [
+            {'column_name': 'open_count', 'agg_fun': 'sum'},
+            {'column_name': 'owner_id', 'agg_fun': 'count'},
+            {'column_name': 'pse_days', 'agg_fun': 'count_if', 'column_in_report': 'pse_16_days',
+             'condition': {'operator': '>=', 'value': 16}},
+            {'column_name': 'gender', 'agg_fun': 'count_if', 'column_in_report': 'girls',
+             'condition': {'operator': '==', 'value': 'F'}},
+            {'column_name': 'pse_days', 'agg_fun': 'avg'},
+            {'column_name': 'pse_days', 'agg_fun': 'last_value', 'group_by': 'awc_id',
+             'column_in_report': 'pse_days_by_awc'},
+        ]
+        self.assertEqual(aggregate_report_data(columns, report_data), [
+            ('open_count', 8),
+            ('owner_id', 3),
+            ('pse_16_days', 1),
+            ('girls', 2),
+            ('pse_days', 10),
+            ('pse_days_by_awc', 20),
+        ])
+        self.assertEqual(aggregate_report_data(columns, []), [
+            ('open_count', 0),
+            ('owner_id', 0),
+            ('pse_16_days', 0),
+            ('girls', 0),
+            ('pse_days', 0),
+            ('pse_days_by_awc', 0),
+        ])
+
+
+class TestCasDataExportPartitions(SimpleTestCase):
+
+    def _read_csv(self, path):
+        with open(path, newline='') as csv_file:
+            return list(csv.reader(csv_file))
+
+    def test_split_csv_by_column(self):
+        with tempfile.TemporaryDirectory() as directory:
+            files = split_csv_by_column(io.StringIO(MBT_CSV), 'district_name', directory)
+            self.assertEqual(set(files), {'D1', 'D2'})
+            self.assertEqual(self._read_csv(files['D1']), [
+                ['case_id', 'district_name', 'block_name'],
+                ['c1', 'D1', 'B1'],
+                ['c3', 'D1', 'B2'],
+                ['c4', 'D1', 'B1'],
+            ])
+            self.assertEqual(self._read_csv(files['D2']), [
+                ['case_id', 'district_name', 'block_name'],
+                ['c2', 'D2', 'B1'],
+            ])
+            self.assertEqual(split_csv_by_column(io.StringIO(MBT_CSV), 'awc_name', directory), {})
+
+    @mock.patch.object(utils, 'IcdsFile')
+    @mock.patch.object(utils, 'SQLLocation')
+    def test_store_partitions(self, sql_location, icds_file):
+        descendants = sql_location.objects.get.return_value.get_descendants.return_value.filter.return_value
+        descendants.values_list.return_value = [
+            ('district', 'D1', 'st1', 'd1'),
+            ('district', 'D2', 'st1', 'd2'),
+            ('block', 'B1', 'd1', 'b1'),
+            ('block', 'B2', 'd1', 'b2'),
+            ('block', 'B1', 'd2', 'b3'),
+        ]
+        stored = {}
+
+        def _get_or_create(blob_id, data_type):
+            blob = mock.Mock()
+            blob.store_file_in_blobdb.side_effect = lambda f, expired: stored.update({
+                blob_id: [row[0] for row in csv.reader(io.TextIOWrapper(f, encoding='utf-8'))][1:]
+            })
+            return blob, True
+        icds_file.objects.get_or_create.side_effect = _get_or_create
+
+        store_cas_data_export_partitions(io.BytesIO(MBT_CSV.encode('utf-8')), 'ccs_record_monthly', 'st1',
+                                         '2020-06-01')
+        self.assertEqual(stored, {
+            'ccs_record_monthly-d1-2020-06-01': ['c1', 'c3', 'c4'],
+            'ccs_record_monthly-d2-2020-06-01': ['c2'],
+            'ccs_record_monthly-b1-2020-06-01': ['c1', 'c4'],
+            'ccs_record_monthly-b2-2020-06-01': ['c3'],
+            'ccs_record_monthly-b3-2020-06-01': ['c2'],
+        })
+
+
+class TestPdfZipFile(SimpleTestCase):
+
+    @mock.patch.object(utils, 'IcdsFile')
+    def test_create_pdf_zip_file(self, icds_file):
+        stored = {}
+
+        def _store_file_in_blobdb(zip_file, expired):
+            with zipfile.ZipFile(zip_file) as archive:
+                stored.update({name: archive.read(name) for name in archive.namelist()})
+        icds_file.return_value.store_file_in_blobdb.side_effect = _store_file_in_blobdb
+
+        progress = []
+        with mock.patch.object(utils, 'write_pdf', side_effect=lambda page: page.encode('utf-8')):
+            pdfs = utils.iter_pdfs(['awc 1', 'awc 2'], processes=1)
+            utils.create_pdf_zip_file(zip(['awc_1.pdf', 'awc_2.pdf'], pdfs), progress.append)
+
+        self.assertEqual(stored, {'awc_1.pdf': b'awc 1', 'awc_2.pdf': b'awc 2'})
+        self.assertEqual(progress, [1, 2])
+        icds_file.return_value.save.assert_called_once_with()
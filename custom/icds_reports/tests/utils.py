@@ -0,0 +1,14 @@
+class FakeCache(object):
+    """In memory stand-in for the django cache"""
+
+    def __init__(self):
+        self.values = {}
+
+    def get(self, key, default=None):
+        return self.values.get(key, default)
+
+    def set(self, key, value, timeout=None):
+        self.values[key] = value
+
+    def set_many(self, values, timeout=None):
+        self.values.update(values)
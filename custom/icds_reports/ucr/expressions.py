@@ -1,3 +1,5 @@
+import threading
+from contextlib import contextmanager
 from datetime import datetime
 
 from jsonobject.base_properties import DefaultProperty
@@ -17,6 +19,7 @@ from corehq.form_processor.interfaces.dbaccessors import CaseAccessors, FormAcce
 from corehq.toggles import NAMESPACE_OTHER
 from custom.icds.icds_toggles import ICDS_UCR_ELASTICSEARCH_DOC_LOADING
 from dimagi.ext.jsonobject import JsonObject, ListProperty, StringProperty, DictProperty, BooleanProperty
+from dimagi.utils.chunked import chunked
 from corehq.apps.app_manager.dbaccessors import get_build_by_version
 from django.conf import settings
 
@@ -111,6 +114,88 @@ class GetLastCasePropertyUpdateSpec(JsonObject):
     xmlns = ListProperty(required=False)
 
 
+ES_PREFETCH_CHUNK_SIZE = 1000
+
+_case_forms_prefetch = threading.local()
+
+
+class CaseFormsPrefetch(object):
+    """Forms of a batch of cases, fetched in bulk so that `icds_get_case_forms_in_date`
+    is evaluated for all the cases of the batch without requests per case.
+
+    The form metadata of all the cases is fetched from ES up front. The SQL forms, only
+    needed when the forms are not loaded from ES, are fetched on first use for all the
+    cases of the batch at once.
+    """
+
+    def __init__(self, domain):
+        self.domain = domain
+        self.xform_ids_by_case = {}
+        # {form id: ES form with timeEnd, or None when the form is not in ES or is invalid}
+        self.es_forms = {}
+        self.sql_forms = {}
+
+    def prefetch(self, cases):
+        """:param cases: case docs, as passed to the UCR data sources"""
+        for case in cases:
+            if 'xform_ids' in case:
+                self.xform_ids_by_case[case['_id']] = case['xform_ids']
+        self.get_es_forms({
+            form_id
+            for xform_ids in self.xform_ids_by_case.values()
+            for form_id in xform_ids
+        })
+
+    def get_es_forms(self, form_ids):
+        missing_ids = [form_id for form_id in form_ids if form_id not in self.es_forms]
+        for ids in chunked(missing_ids, ES_PREFETCH_CHUNK_SIZE):
+            self.es_forms.update(dict.fromkeys(ids))
+            self.es_forms.update({
+                form['_id']: form
+                for form in FormsInDateExpressionSpec._bulk_get_forms_from_elasticsearch(list(ids))
+            })
+        return [self.es_forms[form_id] for form_id in form_ids if self.es_forms[form_id] is not None]
+
+    def get_sql_forms(self, form_ids):
+        missing_ids = [form_id for form_id in form_ids if form_id not in self.sql_forms]
+        if missing_ids:
+            # the forms of the same types of the other cases of the batch will likely be needed next
+            xmlns = {self.es_forms[form_id]['xmlns'] for form_id in missing_ids if self.es_forms.get(form_id)}
+            missing_ids = set(missing_ids) | {
+                form_id for form_id, form in self.es_forms.items()
+                if form is not None and form['xmlns'] in xmlns and form_id not in self.sql_forms
+            }
+            self.sql_forms.update(dict.fromkeys(missing_ids))
+            self.sql_forms.update({
+                form.form_id: form for form in FormAccessors(self.domain).get_forms(list(missing_ids))
+            })
+        return [self.sql_forms[form_id] for form_id in form_ids if self.sql_forms[form_id] is not None]
+
+
+@contextmanager
+def prefetch_case_forms(domain, cases):
+    """Serves the `icds_get_case_forms_in_date` expressions evaluated inside the
+    block from forms fetched in bulk for the cases.
+
+    :param cases: case docs of the batch being processed
+    """
+    prefetch = CaseFormsPrefetch(domain)
+    prefetch.prefetch(cases)
+    previous = getattr(_case_forms_prefetch, 'value', None)
+    _case_forms_prefetch.value = prefetch
+    try:
+        yield prefetch
+    finally:
+        _case_forms_prefetch.value = previous
+
+
+def _get_case_forms_prefetch(domain):
+    prefetch = getattr(_case_forms_prefetch, 'value', None)
+    if prefetch is not None and prefetch.domain == domain:
+        return prefetch
+    return None
+
+
 class FormsInDateExpressionSpec(NoPropertyTypeCoercionMixIn, JsonObject):
     type = TypeProperty('icds_get_case_forms_in_date')
     case_id_expression = DefaultProperty(required=True)
@@ -167,7 +252,11 @@ class FormsInDateExpressionSpec(NoPropertyTypeCoercionMixIn, JsonObject):
 
         if not ICDS_UCR_ELASTICSEARCH_DOC_LOADING.enabled(case_id, NAMESPACE_OTHER):
             form_ids = [x['_id'] for x in xforms]
-            xforms = FormAccessors(domain).get_forms(form_ids)
+            prefetch = _get_case_forms_prefetch(domain)
+            if prefetch is not None:
+                xforms = prefetch.get_sql_forms(form_ids)
+            else:
+                xforms = FormAccessors(domain).get_forms(form_ids)
             xforms = FormsInDateExpressionSpec._get_form_json_list(case_id, xforms, context, domain)
 
         context.set_cache_value(cache_key, xforms)
@@ -182,7 +271,11 @@ class FormsInDateExpressionSpec(NoPropertyTypeCoercionMixIn, JsonObject):
             return context.get_cache_value(cache_key)
 
         source = True if es_toggle_enabled else ['form.meta.timeEnd', 'xmlns', '_id']
-        forms = FormsInDateExpressionSpec._bulk_get_forms_from_elasticsearch(xform_ids)
+        prefetch = _get_case_forms_prefetch(context.root_doc['domain'])
+        if prefetch is not None:
+            forms = prefetch.get_es_forms(xform_ids)
+        else:
+            forms = FormsInDateExpressionSpec._bulk_get_forms_from_elasticsearch(xform_ids)
         context.set_cache_value(cache_key, forms)
         return forms
 
@@ -193,7 +286,10 @@ class FormsInDateExpressionSpec(NoPropertyTypeCoercionMixIn, JsonObject):
             return context.get_cache_value(cache_key)
 
         domain = context.root_doc['domain']
-        if case_id != context.root_doc.get('_id') or 'xform_ids' not in context.root_doc:
+        prefetch = _get_case_forms_prefetch(domain)
+        if prefetch is not None and case_id in prefetch.xform_ids_by_case:
+            xform_ids = prefetch.xform_ids_by_case[case_id]
+        elif case_id != context.root_doc.get('_id') or 'xform_ids' not in context.root_doc:
             xform_ids = CaseAccessors(domain).get_case_xform_ids(case_id)
         else:
             xform_ids = context.root_doc.get('xform_ids')
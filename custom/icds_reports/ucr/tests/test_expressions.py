@@ -1,5 +1,6 @@
-from datetime import datetime
+from datetime import date, datetime
 import uuid
+from unittest import mock
 
 from django.test import SimpleTestCase, TestCase, override_settings
 
@@ -15,6 +16,7 @@ from corehq.pillows.mappings.xform_mapping import XFORM_INDEX_INFO
 from corehq.pillows.xform import transform_xform_for_elasticsearch
 from corehq.toggles import DynamicallyPredictablyRandomToggle, NAMESPACE_OTHER
 from custom.icds.icds_toggles import ICDS_UCR_ELASTICSEARCH_DOC_LOADING
+from custom.icds_reports.ucr.expressions import prefetch_case_forms
 from corehq.util.test_utils import generate_cases
 from corehq.util.elastic import ensure_index_deleted
 from pillowtop.es_utils import initialize_index_and_mapping
@@ -249,6 +251,61 @@ class TestFormsExpressionSpecWithFilterEsVersion(TestFormsExpressionSpecWithFilt
         super(TestFormsExpressionSpecWithFilterEsVersion, cls).tearDownClass()
 
 
+def _es_form(form_id, xmlns='xmlns-a', time_end='2020-06-10T10:00:00.000000Z'):
+    return {'_id': form_id, 'xmlns': xmlns, 'form': {'meta': {'timeEnd': time_end}}}
+
+
+@mock.patch.object(ICDS_UCR_ELASTICSEARCH_DOC_LOADING, 'enabled', return_value=True)
+class TestCaseFormsPrefetch(SimpleTestCase):
+    domain = 'icds-test'
+
+    def setUp(self):
+        es_forms = {
+            'f1': _es_form('f1'),
+            'f2': _es_form('f2', xmlns='xmlns-b'),
+            'f3': _es_form('f3', time_end='2020-08-10T10:00:00.000000Z'),
+            'f4': _es_form('f4', xmlns=None),
+        }
+        patcher = mock.patch(
+            'custom.icds_reports.ucr.expressions.mget_query',
+            side_effect=lambda index, ids: [es_forms[form_id] for form_id in ids if form_id in es_forms]
+        )
+        self.mget_query = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.cases = [
+            {'_id': 'c1', 'domain': self.domain, 'xform_ids': ['f1', 'f2'], 'to_date': date(2020, 7, 1)},
+            {'_id': 'c2', 'domain': self.domain, 'xform_ids': ['f3', 'f4', 'missing'], 'to_date': date(2020, 7, 1)},
+        ]
+
+    def _evaluate(self, case):
+        expression = ExpressionFactory.from_spec({
+            "type": "icds_get_case_forms_in_date",
+            "case_id_expression": {"type": "property_name", "property_name": "_id"},
+            "xmlns": ["xmlns-a"],
+            "to_date_expression": {"type": "property_name", "property_name": "to_date"},
+        })
+        return expression(case, EvaluationContext(case, 0))
+
+    def test_forms_of_the_batch_fetched_once(self, _):
+        with prefetch_case_forms(self.domain, self.cases) as prefetch:
+            self.assertEqual([form['_id'] for form in self._evaluate(self.cases[0])], ['f1'])
+            self.assertEqual(self._evaluate(self.cases[1]), [])
+        self.assertEqual(self.mget_query.call_count, 1)
+        self.assertEqual(set(prefetch.es_forms), {'f1', 'f2', 'f3', 'f4', 'missing'})
+        self.assertEqual(prefetch.es_forms['f3']['timeEnd'], date(2020, 8, 10))
+        self.assertIsNone(prefetch.es_forms['f4'])
+
+    def test_without_prefetch(self, _):
+        self.assertEqual([form['_id'] for form in self._evaluate(self.cases[0])], ['f1'])
+        self.assertEqual(self._evaluate(self.cases[1]), [])
+        self.assertEqual(self.mget_query.call_count, 2)
+
+    def test_other_domain_not_prefetched(self, _):
+        with prefetch_case_forms('other-domain', self.cases):
+            self._evaluate(self.cases[0])
+        self.assertEqual(self.mget_query.call_count, 2)
+
+
 class TestGetAppVersion(SimpleTestCase):
     def test_cases(self):
         expression = ExpressionFactory.from_spec({
@@ -1,12 +1,17 @@
 import copy
 import csv
+import io
 import json
+import multiprocessing
 import os
+import shutil
 import string
+import tempfile
 import time
 import zipfile
 
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta, date
 from dateutil.parser import parse
 from functools import wraps
@@ -61,6 +66,9 @@ import uuid
 from sqlagg.filters import EQ, NOT
 from pillowtop.models import KafkaCheckpoint
 from custom.icds_reports.cache import icds_quickcache
+from custom.icds_reports.utils.cache_warmup import set_filters_month, warm_up_candidate
+from custom.icds_reports.utils.map_aggregation import aggregate_by_map_location, get_fill_key, get_map_columns
+from custom.icds_reports.utils.streaming_export import write_export_tables
 
 OPERATORS = {
     "==": operator.eq,
@@ -83,6 +91,8 @@ DATA_NOT_ENTERED = "Data Not Entered"
 DEFAULT_VALUE = DATA_NOT_ENTERED
 DATA_NOT_VALID = "Data Not Valid"
 
+PDF_RENDER_PROCESSES = 4
+
 india_timezone = pytz.timezone('Asia/Kolkata')
 
 
@@ -155,9 +165,7 @@ class ICDSMixin(object):
 
     @property
     def sources(self):
-        path = (ICDS_APPS_ROOT,) + self.resource_file
-        with open(os.path.join(*path), encoding='utf-8') as f:
-            return json.loads(f.read())[self.slug]
+        return _load_resource_file(self.resource_file)[self.slug]
 
     @property
     @memoized
@@ -201,6 +209,9 @@ class ICDSMixin(object):
 
     def _custom_data(self, selected_location, domain):
         data = {}
+        # the rows of a UCR report are shared by the sections of the same MPR/ASR
+        # that read it with the same filters
+        report_data_cache = self.config.get('report_data_cache', {})
 
         for config in self.sources['data_source']:
             filters = {}
@@ -228,59 +239,99 @@ class ICDSMixin(object):
                             }
                         })
 
-            timer = TimingContext()
-            with timer:
-                allow_conditional_agg = self.allow_conditional_agg and not config.get('disallow_conditional_agg', False)
-                override_agg_column = location_type_column if allow_conditional_agg else None
-                report_data = ICDSData(domain, filters, config['id'], override_agg_column).data()
-            if selected_location:
-                loc_type = selected_location.location_type.name
-            else:
-                loc_type = None
-            tags = ["location_type:{}".format(loc_type), "report_slug:{}".format(self.slug), "config:{}".format(config['id'])]
-            if allow_conditional_agg:
-                tags.append("allow_conditional_agg:yes")
-
-            for column in config['columns']:
-                column_agg_func = column['agg_fun']
-                column_name = column['column_name']
-                column_data = 0
-                if column_agg_func == 'sum':
-                    column_data = sum([x.get(column_name, 0) or 0 for x in report_data])
-                elif column_agg_func == 'count':
-                    column_data = len(report_data)
-                elif column_agg_func == 'count_if':
-                    value = column['condition']['value']
-                    op = column['condition']['operator']
-
-                    def check_condition(v):
-                        if isinstance(v, str):
-                            fil_v = str(value)
-                        elif isinstance(v, int):
-                            fil_v = int(value)
-                        else:
-                            fil_v = value
-
-                        if op == "in":
-                            return OPERATORS[op](fil_v, v)
-                        else:
-                            return OPERATORS[op](v, fil_v)
-
-                    column_data = len([val for val in report_data if check_condition(val[column_name])])
-                elif column_agg_func == 'avg':
-                    values = [x.get(column_name, 0) for x in report_data]
-                    column_data = sum(values) / (len(values) or 1)
-                elif column_agg_func == 'last_value':
-                    group_by = column['group_by']
-                    awc_mapping = {x.get(group_by): x.get(column_name, 0) for x in report_data}
-                    column_data = sum(awc_mapping.values())
-                column_display = column_name if 'column_in_report' not in column else column['column_in_report']
+            allow_conditional_agg = self.allow_conditional_agg and not config.get('disallow_conditional_agg', False)
+            override_agg_column = location_type_column if allow_conditional_agg else None
+            cache_key = _get_report_data_cache_key(config, selected_location, override_agg_column)
+            if cache_key not in report_data_cache:
+                report_data_cache[cache_key] = ICDSData(domain, filters, config['id'], override_agg_column).data()
+            report_data = report_data_cache[cache_key]
+
+            for column_display, column_data in aggregate_report_data(config['columns'], report_data):
                 data.update({
                     column_display: data.get(column_display, 0) + column_data
                 })
         return data
 
 
+@memoized
+def _load_resource_file(resource_file):
+    path = (ICDS_APPS_ROOT,) + resource_file
+    with open(os.path.join(*path), encoding='utf-8') as f:
+        return json.loads(f.read())
+
+
+def _get_report_data_cache_key(config, selected_location, override_agg_column):
+    report_filters = {key: value for key, value in config.items() if key != 'columns'}
+    return (
+        json.dumps(report_filters, sort_keys=True),
+        selected_location.location_id if selected_location else None,
+        override_agg_column,
+    )
+
+
+class _CustomDataColumn(object):
+    """A column of an MPR/ASR section, aggregating a column of the rows of a UCR report"""
+
+    def __init__(self, column):
+        self.agg_fun = column['agg_fun']
+        self.column_name = column['column_name']
+        self.column_display = column.get('column_in_report', self.column_name)
+        self.group_by = column.get('group_by')
+        self.condition = column.get('condition')
+        self.value = 0
+        self.count = 0
+        self.values_by_group = {}
+
+    def check_condition(self, v):
+        value = self.condition['value']
+        op = self.condition['operator']
+        if isinstance(v, str):
+            fil_v = str(value)
+        elif isinstance(v, int):
+            fil_v = int(value)
+        else:
+            fil_v = value
+
+        if op == "in":
+            return OPERATORS[op](fil_v, v)
+        else:
+            return OPERATORS[op](v, fil_v)
+
+    def add(self, row):
+        self.count += 1
+        if self.agg_fun == 'sum':
+            self.value += row.get(self.column_name, 0) or 0
+        elif self.agg_fun == 'count_if':
+            if self.check_condition(row[self.column_name]):
+                self.value += 1
+        elif self.agg_fun == 'avg':
+            self.value += row.get(self.column_name, 0)
+        elif self.agg_fun == 'last_value':
+            self.values_by_group[row.get(self.group_by)] = row.get(self.column_name, 0)
+
+    @property
+    def result(self):
+        if self.agg_fun == 'count':
+            return self.count
+        elif self.agg_fun == 'avg':
+            return self.value / (self.count or 1)
+        elif self.agg_fun == 'last_value':
+            return sum(self.values_by_group.values())
+        return self.value
+
+
+def aggregate_report_data(columns, report_data):
+    """Aggregates the rows of a UCR report for all the columns of an MPR/ASR section at once
+
+    :returns: [(column name in the section, value)], in the order of `columns`
+    """
+    data_columns = [_CustomDataColumn(column) for column in columns]
+    for row in report_data:
+        for data_column in data_columns:
+            data_column.add(row)
+    return [(data_column.column_display, data_column.result) for data_column in data_columns]
+
+
 class ICDSDataTableColumn(DataTablesColumn):
 
     @property
@@ -584,64 +635,19 @@ def include_records_by_age_for_column(include_config, column):
 
 def generate_data_for_map(data, loc_level, num_prop, denom_prop, fill_key_lower, fill_key_bigger,
                           all_property=None, location_launched_status=None):
-    data_for_map = defaultdict(lambda: {
-        num_prop: 0,
-        denom_prop: 0,
-        'original_name': []
-    })
-
+    columns = [num_prop, denom_prop]
     if all_property:
-        data_for_map = defaultdict(lambda: {
-            num_prop: 0,
-            denom_prop: 0,
-            'original_name': [],
-            all_property: 0
-        })
-
-    valid_total = 0
-    in_month_total = 0
-    total = 0
-    values_to_calculate_average = {'numerator': 0, 'denominator': 0}
-
-
-    for row in data:
-        if location_launched_status is not None:
-            launched_status = location_launched_status.get(row['%s_name' % loc_level])
-            if launched_status is None or launched_status <= 0:
-                continue
-        valid = row[denom_prop] or 0
-        name = row['%s_name' % loc_level]
-        on_map_name = row['%s_map_location_name' % loc_level] or name
-        in_month = row[num_prop] or 0
-
-        values_to_calculate_average['numerator'] += in_month if in_month else 0
-        values_to_calculate_average['denominator'] += row[denom_prop] if row[denom_prop] else 0
-
-        valid_total += valid
-        in_month_total += in_month
-        if all_property:
-            all_data = row[all_property] or 0
-            data_for_map[on_map_name][all_property] += all_data
-            total += all_data
-        data_for_map[on_map_name][num_prop] += in_month
-        data_for_map[on_map_name][denom_prop] += valid
-        data_for_map[on_map_name]['original_name'].append(name)
+        columns.append(all_property)
+    data_for_map, totals = aggregate_by_map_location(
+        get_map_columns(data, loc_level, columns, location_launched_status)
+    )
 
     for data_for_location in data_for_map.values():
         value = data_for_location[num_prop] * 100 / (data_for_location[denom_prop] or 1)
-        fill_format = '%s%%-%s%%'
-        if value < fill_key_lower:
-            data_for_location.update({'fillKey': (fill_format % (0, fill_key_lower))})
-        elif fill_key_lower <= value < fill_key_bigger:
-            data_for_location.update({'fillKey': (fill_format % (fill_key_lower, fill_key_bigger))})
-        elif value >= fill_key_bigger:
-            data_for_location.update({'fillKey': (fill_format % (fill_key_bigger, 100))})
-
-    average = (
-        (values_to_calculate_average['numerator'] * 100) /
-        float(values_to_calculate_average['denominator'] or 1)
-    )
-    return data_for_map, valid_total, in_month_total, average, total
+        data_for_location['fillKey'] = get_fill_key(value, fill_key_lower, fill_key_bigger)
+
+    average = totals[num_prop] * 100 / float(totals[denom_prop] or 1)
+    return data_for_map, totals[denom_prop], totals[num_prop], average, totals.get(all_property, 0)
 
 
 def calculate_date_for_age(dob, date):
@@ -689,24 +695,22 @@ def chosen_filters_to_labels(config, default_interval=''):
     return gender_label, chosen_age, chosen_filters
 
 
-def zip_folder(pdf_files):
+def create_pdf_zip_file(pdf_files, progress_callback=None):
+    """Writes the PDFs to a zip on disk as they are generated and stores it in blobdb
+
+    :param pdf_files: iterable of (file name, PDF content)
+    :param progress_callback: called with the number of PDFs written so far
+    """
     zip_hash = uuid.uuid4().hex
     icds_file = IcdsFile(blob_id=zip_hash, data_type='issnip_monthly')
-    in_memory = BytesIO()
-    zip_file = zipfile.ZipFile(in_memory, 'w', zipfile.ZIP_DEFLATED)
-    files_to_zip = IcdsFile.objects.filter(blob_id__in=list(pdf_files.keys()), data_type='issnip_monthly')
-
-    for pdf_file in files_to_zip:
-        zip_file.writestr(
-            'ICDS_CAS_monthly_register_{}.pdf'.format(pdf_files[pdf_file.blob_id]),
-            pdf_file.get_file_from_blobdb().read()
-        )
-    zip_file.close()
-
-    # we need to reset buffer position to the beginning after creating zip, if not read() will return empty string
-    # we read this to save file in blobdb
-    in_memory.seek(0)
-    icds_file.store_file_in_blobdb(in_memory, expired=ONE_DAY)
+    with TransientTempfile() as path:
+        with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as zip_file:
+            for index, (file_name, pdf) in enumerate(pdf_files, 1):
+                zip_file.writestr(file_name, pdf)
+                if progress_callback:
+                    progress_callback(index)
+        with open(path, 'rb') as zip_file:
+            icds_file.store_file_in_blobdb(zip_file, expired=ONE_DAY)
     icds_file.save()
     return zip_hash
 
@@ -722,25 +726,60 @@ def create_excel_file(excel_data, data_type, file_format, blob_key=None, timeout
     return key
 
 
-def create_pdf_file(pdf_context):
-    from custom.icds.const import ICDS_APPS_ROOT
+def create_streaming_excel_file(excel_data, data_type, file_format, blob_key=None, timeout=ONE_DAY):
+    """Same as `create_excel_file` for exports whose rows are generated while the file is
+    written (see `ExportableMixin.get_streaming_excel_data`). The rows are written one by one
+    to a temporary file that is then uploaded to blobdb, so they are never all in memory.
+    """
+    key = blob_key or uuid.uuid4().hex
+    icds_file, _ = IcdsFile.objects.get_or_create(blob_id=key, data_type=data_type)
+    with TransientTempfile() as path:
+        with open(path, 'wb') as export_file:
+            write_export_tables(excel_data, export_file, file_format)
+        with open(path, 'rb') as export_file:
+            icds_file.store_file_in_blobdb(export_file, expired=timeout)
+    icds_file.save()
+    return key
 
-    pdf_hash = uuid.uuid4().hex
+
+def _get_pdf_base_url():
+    return os.path.join(ICDS_APPS_ROOT, 'icds_reports', 'static')
+
+
+@memoized
+def _get_pdf_stylesheet():
+    # parsed once per process instead of once per PDF
+    return CSS(os.path.join(_get_pdf_base_url(), 'css', 'issnip_monthly_print_style.css'))
+
+
+def render_pdf_page(pdf_context):
     template = get_template("icds_reports/icds_app/pdf/issnip_monthly_register.html")
-    resultFile = BytesIO()
-    icds_file = IcdsFile(blob_id=pdf_hash, data_type='issnip_monthly')
     try:
-        pdf_page = template.render(pdf_context)
+        return template.render(pdf_context)
     except Exception as ex:
-        pdf_page = str(ex)
-    base_url = os.path.join(ICDS_APPS_ROOT, 'icds_reports', 'static')
-    resultFile.write(HTML(string=pdf_page, base_url=base_url).write_pdf(
-        stylesheets=[CSS(os.path.join(base_url, 'css', 'issnip_monthly_print_style.css')), ])
-    )
-    # we need to reset buffer position to the beginning after creating pdf, if not read() will return empty string
-    # we read this to save file in blobdb
-    resultFile.seek(0)
+        return str(ex)
+
+
+def write_pdf(pdf_page):
+    return HTML(string=pdf_page, base_url=_get_pdf_base_url()).write_pdf(stylesheets=[_get_pdf_stylesheet()])
+
+
+def iter_pdfs(pdf_pages, processes=PDF_RENDER_PROCESSES):
+    """Yields the PDF of each of the rendered pages, in order, writing them in a pool of processes
+
+    The PDFs are written in the current process when it cannot start processes of its own.
+    """
+    if processes > 1 and len(pdf_pages) > 1 and not multiprocessing.current_process().daemon:
+        with ProcessPoolExecutor(processes) as executor:
+            yield from executor.map(write_pdf, pdf_pages)
+    else:
+        yield from map(write_pdf, pdf_pages)
 
+
+def create_pdf_file(pdf_context):
+    pdf_hash = uuid.uuid4().hex
+    icds_file = IcdsFile(blob_id=pdf_hash, data_type='issnip_monthly')
+    resultFile = BytesIO(write_pdf(render_pdf_page(pdf_context)))
     icds_file.store_file_in_blobdb(resultFile, expired=ONE_DAY)
     icds_file.save()
     return pdf_hash
@@ -2322,7 +2361,7 @@ def phone_number_function(x):
 def filter_cas_data_export(export_file, location):
     with TransientTempfile() as path:
         with open(path, 'wb') as temp_file:
-            temp_file.write(export_file.get_file_from_blobdb().read())
+            shutil.copyfileobj(export_file.get_file_from_blobdb(), temp_file)
         with open(path, 'r') as temp_file:
             fd, export_file_path = mkstemp()
             csv_file = os.fdopen(fd, 'w')
@@ -2342,6 +2381,79 @@ def filter_cas_data_export(export_file, location):
         return export_file_path
 
 
+def split_csv_by_column(csv_file, column, directory):
+    """Splits a CSV file in one file per value of the column, in a single pass
+
+    :param csv_file: text file object of the CSV, with headers
+    :return: {value: path of the CSV file of the rows with that value}
+    """
+    reader = csv.reader(csv_file)
+    headers = next(reader, None)
+    if headers is None or column not in headers:
+        return {}
+    column_index = headers.index(column)
+    files = {}
+    writers = {}
+    try:
+        for row in reader:
+            value = row[column_index]
+            if value not in writers:
+                files[value] = open(os.path.join(directory, f'{column}-{len(files)}.csv'), 'w', newline='')
+                writers[value] = csv.writer(files[value])
+                writers[value].writerow(headers)
+            writers[value].writerow(row)
+    finally:
+        for partition_file in files.values():
+            partition_file.close()
+    return {value: partition_file.name for value, partition_file in files.items()}
+
+
+def store_cas_data_export_partitions(export_file, data_type, state_id, month, expired=None):
+    """Stores the rows of each district and block of the state MBT export in their own file,
+    under the blob ids the sub-state CAS data exports look for, so they are served without
+    filtering the state file.
+
+    :param export_file: binary file object of the CSV export of the state
+    """
+    district_ids = defaultdict(list)
+    block_ids = defaultdict(list)
+    descendants = SQLLocation.objects.get(location_id=state_id).get_descendants().filter(
+        location_type__name__in=['district', 'block']
+    ).values_list('location_type__name', 'name', 'parent__location_id', 'location_id')
+    for location_type, name, parent_id, location_id in descendants:
+        if location_type == 'district':
+            district_ids[name].append(location_id)
+        else:
+            block_ids[(parent_id, name)].append(location_id)
+
+    def _store(location_id, path):
+        with open(path, 'rb') as partition_file:
+            icds_file, _ = IcdsFile.objects.get_or_create(
+                blob_id=f'{data_type}-{location_id}-{month}',
+                data_type=f'mbt_{data_type}'
+            )
+            icds_file.store_file_in_blobdb(partition_file, expired=expired)
+            icds_file.save()
+
+    with tempfile.TemporaryDirectory() as directory:
+        export_file.seek(0)
+        csv_file = io.TextIOWrapper(export_file, encoding='utf-8', newline='')
+        try:
+            district_files = split_csv_by_column(csv_file, 'district_name', directory)
+        finally:
+            csv_file.detach()
+        for district_name, district_path in district_files.items():
+            for district_id in district_ids.get(district_name, []):
+                _store(district_id, district_path)
+                with open(district_path, newline='') as district_file:
+                    block_files = split_csv_by_column(district_file, 'block_name', directory)
+                for block_name, block_path in block_files.items():
+                    for block_id in block_ids.get((district_id, block_name), []):
+                        _store(block_id, block_path)
+                    os.remove(block_path)
+            os.remove(district_path)
+
+
 def prepare_rollup_query(columns_tuples):
     def _columns_and_calculations(column_tuple):
         column = column_tuple[0]
@@ -2460,6 +2572,7 @@ def get_location_replacement_name(location, field, replacement_names):
     return [replacement_names.get(loc_id, '') for loc_id in locations]
 
 
+@warm_up_candidate(set_filters_month)
 @icds_quickcache(['filters', 'loc_name'], timeout=30 * 60)
 def get_location_launched_status(filters, loc_name):
     from custom.icds_reports.models import AggAwcMonthly
@@ -0,0 +1,60 @@
+import logging
+
+from django.db import DatabaseError, connections, router, transaction
+
+from custom.icds_reports.utils.aggregation_profiling import profile_aggregation
+
+logger = logging.getLogger(__name__)
+
+
+class StatementRecorder(object):
+    """Stands in for a cursor and records the statements an aggregation helper
+    would execute, so that they can be sent to the database in a single round trip.
+
+    Only usable with helpers that do not read query results in `aggregate`.
+    """
+
+    def __init__(self):
+        self.statements = []
+
+    def execute(self, sql, params=None):
+        self.statements.append((sql, params))
+
+
+def get_batch_sql(cursor, statements):
+    """Returns the statements as a single SQL string with the parameters bound"""
+    return ';\n'.join(
+        cursor.mogrify(sql, params).decode('utf-8')
+        for sql, params in statements
+    )
+
+
+def aggregate_state_helpers(models, state_id, month):
+    """Runs the aggregation helpers of the models for one state on a single connection
+    and in a single transaction.
+
+    The statements of each helper are sent as one batch inside a savepoint, so a
+    failing helper is rolled back on its own and the others are still committed.
+
+    :param models: list of (func_name, AggregateMixin model)
+    :return: {func_name: exception} for the helpers that failed
+    """
+    failures = {}
+    db_alias = router.db_for_write(models[0][1])
+    with transaction.atomic(using=db_alias), connections[db_alias].cursor() as cursor:
+        for func_name, model in models:
+            if router.db_for_write(model) != db_alias:
+                raise ValueError(f'{model.__name__} is not stored in {db_alias}')
+
+            helper = model._agg_helper_cls(state_id, month)
+            recorder = StatementRecorder()
+            helper.aggregate(recorder)
+            logger.info(f'Starting batched aggregation for {helper.helper_key} month {month} and state {state_id}')
+            try:
+                with transaction.atomic(using=db_alias), \
+                        profile_aggregation(cursor, helper.helper_key, helper.month, state_id) as profiled_cursor:
+                    profiled_cursor.execute(get_batch_sql(cursor, recorder.statements))
+            except DatabaseError as exc:
+                logger.exception(f'Batched aggregation failed for {helper.helper_key} and state {state_id}')
+                failures[func_name] = exc
+    return failures
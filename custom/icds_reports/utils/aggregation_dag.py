@@ -0,0 +1,228 @@
+import logging
+import time
+
+import attr
+
+logger = logging.getLogger(__name__)
+
+SINGLE_STATE = 'single'
+ALL_STATES = 'all'
+NO_STATES = 'none'
+
+
+class AggregationDAGError(Exception):
+    pass
+
+
+@attr.s(frozen=True)
+class AggregationStep(object):
+    """A single aggregation helper in the dependency graph
+
+    Attributes:
+        name - The func_name passed to `icds_aggregation_task`/`icds_state_aggregation_task`
+        by_state - SINGLE_STATE if the step runs once per state, ALL_STATES if it runs once
+                   with the list of all states and NO_STATES if it takes no state argument
+        depends_on - Names of the steps that must finish before this one starts
+        previous_month_depends_on - Names of the steps of the previous month, on top of
+                                    this step itself, that must finish before this one
+                                    starts when several months are aggregated together
+        func_name - The func_name to run, defaults to the name of the step
+        month - The date to aggregate if the step is part of a multi month graph
+    """
+    name = attr.ib()
+    by_state = attr.ib(default=NO_STATES)
+    depends_on = attr.ib(default=(), converter=tuple)
+    previous_month_depends_on = attr.ib(default=(), converter=tuple)
+    func_name = attr.ib(default=attr.Factory(lambda step: step.name, takes_self=True))
+    month = attr.ib(default=None)
+
+
+class AggregationDAG(object):
+    """Declarative dependency graph of the aggregation steps for one month.
+
+    Every step is split into partitions keyed by (step name, state id). Steps that
+    run per state have one partition per state, all other steps have a single partition
+    with a state id of None. A per state step only waits for the partitions of its
+    upstream steps for the same state, so a slow state does not hold back the others.
+    """
+
+    def __init__(self, steps):
+        self.steps = {step.name: step for step in steps}
+        for step in steps:
+            unknown = set(step.depends_on) - set(self.steps)
+            if unknown:
+                raise AggregationDAGError(f'{step.name} depends on unknown steps {sorted(unknown)}')
+        self.ordered_steps = self._topological_order()
+
+    def _topological_order(self):
+        ordered = []
+        visiting = set()
+        visited = set()
+
+        def visit(name):
+            if name in visited:
+                return
+            if name in visiting:
+                raise AggregationDAGError(f'Dependency cycle found at {name}')
+            visiting.add(name)
+            for upstream in self.steps[name].depends_on:
+                visit(upstream)
+            visiting.remove(name)
+            visited.add(name)
+            ordered.append(self.steps[name])
+
+        for name in self.steps:
+            visit(name)
+        return ordered
+
+    def for_months(self, months, pipelined=True):
+        """Returns a single graph with the steps of every month, ordered by month.
+
+        If `pipelined` each step of a month only waits for the same step and its
+        `previous_month_depends_on` steps of the previous month, so that months
+        overlap. Otherwise a month starts once the previous month has finished.
+        """
+        steps = []
+        for i, month in enumerate(months):
+            for step in self.ordered_steps:
+                depends_on = [_month_step_name(name, month) for name in step.depends_on]
+                if i and pipelined:
+                    depends_on.extend(
+                        _month_step_name(name, months[i - 1])
+                        for name in (step.name,) + step.previous_month_depends_on
+                    )
+                elif i and not step.depends_on:
+                    depends_on.extend(_month_step_name(name, months[i - 1]) for name in self.steps)
+                steps.append(attr.evolve(
+                    step,
+                    name=_month_step_name(step.name, month),
+                    depends_on=depends_on,
+                    previous_month_depends_on=(),
+                    month=month,
+                ))
+        return AggregationDAG(steps)
+
+    def partitions(self, state_ids):
+        partitions = []
+        for step in self.ordered_steps:
+            if step.by_state == SINGLE_STATE:
+                partitions.extend((step.name, state_id) for state_id in state_ids)
+            else:
+                partitions.append((step.name, None))
+        return partitions
+
+    def upstream_partitions(self, partition, state_ids):
+        name, state_id = partition
+        step = self.steps[name]
+        upstream = []
+        for upstream_name in step.depends_on:
+            if self.steps[upstream_name].by_state != SINGLE_STATE:
+                upstream.append((upstream_name, None))
+            elif step.by_state == SINGLE_STATE:
+                upstream.append((upstream_name, state_id))
+            else:
+                upstream.extend((upstream_name, upstream_state) for upstream_state in state_ids)
+        return upstream
+
+
+def _month_step_name(name, month):
+    return f'{name}@{month:%Y-%m}'
+
+
+class SkippedPartitionResult(object):
+    """Stands in for the result of a partition that did not need to be run"""
+
+    def ready(self):
+        return True
+
+    def get(self, disable_sync_subtasks=True):
+        return None
+
+
+@attr.s
+class PartitionTiming(object):
+    started = attr.ib()
+    finished = attr.ib(default=None)
+
+    @property
+    def duration(self):
+        return self.finished - self.started
+
+
+class AggregationDAGRun(object):
+    """Runs the partitions of an AggregationDAG as soon as their upstream partitions finish
+
+    :param submit: callable taking (step, state_id) that starts the partition and returns
+                   a celery AsyncResult (or anything exposing `ready` and `get`)
+    :param max_running: maximum number of partitions running at the same time, to
+                        avoid overloading the database. No limit if None.
+    """
+
+    def __init__(self, dag, state_ids, submit, poll_interval=10, clock=time.time, max_running=None):
+        self.dag = dag
+        self.state_ids = state_ids
+        self.submit = submit
+        self.poll_interval = poll_interval
+        self.clock = clock
+        self.max_running = max_running
+        self.timings = {}
+
+    def run(self):
+        pending = self.dag.partitions(self.state_ids)
+        upstream = {
+            partition: self.dag.upstream_partitions(partition, self.state_ids)
+            for partition in pending
+        }
+        running = {}
+        while pending or running:
+            for partition in [p for p in pending if self._is_ready(upstream[p])]:
+                if self.max_running and len(running) >= self.max_running:
+                    break
+                name, state_id = partition
+                logger.info(f'Submitting aggregation step {name} for state {state_id}')
+                self.timings[partition] = PartitionTiming(started=self.clock())
+                running[partition] = self.submit(self.dag.steps[name], state_id)
+                pending.remove(partition)
+
+            if not running:
+                raise AggregationDAGError(f'No aggregation steps can be started: {pending}')
+
+            finished = [partition for partition, result in running.items() if result.ready()]
+            for partition in finished:
+                # re-raises the exception if the partition failed
+                running.pop(partition).get(disable_sync_subtasks=False)
+                self.timings[partition].finished = self.clock()
+            if not finished:
+                time.sleep(self.poll_interval)
+
+        return self.critical_path()
+
+    def _is_ready(self, upstream):
+        return all(
+            partition in self.timings and self.timings[partition].finished is not None
+            for partition in upstream
+        )
+
+    def critical_path(self):
+        """Returns the chain of partitions that determined the total run time as a list of
+        (step name, state id, seconds). Each partition's critical predecessor is the upstream
+        partition that finished last.
+        """
+        if not self.timings:
+            return []
+
+        path = []
+        partition = max(self.timings, key=lambda p: self.timings[p].finished)
+        while partition:
+            name, state_id = partition
+            path.append((name, state_id, self.timings[partition].duration))
+            upstream = self.dag.upstream_partitions(partition, self.state_ids)
+            partition = max(upstream, key=lambda p: self.timings[p].finished, default=None)
+        return list(reversed(path))
+
+
+def format_critical_path(critical_path):
+    return ' -> '.join(
+        '{}{} ({:.0f}s)'.format(name, f'[{state_id}]' if state_id else '', duration)
+        for name, state_id, duration in critical_path
+    )
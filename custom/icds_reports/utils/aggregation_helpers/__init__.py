@@ -29,8 +29,16 @@ def get_agg_child_temp_tablename():
     return 'tmp_agg_child_health_5'
 
 
-def get_prev_agg_tablename(table_alias):
-    return f'{table_alias}_prev'
+def get_prev_agg_tablename(table_alias, month=None):
+    if month is None:
+        return f'{table_alias}_prev'
+    return f'{table_alias}_prev_{month:%Y%m}'
+
+
+def get_prev_local_tablename(table_alias, month=None):
+    if month is None:
+        return f'{table_alias}_prev_local'
+    return f'{table_alias}_prev_local_{month:%Y%m}'
 
 
 def is_current_month(month):
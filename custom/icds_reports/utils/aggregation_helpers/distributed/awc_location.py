@@ -1,6 +1,10 @@
 import csv
 import io
 import json
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db import transaction
 
 from corehq.apps.locations.models import SQLLocation
 from corehq.apps.userreports.models import (
@@ -8,11 +12,14 @@ from corehq.apps.userreports.models import (
     get_datasource_config,
 )
 from corehq.apps.userreports.util import get_table_name
+from custom.icds.icds_toggles import ICDS_INCREMENTAL_AGGREGATION
 from custom.icds_reports.const import AWW_USER_TABLE_ID
 from custom.icds_reports.utils.aggregation_helpers.distributed.base import (
     BaseICDSAggregationDistributedHelper,
 )
 
+LOCATION_CHECKPOINT_OVERLAP = timedelta(hours=1)
+
 
 class LocationAggregationDistributedHelper(BaseICDSAggregationDistributedHelper):
     helper_key = 'location'
@@ -22,8 +29,8 @@ class LocationAggregationDistributedHelper(BaseICDSAggregationDistributedHelper)
 
     ucr_aww_table = AWW_USER_TABLE_ID
 
-    def __init__(self):
-        pass
+    def __init__(self, full_rebuild=False):
+        self.full_rebuild = full_rebuild
 
     @property
     def _table_column_names(self):
@@ -36,13 +43,14 @@ class LocationAggregationDistributedHelper(BaseICDSAggregationDistributedHelper)
             'aggregation_level', 'awc_deprecates', 'awc_deprecated_at', 'supervisor_deprecates', 'supervisor_deprecated_at'
         )
 
-    def generate_csv(self):
-        domain_locations = _get_all_locations_for_domain(self.domain)
-        locations_by_pk = {
-            loc['pk']: loc
-            for loc in domain_locations
-        }
-        locations = [loc for loc in domain_locations if loc['location_type__code'] == 'awc']
+    def generate_csv(self, domain_locations=None, modified_since=None):
+        """Writes the AWC rows of the location table
+
+        When `modified_since` is passed only the AWCs that, or whose ancestors,
+        were modified since then are written.
+        """
+        if domain_locations is None:
+            domain_locations = _get_all_locations_for_domain(self.domain)
 
         output = io.StringIO()
         writer = csv.DictWriter(
@@ -50,50 +58,31 @@ class LocationAggregationDistributedHelper(BaseICDSAggregationDistributedHelper)
             delimiter='\t', escapechar='\\', lineterminator='\n'
         )
         writer.writeheader()
-
-        for location in locations:
-            metadata = json.loads(location['metadata'])
-            # We strip newlines from the names because in the dashboard the names
-            # are displayed without newlines and it keeps the CSV import/export
-            # logic simpler between python and postgres
-            loc = {
-                'aggregation_level': 5,
-                'doc_id': location['location_id'],
-                'awc_name': location['name'].replace("\n", ""),
-                'awc_site_code': location['site_code'],
-                'awc_is_test': 1 if metadata.get('is_test_location') == 'test' else 0,
-                'awc_deprecates': metadata.get('deprecates'),
-                'awc_deprecated_at': metadata.get("deprecated_at"),
-            }
-
-            current_location = location
-            while current_location['parent_id']:
-                current_location = locations_by_pk[current_location['parent_id']]
-                loc_type = current_location['location_type__code']
-                metadata = json.loads(current_location['metadata'])
-                loc.update({
-                    '{}_id'.format(loc_type): current_location['location_id'],
-                    '{}_name'.format(loc_type): current_location['name'].replace("\n", ""),
-                    '{}_site_code'.format(loc_type): current_location['site_code'],
-                    '{}_is_test'.format(loc_type): 1 if metadata.get('is_test_location') == 'test' else 0,
-                })
-                if loc_type == 'supervisor':
-                    loc.update({
-                        'supervisor_deprecates': metadata.get('deprecates'),
-                        'supervisor_deprecated_at': metadata.get("deprecated_at"),
-                    })
-                if loc_type in ('block', 'district', 'state'):
-                    loc.update({
-                        '{}_map_location_name'.format(loc_type): metadata.get('map_location_name'),
-                    })
-
-            writer.writerow(loc)
+        for row in _get_awc_rows(domain_locations, modified_since):
+            writer.writerow(row)
 
         output.seek(0)
         return output
 
     def aggregate(self, cursor):
-        location_csv = self.generate_csv()
+        domain_locations = list(_get_all_locations_for_domain(self.domain))
+        checkpoint = get_location_checkpoint(self.domain)
+        incremental = (
+            not self.full_rebuild
+            and checkpoint is not None
+            and ICDS_INCREMENTAL_AGGREGATION.enabled(self.domain)
+        )
+        if not incremental or not self.aggregate_modified_locations(cursor, domain_locations, checkpoint):
+            self.rebuild(cursor, domain_locations)
+
+        if domain_locations:
+            new_checkpoint = max(location['last_modified'] for location in domain_locations)
+            transaction.on_commit(
+                lambda: set_location_checkpoint(self.domain, new_checkpoint), using=cursor.db.alias
+            )
+
+    def rebuild(self, cursor, domain_locations):
+        location_csv = self.generate_csv(domain_locations)
 
         cursor.execute(self.drop_temporary_table_query())
         cursor.execute(self.create_temporary_table_query())
@@ -107,6 +96,54 @@ class LocationAggregationDistributedHelper(BaseICDSAggregationDistributedHelper)
         cursor.execute(self.move_data_to_local_table())
         cursor.execute(self.create_distributed_table())
 
+    def aggregate_modified_locations(self, cursor, domain_locations, checkpoint):
+        """Replaces the AWCs modified since the checkpoint and recomputes the rollups
+        of their states only.
+
+        Returns False, leaving the base table untouched, when the AWCs in the
+        local table do not match the domain's anymore, e.g. after locations were
+        deleted, in which case a full rebuild is needed.
+        """
+        awc_ids = {
+            location['location_id'] for location in domain_locations if location['location_type__code'] == 'awc'
+        }
+        cursor.execute(self.awc_doc_ids_query())
+        if any(row[0] not in awc_ids for row in cursor.fetchall()):
+            return False
+
+        # locations saved in transactions that were still open when the last
+        # checkpoint was taken can have an older last_modified
+        modified_since = checkpoint - LOCATION_CHECKPOINT_OVERLAP
+        location_csv = self.generate_csv(domain_locations, modified_since)
+
+        cursor.execute(self.drop_temporary_table_query())
+        cursor.execute(self.create_temporary_table_query())
+        self.aggregate_to_temporary_table(cursor, location_csv)
+        cursor.execute(self.aww_query())
+
+        cursor.execute(self.modified_state_ids_query())
+        state_ids = {row[0] for row in cursor.fetchall()}
+        cursor.execute(self.aww_modified_state_ids_query())
+        state_ids.update(row[0] for row in cursor.fetchall())
+        state_ids = sorted(filter(None, state_ids))
+
+        cursor.execute(self.delete_modified_locations_query())
+        cursor.execute(self.move_data_to_local_table())
+        cursor.execute(self.aww_query(self.local_tablename, modified_only=True))
+        if state_ids:
+            cursor.execute(self.delete_rollups_query(), [state_ids])
+            for aggregation_level in range(4, 0, -1):
+                cursor.execute(self.rollup_query(aggregation_level, self.local_tablename, by_state=True), [state_ids])
+
+        cursor.execute(self.awc_count_query())
+        if cursor.fetchone()[0] != len(awc_ids):
+            return False
+
+        if state_ids:
+            cursor.execute(self.delete_distributed_rows_query(), [state_ids])
+            cursor.execute(self.copy_to_distributed_table_query(), [state_ids])
+        return True
+
     @property
     def ucr_aww_tablename(self):
         return get_table_name(self.domain, self.ucr_aww_table)
@@ -185,9 +222,15 @@ class LocationAggregationDistributedHelper(BaseICDSAggregationDistributedHelper)
             calculations=", ".join([col[1] for col in columns]),
         )
 
-    def aww_query(self):
+    def aww_query(self, tablename=None, modified_only=False):
+        modified_filter = """
+              AND (awc_loc.aww_name, awc_loc.contact_phone_number,
+                   awc_loc.awc_ward_1, awc_loc.awc_ward_2, awc_loc.awc_ward_3)
+              IS DISTINCT FROM (ut.aww_name, ut.contact_phone_number, ut.awc_ward_1, ut.awc_ward_2, ut.awc_ward_3)
+              AND awc_loc.aggregation_level = 5
+        """ if modified_only else ""
         return """
-            UPDATE {temporary_tablename} awc_loc SET
+            UPDATE "{tablename}" awc_loc SET
               aww_name = ut.aww_name,
               contact_phone_number = ut.contact_phone_number,
               awc_ward_1 = ut.awc_ward_1,
@@ -203,13 +246,69 @@ class LocationAggregationDistributedHelper(BaseICDSAggregationDistributedHelper)
                 awc_ward_3
               FROM "{ucr_aww_tablename}"
             ) ut
-            WHERE ut.commcare_location_id = awc_loc.doc_id
+            WHERE ut.commcare_location_id = awc_loc.doc_id {modified_filter}
+        """.format(
+            tablename=tablename or self.temporary_tablename,
+            ucr_aww_tablename=self.ucr_aww_tablename,
+            modified_filter=modified_filter,
+        )
+
+    def modified_state_ids_query(self):
+        # the states the modified AWCs were in and the ones they are in now
+        return """
+            SELECT state_id FROM "{local_tablename}"
+            WHERE aggregation_level = 5 AND doc_id IN (SELECT doc_id FROM "{temporary_tablename}")
+            UNION
+            SELECT state_id FROM "{temporary_tablename}"
         """.format(
+            local_tablename=self.local_tablename,
             temporary_tablename=self.temporary_tablename,
-            ucr_aww_tablename=self.ucr_aww_tablename
         )
 
-    def rollup_query(self, aggregation_level):
+    def aww_modified_state_ids_query(self):
+        return """
+            SELECT DISTINCT awc_loc.state_id
+            FROM "{local_tablename}" awc_loc
+            JOIN "{ucr_aww_tablename}" ut ON ut.commcare_location_id = awc_loc.doc_id
+            WHERE awc_loc.aggregation_level = 5
+              AND (awc_loc.aww_name, awc_loc.contact_phone_number,
+                   awc_loc.awc_ward_1, awc_loc.awc_ward_2, awc_loc.awc_ward_3)
+              IS DISTINCT FROM (ut.aww_name, ut.contact_phone_number, ut.awc_ward_1, ut.awc_ward_2, ut.awc_ward_3)
+        """.format(
+            local_tablename=self.local_tablename,
+            ucr_aww_tablename=self.ucr_aww_tablename,
+        )
+
+    def delete_modified_locations_query(self):
+        return """
+            DELETE FROM "{local_tablename}"
+            WHERE aggregation_level = 5 AND doc_id IN (SELECT doc_id FROM "{temporary_tablename}")
+        """.format(
+            local_tablename=self.local_tablename,
+            temporary_tablename=self.temporary_tablename,
+        )
+
+    def delete_rollups_query(self):
+        return """
+            DELETE FROM "{local_tablename}" WHERE aggregation_level < 5 AND state_id = ANY(%s)
+        """.format(local_tablename=self.local_tablename)
+
+    def awc_doc_ids_query(self):
+        return """
+            SELECT doc_id FROM "{local_tablename}" WHERE aggregation_level = 5
+        """.format(local_tablename=self.local_tablename)
+
+    def awc_count_query(self):
+        return """
+            SELECT COUNT(*) FROM "{local_tablename}" WHERE aggregation_level = 5
+        """.format(local_tablename=self.local_tablename)
+
+    def rollup_query(self, aggregation_level, tablename=None, by_state=False):
+        """Rolls the AWC rows of `tablename` up to `aggregation_level`
+
+        :param by_state: only roll up the states passed as the query parameter
+        """
+        tablename = tablename or self.temporary_tablename
         columns = (
             ('doc_id', lambda col: col if aggregation_level > 4 else "'All'"),
             ('awc_name', lambda col: col if aggregation_level > 4 else "NULL"),
@@ -281,19 +380,23 @@ class LocationAggregationDistributedHelper(BaseICDSAggregationDistributedHelper)
                 ["supervisor_{}".format(name) for name in end_text_column if name is not "map_location_name"]
             )
 
+        where = "WHERE aggregation_level = 5 AND state_id = ANY(%s)" if by_state else ""
+
         return """
-            INSERT INTO "{temporary_tablename}" (
+            INSERT INTO "{tablename}" (
               {columns}
             ) (
               SELECT
                 {calculations}
-              FROM "{temporary_tablename}"
+              FROM "{tablename}"
+              {where}
               GROUP BY {group_by}
             )
         """.format(
-            temporary_tablename=self.temporary_tablename,
+            tablename=tablename,
             columns=", ".join([col[0] for col in columns]),
             calculations=", ".join([col[1] for col in columns]),
+            where=where,
             group_by=", ".join(group_by)
         )
 
@@ -306,10 +409,109 @@ class LocationAggregationDistributedHelper(BaseICDSAggregationDistributedHelper)
             local_tablename=self.local_tablename
         )
 
+    def delete_distributed_rows_query(self):
+        return """
+            DELETE FROM "{tablename}" WHERE state_id = ANY(%s)
+        """.format(tablename=self.base_tablename)
+
+    def copy_to_distributed_table_query(self):
+        return """
+            INSERT INTO "{tablename}" SELECT * FROM "{local_tablename}" WHERE state_id = ANY(%s)
+        """.format(
+            tablename=self.base_tablename,
+            local_tablename=self.local_tablename
+        )
+
+
+def _location_checkpoint_key(domain):
+    return f'icds-awc-location-checkpoint/{domain}'
+
+
+def get_location_checkpoint(domain):
+    """The last_modified of the most recently modified location when the location
+    tables were last aggregated
+    """
+    return cache.get(_location_checkpoint_key(domain))
+
+
+def set_location_checkpoint(domain, checkpoint):
+    cache.set(_location_checkpoint_key(domain), checkpoint, timeout=None)
+
+
+def _get_awc_rows(domain_locations, modified_since=None):
+    locations_by_pk = {
+        loc['pk']: loc
+        for loc in domain_locations
+    }
+
+    def _is_modified(location):
+        return modified_since is not None and location['last_modified'] > modified_since
+
+    # the columns of an ancestor are shared by all the AWCs below it,
+    # so its metadata is only parsed once
+    ancestor_columns = {}
+
+    def _get_ancestor_columns(pk):
+        if pk not in ancestor_columns:
+            location = locations_by_pk[pk]
+            if location['parent_id']:
+                columns, modified = _get_ancestor_columns(location['parent_id'])
+                columns = columns.copy()
+            else:
+                columns, modified = {}, False
+            loc_type = location['location_type__code']
+            metadata = json.loads(location['metadata'])
+            columns.update({
+                '{}_id'.format(loc_type): location['location_id'],
+                '{}_name'.format(loc_type): location['name'].replace("\n", ""),
+                '{}_site_code'.format(loc_type): location['site_code'],
+                '{}_is_test'.format(loc_type): 1 if metadata.get('is_test_location') == 'test' else 0,
+            })
+            if loc_type == 'supervisor':
+                columns.update({
+                    'supervisor_deprecates': metadata.get('deprecates'),
+                    'supervisor_deprecated_at': metadata.get("deprecated_at"),
+                })
+            if loc_type in ('block', 'district', 'state'):
+                columns.update({
+                    '{}_map_location_name'.format(loc_type): metadata.get('map_location_name'),
+                })
+            ancestor_columns[pk] = (columns, modified or _is_modified(location))
+        return ancestor_columns[pk]
+
+    for location in domain_locations:
+        if location['location_type__code'] != 'awc':
+            continue
+        if location['parent_id']:
+            columns, ancestor_modified = _get_ancestor_columns(location['parent_id'])
+        else:
+            columns, ancestor_modified = {}, False
+        if modified_since is not None and not (ancestor_modified or _is_modified(location)):
+            continue
+
+        metadata = json.loads(location['metadata'])
+        # We strip newlines from the names because in the dashboard the names
+        # are displayed without newlines and it keeps the CSV import/export
+        # logic simpler between python and postgres
+        loc = {
+            'aggregation_level': 5,
+            'doc_id': location['location_id'],
+            'awc_name': location['name'].replace("\n", ""),
+            'awc_site_code': location['site_code'],
+            'awc_is_test': 1 if metadata.get('is_test_location') == 'test' else 0,
+            'awc_deprecates': metadata.get('deprecates'),
+            'awc_deprecated_at': metadata.get("deprecated_at"),
+        }
+        loc.update(columns)
+        yield loc
+
 
 def _get_all_locations_for_domain(domain):
     return (
         SQLLocation.objects
         .filter(domain=domain)
-        .values('pk', 'parent_id', 'metadata', 'name', 'location_id', 'location_type__code', 'site_code')
+        .values(
+            'pk', 'parent_id', 'metadata', 'name', 'location_id', 'location_type__code', 'site_code',
+            'last_modified'
+        )
     )
@@ -35,7 +35,7 @@ class CcsRecordMonthlyAggregationDistributedHelper(BaseICDSAggregationDistribute
 
     def get_table(self, table_id):
         if not is_current_month(self.month) and ICDS_LOCATION_REASSIGNMENT_AGG.enabled(self.domain):
-            return get_prev_agg_tablename(table_id)
+            return get_prev_agg_tablename(table_id, self.month)
         return get_table_name(self.domain, table_id)
 
     @property
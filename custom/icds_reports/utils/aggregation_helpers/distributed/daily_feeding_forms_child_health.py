@@ -1,5 +1,6 @@
 from dateutil.relativedelta import relativedelta
 
+from custom.icds.icds_toggles import ICDS_INCREMENTAL_AGGREGATION
 from custom.icds_reports.const import AGG_DAILY_FEEDING_TABLE
 from custom.icds_reports.utils.aggregation_helpers import (
     month_formatter,
@@ -75,4 +76,6 @@ class DailyFeedingFormsChildHealthAggregationDistributedHelper(StateBasedAggrega
         pass
 
     def delete_previous_run_query(self):
-        pass
+        # the whole month is deleted up front by drop_df_indices unless only changed states are re-aggregated
+        if ICDS_INCREMENTAL_AGGREGATION.enabled(self.domain):
+            return super().delete_previous_run_query()
@@ -1,5 +1,6 @@
 from dateutil.relativedelta import relativedelta
 
+from custom.icds.icds_toggles import ICDS_INCREMENTAL_AGGREGATION
 from custom.icds_reports.const import AGG_GROWTH_MONITORING_TABLE
 from custom.icds_reports.utils.aggregation_helpers import month_formatter
 from custom.icds_reports.utils.aggregation_helpers.distributed.base import (
@@ -189,4 +190,6 @@ class GrowthMonitoringFormsAggregationDistributedHelper(StateBasedAggregationDis
         pass
 
     def delete_previous_run_query(self):
-        pass
+        # the whole month is deleted up front by drop_gm_indices unless only changed states are re-aggregated
+        if ICDS_INCREMENTAL_AGGREGATION.enabled(self.domain):
+            return super().delete_previous_run_query()
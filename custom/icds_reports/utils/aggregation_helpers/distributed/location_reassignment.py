@@ -1,10 +1,17 @@
+import re
+from datetime import date, datetime
+
 from dateutil.relativedelta import relativedelta
 from django.db import connections
 
 from corehq.apps.userreports.util import get_table_name
 from custom.icds_reports.utils.connections import get_icds_ucr_citus_db_alias
 from custom.icds_reports.const import DASHBOARD_DOMAIN
-from custom.icds_reports.utils.aggregation_helpers import get_prev_agg_tablename, transform_day_to_month
+from custom.icds_reports.utils.aggregation_helpers import (
+    get_prev_agg_tablename,
+    get_prev_local_tablename,
+    transform_day_to_month,
+)
 
 
 class TempPrevTablesBase(object):
@@ -17,7 +24,7 @@ class TempPrevTablesBase(object):
     def drop_temp_tables(self, alias):
         data = {
             'prev_table': get_prev_agg_tablename(alias),
-            'prev_local': f"{alias}_prev_local",
+            'prev_local': get_prev_local_tablename(alias),
         }
         with connections[get_icds_ucr_citus_db_alias()].cursor() as cursor:
             cursor.execute(self.DROP_QUERY.format(**data))
@@ -25,7 +32,7 @@ class TempPrevTablesBase(object):
     def create_temp_tables(self, alias, table, day):
         data = {
             'prev_table': get_prev_agg_tablename(alias),
-            'prev_local': f"{alias}_prev_local",
+            'prev_local': get_prev_local_tablename(alias),
             'prev_month': day,
             'current_table': table,
             'alias': alias
@@ -38,6 +45,13 @@ class TempPrevTablesBase(object):
 
 
 class TempPrevUCRTables(TempPrevTablesBase):
+    """Copies of the case UCRs with the location reassignments of the month after
+    the aggregation month undone.
+
+    The tables are named after the aggregation month so that several months can
+    be aggregated at the same time. They should be dropped with `drop_all_tables`
+    once the month is aggregated, `drop_old_tables` drops the ones left by earlier months.
+    """
 
     CREATE_QUERY = """
     CREATE UNLOGGED TABLE "{prev_table}" (LIKE "{current_table}");
@@ -50,38 +64,69 @@ class TempPrevUCRTables(TempPrevTablesBase):
     INSERT INTO "{prev_table}" (SELECT * FROM "{prev_local}");
     """
 
-    def drop_temp_tables(self, alias):
+    table_list = [
+        'static-child_health_cases',
+        'static-ccs_record_cases',
+        'static-person_cases_v3',
+        'static-household_cases',
+        'static-child_tasks_cases',
+        'static-pregnant-tasks_cases',
+    ]
+
+    def drop_temp_tables(self, alias, month):
         data = {
-            'prev_table': get_prev_agg_tablename(alias),
-            'prev_local': f"{alias}_prev_local",
+            'prev_table': get_prev_agg_tablename(alias, month),
+            'prev_local': get_prev_local_tablename(alias, month),
         }
         with connections[get_icds_ucr_citus_db_alias()].cursor() as cursor:
             cursor.execute(self.DROP_QUERY.format(**data))
 
-    def create_temp_tables(self, table, day):
+    def create_temp_tables(self, table, month):
         data = {
-            'prev_table': get_prev_agg_tablename(table),
-            'prev_local': f"{table}_prev_local",
-            'prev_month': day,
+            'prev_table': get_prev_agg_tablename(table, month),
+            'prev_local': get_prev_local_tablename(table, month),
+            'prev_month': month + relativedelta(months=1),
             'current_table': get_table_name(DASHBOARD_DOMAIN, table),
-            'alias': table
+            'alias': f'{table}_{month:%Y%m}'
         }
         with connections[get_icds_ucr_citus_db_alias()].cursor() as cursor:
             cursor.execute(self.CREATE_QUERY.format(**data))
 
     def make_all_tables(self, day):
-        day = transform_day_to_month(day) + relativedelta(months=1)
-        table_list = [
-            'static-child_health_cases',
-            'static-ccs_record_cases',
-            'static-person_cases_v3',
-            'static-household_cases',
-            'static-child_tasks_cases',
-            'static-pregnant-tasks_cases',
-        ]
-        for table in table_list:
-            self.drop_temp_tables(table)
-            self.create_temp_tables(table, day)
+        month = transform_day_to_month(day)
+        for table in self.table_list:
+            self.drop_temp_tables(table, month)
+            self.create_temp_tables(table, month)
+
+    def drop_all_tables(self, day):
+        month = transform_day_to_month(day)
+        for table in self.table_list:
+            self.drop_temp_tables(table, month)
+
+    def drop_old_tables(self, day, months_kept=2):
+        """Drops the tables left by the aggregations of the months before the `months_kept`
+        months up to the month of `day`, which can be aggregated at the same time.
+        """
+        oldest_month = transform_day_to_month(day) - relativedelta(months=months_kept - 1)
+        with connections[get_icds_ucr_citus_db_alias()].cursor() as cursor:
+            cursor.execute(
+                "SELECT tablename FROM pg_tables WHERE schemaname = 'public' AND tablename LIKE ANY(%s)",
+                [[f'{table}_prev_%' for table in self.table_list]]
+            )
+            old_tables = [
+                row[0] for row in cursor.fetchall()
+                if self._get_table_month(row[0]) < oldest_month
+            ]
+            for tablename in old_tables:
+                cursor.execute(f'DROP TABLE IF EXISTS "{tablename}"')
+
+    def _get_table_month(self, tablename):
+        """Returns the month of a table created by `create_temp_tables`, or date.max for other tables"""
+        for table in self.table_list:
+            match = re.fullmatch(re.escape(table) + r'_prev(?:_local)?_(\d{6})', tablename)
+            if match:
+                return datetime.strptime(match.group(1), '%Y%m').date()
+        return date.max
 
 
 class TempPrevIntermediateTables(TempPrevTablesBase):
@@ -112,11 +157,12 @@ class TempPrevIntermediateTables(TempPrevTablesBase):
         alias, table, ucr_alias, id_column_name = table
         data = {
             'prev_table': get_prev_agg_tablename(alias),
-            'prev_local': f"{alias}_prev_local",
+            'prev_local': get_prev_local_tablename(alias),
             'prev_month': day,
             'current_table': table,
             'alias': alias,
-            'ucr_prev_local': f"{ucr_alias}_prev_local",
+            # the UCR tables are built for the month being aggregated
+            'ucr_prev_local': get_prev_local_tablename(ucr_alias, day + relativedelta(months=1)),
             'id_column': id_column_name
         }
         with connections[get_icds_ucr_citus_db_alias()].cursor() as cursor:
@@ -157,7 +203,7 @@ class TempInfraTables(TempPrevTablesBase):
         alias, table = table
         data = {
             'prev_table': get_prev_agg_tablename(alias),
-            'prev_local': f"{alias}_prev_local",
+            'prev_local': get_prev_local_tablename(alias),
             'prev_month': day,
             'current_table': table,
             'alias': alias,
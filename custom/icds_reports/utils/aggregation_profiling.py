@@ -0,0 +1,113 @@
+import time
+from contextlib import contextmanager
+
+from django.db.models import Sum
+
+from custom.icds.icds_toggles import ICDS_AGGREGATION_EXPLAIN, ICDS_AGGREGATION_PROFILING
+from custom.icds_reports.const import DASHBOARD_DOMAIN
+
+# EXPLAIN ANALYZE runs the statement, so it is only used for statements whose
+# results are not read back by the helpers
+EXPLAINABLE_STATEMENTS = ('INSERT', 'UPDATE', 'DELETE')
+
+
+class ProfilingCursor(object):
+    """Wraps the cursor passed to an aggregation helper and times every statement
+    executed through it. Everything else is passed through to the wrapped cursor.
+    """
+
+    def __init__(self, cursor, explain=False):
+        self.cursor = cursor
+        self.explain = explain
+        self.profiles = []
+
+    def __getattr__(self, name):
+        return getattr(self.cursor, name)
+
+    def __iter__(self):
+        return iter(self.cursor)
+
+    def execute(self, sql, params=None):
+        explain_plan = None
+        start = time.time()
+        if self.explain and _is_explainable(sql):
+            self.cursor.execute(f'EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {sql}', params)
+            explain_plan = self.cursor.fetchone()[0]
+            rows_affected = _rows_from_plan(explain_plan)
+        else:
+            self.cursor.execute(sql, params)
+            rows_affected = self.cursor.rowcount if self.cursor.rowcount >= 0 else None
+        self.profiles.append({
+            'query': str(sql),
+            'duration': time.time() - start,
+            'rows_affected': rows_affected,
+            'explain_plan': explain_plan,
+        })
+
+
+def _is_explainable(sql):
+    sql = str(sql).strip().rstrip(';')
+    return sql.split(None, 1)[0].upper() in EXPLAINABLE_STATEMENTS and ';' not in sql
+
+
+def _rows_from_plan(explain_plan):
+    plan = explain_plan[0]['Plan']
+    # INSERT/UPDATE/DELETE report their rows on the node below ModifyTable
+    if plan['Node Type'] == 'ModifyTable' and plan.get('Plans'):
+        plan = plan['Plans'][0]
+    return plan.get('Actual Rows')
+
+
+@contextmanager
+def profile_aggregation(cursor, helper_key, month, state_id=None):
+    """Yields the cursor to run the statements of an aggregation helper with and
+    saves their timings once the helper has finished successfully.
+    """
+    from custom.icds_reports.models.util import AggregationQueryProfile
+
+    if not ICDS_AGGREGATION_PROFILING.enabled(DASHBOARD_DOMAIN):
+        yield cursor
+        return
+
+    profiling_cursor = ProfilingCursor(cursor, explain=ICDS_AGGREGATION_EXPLAIN.enabled(DASHBOARD_DOMAIN))
+    yield profiling_cursor
+
+    AggregationQueryProfile.objects.bulk_create([
+        AggregationQueryProfile(
+            helper_key=helper_key,
+            state_id=state_id,
+            month=month,
+            query_index=index,
+            **profile
+        )
+        for index, profile in enumerate(profiling_cursor.profiles)
+    ])
+
+
+def profile_helper(cursor, helper):
+    state_id = getattr(helper, 'state_id', None)
+    month = getattr(helper, 'month', None) or getattr(helper, 'month_start', None)
+    # helpers aggregating all states at once are recorded without a state
+    return profile_aggregation(
+        cursor, helper.helper_key, month, state_id if isinstance(state_id, str) else None
+    )
+
+
+def get_slowest_queries(since, limit=10):
+    from custom.icds_reports.models.util import AggregationQueryProfile
+
+    return (AggregationQueryProfile.objects
+            .filter(created_at__gte=since)
+            .order_by('-duration')
+            .values('helper_key', 'state_id', 'month', 'query_index', 'duration', 'rows_affected')[:limit])
+
+
+def get_helper_durations(since, limit=10):
+    """Returns the total statement time of the slowest helpers since `since`"""
+    from custom.icds_reports.models.util import AggregationQueryProfile
+
+    return (AggregationQueryProfile.objects
+            .filter(created_at__gte=since)
+            .values('helper_key')
+            .annotate(total_duration=Sum('duration'))
+            .order_by('-total_duration')[:limit])
@@ -0,0 +1,196 @@
+import logging
+from collections import defaultdict
+
+from django.db import connections
+
+from dateutil.relativedelta import relativedelta
+
+from corehq.apps.userreports.util import get_table_name
+from dimagi.utils.dates import force_to_date
+from custom.icds_reports.const import DAILY_FEEDING_TABLE_ID, DASHBOARD_DOMAIN
+from custom.icds_reports.models.aggregate import (
+    AggregateAdolescentGirlsRegistrationForms,
+    AggregateAvailingServiceForms,
+    AggregateAwcInfrastructureForms,
+    AggregateBeneficiaryForm,
+    AggregateBirthPreparednesForms,
+    AggregateCcsRecordComplementaryFeedingForms,
+    AggregateCcsRecordDeliveryForms,
+    AggregateCcsRecordPostnatalCareForms,
+    AggregateCcsRecordTHRForms,
+    AggregateChildHealthDailyFeedingForms,
+    AggregateChildHealthPostnatalCareForms,
+    AggregateChildHealthTHRForms,
+    AggregateComplementaryFeedingForms,
+    AggregateGrowthMonitoringForms,
+    AggregateLsAWCVisitForm,
+    AggregateLsVhndForm,
+    AggregateMigrationForms,
+    AggregateTHRForm,
+)
+from custom.icds_reports.models.util import UcrAggregationWatermark
+from custom.icds_reports.utils.aggregation_helpers import transform_day_to_month
+from custom.icds_reports.utils.connections import get_icds_ucr_citus_db_alias
+
+logger = logging.getLogger(__name__)
+
+LOCATION_DATA_SOURCE_ID = 'static-awc_location'
+
+# The per state aggregation steps that can be skipped and the UCRs, on top of the
+# helper's own data source, that they read. The case UCRs are used to build the
+# location reassignment tables for the previous month.
+INCREMENTAL_AGGREGATION_STEPS = {
+    '_aggregate_gm_forms': (AggregateGrowthMonitoringForms, ['static-child_health_cases']),
+    '_aggregate_df_forms': (AggregateChildHealthDailyFeedingForms, [DAILY_FEEDING_TABLE_ID]),
+    '_aggregate_cf_forms': (AggregateComplementaryFeedingForms, ['static-child_health_cases']),
+    '_aggregate_ccs_cf_forms': (AggregateCcsRecordComplementaryFeedingForms, ['static-ccs_record_cases']),
+    '_aggregate_child_health_thr_forms': (AggregateChildHealthTHRForms, []),
+    '_aggregate_ccs_record_thr_forms': (AggregateCcsRecordTHRForms, []),
+    '_aggregate_child_health_pnc_forms': (AggregateChildHealthPostnatalCareForms, ['static-child_health_cases']),
+    '_aggregate_ccs_record_pnc_forms': (AggregateCcsRecordPostnatalCareForms, ['static-ccs_record_cases']),
+    '_aggregate_delivery_forms': (AggregateCcsRecordDeliveryForms, []),
+    '_aggregate_bp_forms': (AggregateBirthPreparednesForms, ['static-ccs_record_cases']),
+    '_aggregate_awc_infra_forms': (AggregateAwcInfrastructureForms, []),
+    '_agg_thr_table': (AggregateTHRForm, []),
+    '_agg_adolescent_girls_registration_table': (
+        AggregateAdolescentGirlsRegistrationForms, ['static-person_cases_v3']
+    ),
+    '_agg_migration_table': (AggregateMigrationForms, ['static-person_cases_v3']),
+    '_agg_availing_services_table': (AggregateAvailingServiceForms, ['static-person_cases_v3']),
+    '_agg_ls_awc_mgt_form': (AggregateLsAWCVisitForm, []),
+    '_agg_ls_vhnd_form': (AggregateLsVhndForm, []),
+    '_agg_beneficiary_form': (AggregateBeneficiaryForm, []),
+}
+
+
+# The column the aggregation steps filter the month of each form UCR on. The case
+# and location UCRs are not read by month and are watermarked for the whole state.
+UCR_MONTH_COLUMNS = {
+    'static-adolescent_girls_reg_form': 'timeend',
+    'static-availing_service_form': 'timeend',
+    'static-awc_mgt_forms': 'submitted_on',
+    'static-complementary_feeding_forms': 'timeend',
+    'static-dashboard_birth_preparedness_forms': 'timeend',
+    'static-dashboard_delivery_forms': 'timeend_with_time',
+    'static-dashboard_growth_monitoring_forms': 'timeend',
+    'static-dashboard_thr_forms': 'timeend',
+    'static-infrastructure_form_v2': 'timeend',
+    'static-ls_home_visit_forms_filled': 'submitted_on',
+    'static-ls_vhnd_form': 'vhnd_date',
+    'static-migration_form': 'timeend',
+    'static-postnatal_care_forms': 'timeend',
+    'static-thr_forms_v2': 'submitted_on',
+    'dashboard_child_health_daily_feeding_forms': 'timeend',
+    DAILY_FEEDING_TABLE_ID: 'month',
+}
+
+# The number of months before the aggregated month that are also read from a UCR
+UCR_PREVIOUS_MONTHS_READ = {
+    'static-infrastructure_form_v2': 6,
+}
+
+
+def get_step_data_source_ids(func_name):
+    model, extra_data_source_ids = INCREMENTAL_AGGREGATION_STEPS[func_name]
+    return [model._agg_helper_cls.ucr_data_source_id, LOCATION_DATA_SOURCE_ID] + extra_data_source_ids
+
+
+def get_ucr_watermarks(months):
+    """Returns the max inserted_at of the UCRs read by the incremental aggregation steps
+    as {data_source_id: {(state_id, month): inserted_at}} for the form UCRs, which are
+    limited to the months read when aggregating `months`, and as
+    {data_source_id: {(state_id, None): inserted_at}} for the other UCRs.
+    """
+    months = [transform_day_to_month(force_to_date(month)) for month in months]
+    data_source_ids = {
+        data_source_id
+        for func_name in INCREMENTAL_AGGREGATION_STEPS
+        for data_source_id in get_step_data_source_ids(func_name)
+    }
+    watermarks = {}
+    with connections[get_icds_ucr_citus_db_alias()].cursor() as cursor:
+        for data_source_id in sorted(data_source_ids):
+            tablename = get_table_name(DASHBOARD_DOMAIN, data_source_id)
+            month_column = UCR_MONTH_COLUMNS.get(data_source_id)
+            if month_column:
+                previous_months_read = UCR_PREVIOUS_MONTHS_READ.get(data_source_id, 0)
+                cursor.execute(f'''
+                    SELECT state_id, date_trunc('month', "{month_column}")::date, MAX(inserted_at)
+                    FROM "{tablename}"
+                    WHERE "{month_column}" >= %(start_date)s AND "{month_column}" < %(end_date)s
+                    GROUP BY 1, 2
+                ''', {
+                    'start_date': min(months) - relativedelta(months=previous_months_read),
+                    'end_date': max(months) + relativedelta(months=1),
+                })
+            else:
+                cursor.execute(f'SELECT state_id, NULL, MAX(inserted_at) FROM "{tablename}" GROUP BY state_id')
+            watermarks[data_source_id] = {
+                (state_id, month): inserted_at.isoformat() if inserted_at else None
+                for state_id, month, inserted_at in cursor.fetchall()
+            }
+    return watermarks
+
+
+class IncrementalAggregationPlan(object):
+    """Decides which per state aggregation steps need to run for a month.
+
+    A (step, state) is skipped when the UCR watermarks of the state and of the months
+    read by the step are the same as
+    the ones recorded by the last aggregation of the month, and the previous month,
+    whose aggregate tables are used as a base for this month, has not been
+    re-aggregated since then.
+
+    The last aggregations are looked up when a step is about to run, so that a previous
+    month aggregated earlier in the same run is taken into account.
+    """
+
+    def __init__(self, month, ucr_watermarks):
+        self.month = transform_day_to_month(force_to_date(month))
+        self.prev_month = self.month - relativedelta(months=1)
+        self.ucr_watermarks = ucr_watermarks
+        self.skipped = defaultdict(list)
+
+    def watermarks_for(self, func_name, state_id):
+        if func_name not in INCREMENTAL_AGGREGATION_STEPS:
+            return None
+        return {
+            data_source_id: self._get_watermark(data_source_id, state_id)
+            for data_source_id in get_step_data_source_ids(func_name)
+        }
+
+    def _get_watermark(self, data_source_id, state_id):
+        watermarks = self.ucr_watermarks[data_source_id]
+        if data_source_id not in UCR_MONTH_COLUMNS:
+            return watermarks.get((state_id, None))
+        months_read = [
+            self.month - relativedelta(months=months_before)
+            for months_before in range(UCR_PREVIOUS_MONTHS_READ.get(data_source_id, 0) + 1)
+        ]
+        inserted_at = [
+            watermarks[(state_id, month)] for month in months_read if watermarks.get((state_id, month))
+        ]
+        return max(inserted_at) if inserted_at else None
+
+    def should_skip(self, func_name, state_id):
+        if func_name not in INCREMENTAL_AGGREGATION_STEPS:
+            return False
+
+        last_aggregations = {
+            watermark.month: watermark
+            for watermark in UcrAggregationWatermark.objects.filter(
+                func_name=func_name, state_id=state_id, month__in=[self.month, self.prev_month]
+            )
+        }
+        last_aggregation = last_aggregations.get(self.month)
+        prev_month_aggregation = last_aggregations.get(self.prev_month)
+        if not last_aggregation or not prev_month_aggregation:
+            return False
+        if prev_month_aggregation.aggregated_at > last_aggregation.aggregated_at:
+            return False
+        if last_aggregation.ucr_watermarks != self.watermarks_for(func_name, state_id):
+            return False
+
+        logger.info(f'Skipping {func_name} for state {state_id} and month {self.month}: UCR data unchanged')
+        self.skipped[func_name].append(state_id)
+        return True
@@ -0,0 +1,162 @@
+import inspect
+import json
+import logging
+import random
+import time
+from datetime import date, datetime
+from functools import wraps
+
+from dateutil.relativedelta import relativedelta
+from gevent.pool import Pool
+
+from dimagi.utils.couch.cache.cache_core import get_redis_client
+
+from custom.icds.icds_toggles import ICDS_DASHBOARD_CACHE_WARMUP
+from custom.icds_reports.const import DASHBOARD_DOMAIN
+
+logger = logging.getLogger(__name__)
+
+HOT_CALLS_KEY = 'icds-dashboard-hot-calls'
+HOT_CALLS_EXPIRY = 14 * 24 * 60 * 60
+MAX_HOT_CALLS = 5000
+# one in HOT_CALLS_SAMPLE_RATE calls is recorded, with a score of HOT_CALLS_SAMPLE_RATE,
+# so that the dashboard requests do not all pay for a round trip to redis
+HOT_CALLS_SAMPLE_RATE = 10
+
+# {function name: (function, set_month)} of every function decorated with warm_up_candidate
+WARM_UP_FUNCTIONS = {}
+
+
+def _month_tuple(month):
+    return tuple(month.timetuple())[:3] if month else None
+
+
+def set_config_month(arguments, month):
+    """`set_month` of the functions called by the map, sector and chart views"""
+    config = arguments['config']
+    config['month'] = _month_tuple(month)
+    if 'prev_month' in config:
+        config['prev_month'] = _month_tuple(month - relativedelta(months=1)) if month else None
+
+
+def set_program_summary_month(arguments, month):
+    set_config_month(arguments, month)
+    arguments['now'] = _month_tuple(date.today()) if month else None
+
+
+def set_filters_month(arguments, month):
+    arguments['filters']['month'] = datetime(month.year, month.month, 1) if month else None
+
+
+def set_fact_sheet_month(arguments, month):
+    # fact sheets always compare with the national data of the previous month
+    previous_month = date.today().replace(day=1) - relativedelta(months=1)
+    arguments['previous_month'] = previous_month.strftime('%Y-%m-%d') if month else None
+
+
+def warm_up_candidate(set_month):
+    """Records the calls of a cached dashboard function in a hot list so that
+    `warm_up_cache` can replay the most requested ones after aggregation.
+
+    Should be placed above `icds_quickcache` so that cache hits are counted too.
+    Only a sample of the calls is recorded, see `HOT_CALLS_SAMPLE_RATE`.
+
+    :param set_month: function(arguments, month) that sets every month dependent
+                      argument in the bound arguments of a call. It is called with
+                      `None` to record calls independently of the requested month.
+    """
+    def decorator(func):
+        name = f'{func.__module__}.{func.__name__}'
+        signature = inspect.signature(func)
+        WARM_UP_FUNCTIONS[name] = (func, set_month)
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if (random.randrange(HOT_CALLS_SAMPLE_RATE) == 0
+                    and ICDS_DASHBOARD_CACHE_WARMUP.enabled(DASHBOARD_DOMAIN)):
+                try:
+                    record_hot_call(name, signature, args, kwargs)
+                except Exception:
+                    logger.exception(f'Could not record the call of {name}')
+            return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def get_hot_call(name, signature, args, kwargs):
+    bound = signature.bind(*args, **kwargs)
+    bound.apply_defaults()
+    # set_month may change the arguments in place
+    arguments = json.loads(json.dumps(bound.arguments, default=str))
+    WARM_UP_FUNCTIONS[name][1](arguments, None)
+    return json.dumps({'function': name, 'arguments': arguments}, sort_keys=True)
+
+
+def record_hot_call(name, signature, args, kwargs):
+    hot_call = get_hot_call(name, signature, args, kwargs)
+    pipeline = get_redis_client().client.get_client().pipeline(transaction=False)
+    pipeline.zincrby(HOT_CALLS_KEY, HOT_CALLS_SAMPLE_RATE, hot_call)
+    pipeline.expire(HOT_CALLS_KEY, HOT_CALLS_EXPIRY)
+    pipeline.execute()
+
+
+def get_hot_calls(limit):
+    """Returns the `limit` most requested calls as (hot call, number of requests)
+    and the total number of recorded requests
+    """
+    client = get_redis_client().client.get_client()
+    # drop the long tail so that the hot list does not grow without limit
+    client.zremrangebyrank(HOT_CALLS_KEY, 0, -MAX_HOT_CALLS - 1)
+    hot_calls = client.zrevrange(HOT_CALLS_KEY, 0, limit - 1, withscores=True)
+    total = sum(score for _, score in client.zrange(HOT_CALLS_KEY, 0, -1, withscores=True))
+    return [(hot_call.decode('utf-8'), score) for hot_call, score in hot_calls], total
+
+
+def get_replay_call(hot_call, month):
+    """Returns the function and arguments to replay a recorded call for the month"""
+    hot_call = json.loads(hot_call)
+    func, set_month = WARM_UP_FUNCTIONS[hot_call['function']]
+    arguments = hot_call['arguments']
+    set_month(arguments, month)
+    return func, arguments
+
+
+def warm_up_cache(months, limit=500, concurrency=10):
+    """Calls the most requested dashboard functions for the months so that both
+    tiers of `icds_quickcache` are populated before the users request them.
+
+    :param months: list of first days of the month
+    :param limit: number of hot calls replayed for each month
+    :param concurrency: number of calls running at the same time
+    :return: dict with the coverage and timing of the warm up
+    """
+    hot_calls, total_requests = get_hot_calls(limit)
+    durations = []
+    failed = []
+
+    def _replay(hot_call, month):
+        start = time.time()
+        try:
+            func, arguments = get_replay_call(hot_call, month)
+            func(**arguments)
+        except Exception:
+            logger.exception(f'Could not warm up the cache for {hot_call}')
+            failed.append(hot_call)
+        else:
+            durations.append((time.time() - start, hot_call))
+
+    start = time.time()
+    pool = Pool(concurrency)
+    for month in months:
+        for hot_call, _ in hot_calls:
+            pool.spawn(_replay, hot_call, month)
+    pool.join()
+
+    warmed_requests = sum(score for hot_call, score in hot_calls if hot_call not in failed)
+    return {
+        'calls': len(durations),
+        'failed': len(failed),
+        'coverage': warmed_requests / total_requests if total_requests else 0,
+        'duration': time.time() - start,
+        'slowest': sorted(durations, reverse=True)[:10],
+    }
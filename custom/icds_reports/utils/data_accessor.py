@@ -11,6 +11,7 @@ from custom.icds_reports.reports.cas_reach_data import get_cas_reach_data
 from custom.icds_reports.reports.demographics_data import get_demographics_data
 from custom.icds_reports.reports.maternal_child import get_maternal_child_data
 from custom.icds_reports.models.views import NICIndicatorsView
+from custom.icds_reports.utils.cache_warmup import set_program_summary_month, warm_up_candidate
 from custom.icds_reports.reports.awcs_covered import get_awcs_covered_data_map, get_awcs_covered_sector_data, \
     get_awcs_covered_data_chart
 
@@ -44,6 +45,7 @@ def get_program_summary_data(step, domain, config, now, include_test, pre_releas
     return data
 
 
+@warm_up_candidate(set_program_summary_month)
 @icds_quickcache(['step', 'domain', 'config', 'now', 'include_test', 'pre_release_features'], timeout=30 * 60)
 def get_program_summary_data_with_retrying(step, domain, config, now, include_test, pre_release_features):
     retry = 0
@@ -61,7 +63,7 @@ def get_program_summary_data_with_retrying(step, domain, config, now, include_te
 
 # keeping cache timeout as 2 hours as this is going to be used
 # in some script/tool which might flood us with requests
-@icds_quickcache([], timeout=120 * 60)
+@icds_quickcache([], timeout=120 * 60, vary_on_data_generation=False)
 def get_inc_indicator_api_data():
     latest_available_month = datetime.utcnow() - timedelta(days=1)
     first_day_month = latest_available_month.replace(day=1)
@@ -0,0 +1,87 @@
+import hashlib
+import time
+
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from corehq.apps.locations.models import SQLLocation
+
+LOCATION_ACCESS_TIMEOUT = 60 * 60
+
+
+def _location_tree_version_key(domain):
+    return f'icds-location-tree-version/{domain}'
+
+
+def get_location_tree_version(domain):
+    return cache.get(_location_tree_version_key(domain))
+
+
+@receiver([post_save, post_delete], sender=SQLLocation)
+def bump_location_tree_version(sender, instance, **kwargs):
+    cache.set(_location_tree_version_key(instance.domain), int(time.time() * 1000), timeout=None)
+
+
+class LocationAccess(object):
+    """Answers which locations a user can access, for a whole list of locations at once.
+
+    The ancestors of the user's locations and the access to the locations already
+    looked up are cached per user, assigned locations and version of the location tree,
+    so drilling down the location tree does not resolve the access again on every request.
+    """
+
+    def __init__(self, domain, user):
+        self.domain = domain
+        self.user = user
+        self.access_all_locations = user.has_permission(domain, 'access_all_locations')
+        self._cache_key = self._get_cache_key()
+        self._index = cache.get(self._cache_key)
+        if self._index is None:
+            self._index = {
+                'ancestor_ids': self._get_ancestor_ids(),
+                'accessible': {},
+            }
+            self._save()
+
+    def _get_cache_key(self):
+        location_ids = ','.join(sorted(self.user.get_location_ids(self.domain)))
+        locations_hash = hashlib.md5(location_ids.encode('utf-8')).hexdigest()
+        version = get_location_tree_version(self.domain)
+        return f'icds-location-access/{self.domain}/{self.user._id}/{locations_hash}/{version}'
+
+    def _get_ancestor_ids(self):
+        return set(SQLLocation.objects.get_queryset_ancestors(
+            self.user.get_sql_locations(self.domain), include_self=True
+        ).distinct().values_list('location_id', flat=True))
+
+    def _save(self):
+        cache.set(self._cache_key, self._index, LOCATION_ACCESS_TIMEOUT)
+
+    @property
+    def ancestor_ids(self):
+        """location ids of the user's locations and of their ancestors"""
+        return self._index['ancestor_ids']
+
+    def get_accessible_location_ids(self, location_ids):
+        """Returns the location ids of `location_ids` the user can access, resolving the
+        locations not looked up yet in a single query
+        """
+        location_ids = set(filter(None, location_ids))
+        if self.access_all_locations:
+            return location_ids
+
+        accessible = self._index['accessible']
+        unknown_ids = location_ids - set(accessible)
+        if unknown_ids:
+            accessible_ids = set(SQLLocation.objects.accessible_to_user(
+                self.domain, self.user
+            ).filter(location_id__in=unknown_ids).values_list('location_id', flat=True))
+            accessible.update({location_id: location_id in accessible_ids for location_id in unknown_ids})
+            self._save()
+        return {location_id for location_id in location_ids if accessible[location_id]}
+
+    def can_access(self, location_id):
+        if self.access_all_locations:
+            return True
+        return location_id in self.get_accessible_location_ids([location_id])
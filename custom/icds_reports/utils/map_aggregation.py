@@ -0,0 +1,90 @@
+from collections import namedtuple
+
+from django.db.models import QuerySet
+
+# values of a map query by column
+# names: location names, map_names: map location names, values: {column: list of values}
+MapColumns = namedtuple('MapColumns', ['names', 'map_names', 'values'])
+
+
+def get_launched_location_names(location_launched_status):
+    return [name for name, launched in location_launched_status.items() if launched and launched > 0]
+
+
+def get_map_columns(data, loc_level, columns, location_launched_status=None):
+    """Returns the values of a map query by column.
+
+    When the data is a queryset only the columns are fetched, as tuples, and the
+    locations that are not launched are filtered out by the database.
+
+    :param data: queryset or iterable of dicts grouped by the location name and map location name
+    :param location_launched_status: {location name: number of launched AWCs} or None to keep
+                                     all the locations
+    """
+    name_column = '%s_name' % loc_level
+    map_name_column = '%s_map_location_name' % loc_level
+    if isinstance(data, QuerySet):
+        if location_launched_status is not None:
+            data = data.filter(**{
+                '%s__in' % name_column: get_launched_location_names(location_launched_status)
+            })
+        rows = list(data.values_list(name_column, map_name_column, *columns))
+        names, map_names, *values = zip(*rows) if rows else [()] * (len(columns) + 2)
+        return MapColumns(names, map_names, dict(zip(columns, values)))
+
+    rows = list(data)
+    if location_launched_status is not None:
+        launched_names = set(get_launched_location_names(location_launched_status))
+        rows = [row for row in rows if row[name_column] in launched_names]
+    return MapColumns(
+        [row[name_column] for row in rows],
+        [row[map_name_column] for row in rows],
+        {column: [row[column] for row in rows] for column in columns}
+    )
+
+
+def aggregate_by_map_location(map_columns, max_columns=()):
+    """Adds up the values of each column for every map location, as several locations
+    can be shown as a single one on the map.
+
+    :param map_columns: output of `get_map_columns`
+    :param max_columns: columns for which the maximum value is kept instead of the sum
+    :return: ({map location name: {column: value, 'original_name': [location names]}},
+              {column: sum of the values of all the map locations})
+    """
+    keys = [map_name or name for name, map_name in zip(map_columns.names, map_columns.map_names)]
+    original_names = {}
+    for key, name in zip(keys, map_columns.names):
+        if key in original_names:
+            original_names[key].append(name)
+        else:
+            original_names[key] = [name]
+
+    data_for_map = {key: {} for key in original_names}
+    totals = {}
+    for column, values in map_columns.values.items():
+        location_values = dict.fromkeys(original_names, 0)
+        if column in max_columns:
+            for key, value in zip(keys, values):
+                if value and value > location_values[key]:
+                    location_values[key] = value
+        else:
+            for key, value in zip(keys, values):
+                if value:
+                    location_values[key] += value
+        for key, value in location_values.items():
+            data_for_map[key][column] = value
+        totals[column] = sum(location_values.values())
+
+    for key, names in original_names.items():
+        data_for_map[key]['original_name'] = names
+    return data_for_map, totals
+
+
+def get_fill_key(value, fill_key_lower, fill_key_bigger):
+    fill_format = '%s%%-%s%%'
+    if value < fill_key_lower:
+        return fill_format % (0, fill_key_lower)
+    elif value < fill_key_bigger:
+        return fill_format % (fill_key_lower, fill_key_bigger)
+    return fill_format % (fill_key_bigger, 100)
@@ -0,0 +1,139 @@
+import hashlib
+import inspect
+import json
+import logging
+from datetime import datetime
+from functools import wraps
+
+from custom.icds.icds_toggles import ICDS_MATERIALIZED_DASHBOARD_RESULTS
+from custom.icds_reports.const import DASHBOARD_DOMAIN
+
+logger = logging.getLogger(__name__)
+
+MAP = 'map'
+SECTOR = 'sector'
+CHART = 'chart'
+
+# {function name: (function, kind)} of every function decorated with materialized_result
+MATERIALIZED_FUNCTIONS = {}
+
+
+def materialized_result(kind):
+    """Serves the result of a dashboard indicator function from MaterializedReportResult
+    when it has been precomputed by `precompute_results` for the exact same arguments,
+    and falls back to running the function otherwise.
+
+    Should be placed below `icds_quickcache` so that cache hits skip the lookup.
+
+    :param kind: MAP, SECTOR or CHART, used to know which arguments to precompute
+    """
+    def decorator(func):
+        name = f'{func.__module__}.{func.__name__}'
+        signature = inspect.signature(func)
+        MATERIALIZED_FUNCTIONS[name] = (func, kind)
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not ICDS_MATERIALIZED_DASHBOARD_RESULTS.enabled(DASHBOARD_DOMAIN):
+                return func(*args, **kwargs)
+
+            from custom.icds_reports.models.util import MaterializedReportResult
+            result_key = get_result_key(name, signature, args, kwargs)
+            payload = (MaterializedReportResult.objects
+                       .filter(result_key=result_key)
+                       .values_list('payload', flat=True)
+                       .first())
+            if payload is not None:
+                return json.loads(payload)
+            return func(*args, **kwargs)
+
+        # quickcache reads the argument names from the signature
+        wrapper.__signature__ = signature
+        return wrapper
+    return decorator
+
+
+def get_result_key(name, signature, args, kwargs):
+    bound = signature.bind(*args, **kwargs)
+    bound.apply_defaults()
+    arguments = json.dumps(bound.arguments, sort_keys=True, default=str)
+    return hashlib.sha256(f'{name}:{arguments}'.encode('utf-8')).hexdigest()
+
+
+def _get_flag_argument(signature):
+    """Returns the name of the feature flag argument of the function if it has one"""
+    names = list(signature.parameters)
+    if 'show_test' in names and names[-1] != 'show_test':
+        return names[-1]
+    return None
+
+
+def get_precompute_calls(name, kind, domain, location_id, config, loc_level):
+    """Yields the (args, kwargs) the dashboard views call the function with for a
+    location when the default filters are used.
+    """
+    from custom.icds_reports.const import LocationTypes
+
+    func, _ = MATERIALIZED_FUNCTIONS[name]
+    flag_argument = _get_flag_argument(inspect.signature(func))
+    if kind == MAP and loc_level in (LocationTypes.SUPERVISOR, LocationTypes.AWC):
+        return
+    if kind == SECTOR and loc_level not in (LocationTypes.BLOCK, LocationTypes.SUPERVISOR, LocationTypes.AWC):
+        return
+
+    for flag in ((False, True) if flag_argument else (None,)):
+        args = [domain, dict(config), loc_level]
+        if kind == SECTOR:
+            args.append(location_id)
+        kwargs = {'show_test': False}
+        if flag_argument:
+            kwargs[flag_argument] = flag
+        yield args, kwargs
+
+
+def precompute_results(domain, month, locations):
+    """Computes and stores the results of every materialized function for the locations
+    with the default filters.
+
+    :param month: first day of the month
+    :param locations: list of (location_id, location filter) where the filter is the
+                      output of `get_location_filter` and location_id is None for the
+                      national level
+    :return: (number of results stored, number of results that could not be stored)
+    """
+    from custom.icds_reports.models.util import MaterializedReportResult
+    from custom.icds_reports.utils import get_location_level
+
+    start = datetime.utcnow()
+    stored = failed = 0
+    for location_id, location_filter in locations:
+        config = {
+            'month': tuple(month.timetuple())[:3],
+            'aggregation_level': 1,
+        }
+        config.update(location_filter)
+        loc_level = get_location_level(config.get('aggregation_level'))
+        for name, (func, kind) in MATERIALIZED_FUNCTIONS.items():
+            signature = inspect.signature(func)
+            for args, kwargs in get_precompute_calls(name, kind, domain, location_id, config, loc_level):
+                result_key = get_result_key(name, signature, args, kwargs)
+                try:
+                    result = func(*args, **kwargs)
+                    payload = json.dumps(result)
+                    # only results that survive a JSON round trip unchanged are served
+                    if json.loads(payload) != result:
+                        failed += 1
+                        continue
+                except Exception:
+                    logger.exception(f'Could not precompute {name} for {location_id}')
+                    failed += 1
+                    continue
+                MaterializedReportResult.objects.update_or_create(
+                    result_key=result_key,
+                    defaults={'function_name': name, 'month': month, 'payload': payload}
+                )
+                stored += 1
+
+    # results of locations or functions that are gone
+    MaterializedReportResult.objects.filter(month=month, computed_at__lt=start).delete()
+    return stored, failed
@@ -18,6 +18,12 @@ NUM_LAUNCHED_AWCS = 'Number of launched AWCs (ever submitted at least one HH reg
 NUM_OF_DAYS_AWC_WAS_OPEN = 'Number of days AWC was open in the given month'
 NUM_LAUNCHED_LSS = 'Number of launched LSs'
 
+# rows read at once by the streaming exports
+EXPORT_PAGE_SIZE = 10000
+
+# the location id column of each location level, by loc_level - 1
+LOCATION_ID_COLUMNS = ['state_id', 'district_id', 'block_id', 'supervisor_id', 'awc_id']
+
 FILTER_BY_LIST = {
     'unweighed': 'Data not Entered for weight (Unweighed)',
     'umeasured': 'Data not Entered for height (Unmeasured)',
@@ -70,12 +76,20 @@ class ExportableMixin(object):
             filters.append(EQ(key, key))
         return filters
 
+    @property
+    def location_id_column(self):
+        """The id of the locations of the exported level, which tells apart the locations
+        with the same name and gives the rows a unique order to be read page by page
+        """
+        return LOCATION_ID_COLUMNS[self.loc_level - 1]
+
     @property
     def group_by(self):
         group_by_columns = self.get_columns_by_loc_level
         group_by = ['aggregation_level']
         for column in group_by_columns:
             group_by.append(column.slug)
+        group_by.append(self.location_id_column)
         return group_by
 
     @property
@@ -85,6 +99,7 @@ class ExportableMixin(object):
         for column in order_by_columns:
             order_by.append(OrderBy(column.slug))
         order_by.append(OrderBy('aggregation_level'))
+        order_by.append(OrderBy(self.location_id_column))
         return order_by
 
     def to_export(self, format, location):
@@ -97,26 +112,103 @@ class ExportableMixin(object):
     def get_excel_data(self, location, system_usage_num_launched_awcs_formatting_at_awc_level=False,
                        system_usage_num_of_days_awc_was_open_formatting=False,
                        system_usage_num_of_lss_formatting=False):
-        excel_rows = []
+        excel_rows = list(self._get_excel_rows(
+            self.get_data(),
+            system_usage_num_launched_awcs_formatting_at_awc_level,
+            system_usage_num_of_days_awc_was_open_formatting,
+            system_usage_num_of_lss_formatting
+        ))
+        return [
+            [
+                self.title,
+                excel_rows
+            ],
+            [
+                'Export Info',
+                self._get_export_info(location)
+            ]
+        ]
+
+    def get_streaming_excel_data(self, location, system_usage_num_launched_awcs_formatting_at_awc_level=False,
+                                 system_usage_num_of_days_awc_was_open_formatting=False,
+                                 system_usage_num_of_lss_formatting=False):
+        """Same as `get_excel_data` but the rows are generated while the export is written,
+        reading the data page by page
+        """
+        excel_rows = self._get_excel_rows(
+            self.iter_data(),
+            system_usage_num_launched_awcs_formatting_at_awc_level,
+            system_usage_num_of_days_awc_was_open_formatting,
+            system_usage_num_of_lss_formatting
+        )
+        return [
+            [
+                self.title,
+                excel_rows
+            ],
+            [
+                'Export Info',
+                self._get_export_info(location)
+            ]
+        ]
+
+    def iter_data(self):
+        start = 0
+        while True:
+            rows = self.get_data(start=start, limit=EXPORT_PAGE_SIZE)
+            yield from rows
+            if len(rows) < EXPORT_PAGE_SIZE:
+                break
+            start += EXPORT_PAGE_SIZE
+
+    def _get_excel_rows(self, data, system_usage_num_launched_awcs_formatting_at_awc_level=False,
+                        system_usage_num_of_days_awc_was_open_formatting=False,
+                        system_usage_num_of_lss_formatting=False):
+        columns = self.columns
         headers = []
-        for column in self.columns:
+        slugs = []
+        for column in columns:
             if isinstance(column, Column):
                 headers.append(column.header)
+                slugs.append(column.slug)
             else:
                 headers.append(column['header'])
-        excel_rows.append(headers)
-        for row in self.get_data():
-            row_data = []
-            for c in self.columns:
-                if isinstance(c, Column):
-                    cell = row[c.slug]
-                else:
-                    cell = row[c['slug']]
+                slugs.append(column['slug'])
+        yield headers
+
+        # as DatabaseColumn from corehq.apps.reports.sqlreport doesn't format None
+        num_launched_awcs_column = num_of_days_awc_was_open_column = num_lss_launched_column = None
+        if system_usage_num_launched_awcs_formatting_at_awc_level and NUM_LAUNCHED_AWCS in headers:
+            num_launched_awcs_column = headers.index(NUM_LAUNCHED_AWCS)
+        if system_usage_num_of_days_awc_was_open_formatting and \
+                self.loc_level <= 4 and NUM_OF_DAYS_AWC_WAS_OPEN in headers:
+            num_of_days_awc_was_open_column = headers.index(NUM_OF_DAYS_AWC_WAS_OPEN)
+        if system_usage_num_of_lss_formatting and NUM_LAUNCHED_LSS in headers:
+            num_lss_launched_column = headers.index(NUM_LAUNCHED_LSS)
+
+        for row in data:
+            record = []
+            for slug in slugs:
+                cell = row[slug]
                 if not isinstance(cell, dict):
-                    row_data.append(cell if cell else DATA_NOT_ENTERED)
+                    record.append(cell if cell else DATA_NOT_ENTERED)
+                else:
+                    record.append(cell['sort_key'] if cell and 'sort_key' in cell else cell)
+            if num_launched_awcs_column is not None:
+                if record[num_launched_awcs_column] == DATA_NOT_ENTERED:
+                    record[num_launched_awcs_column] = 'Not Launched'
                 else:
-                    row_data.append(cell['sort_key'] if cell and 'sort_key' in cell else cell)
-            excel_rows.append(row_data)
+                    record[num_launched_awcs_column] = \
+                        'Launched' if record[num_launched_awcs_column] else 'Not Launched'
+            if num_of_days_awc_was_open_column is not None:
+                if record[num_of_days_awc_was_open_column] == DATA_NOT_ENTERED:
+                    record[num_of_days_awc_was_open_column] = 'Applicable at only AWC level'
+            if num_lss_launched_column is not None:
+                if record[num_lss_launched_column] == DATA_NOT_ENTERED:
+                    record[num_lss_launched_column] = 'Not Launched'
+            yield record
+
+    def _get_export_info(self, location):
         filters = [['Generated at', india_now()]]
         if location:
             locs = SQLLocation.objects.get(location_id=location).get_ancestors(include_self=True)
@@ -134,36 +226,7 @@ class ExportableMixin(object):
             for filter_by in self.config['filters']:
                 filter_values.append(FILTER_BY_LIST[filter_by])
             filters.append(['Filtered By', ', '.join(filter_values)])
-        # as DatabaseColumn from corehq.apps.reports.sqlreport doesn't format None
-        if system_usage_num_launched_awcs_formatting_at_awc_level or\
-           system_usage_num_of_days_awc_was_open_formatting or system_usage_num_of_lss_formatting:
-            for record in excel_rows[1:]:
-                if system_usage_num_launched_awcs_formatting_at_awc_level and NUM_LAUNCHED_AWCS in excel_rows[0]:
-                    num_launched_awcs_column = excel_rows[0].index(NUM_LAUNCHED_AWCS)
-                    if record[num_launched_awcs_column] == DATA_NOT_ENTERED:
-                        record[num_launched_awcs_column] = 'Not Launched'
-                    else:
-                        record[num_launched_awcs_column] = \
-                            'Launched' if record[num_launched_awcs_column] else 'Not Launched'
-                if system_usage_num_of_days_awc_was_open_formatting and \
-                        self.loc_level <= 4 and NUM_OF_DAYS_AWC_WAS_OPEN in excel_rows[0]:
-                    num_of_days_awc_was_open_column = excel_rows[0].index(NUM_OF_DAYS_AWC_WAS_OPEN)
-                    if record[num_of_days_awc_was_open_column] == DATA_NOT_ENTERED:
-                        record[num_of_days_awc_was_open_column] = 'Applicable at only AWC level'
-                if system_usage_num_of_lss_formatting and NUM_LAUNCHED_LSS in excel_rows[0]:
-                    num_lss_launched_column = excel_rows[0].index(NUM_LAUNCHED_LSS)
-                    if record[num_lss_launched_column] == DATA_NOT_ENTERED:
-                        record[num_lss_launched_column] = 'Not Launched'
-        return [
-            [
-                self.title,
-                excel_rows
-            ],
-            [
-                'Export Info',
-                filters
-            ]
-        ]
+        return filters
 
 
 class ProgressReportMixIn(object):
@@ -0,0 +1,58 @@
+import csv
+import io
+import zipfile
+from datetime import date, datetime
+from decimal import Decimal
+
+from openpyxl import Workbook
+
+STREAMING_EXPORT_FORMATS = ('csv', 'xlsx')
+
+_EXCEL_TYPES = (str, int, float, Decimal, date, datetime)
+
+# sheet names are limited to 31 characters in excel
+MAX_SHEET_TITLE_LENGTH = 31
+
+
+def write_export_tables(tables, export_file, file_format):
+    """Writes the tables of an export one row at a time, so that the rows can be generated
+    while the file is written.
+
+    The files are laid out as the ones of `couchexport.export.export_from_tables`:
+    a zip of one CSV per table, or a workbook with one sheet per table.
+
+    :param tables: [[table title, iterable of rows]], the first row being the headers
+    :param export_file: binary file object the export is written to
+    """
+    if file_format == 'csv':
+        _write_csv_tables(tables, export_file)
+    elif file_format == 'xlsx':
+        _write_xlsx_tables(tables, export_file)
+    else:
+        raise ValueError(f'{file_format} exports cannot be streamed')
+
+
+def _write_csv_tables(tables, export_file):
+    with zipfile.ZipFile(export_file, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for title, rows in tables:
+            with archive.open(f'{title}.csv', 'w') as table_file:
+                with io.TextIOWrapper(table_file, encoding='utf-8', newline='') as text_file:
+                    writer = csv.writer(text_file)
+                    for row in rows:
+                        writer.writerow(['' if value is None else value for value in row])
+
+
+def _write_xlsx_tables(tables, export_file):
+    # write only workbooks keep the rows in temporary files instead of memory
+    workbook = Workbook(write_only=True)
+    for title, rows in tables:
+        worksheet = workbook.create_sheet(title[:MAX_SHEET_TITLE_LENGTH])
+        for row in rows:
+            worksheet.append([_get_excel_value(value) for value in row])
+    workbook.save(export_file)
+
+
+def _get_excel_value(value):
+    if value is None or isinstance(value, _EXCEL_TYPES):
+        return value
+    return str(value)
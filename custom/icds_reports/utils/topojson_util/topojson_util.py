@@ -1,6 +1,9 @@
+import gzip
+import hashlib
 import json
 import logging
 import os
+from functools import lru_cache
 from pathlib import Path
 
 import attr
@@ -90,6 +93,60 @@ def get_block_topojson_for_state(state):
         logging.error('State {} not found in district topojson file'.format(state))
 
 
+@attr.s
+class CompiledTopojson:
+    """Response content of a topojson, compressed once per process"""
+    gzipped_content = attr.ib()
+    etag = attr.ib()
+    last_modified = attr.ib()
+
+    @property
+    def content(self):
+        return gzip.decompress(self.gzipped_content)
+
+
+def get_compiled_block_topojson_for_state(state):
+    """
+    Returns the `{"topojson": ...}` content served for the blocks of a state, built from the
+    file content without parsing and serializing the topojson again.
+    """
+    block_filenames = _get_block_topojson_filenames()
+    if state not in block_filenames:
+        logging.error('State {} not found in district topojson file'.format(state))
+    # cached by file name so that the cache is bounded by the number of files
+    return _get_compiled_block_topojson(block_filenames.get(state))
+
+
+@lru_cache(maxsize=None)
+def _get_block_topojson_filenames():
+    return {
+        state: state_data['file_name']
+        for state, state_data in get_district_topojson_data().items()
+    }
+
+
+@lru_cache(maxsize=None)
+def _get_compiled_block_topojson(filename):
+    """
+    Only the compressed content is kept in memory as hardly any browser does not accept gzip.
+    """
+    path = get_topojson_directory()
+    if filename:
+        topojson_path = os.path.join(path, 'blocks/' + filename)
+        with open(topojson_path, 'rb') as f:
+            topojson = f.read().strip()
+        last_modified = os.path.getmtime(topojson_path)
+    else:
+        topojson = b'null'
+        last_modified = os.path.getmtime(os.path.join(path, 'district_topojson_data.json'))
+    content = b'{"topojson": ' + topojson + b'}'
+    return CompiledTopojson(
+        gzipped_content=gzip.compress(content),
+        etag=hashlib.md5(content).hexdigest(),
+        last_modified=last_modified,
+    )
+
+
 def get_district_topojson_data():
     district_topojson_data_path = os.path.join(get_topojson_directory(), 'district_topojson_data.json')
     with open(district_topojson_data_path, encoding='utf-8') as f:
@@ -14,7 +14,9 @@ from django.http.response import (
     StreamingHttpResponse,
 )
 from django.shortcuts import get_object_or_404, redirect
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
 from django.utils.decorators import method_decorator
+from django.utils.http import http_date
 from django.views.generic.base import RedirectView, TemplateView, View
 
 import requests
@@ -24,7 +26,10 @@ from dateutil.relativedelta import relativedelta
 from couchexport.export import Format
 from couchexport.shortcuts import export_response
 
-from custom.icds_reports.utils.topojson_util.topojson_util import get_block_topojson_for_state, get_map_name
+from custom.icds_reports.utils.topojson_util.topojson_util import (
+    get_compiled_block_topojson_for_state,
+    get_map_name,
+)
 from dimagi.utils.dates import add_months, force_to_date
 
 from custom.icds import icds_toggles
@@ -245,13 +250,20 @@ from custom.icds_reports.utils.data_accessor import (
     get_inc_indicator_api_data,
     get_program_summary_data_with_retrying,
 )
+from custom.icds_reports.utils.location_access import LocationAccess
 
 from custom.icds_reports.reports.governance_apis import (
     get_home_visit_data,
+    get_home_visit_query,
     get_vhnd_data,
+    get_vhnd_query,
     get_beneficiary_data,
+    get_beneficiary_query,
     get_state_names,
-    get_cbe_data)
+    get_cbe_data,
+    get_cbe_query,
+    get_total_count_for_query,
+    iter_ndjson)
 
 from custom.icds_reports.reports.bihar_api import get_api_demographics_data, get_mother_details,\
     get_api_vaccine_data, get_api_ag_school_data
@@ -508,9 +520,22 @@ class TopoJsonView(BaseReportView):
 
     def get(self, request, *args, **kwargs):
         state = request.GET.get('state')
-        topojson = get_block_topojson_for_state(state)
-        data = {'topojson': topojson}
-        return JsonResponse(data=data)
+        topojson = get_compiled_block_topojson_for_state(state)
+        etag = f'W/"{topojson.etag}"'
+        last_modified = int(topojson.last_modified)
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            if 'gzip' in request.META.get('HTTP_ACCEPT_ENCODING', ''):
+                response = HttpResponse(topojson.gzipped_content, content_type='application/json')
+                response['Content-Encoding'] = 'gzip'
+            else:
+                response = HttpResponse(topojson.content, content_type='application/json')
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(last_modified)
+        # browsers revalidate the topojson instead of downloading it again
+        patch_cache_control(response, private=True, no_cache=True)
+        patch_vary_headers(response, ['Accept-Encoding'])
+        return response
 
 
 @method_decorator(DASHBOARD_CHECKS, name='dispatch')
@@ -642,16 +667,12 @@ class LocationView(View):
 
     def get(self, request, *args, **kwargs):
         location_id = request.GET.get('location_id')
-        user_locations_with_parents = SQLLocation.objects.get_queryset_ancestors(
-            self.request.couch_user.get_sql_locations(self.kwargs['domain']), include_self=True
-        ).distinct()
-        parent_ids = [loc.location_id for loc in user_locations_with_parents]
+        location_access = LocationAccess(self.kwargs['domain'], request.couch_user)
+        parent_ids = location_access.ancestor_ids
         if location_id == 'null' or location_id == 'undefined':
             location_id = None
         if location_id:
-            if not user_can_access_location_id(
-                self.kwargs['domain'], request.couch_user, location_id
-            ) and location_id not in parent_ids:
+            if not location_access.can_access(location_id) and location_id not in parent_ids:
                 return JsonResponse({})
             location = get_object_or_404(
                 SQLLocation,
@@ -664,10 +685,7 @@ class LocationView(View):
                 'map_location_name': get_map_name(location),
                 'location_type': location.location_type.code,
                 'location_type_name': location.location_type_name,
-                'user_have_access': user_can_access_location_id(
-                    self.kwargs['domain'],
-                    request.couch_user, location.location_id
-                ),
+                'user_have_access': location_access.can_access(location.location_id),
                 'user_have_access_to_parent': location.location_id in parent_ids,
                 'parent_name': location.parent.name if location.parent else None,
                 'parent_map_name': get_map_name(location.parent),
@@ -689,7 +707,9 @@ class LocationView(View):
             locations = locations.filter(parent__location_id=parent_id)
 
         if locations.count() == 0:
-            locations = user_locations_with_parents.filter(parent__location_id=parent_id)
+            locations = SQLLocation.objects.filter(
+                domain=self.kwargs['domain'], location_id__in=parent_ids, parent__location_id=parent_id
+            )
 
         if name:
             locations = locations.filter(name__iexact=name)
@@ -700,6 +720,7 @@ class LocationView(View):
             return JsonResponse(data={'locations': []})
 
         locations_list, replacement_names = get_deprecation_info(locations, show_test)
+        accessible_ids = location_access.get_accessible_location_ids([loc.location_id for loc in locations_list])
         return JsonResponse(data={
             'locations': [
                 {
@@ -707,10 +728,7 @@ class LocationView(View):
                     'name': loc.name,
                     'parent_id': parent_id,
                     'location_type_name': loc.location_type_name,
-                    'user_have_access': user_can_access_location_id(
-                        self.kwargs['domain'],
-                        request.couch_user, loc.location_id
-                    ),
+                    'user_have_access': loc.location_id in accessible_ids,
                     'user_have_access_to_parent': loc.location_id in parent_ids,
                     'deprecates': get_location_replacement_name(loc, 'deprecates', replacement_names),
                     'archived_on': datetime_to_date_string(loc.archived_on),
@@ -731,9 +749,10 @@ class LocationAncestorsView(View):
             location_id = None
         show_test = request.GET.get('include_test', False)
         selected_location = get_object_or_404(SQLLocation, location_id=location_id, domain=self.kwargs['domain'])
-        parents = list(SQLLocation.objects.get_queryset_ancestors(
-            self.request.couch_user.get_sql_locations(self.kwargs['domain']), include_self=True
-        ).distinct()) + list(selected_location.get_ancestors())
+        location_access = LocationAccess(self.kwargs['domain'], request.couch_user)
+        parents = list(SQLLocation.objects.filter(
+            domain=self.kwargs['domain'], location_id__in=location_access.ancestor_ids
+        )) + list(selected_location.get_ancestors())
         parent_ids = [x.pk for x in parents]
         parent_locations_ids = [loc.location_id for loc in parents]
         locations = SQLLocation.objects.accessible_to_user(
@@ -743,6 +762,9 @@ class LocationAncestorsView(View):
         ).select_related('parent').distinct().order_by('name')
         all_locations = list(OrderedDict.fromkeys(list(locations) + list(parents)))
         location_list, replacement_names = get_deprecation_info(all_locations, show_test, True)
+        accessible_ids = location_access.get_accessible_location_ids(
+            [location.location_id for location in location_list] + [selected_location.location_id]
+        )
         return JsonResponse(data={
             'locations': [
                 {
@@ -750,10 +772,7 @@ class LocationAncestorsView(View):
                     'name': location.name,
                     'parent_id': location.parent.location_id if location.parent else None,
                     'location_type_name': location.location_type_name,
-                    'user_have_access': user_can_access_location_id(
-                        self.kwargs['domain'],
-                        request.couch_user, location.location_id
-                    ),
+                    'user_have_access': location.location_id in accessible_ids,
                     'user_have_access_to_parent': location.location_id in parent_locations_ids,
                     'deprecates': get_location_replacement_name(location, 'deprecates', replacement_names),
                     'archived_on': datetime_to_date_string(location.archived_on),
@@ -767,10 +786,7 @@ class LocationAncestorsView(View):
                 'location_id': selected_location.location_id,
                 'name': selected_location.name,
                 'parent_id': selected_location.parent.location_id if selected_location.parent else None,
-                'user_have_access': user_can_access_location_id(
-                    self.kwargs['domain'],
-                    request.couch_user, selected_location.location_id
-                ),
+                'user_have_access': selected_location.location_id in accessible_ids,
                 'user_have_access_to_parent': selected_location.location_id in parent_locations_ids,
                 'deprecates': get_location_replacement_name(selected_location, 'deprecates', replacement_names),
                 'archived_on': datetime_to_date_string(selected_location.archived_on),
@@ -806,13 +822,15 @@ class AWCLocationView(View):
 @method_decorator([login_and_domain_required], name='dispatch')
 class HaveAccessToLocation(View):
     def get(self, request, *args, **kwargs):
-        location_id = request.GET.get('location_id')
-        have_access = user_can_access_location_id(
-            self.kwargs['domain'],
-            request.couch_user, location_id
-        )
+        location_access = LocationAccess(self.kwargs['domain'], request.couch_user)
+        location_ids = request.GET.getlist('location_ids')
+        if location_ids:
+            accessible_ids = location_access.get_accessible_location_ids(location_ids)
+            return JsonResponse(data={
+                'haveAccess': {location_id: location_id in accessible_ids for location_id in location_ids}
+            })
         return JsonResponse(data={
-            'haveAccess': have_access
+            'haveAccess': location_access.can_access(request.GET.get('location_id'))
         })
 
 
@@ -2146,6 +2164,8 @@ class CheckExportReportStatus(View):
                     'task_result': res.result if res.successful() else None
                 }
             )
+        if res and res.state == 'PROGRESS':
+            return JsonResponse({'task_ready': status, 'task_progress': res.info})
         return JsonResponse({'task_ready': status})
 
 
@@ -2503,6 +2523,29 @@ class GovernanceAPIBaseView(View):
 
         return is_valid, error_message
 
+    def get_api_response(self, request, get_data, get_query, month, year, order, query_filters):
+        """
+        Returns a page of CAS_API_PAGE_SIZE AWCs, with the number of AWCs after `last_awc_id`
+        and the total of the month, or with `format=ndjson` all the AWCs after `last_awc_id`
+        streamed as one JSON object per line
+        """
+        query = get_query(year, month, order, query_filters)
+        if request.GET.get('format') == 'ndjson':
+            return StreamingHttpResponse(iter_ndjson(query), content_type='application/x-ndjson')
+
+        data, count = get_data(CAS_API_PAGE_SIZE, year, month, order, query_filters)
+        response_json = {
+            'data': data,
+            'metadata': {
+                'month': month,
+                'year': year,
+                'count': count,
+                'total_count': get_total_count_for_query(query, year, month, query_filters),
+                'timestamp': india_now()
+            }
+        }
+        return JsonResponse(data=response_json)
+
 
 class GovernanceHomeVisitAPI(GovernanceAPIBaseView):
 
@@ -2520,23 +2563,9 @@ class GovernanceHomeVisitAPI(GovernanceAPIBaseView):
                          }
         order = ['awc_id']
 
-        data, count = get_home_visit_data(
-            CAS_API_PAGE_SIZE,
-            year,
-            month,
-            order,
-            query_filters
+        return self.get_api_response(
+            request, get_home_visit_data, get_home_visit_query, month, year, order, query_filters
         )
-        response_json = {
-            'data': data,
-            'metadata': {
-                'month': month,
-                'year': year,
-                'count': count,
-                'timestamp': india_now()
-            }
-        }
-        return JsonResponse(data=response_json)
 
 
 class GovernanceBeneficiaryAPI(GovernanceAPIBaseView):
@@ -2554,25 +2583,10 @@ class GovernanceBeneficiaryAPI(GovernanceAPIBaseView):
             'awc_id__gt': last_awc_id}
         order = ['awc_id']
 
-        data, count = get_beneficiary_data(
-            CAS_API_PAGE_SIZE,
-            year,
-            month,
-            order,
-            query_filters
+        return self.get_api_response(
+            request, get_beneficiary_data, get_beneficiary_query, month, year, order, query_filters
         )
 
-        response_json = {
-            'data': data,
-            'metadata': {
-                'month': month,
-                'year': year,
-                'count': count,
-                'timestamp': india_now()
-            }
-        }
-        return JsonResponse(data=response_json)
-
 
 class GovernanceStateListAPI(GovernanceAPIBaseView):
 
@@ -2593,18 +2607,9 @@ class GovernanceVHNDSAPI(GovernanceAPIBaseView):
         order = ['awc_id']
         if state_id is not None:
             query_filters['state_id'] = state_id
-        data, count = get_vhnd_data(CAS_API_PAGE_SIZE, year,
-                                    month, order, query_filters)
-        response_json = {
-            'data': data,
-            'metadata': {
-                'month': month,
-                'year': year,
-                'count': count,
-                'timestamp': india_now()
-            }
-        }
-        return JsonResponse(data=response_json)
+        return self.get_api_response(
+            request, get_vhnd_data, get_vhnd_query, month, year, order, query_filters
+        )
 
 
 class GovernanceCBEAPI(GovernanceAPIBaseView):
@@ -2622,25 +2627,10 @@ class GovernanceCBEAPI(GovernanceAPIBaseView):
             'awc_id__gt': last_awc_id}
         order = ['awc_id']
 
-        data, count = get_cbe_data(
-            CAS_API_PAGE_SIZE,
-            year,
-            month,
-            order,
-            query_filters
+        return self.get_api_response(
+            request, get_cbe_data, get_cbe_query, month, year, order, query_filters
         )
 
-        response_json = {
-            'data': data,
-            'metadata': {
-                'month': month,
-                'year': year,
-                'count': count,
-                'timestamp': india_now()
-            }
-        }
-        return JsonResponse(data=response_json)
-
 
 @location_safe
 @method_decorator([api_auth, icds_toggles.ICDS_BIHAR_DEMOGRAPHICS_API.required_decorator()], name='dispatch')